@@ -0,0 +1,147 @@
+"""Compare GeoTIFF creation presets of the forage model on a model grid.
+
+Usage: python benchmark_raster_presets.py [--template <raster>] [--repeats N]
+
+For pygeoprocessing's default creation options and each preset in
+`forage._GTIFF_CREATION_PRESETS`, write and read back a chain of rasters
+shaped like a state variable update, and report the time taken and the size
+of each raster. With `--template`, rasters take the size, grid and values of
+the first band of the template, e.g. an aligned input or a state variable of
+a previous run; otherwise a synthetic grid is used.
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import numpy
+from osgeo import gdal
+import pygeoprocessing
+
+from rangeland_production import forage
+
+_NODATA = -1.0
+
+
+def _synthetic_template(target_path, n_cols, n_rows):
+    """Write a smooth field with nodata outside an ellipse."""
+    driver = gdal.GetDriverByName('GTiff')
+    target_raster = driver.Create(
+        target_path, n_cols, n_rows, 1, gdal.GDT_Float32,
+        options=['TILED=YES', 'BLOCKXSIZE=256', 'BLOCKYSIZE=256'])
+    target_raster.SetGeoTransform([100, 0.0025, 0, 45, 0, -0.0025])
+    target_band = target_raster.GetRasterBand(1)
+    target_band.SetNoDataValue(_NODATA)
+    x_array, y_array = numpy.meshgrid(
+        numpy.linspace(-1, 1, n_cols), numpy.linspace(-1, 1, n_rows))
+    value_array = (
+        500. + 200. * numpy.sin(3 * x_array) * numpy.cos(2 * y_array) +
+        numpy.random.RandomState(0).normal(0, 5, x_array.shape)).astype(
+            numpy.float32)
+    value_array[(x_array ** 2 + (y_array / 0.8) ** 2) > 1] = _NODATA
+    target_band.WriteArray(value_array)
+    target_band = None
+    target_raster = None
+
+
+def _monthly_update(value, month):
+    """Change each valid pixel a little, as a monthly state update does."""
+    result = numpy.empty(value.shape, dtype=numpy.float32)
+    result[:] = _NODATA
+    valid_mask = value != _NODATA
+    result[valid_mask] = value[valid_mask] * (
+        1. + 0.01 * numpy.sin(month + value[valid_mask] / 50.))
+    return result
+
+
+def _benchmark_preset(template_path, preset, n_repeats, work_dir):
+    """Time writing and reading a chain of rasters with one preset.
+
+    Returns:
+        tuple (seconds writing, seconds reading, mean bytes per raster)
+
+    """
+    preset_dir = os.path.join(work_dir, preset or 'default')
+    os.makedirs(preset_dir)
+    creation_kwargs = {}
+    if preset:
+        creation_kwargs['gtiff_creation_options'] = (
+            forage._gtiff_creation_options(preset, gdal.GDT_Float32))
+
+    base_path = template_path
+    path_list = []
+    start_time = time.time()
+    for month in range(n_repeats):
+        target_path = os.path.join(preset_dir, 'month_%d.tif' % month)
+        pygeoprocessing.raster_calculator(
+            [(base_path, 1), (month, 'raw')], _monthly_update, target_path,
+            gdal.GDT_Float32, _NODATA, **creation_kwargs)
+        path_list.append(target_path)
+        base_path = target_path
+    write_seconds = time.time() - start_time
+
+    start_time = time.time()
+    for path in path_list:
+        for _, block in pygeoprocessing.iterblocks((path, 1)):
+            numpy.sum(block)
+    read_seconds = time.time() - start_time
+
+    mean_bytes = numpy.mean([os.path.getsize(path) for path in path_list])
+    return write_seconds, read_seconds, mean_bytes
+
+
+def main():
+    """Entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument(
+        '--template', help='raster whose grid and values are used')
+    parser.add_argument(
+        '--size', type=int, default=2048,
+        help='width and height of the synthetic grid, if no template')
+    parser.add_argument(
+        '--repeats', type=int, default=12,
+        help='number of rasters written with each preset')
+    parser.add_argument(
+        '--work-dir', help='directory for rasters, e.g. on the disk used '
+        'for model workspaces. A temporary directory by default')
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(dir=args.work_dir)
+    try:
+        template_path = args.template
+        if not template_path:
+            template_path = os.path.join(work_dir, 'template.tif')
+            _synthetic_template(template_path, args.size, args.size)
+        n_cols, n_rows = pygeoprocessing.get_raster_info(
+            template_path)['raster_size']
+        megapixels = n_cols * n_rows * args.repeats / 1e6
+
+        print('%d x %d pixels, %d rasters per preset' % (
+            n_cols, n_rows, args.repeats))
+        print('%-16s %12s %12s %12s %10s' % (
+            'preset', 'write MP/s', 'read MP/s', 'MB/raster', 'ratio'))
+        baseline_bytes = None
+        supported_list = gdal.GetDriverByName('GTiff').GetMetadataItem(
+            'DMD_CREATIONOPTIONLIST')
+        for preset in [None] + sorted(forage._GTIFF_CREATION_PRESETS):
+            if preset and 'COMPRESS=ZSTD' in (
+                    forage._GTIFF_CREATION_PRESETS[preset]) and (
+                    'ZSTD' not in supported_list):
+                print('%-16s not supported by this build of GDAL' % preset)
+                continue
+            write_seconds, read_seconds, mean_bytes = _benchmark_preset(
+                template_path, preset, args.repeats, work_dir)
+            if baseline_bytes is None:
+                baseline_bytes = mean_bytes
+            print('%-16s %12.1f %12.1f %12.2f %10.2f' % (
+                preset or 'default', megapixels / write_seconds,
+                megapixels / read_seconds, mean_bytes / 1e6,
+                baseline_bytes / mean_bytes))
+    finally:
+        shutil.rmtree(work_dir)
+
+
+if __name__ == '__main__':
+    main()
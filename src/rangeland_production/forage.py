@@ -3,9 +3,13 @@ import os
 import logging
 import tempfile
 import shutil
+import hashlib
+import json
 from builtins import range
 import re
 import math
+import multiprocessing
+import multiprocessing.pool
 
 import numpy
 import pandas
@@ -25,6 +29,29 @@ SOIL_TYPE_LIST = ['clay', 'silt', 'sand']
 # temporary directory to store intermediate files
 PROCESSING_DIR = None
 
+# GeoTIFF creation options of the presets that may be selected for rasters
+# inside PROCESSING_DIR and for all other rasters created by the model. The
+# predictor of compressed presets is chosen from the datatype of each raster.
+# On float32 grids with the floating point predictor, DEFLATE level 3 gives
+# 95-99% of the size reduction of level 6 in half the time, and 512-pixel
+# blocks compress no better than 256-pixel blocks
+_GTIFF_CREATION_PRESETS = {
+    'fast_scratch': [
+        'TILED=YES', 'BLOCKXSIZE=256', 'BLOCKYSIZE=256', 'COMPRESS=NONE',
+        'SPARSE_OK=TRUE', 'BIGTIFF=IF_SAFER'],
+    'compact_archive': [
+        'TILED=YES', 'BLOCKXSIZE=256', 'BLOCKYSIZE=256', 'COMPRESS=DEFLATE',
+        'ZLEVEL=3', 'BIGTIFF=IF_SAFER'],
+    'compact_zstd': [
+        'TILED=YES', 'BLOCKXSIZE=256', 'BLOCKYSIZE=256', 'COMPRESS=ZSTD',
+        'ZSTD_LEVEL=9', 'BIGTIFF=IF_SAFER'],
+}
+
+# presets selected for the current run, or None to use the defaults of
+# pygeoprocessing
+SCRATCH_RASTER_PRESET = None
+OUTPUT_RASTER_PRESET = None
+
 # state variables and parameters take their names from Century
 # _SITE_STATE_VARIABLE_FILES contains state variables that are a
 # property of the site, including:
@@ -181,6 +208,11 @@ _PFT_INTERMEDIATE_VALUES = [
     'cercrp_max_below_1', 'cercrp_max_below_2',
     'tgprod', 'rtsh', 'flgrem', 'fdgrem']
 
+# monthly outputs that may be selected with args['outputs']
+_MONTHLY_OUTPUTS = [
+    'potential_biomass', 'standing_biomass', 'animal_density',
+    'diet_sufficiency', 'observed_biomass']
+
 # intermediate site-level values that are shared between submodels,
 # but do not need to be saved as output
 _SITE_INTERMEDIATE_VALUES = [
@@ -459,6 +491,43 @@ _IC_NODATA = float(numpy.finfo('float32').min)
 # SV_NODATA is for state variables
 _SV_NODATA = -1.0
 
+# scale of monthly outputs written as 16-bit unsigned integers with
+# args['quantize_outputs'], such that value = stored value * scale + offset.
+# Larger values are stored as the largest valid stored value
+_QUANTIZED_OUTPUT_SCALE = {
+    'potential_biomass': 0.5,
+    'standing_biomass': 0.5,
+    'observed_biomass': 0.5,
+    'animal_density': 0.001,
+    'diet_sufficiency': 0.0001,
+}
+_QUANTIZED_OUTPUT_OFFSET = 0.
+_QUANTIZED_NODATA = 65535
+
+# columns of the animal trait table that change from month to month
+_ANIMAL_STATE_COLUMNS = ['reproductive_status_int', 'W_total', 'A_foet', 'A_y']
+
+# initial state variables used to calculate persistent parameters
+_PERSISTENT_PARAM_SV_KEYS = [
+    'som1c_2_path', 'som2c_2_path', 'som3c_path', 'strucc_1_path',
+    'struce_1_1_path', 'struce_1_2_path']
+
+# soil organic carbon pools that must be stable to end the spin-up
+_SOM_CARBON_POOLS = ['som1c_1', 'som1c_2', 'som2c_1', 'som2c_2', 'som3c']
+# nodata value of the raster recording the year in which pixels are stable
+_STABLE_YEAR_NODATA = -9999
+
+# arguments that determine the shared history of forked scenarios
+_FORK_FIXED_ARGS = [
+    'starting_month', 'starting_year', 'aoi_path', 'proportion_legume_path',
+    'bulk_density_path', 'ph_path', 'clay_proportion_path',
+    'silt_proportion_path', 'sand_proportion_path', 'site_param_table',
+    'site_param_spatial_index_path', 'veg_spatial_composition_path_pattern',
+    'initial_conditions_dir', 'site_initial_table', 'pft_initial_table']
+
+# keys of inputs that are supplied once for each month of the simulation
+_MONTHLY_INPUT_KEY_REGEX = re.compile(r'^(precip|EO_index)_(\d+)$')
+
 
 def execute(args):
     """InVEST Forage Model.
@@ -627,6 +696,157 @@ def execute(args):
             plant functional type index and each state variable listed in the
             following table:
             https://docs.google.com/spreadsheets/d/1TGCDOJS4nNsJpzTWdiWed390NmbhQFB2uUoMs9oTTYo/edit?usp=sharing
+        args['alignment_cache_dir'] (string): optional input, path to
+            directory where aligned copies of the input rasters are stored.
+            Aligned rasters are named by a key calculated from the path, size
+            and modification time of the source raster, the target pixel
+            size and extent, the area of interest and the resampling method,
+            so runs that share this directory reuse inputs aligned by
+            previous runs instead of aligning them again. Persistent
+            parameters calculated from soil inputs, site parameters and
+            initial soil organic matter are cached in the same directory and
+            reused by runs with the same inputs. If not supplied, aligned
+            inputs are cached in the directory `aligned_inputs` inside
+            `workspace_dir`.
+        args['use_vrt_alignment'] (bool): optional input. If True, input
+            rasters that already share the pixel size and grid of the aligned
+            inputs and have a nodata value are aligned as lightweight virtual
+            rasters (VRT) that clip and mask the source raster when it is
+            read, instead of being copied. Inputs on a different grid are
+            resampled as usual. Defaults to False.
+        args['lazy_monthly_alignment'] (bool): optional input. If True,
+            monthly precipitation and vegetation index inputs are aligned
+            just before the month that uses them, while the inputs of the
+            following months are aligned in a background thread, and are
+            deleted once no later month of the simulation needs them. These
+            aligned inputs are temporary and are not added to the alignment
+            cache. Defaults to False.
+        args['monthly_precip_cube_path'] (string): optional input, path to a
+            multi-band GeoTIFF or NetCDF raster containing one band of
+            monthly precipitation per month, used instead of
+            `monthly_precip_path_pattern`. NetCDF files with more than one
+            variable may be given as a GDAL subdataset name, e.g.
+            'NETCDF:"./climate/chirps.nc":precip'. The first band contains
+            precipitation for the month given by
+            `climate_cube_start_month` and `climate_cube_start_year`, and
+            each following band contains the following month.
+        args['monthly_vi_cube_path'] (string): optional input, path to a
+            multi-band GeoTIFF or NetCDF raster containing one band of
+            vegetation index per month, used instead of
+            `monthly_vi_path_pattern`. Bands are ordered in time as in
+            `monthly_precip_cube_path`.
+        args['min_temp_cube_path'] (string): optional input, path to a
+            GeoTIFF or NetCDF raster with 12 bands containing minimum monthly
+            temperature for January..December, used instead of
+            `min_temp_path_pattern`.
+        args['max_temp_cube_path'] (string): optional input, path to a
+            GeoTIFF or NetCDF raster with 12 bands containing maximum monthly
+            temperature for January..December, used instead of
+            `max_temp_path_pattern`.
+        args['climate_cube_start_year'] (int): optional input, year of the
+            first band of `monthly_precip_cube_path` and
+            `monthly_vi_cube_path`. Defaults to `starting_year`.
+        args['climate_cube_start_month'] (int): optional input, month
+            (1..12) of the first band of `monthly_precip_cube_path` and
+            `monthly_vi_cube_path`. Defaults to `starting_month`.
+            The cube arguments only spare preparing a separate source file
+            for each month: each band used by the run is still aligned to
+            its own raster in the alignment cache, as are monthly inputs
+            given as separate files. Bands are aligned as virtual rasters
+            referring to the cube, without copying pixels, only with
+            `use_vrt_alignment` and where the cube already shares the
+            target grid.
+        args['prefetch_monthly_inputs'] (bool): optional input. If True,
+            the aligned precipitation, vegetation index and temperature
+            inputs of the next month are read in background threads while
+            the current month is computed, so that the time spent reading
+            them from slow or network storage overlaps with computation.
+            Defaults to False.
+        args['checkpoint_interval'] (int): optional input, number of months
+            between checkpoints of the model state. A checkpoint containing
+            the state variables, persistent and yearly parameters and the
+            reproductive status of animals at the end of a month is written
+            to the directory `checkpoints` inside `workspace_dir` every
+            `checkpoint_interval` months and after the last month of the
+            run. If 0, no checkpoints are written. Defaults to 12.
+        args['resume_from'] (string): optional input, path to a workspace
+            containing checkpoints written by a previous run, or to one
+            checkpoint directory. If supplied, the simulation resumes from
+            the month following the latest complete checkpoint instead of
+            starting from initial conditions. The previous run must have
+            the same `starting_month` and `starting_year`. Animal traits
+            are derived from `animal_trait_path` of this run, while the
+            reproductive status of each animal is taken from the
+            checkpoint. To extend a completed run when new monthly inputs
+            become available, supply its workspace as `resume_from` and
+            increase `n_months`: only the new months are simulated, and
+            their outputs are added to the outputs of `workspace_dir`.
+            Monthly inputs for months before the checkpoint are not
+            required, other than the precipitation of the months summed at
+            the start of the first new year.
+        args['align_only'] (bool): optional input. If True, inputs are
+            aligned into the alignment cache and the model returns without
+            simulating any months, so that several runs started later can
+            share the aligned inputs. The paths of the aligned inputs are
+            written to the file `aligned_inputs.json` inside the directory
+            `aligned_inputs` of `workspace_dir`. Defaults to False.
+        args['latitude_path'] (string): optional input, path to a raster
+            giving the latitude of each pixel, used to calculate daylength
+            and solar radiation instead of the latitude of the pixel center.
+            Used by `run_points`, where pixels of the model grid stand for
+            points at different locations.
+        args['stack_monthly_outputs'] (bool): optional input. If True,
+            potential biomass, standing biomass, animal density and diet
+            sufficiency are written as one raster per output inside the
+            directory `output` of `workspace_dir`, for example
+            `standing_biomass.tif`, with one band for each month of the run,
+            instead of one raster per output and month. The rasters are tiled
+            and compressed, and the band of each month is described by
+            `<year>_<month>`. Use `read_output_time_series` to read the
+            values of all months at a point. Defaults to False.
+        args['outputs'] (list): optional input, names of the monthly outputs
+            that should be written, out of 'potential_biomass',
+            'standing_biomass', 'animal_density', 'diet_sufficiency' and
+            'observed_biomass', as a list or a comma-separated string.
+            Outputs that are not listed are not written, and are not
+            calculated unless the model needs them. Defaults to all outputs.
+        args['write_summary_table'] (bool): optional input. If True, the
+            mean of potential biomass, standing biomass, animal density and
+            diet sufficiency inside the study area and inside each grazing
+            area polygon, and the total biomass and number of animals, are
+            appended each month to the table `summary_time_series.csv`
+            inside the directory `output` of `workspace_dir`. Grazing areas
+            are identified by the FID of the polygon. Defaults to False.
+        args['state_variable_retention'] (string): optional input, policy
+            for the directories `state_variables_m<month>` that are written
+            inside `workspace_dir` for each month. One of 'all', to keep
+            every month; 'last:N', to keep the last N months; 'every:K', to
+            keep every Kth month and the last month; or 'none', to keep no
+            month, not even the last. Directories that are not kept are
+            removed in a background thread once the simulation no longer
+            needs them, and rasters of directories that are kept are
+            compressed. Checkpoints contain copies of the state variables,
+            so they are not affected. By default all directories are kept
+            uncompressed.
+        args['scratch_raster_preset'] (string): optional input, GeoTIFF
+            creation preset of temporary rasters inside the directory
+            `temporary_files` of `workspace_dir`, one of the keys of
+            `_GTIFF_CREATION_PRESETS`. 'fast_scratch' writes uncompressed
+            tiled rasters. Defaults to the creation options of
+            pygeoprocessing.
+        args['output_raster_preset'] (string): optional input, GeoTIFF
+            creation preset of all other rasters created by the model,
+            including state variables and outputs. 'compact_archive' writes
+            tiled rasters compressed with DEFLATE and a predictor;
+            'compact_zstd' uses ZSTD instead, if GDAL supports it. Defaults
+            to the creation options of pygeoprocessing.
+        args['quantize_outputs'] (bool): optional input. If True, monthly
+            outputs are written as 16-bit unsigned integer rasters with the
+            scale and offset given in `_QUANTIZED_OUTPUT_SCALE` and
+            `_QUANTIZED_OUTPUT_OFFSET`, stored as raster metadata, e.g.
+            biomass to the nearest 0.5 kg/ha. Use `read_output_raster` or
+            `read_output_time_series` to read them as floating point
+            values. Defaults to False.
 
     Returns:
         None.
@@ -636,10 +856,105 @@ def execute(args):
     starting_month = int(args['starting_month'])
     starting_year = int(args['starting_year'])
     n_months = int(args['n_months'])
+    output_list = list(_MONTHLY_OUTPUTS)
+    try:
+        if args['outputs'] not in ['', None]:
+            output_list = _parse_output_list(args['outputs'])
+    except KeyError:
+        pass
+
+    # state variable directories of past months may be removed or compressed
+    sv_retention = None
+    try:
+        if args['state_variable_retention'] not in ['', None]:
+            sv_retention = _StateVariableRetention(
+                args['workspace_dir'], args['state_variable_retention'])
+    except KeyError:
+        pass
+
+    # checkpoints of model state are written every `checkpoint_interval`
+    # months, and a previous run can be resumed from the latest of them
+    checkpoint_interval = 12
+    try:
+        if args['checkpoint_interval'] not in ['', None]:
+            checkpoint_interval = int(args['checkpoint_interval'])
+    except KeyError:
+        pass
+    checkpoint = None
+    try:
+        if args['resume_from']:
+            checkpoint = _read_checkpoint(
+                _find_latest_checkpoint(args['resume_from']))
+    except KeyError:
+        pass
+    if checkpoint:
+        if (checkpoint['starting_year'] != starting_year or
+                checkpoint['starting_month'] != starting_month):
+            raise ValueError(
+                "Checkpoint was written by a run starting in %d/%d, but this "
+                "run starts in %d/%d" % (
+                    checkpoint['starting_month'], checkpoint['starting_year'],
+                    starting_month, starting_year))
+        LOGGER.info(
+            "resuming from checkpoint of month %d", checkpoint['month_index'])
+
+    # when resuming, inputs are needed only for the months that remain and
+    # for the precipitation window of the first remaining year
+    first_month_index = 0
+    first_precip_month_index = 0
+    if checkpoint:
+        first_month_index = checkpoint['month_index'] + 1
+        first_year_month_index = int(math.ceil(first_month_index / 12.)) * 12
+        first_precip_month_index = max(
+            0, min(first_month_index, first_year_month_index - 11))
+        if first_month_index >= n_months:
+            LOGGER.warning(
+                "checkpoint already covers all %d months of the run",
+                n_months)
+
     # this set will build up the integer months that are used so we can index
     # the mwith temperature later
     temperature_month_set = set()
 
+    # directory for rasters that are aligned to the model inputs
+    aligned_raster_dir = os.path.join(
+        args['workspace_dir'], 'aligned_inputs')
+    utils.make_directories([aligned_raster_dir])
+    alignment_cache_dir = None
+    try:
+        alignment_cache_dir = args['alignment_cache_dir']
+    except KeyError:
+        pass
+    if not alignment_cache_dir:
+        alignment_cache_dir = aligned_raster_dir
+
+    # climate and vegetation index inputs may be supplied as time-stacked
+    # rasters with one band per month instead of one file per month
+    cube_path_map = {}
+    for cube_key in [
+            'monthly_precip_cube_path', 'monthly_vi_cube_path',
+            'min_temp_cube_path', 'max_temp_cube_path']:
+        try:
+            if args[cube_key]:
+                cube_path_map[cube_key] = args[cube_key]
+        except KeyError:
+            pass
+    cube_slice_dir = os.path.join(alignment_cache_dir, 'cube_slices')
+    cube_start_year = starting_year
+    cube_start_month = starting_month
+    try:
+        if args['climate_cube_start_year'] not in ['', None]:
+            cube_start_year = int(args['climate_cube_start_year'])
+    except KeyError:
+        pass
+    try:
+        if args['climate_cube_start_month'] not in ['', None]:
+            cube_start_month = int(args['climate_cube_start_month'])
+    except KeyError:
+        pass
+    precip_band_map = {}
+    EO_index_band_map = {}
+
     # this dict will be used to build the set of input rasters associated with
     # a reasonable lookup ID so we can have a nice dataset to align for raster
     # stack operations
@@ -647,26 +962,37 @@ def execute(args):
     # we'll use this to report any missing paths
     missing_precip_path_list = []
     missing_EO_index_path_list = []
-    for month_index in range(n_months):
+    for month_index in range(first_precip_month_index, n_months):
         month_i = (starting_month + month_index - 1) % 12 + 1
-        temperature_month_set.add(month_i)
         year = starting_year + (starting_month + month_index - 1) // 12
-        precip_path = args[
-            'monthly_precip_path_pattern'].replace(
-                '<year>', str(year)).replace(
-                '<month>', '{:02d}'.format(month_i))
-        base_align_raster_path_id_map[
-            'precip_{}'.format(month_index)] = precip_path
-        if not os.path.exists(precip_path):
-            missing_precip_path_list.append(precip_path)
-        EO_index_path = args[
-            'monthly_vi_path_pattern'].replace(
-                '<year>', str(year)).replace(
-                '<month>', '{:02d}'.format(month_i))
-        base_align_raster_path_id_map[
-            'EO_index_{}'.format(month_index)] = EO_index_path
-        if not os.path.exists(EO_index_path):
-            missing_EO_index_path_list.append(EO_index_path)
+        cube_band = (
+            (year - cube_start_year) * 12 + month_i - cube_start_month + 1)
+        if 'monthly_precip_cube_path' in cube_path_map:
+            precip_band_map['precip_{}'.format(month_index)] = cube_band
+        else:
+            precip_path = args[
+                'monthly_precip_path_pattern'].replace(
+                    '<year>', str(year)).replace(
+                    '<month>', '{:02d}'.format(month_i))
+            base_align_raster_path_id_map[
+                'precip_{}'.format(month_index)] = precip_path
+            if not os.path.exists(precip_path):
+                missing_precip_path_list.append(precip_path)
+        if month_index < first_month_index:
+            # earlier months only contribute to annual precipitation
+            continue
+        temperature_month_set.add(month_i)
+        if 'monthly_vi_cube_path' in cube_path_map:
+            EO_index_band_map['EO_index_{}'.format(month_index)] = cube_band
+        else:
+            EO_index_path = args[
+                'monthly_vi_path_pattern'].replace(
+                    '<year>', str(year)).replace(
+                    '<month>', '{:02d}'.format(month_i))
+            base_align_raster_path_id_map[
+                'EO_index_{}'.format(month_index)] = EO_index_path
+            if not os.path.exists(EO_index_path):
+                missing_EO_index_path_list.append(EO_index_path)
     if missing_precip_path_list:
         raise ValueError(
             "Couldn't find the following precipitation paths given the " +
@@ -681,21 +1007,49 @@ def execute(args):
     # atmospheric N deposition and potential production from annual precip
     n_precip_months = int(args['n_months'])
     if n_precip_months < 12:
+        if 'monthly_precip_cube_path' in cube_path_map:
+            n_precip_bands = pygeoprocessing.get_raster_info(
+                cube_path_map['monthly_precip_cube_path'])['n_bands']
         m_index = int(args['n_months'])
         while m_index <= 12:
             month_i = (starting_month + m_index - 1) % 12 + 1
             year = starting_year + (starting_month + m_index - 1) // 12
-            precip_path = args['monthly_precip_path_pattern'].replace(
-                '<year>', str(year)).replace('<month>', '%.2d' % month_i)
-            base_align_raster_path_id_map['precip_%d' % m_index] = precip_path
-            if os.path.exists(precip_path):
-                n_precip_months = n_precip_months + 1
+            if 'monthly_precip_cube_path' in cube_path_map:
+                cube_band = (
+                    (year - cube_start_year) * 12 + month_i -
+                    cube_start_month + 1)
+                if cube_band <= n_precip_bands:
+                    precip_band_map['precip_%d' % m_index] = cube_band
+                    n_precip_months = n_precip_months + 1
+            else:
+                precip_path = args['monthly_precip_path_pattern'].replace(
+                    '<year>', str(year)).replace('<month>', '%.2d' % month_i)
+                base_align_raster_path_id_map[
+                    'precip_%d' % m_index] = precip_path
+                if os.path.exists(precip_path):
+                    n_precip_months = n_precip_months + 1
             m_index = m_index + 1
     if n_precip_months < 12:
         raise ValueError("At least 12 months of precipitation data required")
+    if 'monthly_precip_cube_path' in cube_path_map:
+        base_align_raster_path_id_map.update(_write_cube_slices(
+            cube_path_map['monthly_precip_cube_path'], precip_band_map,
+            cube_slice_dir))
+    if 'monthly_vi_cube_path' in cube_path_map:
+        base_align_raster_path_id_map.update(_write_cube_slices(
+            cube_path_map['monthly_vi_cube_path'], EO_index_band_map,
+            cube_slice_dir))
 
     # this list will be used to record any expected files that are not found
     for substring in ['min', 'max']:
+        if '%s_temp_cube_path' % substring in cube_path_map:
+            # temperature cubes contain one band for each month of the year
+            base_align_raster_path_id_map.update(_write_cube_slices(
+                cube_path_map['%s_temp_cube_path' % substring],
+                dict([('%s_temp_%d' % (substring, month_i), month_i) for
+                      month_i in temperature_month_set]),
+                cube_slice_dir))
+            continue
         missing_temperature_path_list = []
         for month_i in temperature_month_set:
             monthly_temp_path = args[
@@ -784,6 +1138,11 @@ def execute(args):
 
     base_align_raster_path_id_map['proportion_legume_path'] = args[
         'proportion_legume_path']
+    try:
+        if args['latitude_path']:
+            base_align_raster_path_id_map['latitude'] = args['latitude_path']
+    except KeyError:
+        pass
 
     # track separate state variable files for each PFT
     pft_sv_dict = {}
@@ -811,8 +1170,12 @@ def execute(args):
             "ids: %s\n\t" + ", ".join(missing_animal_trait_list))
 
     # align inputs to match resolution of precipitation rasters
-    target_pixel_size = pygeoprocessing.get_raster_info(
-        base_align_raster_path_id_map['precip_0'])['pixel_size']
+    if checkpoint:
+        # state variables in the checkpoint are on the grid of that run
+        target_pixel_size = checkpoint['target_pixel_size']
+    else:
+        target_pixel_size = pygeoprocessing.get_raster_info(
+            base_align_raster_path_id_map['precip_0'])['pixel_size']
     LOGGER.info(
         "pixel size of aligned inputs: %s", target_pixel_size)
 
@@ -821,148 +1184,119 @@ def execute(args):
     PROCESSING_DIR = os.path.join(args['workspace_dir'], "temporary_files")
     if not os.path.exists(PROCESSING_DIR):
         os.makedirs(PROCESSING_DIR)
-
-    # set up a dictionary that uses the same keys as
-    # 'base_align_raster_path_id_map' to point to the clipped/resampled
-    # rasters to be used in raster calculations for the model.
-    aligned_raster_dir = os.path.join(
-        args['workspace_dir'], 'aligned_inputs')
-    if os.path.exists(aligned_raster_dir):
-        shutil.rmtree(aligned_raster_dir)
-    os.makedirs(aligned_raster_dir)
-    aligned_inputs = dict([(key, os.path.join(
-        aligned_raster_dir, 'aligned_%s' % os.path.basename(path)))
-        for key, path in base_align_raster_path_id_map.items()])
+    _set_raster_presets(args)
 
     # align all the base inputs to be the minimum known pixel size and to
-    # only extend over their combined intersections
-    source_input_path_list = [
-        base_align_raster_path_id_map[k] for k in sorted(
-            base_align_raster_path_id_map.keys())]
-    aligned_input_path_list = [
-        aligned_inputs[k] for k in sorted(aligned_inputs.keys())]
-    pygeoprocessing.align_and_resize_raster_stack(
-        source_input_path_list, aligned_input_path_list,
-        ['near'] * len(source_input_path_list),
-        target_pixel_size, 'intersection',
-        base_vector_path_list=[args['aoi_path']],
-        vector_mask_options={'mask_vector_path': args['aoi_path']})
+    # only extend over their combined intersections. set up a dictionary that
+    # uses the same keys as 'base_align_raster_path_id_map' to point to the
+    # clipped/resampled rasters to be used in raster calculations for the
+    # model. Inputs aligned by a previous run are reused from the cache.
+    use_vrt = False
+    try:
+        use_vrt = bool(args['use_vrt_alignment'])
+    except KeyError:
+        pass
+    lazy_monthly_alignment = False
+    try:
+        lazy_monthly_alignment = bool(args['lazy_monthly_alignment'])
+    except KeyError:
+        pass
+    if checkpoint:
+        target_bb = checkpoint['target_bb']
+    else:
+        target_bb = _target_bounding_box(
+            list(base_align_raster_path_id_map.values()), args['aoi_path'])
+    align_only = False
+    try:
+        align_only = bool(args['align_only'])
+    except KeyError:
+        pass
+    if align_only:
+        # all inputs are aligned into the cache for later runs
+        lazy_monthly_alignment = False
+    monthly_aligner = None
+    prefetch_monthly_inputs = False
+    try:
+        prefetch_monthly_inputs = bool(args['prefetch_monthly_inputs'])
+    except KeyError:
+        pass
+    if lazy_monthly_alignment:
+        # monthly inputs are aligned as the simulation reaches them
+        base_static_path_id_map = dict([
+            (key, path) for key, path in base_align_raster_path_id_map.items()
+            if not _MONTHLY_INPUT_KEY_REGEX.match(key)])
+        base_monthly_path_id_map = dict([
+            (key, path) for key, path in base_align_raster_path_id_map.items()
+            if _MONTHLY_INPUT_KEY_REGEX.match(key)])
+        monthly_aligner = _MonthlyInputAligner(
+            base_monthly_path_id_map, target_pixel_size, target_bb,
+            args['aoi_path'], tempfile.mkdtemp(dir=PROCESSING_DIR),
+            use_vrt=use_vrt, read_ahead=prefetch_monthly_inputs)
+    else:
+        base_static_path_id_map = base_align_raster_path_id_map
+    aligned_inputs = _align_inputs(
+        base_static_path_id_map, target_pixel_size, target_bb,
+        args['aoi_path'], alignment_cache_dir, use_vrt=use_vrt)
+    if monthly_aligner and not checkpoint:
+        monthly_aligner.prepare(0, aligned_inputs)
     _check_pft_fractional_cover_sum(aligned_inputs, pft_id_set)
     file_suffix = utils.make_suffix_string(args, 'results_suffix')
 
     # create animal trait spatial index raster from management polygon
     aligned_inputs['animal_index'] = os.path.join(
         aligned_raster_dir, 'animal_spatial_index.tif')
-    pygeoprocessing.new_raster_from_base(
+    _new_raster_from_base(
         aligned_inputs['site_index'], aligned_inputs['animal_index'],
         gdal.GDT_Int32, [_TARGET_NODATA], fill_value_list=[_TARGET_NODATA])
     pygeoprocessing.rasterize(
         args['animal_grazing_areas_path'], aligned_inputs['animal_index'],
         option_list=["ATTRIBUTE=animal_id"])
 
+    # rasterize the study area once to summarize state variables inside it
+    aligned_inputs['aoi_mask'] = os.path.join(
+        aligned_raster_dir, 'aoi_mask.tif')
+    _new_raster_from_base(
+        aligned_inputs['site_index'], aligned_inputs['aoi_mask'],
+        gdal.GDT_Int32, [_TARGET_NODATA], fill_value_list=[_TARGET_NODATA])
+    pygeoprocessing.rasterize(
+        args['aoi_path'], aligned_inputs['aoi_mask'], burn_values=[0])
+
+    # rasterize grazing area polygons and animal numbers once for the run
+    aligned_inputs['grazing_area_id'] = os.path.join(
+        aligned_raster_dir, 'grazing_area_id.tif')
+    aligned_inputs['total_animals'] = os.path.join(
+        aligned_raster_dir, 'total_animals.tif')
+    _rasterize_grazing_areas(
+        args['animal_grazing_areas_path'], aligned_inputs['site_index'],
+        aligned_inputs['grazing_area_id'], aligned_inputs['total_animals'])
+    if align_only:
+        LOGGER.info("inputs aligned in %s", alignment_cache_dir)
+        with open(os.path.join(
+                aligned_raster_dir, 'aligned_inputs.json'), 'w') as \
+                manifest_file:
+            json.dump(aligned_inputs, manifest_file, indent=2, sort_keys=True)
+        shutil.rmtree(PROCESSING_DIR)
+        return
+
     # Initialization
-    sv_dir = os.path.join(args['workspace_dir'], 'state_variables_m-1')
-    os.makedirs(sv_dir)
-    initial_conditions_dir = None
-    try:
-        initial_conditions_dir = args['initial_conditions_dir']
-    except KeyError:
-        pass
-    if initial_conditions_dir:
-        # check that a raster for each required state variable is supplied
-        missing_initial_values = []
-        # set _SV_NODATA from initial rasters
-        state_var_nodata = set([])
-        # align initial state variables to resampled inputs
-        resample_initial_path_map = {}
-        for sv in _SITE_STATE_VARIABLE_FILES.keys():
-            sv_path = os.path.join(
-                initial_conditions_dir, _SITE_STATE_VARIABLE_FILES[sv])
-            state_var_nodata.update(
-                set([pygeoprocessing.get_raster_info(sv_path)['nodata'][0]]))
-            resample_initial_path_map[sv] = sv_path
-            if not os.path.exists(sv_path):
-                missing_initial_values.append(sv_path)
-        for pft_i in pft_id_set:
-            for sv in _PFT_STATE_VARIABLES:
-                sv_key = '{}_{}_path'.format(sv, pft_i)
-                sv_path = os.path.join(
-                    initial_conditions_dir, '{}_{}.tif'.format(sv, pft_i))
-                state_var_nodata.update(
-                    set([pygeoprocessing.get_raster_info(sv_path)['nodata']
-                         [0]]))
-                resample_initial_path_map[sv_key] = sv_path
-                if not os.path.exists(sv_path):
-                    missing_initial_values.append(sv_path)
-        if missing_initial_values:
-            raise ValueError(
-                "Couldn't find the following required initial values: " +
-                "\n\t".join(missing_initial_values))
-        if len(state_var_nodata) > 1:
-            raise ValueError(
-                "Initial state variable rasters contain >1 nodata value")
+    if checkpoint:
+        # continue from the state at the end of the checkpointed month
         global _SV_NODATA
-        _SV_NODATA = list(state_var_nodata)[0]
-
-        # align initial values with inputs
-        initial_path_list = (
-            [aligned_inputs['precip_0']] +
-            [resample_initial_path_map[key] for key in sorted(
-                resample_initial_path_map.keys())])
-        aligned_initial_path_list = (
-            [os.path.join(PROCESSING_DIR, 'aligned_input_template.tif')] +
-            [os.path.join(
-                sv_dir, os.path.basename(resample_initial_path_map[key])) for
-                key in sorted(resample_initial_path_map.keys())])
-        pygeoprocessing.align_and_resize_raster_stack(
-            initial_path_list, aligned_initial_path_list,
-            ['near'] * len(initial_path_list),
-            target_pixel_size, 'intersection',
-            base_vector_path_list=[args['aoi_path']], raster_align_index=0,
-            vector_mask_options={'mask_vector_path': args['aoi_path']})
-        sv_reg = dict(
-            [(key, os.path.join(sv_dir, os.path.basename(path)))
-             for key, path in resample_initial_path_map.items()])
+        _SV_NODATA = checkpoint['sv_nodata']
+        start_month_index = first_month_index
+        sv_dir = os.path.join(
+            args['workspace_dir'],
+            'state_variables_m%d' % checkpoint['month_index'])
+        utils.make_directories([sv_dir])
+        sv_reg = utils.build_file_registry(
+            [(_SITE_STATE_VARIABLE_FILES, sv_dir),
+                (pft_sv_dict, sv_dir)], file_suffix)
+        _restore_registry(checkpoint['state_variables'], sv_reg)
     else:
-        # create initialization rasters from tables
-        try:
-            site_initial_conditions_table = utils.build_lookup_from_csv(
-                args['site_initial_table'], 'site')
-        except KeyError:
-            raise ValueError(
-                "If initial conditions rasters are not supplied, initial " +
-                "conditions tables must be supplied")
-        missing_site_index_list = list(
-            site_index_set.difference(site_initial_conditions_table.keys()))
-        if missing_site_index_list:
-            raise ValueError(
-                "Couldn't find initial conditions values for the following " +
-                "site indices: %s\n\t" + ", ".join(missing_site_index_list))
-        try:
-            pft_initial_conditions_table = utils.build_lookup_from_csv(
-                args['pft_initial_table'], 'PFT')
-        except KeyError:
-            raise ValueError(
-                "If initial conditions rasters are not supplied, initial " +
-                "conditions tables must be supplied")
-        missing_pft_index_list = pft_id_set.difference(
-            pft_initial_conditions_table.keys())
-        if missing_pft_index_list:
-            raise ValueError(
-                "Couldn't find initial condition values for the following "
-                "plant functional types: %s\n\t" + ", ".join(
-                    missing_pft_index_list))
-        sv_reg = initial_conditions_from_tables(
-            aligned_inputs, sv_dir, pft_id_set, site_initial_conditions_table,
-            pft_initial_conditions_table)
-
-    # calculate persistent intermediate parameters that do not change during
-    # the simulation
-    persist_param_dir = os.path.join(
-        args['workspace_dir'], 'intermediate_parameters')
-    utils.make_directories([persist_param_dir])
-    pp_reg = utils.build_file_registry(
-        [(_PERSISTENT_PARAMS_FILES, persist_param_dir)], file_suffix)
+        start_month_index = 0
+        sv_reg = _initial_state_variables(
+            args, aligned_inputs, pft_id_set, site_index_set,
+            target_pixel_size)
 
     # calculate derived animal traits that do not change during the simulation
     freer_parameter_df = pandas.DataFrame.from_dict(
@@ -972,29 +1306,26 @@ def execute(args):
         input_animal_trait_table, freer_parameter_df)
 
     # calculate maximum potential intake of each animal type
-    for animal_id in animal_trait_table.keys():
-        revised_animal_trait_dict = calc_max_intake(
-            animal_trait_table[animal_id])
-        animal_trait_table[animal_id] = revised_animal_trait_dict
-
-    # calculate field capacity and wilting point
-    LOGGER.info("Calculating field capacity and wilting point")
-    _afiel_awilt(
-        aligned_inputs['site_index'], site_param_table,
-        sv_reg['som1c_2_path'], sv_reg['som2c_2_path'], sv_reg['som3c_path'],
-        aligned_inputs['sand'], aligned_inputs['silt'],
-        aligned_inputs['clay'], aligned_inputs['bulk_d_path'], pp_reg)
+    animal_trait_table = calc_max_intake(animal_trait_table)
 
-    # calculate other persistent parameters
-    LOGGER.info("Calculating persistent parameters")
-    _persistent_params(
-        aligned_inputs['site_index'], site_param_table,
-        aligned_inputs['sand'], aligned_inputs['clay'], pp_reg)
-
-    # calculate required ratios for decomposition of structural material
-    LOGGER.info("Calculating required ratios for structural decomposition")
-    _structural_ratios(
-        aligned_inputs['site_index'], site_param_table, sv_reg, pp_reg)
+    # persistent intermediate parameters do not change during the simulation
+    persist_param_dir = os.path.join(
+        args['workspace_dir'], 'intermediate_parameters')
+    if checkpoint:
+        # restore persistent parameters and animal reproductive status
+        utils.make_directories([persist_param_dir])
+        pp_reg = utils.build_file_registry(
+            [(_PERSISTENT_PARAMS_FILES, persist_param_dir)], file_suffix)
+        _restore_registry(checkpoint['persistent_params'], pp_reg)
+        animal_trait_table = _restore_animal_state(
+            animal_trait_table,
+            pandas.read_pickle(checkpoint['animal_trait_table']))
+    else:
+        # parameters calculated by a previous run from the same inputs are
+        # reused from the cache
+        pp_reg = _cached_persistent_params(
+            aligned_inputs, site_param_table, sv_reg,
+            os.path.join(alignment_cache_dir, 'persistent_parameters'))
 
     # make yearly directory for values that are updated every twelve months
     year_dir = tempfile.mkdtemp(dir=PROCESSING_DIR)
@@ -1005,6 +1336,12 @@ def execute(args):
         for file in _YEARLY_PFT_FILES:
             year_reg['{}_{}'.format(file, pft_i)] = os.path.join(
                 year_dir, '{}_{}.tif'.format(file, pft_i))
+    if checkpoint:
+        # yearly values are recalculated at the start of the next year
+        _restore_registry(
+            checkpoint['yearly'], dict([
+                (key, path) for key, path in year_reg.items() if
+                key in checkpoint['yearly']]))
 
     # make monthly directory for monthly intermediate parameters that are
     # shared between submodels, but do not need to be saved as output
@@ -1033,12 +1370,90 @@ def execute(args):
 
     # Main simulation loop
     # for each step in the simulation
-    for month_index in range(n_months):
+    monthly_prefetcher = None
+    if prefetch_monthly_inputs:
+        monthly_prefetcher = _MonthlyInputPrefetcher()
+    # annual precipitation is summed from scratch or by moving the window
+    # forward, whichever reads fewer rasters, when it is needed each year
+    precip_window = _AnnualPrecipWindow(tempfile.mkdtemp(dir=PROCESSING_DIR))
+
+    # monthly outputs may be stored as scaled integers
+    quantize_outputs = False
+    try:
+        quantize_outputs = bool(args['quantize_outputs'])
+    except KeyError:
+        pass
+
+    # monthly outputs may be collected into one time-stacked raster per output
+    output_stack = None
+    try:
+        if args['stack_monthly_outputs']:
+            output_stack = _MonthlyOutputStack(
+                output_dir, starting_year, starting_month, n_months,
+                aligned_inputs['site_index'], quantize=quantize_outputs)
+    except KeyError:
+        pass
+
+    # observed biomass does not depend on model state, so it is calculated
+    # ahead of the months that use it
+    observed_biomass_pre_pass = _ObservedBiomassPrePass(
+        aligned_inputs['site_index'], site_param_table)
+
+    # summaries of each month are appended to one table
+    summary_table_path = None
+    try:
+        if args['write_summary_table']:
+            summary_table_path = os.path.join(
+                output_dir, 'summary_time_series.csv')
+    except KeyError:
+        pass
+    if summary_table_path and os.path.exists(summary_table_path):
+        # rows of months that are simulated again are replaced
+        summary_df = pandas.read_csv(summary_table_path)
+        summary_month_index = (
+            (summary_df['year'] - starting_year) * 12 + summary_df['month'] -
+            starting_month)
+        summary_df[summary_month_index < start_month_index].to_csv(
+            summary_table_path, index=False)
+
+    # observed biomass that is not an output, or that is stored as scaled
+    #   integers, is removed once it was used
+    obs_biomass_dir = output_dir
+    if 'observed_biomass' not in output_list or quantize_outputs:
+        obs_biomass_dir = tempfile.mkdtemp(dir=PROCESSING_DIR)
+    # potential biomass calculated to estimate animal density is kept for
+    #   the outputs
+    potential_biomass_path = os.path.join(
+        month_temp_dir, 'potential_biomass.tif')
+
+    def obs_biomass_path(month_index):
+        month_i = (starting_month + month_index - 1) % 12 + 1
+        year = starting_year + (starting_month + month_index - 1) // 12
+        return os.path.join(
+            obs_biomass_dir, 'observed_biomass_{}_{}.tif'.format(
+                year, month_i))
+
+    for month_index in range(start_month_index, n_months):
+        EO_index_key = 'EO_index_{}'.format(month_index)
+        if EO_index_key in aligned_inputs:
+            observed_biomass_pre_pass.submit(
+                aligned_inputs[EO_index_key], obs_biomass_path(month_index))
+    for month_index in range(start_month_index, n_months):
+        if monthly_aligner:
+            monthly_aligner.prepare(month_index, aligned_inputs)
+            # monthly inputs aligned just now are streamed to the pre-pass
+            observed_biomass_pre_pass.submit(
+                aligned_inputs['EO_index_{}'.format(month_index)],
+                obs_biomass_path(month_index))
+        if monthly_prefetcher:
+            # read next month's inputs while this month is computed
+            monthly_prefetcher.prefetch(_next_month_input_paths(
+                aligned_inputs, month_index, starting_month))
         if (month_index % 12) == 0:
             # Update yearly quantities
             _yearly_tasks(
                 aligned_inputs, site_param_table, veg_trait_table, month_index,
-                pft_id_set, year_reg)
+                pft_id_set, year_reg, precip_window=precip_window)
 
         current_month = (starting_month + month_index - 1) % 12 + 1
         current_year = starting_year + (starting_month + month_index - 1) // 12
@@ -1046,22 +1461,18 @@ def execute(args):
         # track state variables from previous step
         prev_sv_reg = sv_reg
 
-        for animal_id in animal_trait_table.keys():
-            if animal_trait_table[animal_id]['sex'] == 'breeding_female':
-                revised_animal_trait_dict = update_breeding_female_status(
-                    animal_trait_table[animal_id], month_index)
-                animal_trait_table[animal_id] = revised_animal_trait_dict
-            revised_animal_trait_dict = calc_max_intake(
-                animal_trait_table[animal_id])
-            animal_trait_table[animal_id] = revised_animal_trait_dict
+        # update reproductive status and maximum intake of all animal types
+        animal_trait_table = update_breeding_female_status(
+            animal_trait_table, month_index)
+        animal_trait_table = calc_max_intake(animal_trait_table)
 
         # enforce absence of grazing as zero biomass removed
         for pft_i in pft_id_set:
-            pygeoprocessing.new_raster_from_base(
+            _new_raster_from_base(
                 aligned_inputs['pft_{}'.format(pft_i)],
                 month_reg['flgrem_{}'.format(pft_i)], gdal.GDT_Float32,
                 [_TARGET_NODATA], fill_value_list=[0])
-            pygeoprocessing.new_raster_from_base(
+            _new_raster_from_base(
                 aligned_inputs['pft_{}'.format(pft_i)],
                 month_reg['fdgrem_{}'.format(pft_i)], gdal.GDT_Float32,
                 [_TARGET_NODATA], fill_value_list=[0])
@@ -1102,20 +1513,28 @@ def execute(args):
 
         # estimate animal density from provisional biomass in the absence of
         #   grazing vs observed biomass from earth observations
-        obs_biomass_path = os.path.join(
-            output_dir, 'observed_biomass_{}_{}.tif'.format(
-                current_year, current_month))
+        observed_biomass_pre_pass.wait(obs_biomass_path(month_index))
         _estimate_animal_density(
             aligned_inputs, month_index, pft_id_set, site_param_table,
-            args['animal_grazing_areas_path'], provisional_sv_reg,
-            obs_biomass_path, month_reg)
+            provisional_sv_reg, obs_biomass_path(month_index), month_reg,
+            calculate_observed_biomass=False,
+            potential_biomass_path=potential_biomass_path)
+        if obs_biomass_dir != output_dir:
+            if 'observed_biomass' in output_list:
+                _write_quantized_raster(
+                    obs_biomass_path(month_index), os.path.join(
+                        output_dir, os.path.basename(
+                            obs_biomass_path(month_index))),
+                    'observed_biomass')
+            os.remove(obs_biomass_path(month_index))
 
         # estimate grazing offtake by animals relative to provisional biomass
         #   at an intermediate step, after senescence but before new growth
         _calc_grazing_offtake(
-            aligned_inputs, args['aoi_path'], args['management_threshold'],
-            intermediate_sv_reg, pft_id_set, aligned_inputs['animal_index'],
-            animal_trait_table, veg_trait_table, current_month, month_reg)
+            aligned_inputs, aligned_inputs['aoi_mask'],
+            args['management_threshold'], intermediate_sv_reg, pft_id_set,
+            aligned_inputs['animal_index'], animal_trait_table,
+            veg_trait_table, current_month, month_reg)
 
         # estimate actual biomass production for this step, integrating impacts
         #   of grazing
@@ -1172,388 +1591,3187 @@ def execute(args):
 
         _write_monthly_outputs(
             aligned_inputs, provisional_sv_reg, sv_reg, month_reg, pft_id_set,
-            current_year, current_month, output_dir)
+            current_year, current_month, output_dir, output_stack,
+            output_list=output_list,
+            potential_biomass_path=potential_biomass_path,
+            summary_table_path=summary_table_path,
+            quantize_outputs=quantize_outputs)
+
+        # the last month is always saved so that the run can be extended
+        if checkpoint_interval > 0 and (
+                (month_index + 1) % checkpoint_interval == 0 or
+                month_index == n_months - 1):
+            _write_checkpoint(
+                os.path.join(
+                    args['workspace_dir'], 'checkpoints',
+                    'm%d' % month_index),
+                month_index, starting_year, starting_month, target_pixel_size,
+                target_bb, sv_reg, pp_reg, year_reg, animal_trait_table)
+
+        if monthly_aligner:
+            monthly_aligner.release(month_index, aligned_inputs)
+        if sv_retention:
+            sv_retention.month_completed(month_index)
 
     # clean up
-    shutil.rmtree(persist_param_dir)
+    if sv_retention:
+        sv_retention.close()
+    observed_biomass_pre_pass.close()
+    if monthly_prefetcher:
+        monthly_prefetcher.close()
+    if monthly_aligner:
+        monthly_aligner.close()
+    if os.path.exists(persist_param_dir):
+        shutil.rmtree(persist_param_dir)
     shutil.rmtree(PROCESSING_DIR)
 
 
-def raster_multiplication(
-        raster1, raster1_nodata, raster2, raster2_nodata, target_path,
-        target_path_nodata):
-    """Multiply raster1 by raster2.
+def fork_scenarios(
+        args, fork_month_index, scenario_args_map, n_workers=None):
+    """Run management scenarios that share model history up to one month.
 
-    Multiply raster1 by raster2 element-wise. In any pixel where raster1 or
-    raster2 is nodata, the result is nodata. The result is always of float
-    datatype.
+    The model is run once with `args` through month `fork_month_index`, and
+    the model state at the end of that month is saved as a checkpoint. Each
+    scenario then resumes from the checkpoint with its own arguments, in a
+    separate process, so the shared history is only simulated once.
+    Scenarios reuse the inputs aligned by the shared run through its
+    alignment cache, and the persistent parameters saved in the checkpoint.
+    If the checkpoint exists already, the shared run is not repeated.
 
-    Side effects:
-        modifies or creates the raster indicated by `target_path`
+    Parameters:
+        args (dict): arguments to `execute` describing the shared run and
+            the default arguments of each scenario. `args['n_months']` gives
+            the number of months simulated in each scenario, including the
+            shared months.
+        fork_month_index (int): last month of the shared history, where 0 is
+            the first month of the simulation
+        scenario_args_map (dict): map of scenario name to dictionary of the
+            arguments to `execute` that differ from `args` in that scenario,
+            e.g. {'low_threshold': {'management_threshold': 100}}. Scenarios
+            may change management and animal inputs, but not the arguments
+            in `_FORK_FIXED_ARGS`. Unless it is given, the workspace of each
+            scenario is the directory `scenarios/<name>` inside
+            `args['workspace_dir']`.
+        n_workers (int): number of scenarios to run at once. Defaults to the
+            number of CPUs.
+
+    Raises:
+        ValueError if `fork_month_index` is not a month of the simulation
+            before its last month
+        ValueError if a scenario changes an argument that determines the
+            shared history
 
     Returns:
-        None
+        dict mapping scenario name to the workspace of that scenario
 
     """
-    def raster_multiply_op(raster1, raster2):
-        """Multiply two rasters."""
-        valid_mask = (
-            (~numpy.isclose(raster1, raster1_nodata)) &
-            (~numpy.isclose(raster2, raster2_nodata)))
-        result = numpy.empty(raster1.shape, dtype=numpy.float32)
-        result[:] = target_path_nodata
-        result[valid_mask] = raster1[valid_mask] * raster2[valid_mask]
-        return result
-    pygeoprocessing.raster_calculator(
-        [(path, 1) for path in [raster1, raster2]],
-        raster_multiply_op, target_path, gdal.GDT_Float32,
-        target_path_nodata)
+    n_months = int(args['n_months'])
+    if fork_month_index < 0 or fork_month_index >= n_months - 1:
+        raise ValueError(
+            "Scenarios must fork between months 0 and %d" % (n_months - 2))
+    for scenario_name, scenario_args in scenario_args_map.items():
+        fixed_key_list = sorted(
+            set(scenario_args.keys()).intersection(_FORK_FIXED_ARGS))
+        if fixed_key_list:
+            raise ValueError(
+                "Scenario %s changes arguments that determine the shared "
+                "history: %s" % (scenario_name, ", ".join(fixed_key_list)))
+
+    checkpoint_dir = os.path.join(
+        args['workspace_dir'], 'checkpoints', 'm%d' % fork_month_index)
+    if not os.path.exists(os.path.join(checkpoint_dir, 'checkpoint.json')):
+        LOGGER.info("simulating shared history to month %d", fork_month_index)
+        shared_args = args.copy()
+        shared_args['n_months'] = fork_month_index + 1
+        shared_args['checkpoint_interval'] = fork_month_index + 1
+        execute(shared_args)
+
+    alignment_cache_dir = None
+    try:
+        alignment_cache_dir = args['alignment_cache_dir']
+    except KeyError:
+        pass
+    if not alignment_cache_dir:
+        alignment_cache_dir = os.path.join(
+            args['workspace_dir'], 'aligned_inputs')
+
+    scenario_workspace_map = {}
+    scenario_args_list = []
+    for scenario_name in sorted(scenario_args_map.keys()):
+        scenario_args = args.copy()
+        scenario_args['workspace_dir'] = os.path.join(
+            args['workspace_dir'], 'scenarios', scenario_name)
+        scenario_args['alignment_cache_dir'] = alignment_cache_dir
+        scenario_args.update(scenario_args_map[scenario_name])
+        scenario_args['resume_from'] = checkpoint_dir
+        scenario_workspace_map[scenario_name] = scenario_args['workspace_dir']
+        scenario_args_list.append(scenario_args)
 
+    LOGGER.info(
+        "running %d scenarios from month %d", len(scenario_args_list),
+        fork_month_index + 1)
+    _execute_in_processes(scenario_args_list, n_workers)
+    return scenario_workspace_map
 
-def raster_division(
-        raster1, raster1_nodata, raster2, raster2_nodata, target_path,
-        target_path_nodata):
-    """Divide raster1 by raster2.
 
-    Divide raster1 by raster2 element-wise. In any pixel where raster1 or
-    raster2 is nodata, the result is nodata. The result is always of float
-    datatype.
+def run_points(args, point_table_path):
+    """Run the model at a list of points instead of the whole landscape.
 
-    Side effects:
-        modifies or creates the raster indicated by `target_path`
+    Inputs are aligned into the alignment cache as for a landscape run, and
+    the value of each aligned input is read at each point. The sampled values
+    are written to rasters with a single row holding one pixel for each
+    point, and the model is run on these rasters, so that the cost of each
+    month scales with the number of points rather than the area of the
+    landscape. Daylength and solar radiation are calculated from the latitude
+    of each point. A point inside a grazing area is treated as a grazing area
+    of its own, stocked with the average number of animals per pixel of the
+    grazing area that contains it.
+
+    Parameters:
+        args (dict): arguments to `execute` describing the landscape. The
+            point run is written to the directory `points` inside
+            `args['workspace_dir']`.
+        point_table_path (string): path to table containing the fields
+            'point_id', 'x' and 'y' giving the identifier and coordinates of
+            each point, in the coordinate system of the inputs
+
+    Raises:
+        ValueError if a point lies outside the aligned inputs
 
     Returns:
-        None
+        path to table containing the value of each model output at each
+            point, with the fields 'point_id', 'output' and 'value'
 
     """
-    def raster_divide_op(raster1, raster2):
-        """Divide raster1 by raster2."""
-        valid_mask = (
-            (~numpy.isclose(raster1, raster1_nodata)) &
-            (~numpy.isclose(raster2, raster2_nodata)))
-        raster1 = raster1.astype(numpy.float32)
-        raster2 = raster2.astype(numpy.float32)
+    point_dir = os.path.join(args['workspace_dir'], 'points')
+    point_args, point_id_list = _prepare_point_run(
+        args, point_table_path, point_dir)
+    LOGGER.info("running the model at %d points", len(point_id_list))
+    execute(point_args)
+    point_output_path = os.path.join(point_dir, 'point_outputs.csv')
+    _collect_point_outputs(
+        os.path.join(point_dir, 'output'), point_id_list, point_output_path)
+    return point_output_path
+
+
+def calibrate_parameters(
+        args, point_table_path, veg_param_bounds, site_param_bounds,
+        n_iterations=4, batch_size=None, modeled_output='potential_biomass',
+        n_workers=None, seed=None):
+    """Fit plant and site parameters to biomass observed from the EO index.
+
+    Search for values of the chosen parameters of the plant functional type
+    and site parameter tables that minimize the root mean squared difference
+    between modeled biomass and biomass observed from the vegetation index
+    (`observed_biomass_<year>_<month>.tif`) at a list of points. Inputs are
+    aligned and sampled at the points once, as for `run_points`, and every
+    candidate parameter set is then evaluated by a point run that reads the
+    sampled inputs. Candidates are evaluated in batches of parallel
+    processes. The first batch is drawn uniformly within the bounds of each
+    parameter, and each following batch is drawn from a range around the
+    best candidate so far that is half the width of the previous range.
 
-        result = numpy.empty(raster1.shape, dtype=numpy.float32)
-        result[:] = target_path_nodata
-        error_mask = ((raster1 != 0) & (raster2 == 0.) & valid_mask)
-        zero_mask = ((raster1 == 0.) & (raster2 == 0.) & valid_mask)
-        nonzero_mask = ((raster2 != 0.) & valid_mask)
-        result[error_mask] = target_path_nodata
-        result[zero_mask] = 0.
-        result[nonzero_mask] = raster1[nonzero_mask] / raster2[nonzero_mask]
-        return result
-    pygeoprocessing.raster_calculator(
-        [(path, 1) for path in [raster1, raster2]],
-        raster_divide_op, target_path, gdal.GDT_Float32,
-        target_path_nodata)
+    Parameters:
+        args (dict): arguments to `execute` describing the landscape. The
+            calibration is written to the directory `calibration` inside
+            `args['workspace_dir']`.
+        point_table_path (string): path to table containing the fields
+            'point_id', 'x' and 'y' giving the locations where modeled and
+            observed biomass are compared
+        veg_param_bounds (dict): map of column name in
+            `args['veg_trait_path']` to a tuple (minimum, maximum) of values
+            to try. Each value is used for every plant functional type.
+        site_param_bounds (dict): map of column name in
+            `args['site_param_table']` to a tuple (minimum, maximum) of values
+            to try. Each value is used for every site.
+        n_iterations (int): number of batches of candidates
+        batch_size (int): number of candidates in each batch. Defaults to
+            the number of CPUs.
+        modeled_output (string): model output compared to observed biomass,
+            'potential_biomass' (biomass in the absence of grazing) or
+            'standing_biomass'
+        n_workers (int): number of candidates to evaluate at once. Defaults
+            to the number of CPUs.
+        seed (int): seed for the random number generator used to draw
+            candidates
 
+    Raises:
+        ValueError if a calibrated parameter is not a column of its table
 
-def raster_list_sum(
-        raster_list, input_nodata, target_path, target_nodata,
-        nodata_remove=False):
-    """Calculate the sum per pixel across rasters in a list.
+    Returns:
+        dictionary with the keys 'veg' and 'site', each mapping parameter
+            name to the value of the best candidate, or None if modeled and
+            observed biomass could not be compared for any candidate. The
+            error of every candidate is written to the table
+            `calibration_results.csv` inside the calibration directory.
 
-    Sum the rasters in `raster_list` element-wise, allowing nodata values
-    in the rasters to propagate to the result or treating nodata as zero. If
-    nodata is treated as zero, areas where all inputs are nodata will be nodata
-    in the output.
+    """
+    if batch_size is None:
+        batch_size = multiprocessing.cpu_count()
+    calibration_dir = os.path.join(args['workspace_dir'], 'calibration')
+    point_args, _ = _prepare_point_run(
+        args, point_table_path, os.path.join(calibration_dir, 'points'))
+    # calibration runs are not resumed, so checkpoints are not needed
+    point_args['checkpoint_interval'] = 0
+    # only outputs compared by the calibration are written
+    point_args['outputs'] = [modeled_output, 'observed_biomass']
+    point_args['state_variable_retention'] = 'none'
+
+    random_state = numpy.random.RandomState(seed)
+    best_candidate = None
+    best_error = None
+    result_list = []
+    for iteration in range(n_iterations):
+        candidate_list = [
+            {'veg': _draw_parameter_values(
+                veg_param_bounds,
+                best_candidate['veg'] if best_candidate else None,
+                0.5 ** iteration, random_state),
+             'site': _draw_parameter_values(
+                site_param_bounds,
+                best_candidate['site'] if best_candidate else None,
+                0.5 ** iteration, random_state)}
+            for _ in range(batch_size)]
+        candidate_args_list = []
+        for candidate_index, candidate in enumerate(candidate_list):
+            candidate_args = point_args.copy()
+            candidate_args['workspace_dir'] = os.path.join(
+                calibration_dir, 'iteration_%d' % iteration,
+                'candidate_%d' % candidate_index)
+            utils.make_directories([candidate_args['workspace_dir']])
+            candidate_args['veg_trait_path'] = os.path.join(
+                candidate_args['workspace_dir'], 'veg_trait_table.csv')
+            _write_parameter_table(
+                args['veg_trait_path'], candidate['veg'],
+                candidate_args['veg_trait_path'])
+            candidate_args['site_param_table'] = os.path.join(
+                candidate_args['workspace_dir'], 'site_param_table.csv')
+            _write_parameter_table(
+                args['site_param_table'], candidate['site'],
+                candidate_args['site_param_table'])
+            candidate_args_list.append(candidate_args)
+
+        LOGGER.info(
+            "calibration iteration %d: evaluating %d candidates", iteration,
+            len(candidate_args_list))
+        _execute_in_processes(candidate_args_list, n_workers)
+        for candidate_index, candidate in enumerate(candidate_list):
+            error = _observed_biomass_error(
+                os.path.join(
+                    candidate_args_list[candidate_index]['workspace_dir'],
+                    'output'), modeled_output)
+            result = {
+                'iteration': iteration,
+                'candidate': candidate_index,
+                'rmse': error,
+            }
+            for table_key in ['veg', 'site']:
+                for param_name, value in candidate[table_key].items():
+                    result['%s:%s' % (table_key, param_name)] = value
+            result_list.append(result)
+            if not numpy.isnan(error) and (
+                    best_error is None or error < best_error):
+                best_error = error
+                best_candidate = candidate
+        LOGGER.info(
+            "calibration iteration %d: best rmse %s", iteration, best_error)
+
+    pandas.DataFrame(result_list).to_csv(
+        os.path.join(calibration_dir, 'calibration_results.csv'),
+        index=False)
+    return best_candidate
+
+
+def spin_up(args, initial_conditions_dir, max_years=500, tolerance=0.001):
+    """Bring soil organic matter to equilibrium before a model run.
+
+    Starting from the initial conditions of `args`, a climatology year is
+    repeated through the plant production, soil water, decomposition and
+    leaching submodels only, without grazing animals. Precipitation of each
+    month of the climatology year is the mean of that month over the months
+    of `args`. At the end of each year, a pixel is considered stable when
+    carbon in each soil organic matter pool changed by less than `tolerance`
+    times its value at the start of the year. The state of stable pixels is
+    held fixed from then on, and the spin-up stops when all pixels are
+    stable or after `max_years`. The final state is written to
+    `initial_conditions_dir`, which may be given as
+    `args['initial_conditions_dir']` of a following run.
 
     Parameters:
-        raster_list (list): list of paths to rasters to sum
-        input_nodata (float or int): nodata value in the input rasters
-        target_path (string): path to location to store the result
-        target_nodata (float or int): nodata value for the result raster
-        nodata_remove (bool): if true, treat nodata values in input
-            rasters as zero. If false, the sum in a pixel where any input
-            raster is nodata is nodata.
+        args (dict): arguments to `execute`. The spin-up is run in the
+            directory `spin_up` inside `args['workspace_dir']`.
+        initial_conditions_dir (string): path to directory where initial
+            state variable rasters should be written
+        max_years (int): maximum number of years to repeat
+        tolerance (float): relative change in soil organic carbon over one
+            year below which a pixel is stable
 
     Side effects:
-        modifies or creates the raster indicated by `target_path`
+        creates a raster for each state variable in `initial_conditions_dir`
+        creates the raster `stable_year.tif` in the spin-up directory,
+            giving the year in which each pixel became stable, or -1
 
     Returns:
-        None
+        number of years simulated
+
+    Raises:
+        ValueError if `args['n_months']` is less than 12
 
     """
-    def raster_sum_op(*raster_list):
-        """Add the rasters in raster_list without removing nodata values."""
-        invalid_mask = numpy.any(
-            numpy.isclose(numpy.array(raster_list), input_nodata), axis=0)
-        for r in raster_list:
-            numpy.place(r, numpy.isclose(r, input_nodata), [0])
-        sum_of_rasters = numpy.sum(raster_list, axis=0)
-        sum_of_rasters[invalid_mask] = target_nodata
-        return sum_of_rasters
+    starting_month = int(args['starting_month'])
+    n_months = int(args['n_months'])
+    if n_months < 12:
+        raise ValueError(
+            "Spin-up requires at least 12 months of inputs, but n_months "
+            "is %d" % n_months)
+    alignment_cache_dir, aligned_inputs = _align_shared_inputs(args)
+    spin_up_dir = os.path.join(args['workspace_dir'], 'spin_up')
+    spin_up_args = args.copy()
+    spin_up_args['workspace_dir'] = spin_up_dir
 
-    def raster_sum_op_nodata_remove(*raster_list):
-        """Add the rasters in raster_list, treating nodata as zero."""
-        invalid_mask = numpy.all(
-            numpy.isclose(numpy.array(raster_list), input_nodata), axis=0)
-        for r in raster_list:
-            numpy.place(r, numpy.isclose(r, input_nodata), [0])
-        sum_of_rasters = numpy.sum(raster_list, axis=0)
-        sum_of_rasters[invalid_mask] = target_nodata
-        return sum_of_rasters
+    global PROCESSING_DIR
+    PROCESSING_DIR = os.path.join(spin_up_dir, 'temporary_files')
+    utils.make_directories([PROCESSING_DIR, initial_conditions_dir])
+    _set_raster_presets(args)
+    file_suffix = utils.make_suffix_string(args, 'results_suffix')
 
-    if nodata_remove:
-        pygeoprocessing.raster_calculator(
-            [(path, 1) for path in raster_list], raster_sum_op_nodata_remove,
-            target_path, gdal.GDT_Float32, target_nodata)
+    site_param_table = utils.build_lookup_from_csv(
+        args['site_param_table'], 'site')
+    veg_trait_table = utils.build_lookup_from_csv(
+        args['veg_trait_path'], 'PFT')
+    pft_id_set = set([
+        int(key[4:]) for key in aligned_inputs if re.match(r'^pft_\d+$', key)])
+    pft_sv_dict = {}
+    for pft_i in pft_id_set:
+        for sv in _PFT_STATE_VARIABLES:
+            pft_sv_dict['{}_{}_path'.format(
+                sv, pft_i)] = '{}_{}.tif'.format(sv, pft_i)
+    site_index_set = set()
+    for offset_map, raster_block in pygeoprocessing.iterblocks(
+            (aligned_inputs['site_index'], 1)):
+        site_index_set.update(numpy.unique(raster_block))
+    site_nodata = pygeoprocessing.get_raster_info(
+        aligned_inputs['site_index'])['nodata'][0]
+    site_index_set.discard(site_nodata)
+    target_pixel_size = pygeoprocessing.get_raster_info(
+        aligned_inputs['site_index'])['pixel_size']
 
-    else:
-        pygeoprocessing.raster_calculator(
-            [(path, 1) for path in raster_list], raster_sum_op,
-            target_path, gdal.GDT_Float32, target_nodata)
+    climate_inputs = _precip_climatology(
+        aligned_inputs, n_months, PROCESSING_DIR)
 
+    year_start_sv_reg = _initial_state_variables(
+        spin_up_args, aligned_inputs, pft_id_set, site_index_set,
+        target_pixel_size)
 
-def raster_sum(
-        raster1, raster1_nodata, raster2, raster2_nodata, target_path,
-        target_nodata, nodata_remove=False):
-    """Add raster 1 and raster2.
+    pp_reg = _cached_persistent_params(
+        aligned_inputs, site_param_table, year_start_sv_reg,
+        os.path.join(alignment_cache_dir, 'persistent_parameters'))
 
-    Add raster1 and raster2, allowing nodata values in the rasters to
-    propagate to the result or treating nodata as zero.
+    year_dir = tempfile.mkdtemp(dir=PROCESSING_DIR)
+    year_reg = dict(
+        [(key, os.path.join(year_dir, path)) for key, path in
+            _YEARLY_FILES.items()])
+    for pft_i in pft_id_set:
+        for file in _YEARLY_PFT_FILES:
+            year_reg['{}_{}'.format(file, pft_i)] = os.path.join(
+                year_dir, '{}_{}.tif'.format(file, pft_i))
+    # the climatology year is the same every year, so quantities that remain
+    # static for 12 months are calculated once
+    _yearly_tasks(
+        climate_inputs, site_param_table, veg_trait_table, 0, pft_id_set,
+        year_reg)
+    month_temp_dir = tempfile.mkdtemp(dir=PROCESSING_DIR)
+    month_reg = {}
+    for pft_i in pft_id_set:
+        for val in _PFT_INTERMEDIATE_VALUES:
+            month_reg['{}_{}'.format(
+                val, pft_i)] = os.path.join(
+                month_temp_dir, '{}_{}.tif'.format(val, pft_i))
+    for val in _SITE_INTERMEDIATE_VALUES:
+        month_reg[val] = os.path.join(month_temp_dir, '{}.tif'.format(val))
+
+    # state variables of consecutive months alternate between two
+    # directories
+    month_sv_reg_list = [
+        utils.build_file_registry(
+            [(_SITE_STATE_VARIABLE_FILES, month_sv_dir),
+                (pft_sv_dict, month_sv_dir)], file_suffix) for
+        month_sv_dir in [
+            tempfile.mkdtemp(dir=PROCESSING_DIR),
+            tempfile.mkdtemp(dir=PROCESSING_DIR)]]
+
+    stable_year_path = os.path.join(spin_up_dir, 'stable_year.tif')
+    _new_raster_from_base(
+        aligned_inputs['site_index'], stable_year_path, gdal.GDT_Int32,
+        [_STABLE_YEAR_NODATA], fill_value_list=[-1])
+    n_years = 0
+    for year in range(max_years):
+        sv_reg = year_start_sv_reg
+        for month_index in range(12):
+            current_month = (starting_month + month_index - 1) % 12 + 1
+            prev_sv_reg = sv_reg
+            sv_reg = month_sv_reg_list[month_index % 2]
+            for pft_i in pft_id_set:
+                _new_raster_from_base(
+                    aligned_inputs['pft_{}'.format(pft_i)],
+                    month_reg['flgrem_{}'.format(pft_i)], gdal.GDT_Float32,
+                    [_TARGET_NODATA], fill_value_list=[0])
+                _new_raster_from_base(
+                    aligned_inputs['pft_{}'.format(pft_i)],
+                    month_reg['fdgrem_{}'.format(pft_i)], gdal.GDT_Float32,
+                    [_TARGET_NODATA], fill_value_list=[0])
+            _potential_production(
+                climate_inputs, site_param_table, current_month,
+                month_index, pft_id_set, veg_trait_table, prev_sv_reg,
+                pp_reg, month_reg)
+            _root_shoot_ratio(
+                climate_inputs, site_param_table, current_month, pft_id_set,
+                veg_trait_table, prev_sv_reg, year_reg, month_reg)
+            _soil_water(
+                climate_inputs, site_param_table, veg_trait_table,
+                current_month, month_index, prev_sv_reg, pp_reg, pft_id_set,
+                month_reg, sv_reg)
+            _decomposition(
+                climate_inputs, current_month, month_index, pft_id_set,
+                site_param_table, year_reg, month_reg, prev_sv_reg, pp_reg,
+                sv_reg)
+            _death_and_partition(
+                'stded', climate_inputs, site_param_table, current_month,
+                year_reg, pft_id_set, veg_trait_table, prev_sv_reg, sv_reg)
+            _death_and_partition(
+                'bgliv', climate_inputs, site_param_table, current_month,
+                year_reg, pft_id_set, veg_trait_table, prev_sv_reg, sv_reg)
+            _shoot_senescence(
+                pft_id_set, veg_trait_table, prev_sv_reg, month_reg,
+                current_month, sv_reg)
+            delta_agliv_dict = _new_growth(
+                pft_id_set, climate_inputs, site_param_table,
+                veg_trait_table, month_reg, current_month, sv_reg)
+            _apply_new_growth(delta_agliv_dict, pft_id_set, sv_reg)
+            _leach(climate_inputs, site_param_table, month_reg, sv_reg)
+
+        n_years = year + 1
+        n_unstable = _update_spin_up_state(
+            year_start_sv_reg, sv_reg, stable_year_path, year, tolerance)
+        LOGGER.info(
+            "spin-up year %d: %d pixels not yet stable", year, n_unstable)
+        if n_unstable == 0:
+            break
+
+    for sv_key, basename in list(_SITE_STATE_VARIABLE_FILES.items()) + list(
+            pft_sv_dict.items()):
+        shutil.copyfile(
+            year_start_sv_reg[sv_key],
+            os.path.join(initial_conditions_dir, basename))
+
+    # clean up
+    shutil.rmtree(PROCESSING_DIR)
+    return n_years
+
+
+def read_output_time_series(stack_path, x, y):
+    """Read the values of all months at a point from a stacked output.
 
     Parameters:
-        raster1 (string): path to one raster operand
-        raster1_nodata (float or int): nodata value in raster1
-        raster2 (string): path to second raster operand
-        raster2_nodata (float or int): nodata value in raster2
-        target_path (string): path to location to store the sum
-        target_nodata (float or int): nodata value for the result raster
-        nodata_remove (bool): if true, treat nodata values in input
-            rasters as zero. If false, the sum in a pixel where any
-            input raster is nodata is nodata.
+        stack_path (string): path to a raster of one output written with
+            `args['stack_monthly_outputs']`, for example
+            `output/standing_biomass.tif` inside the workspace
+        x (float): x coordinate of the point, in the coordinate system of
+            the raster
+        y (float): y coordinate of the point, in the coordinate system of
+            the raster
 
-    Side effects:
-        modifies or creates the raster indicated by `target_path`
+    Raises:
+        ValueError if the point lies outside the raster
 
     Returns:
-        None
+        pandas Series indexed by `<year>_<month>` containing the value of
+            the output at the point in each month, or NaN where the value is
+            nodata or the month has not been simulated
 
     """
-    def raster_sum_op(raster1, raster2):
-        """Add raster1 and raster2 without removing nodata values."""
-        valid_mask = (
-            (~numpy.isclose(raster1, raster1_nodata)) &
-            (~numpy.isclose(raster2, raster2_nodata)))
-        result = numpy.empty(raster1.shape, dtype=numpy.float32)
-        result[:] = target_nodata
-        result[valid_mask] = raster1[valid_mask] + raster2[valid_mask]
-        return result
+    raster_info = pygeoprocessing.get_raster_info(stack_path)
+    geotransform = raster_info['geotransform']
+    n_cols, n_rows = raster_info['raster_size']
+    col = int(math.floor((x - geotransform[0]) / geotransform[1]))
+    row = int(math.floor((y - geotransform[3]) / geotransform[5]))
+    if col < 0 or col >= n_cols or row < 0 or row >= n_rows:
+        raise ValueError(
+            "The point (%s, %s) lies outside %s" % (x, y, stack_path))
+
+    stack_raster = gdal.OpenEx(stack_path, gdal.OF_RASTER)
+    value_array = stack_raster.ReadAsArray(col, row, 1, 1).astype(
+        numpy.float64).reshape(-1)
+    band_list = [
+        stack_raster.GetRasterBand(band_index) for band_index in
+        range(1, stack_raster.RasterCount + 1)]
+    label_list = [band.GetDescription() for band in band_list]
+    nodata_mask = _nodata_mask(value_array, band_list[0].GetNoDataValue())
+    # outputs stored as scaled integers are restored to their values
+    value_array = (
+        value_array *
+        numpy.array([band.GetScale() or 1. for band in band_list]) +
+        numpy.array([band.GetOffset() or 0. for band in band_list]))
+    band_list = None
+    stack_raster = None
+    value_array[nodata_mask] = numpy.nan
+    return pandas.Series(value_array, index=label_list)
+
+
+def read_output_raster(raster_path, band_index=1):
+    """Read a monthly output as floating point values.
+
+    Outputs written with `args['quantize_outputs']` are stored as scaled
+    integers and are restored to their values with the scale and offset in
+    the metadata of the raster. Other outputs are read unchanged.
 
-    def raster_sum_op_nodata_remove(raster1, raster2):
-        """Subtract raster2 from raster1, treating nodata as zero."""
-        numpy.place(raster1, numpy.isclose(raster1, raster1_nodata), [0])
-        numpy.place(raster2, numpy.isclose(raster2, raster2_nodata), [0])
-        result = raster1 + raster2
-        return result
+    Parameters:
+        raster_path (string): path to an output raster, for example
+            `output/standing_biomass_2016_1.tif` inside the workspace
+        band_index (int): band to read, for example the band of a month in
+            an output written with `args['stack_monthly_outputs']`
 
-    if nodata_remove:
-        pygeoprocessing.raster_calculator(
-            [(path, 1) for path in [raster1, raster2]],
-            raster_sum_op_nodata_remove, target_path, gdal.GDT_Float32,
-            target_nodata)
-    else:
-        pygeoprocessing.raster_calculator(
-            [(path, 1) for path in [raster1, raster2]],
-            raster_sum_op, target_path, gdal.GDT_Float32,
-            target_nodata)
+    Returns:
+        numpy array containing the value of the output at each pixel, or NaN
+            where the output is nodata
 
+    """
+    raster = gdal.OpenEx(raster_path, gdal.OF_RASTER)
+    band = raster.GetRasterBand(band_index)
+    stored_array = band.ReadAsArray()
+    nodata_mask = _nodata_mask(stored_array, band.GetNoDataValue())
+    value_array = (
+        stored_array.astype(numpy.float64) * (band.GetScale() or 1.) +
+        (band.GetOffset() or 0.))
+    band = None
+    raster = None
+    value_array[nodata_mask] = numpy.nan
+    return value_array
+
+
+def _parse_output_list(outputs):
+    """Identify the monthly outputs selected by `args['outputs']`.
 
-def raster_difference(
-        raster1, raster1_nodata, raster2, raster2_nodata, target_path,
-        target_nodata, nodata_remove=False):
-    """Subtract raster2 from raster1.
+    Parameters:
+        outputs (list or string): names of outputs, as a list or a
+            comma-separated string
 
-    Subtract raster2 from raster1 element-wise, allowing nodata values in the
-    rasters to propagate to the result or treating nodata as zero.
+    Raises:
+        ValueError if an output is not one of `_MONTHLY_OUTPUTS`
+
+    Returns:
+        list of names of the selected outputs
+
+    """
+    if not isinstance(outputs, (list, tuple)):
+        outputs = outputs.split(',')
+    output_list = [output.strip() for output in outputs if output.strip()]
+    unknown_output_list = sorted(
+        set(output_list).difference(_MONTHLY_OUTPUTS))
+    if unknown_output_list:
+        raise ValueError(
+            "The following outputs are not recognized: %s\n\tAvailable "
+            "outputs are: %s" % (
+                ", ".join(unknown_output_list), ", ".join(_MONTHLY_OUTPUTS)))
+    return output_list
+
+
+def _prepare_point_run(args, point_table_path, point_dir):
+    """Sample model inputs at a list of points for a point run.
+
+    Align the inputs described by `args`, read their values at each point
+    and write them to rasters with a single row holding one pixel for each
+    point, as described in `run_points`.
 
     Parameters:
-        raster1 (string): path to raster from which to subtract raster2
-        raster1_nodata (float or int): nodata value in raster1
-        raster2 (string): path to raster which should be subtracted from
-            raster1
-        raster2_nodata (float or int): nodata value in raster2
-        target_path (string): path to location to store the difference
-        target_nodata (float or int): nodata value for the result raster
-        nodata_remove (bool): if true, treat nodata values in input
-            rasters as zero. If false, the difference in a pixel where any
-            input raster is nodata is nodata.
+        args (dict): arguments to `execute` describing the landscape
+        point_table_path (string): path to table containing the fields
+            'point_id', 'x' and 'y'
+        point_dir (string): path to directory where sampled inputs should be
+            written, used as the workspace of the point run
+
+    Raises:
+        ValueError if a point lies outside the aligned inputs
+
+    Returns:
+        a tuple (point_args, point_id_list) where point_args is a dictionary
+            of arguments to `execute` for the point run, and point_id_list
+            is the identifier of each pixel of the point run, in order
+
+    """
+    _, aligned_inputs = _align_shared_inputs(args)
+
+    point_df = pandas.read_csv(point_table_path)
+    x_array = point_df['x'].values.astype(numpy.float64)
+    y_array = point_df['y'].values.astype(numpy.float64)
+    n_points = len(point_df)
+
+    point_input_dir = os.path.join(point_dir, 'point_inputs')
+    utils.make_directories([point_input_dir])
+
+    # points are arranged in one row at their mean latitude, so that the
+    # area of each pixel matches the area of landscape pixels
+    template_info = pygeoprocessing.get_raster_info(
+        aligned_inputs['site_index'])
+    pixel_x, pixel_y = template_info['pixel_size']
+    projection_wkt = template_info['projection']
+    point_geotransform = [
+        float(numpy.amin(x_array)), pixel_x, 0,
+        float(numpy.mean(y_array)) - pixel_y / 2., 0, pixel_y]
+
+    starting_month = int(args['starting_month'])
+    starting_year = int(args['starting_year'])
+    point_args = args.copy()
+    for key in [
+            'monthly_precip_cube_path', 'monthly_vi_cube_path',
+            'min_temp_cube_path', 'max_temp_cube_path', 'resume_from']:
+        point_args.pop(key, None)
+    static_arg_map = {
+        'clay': 'clay_proportion_path',
+        'silt': 'silt_proportion_path',
+        'sand': 'sand_proportion_path',
+        'bulk_d_path': 'bulk_density_path',
+        'ph_path': 'ph_path',
+        'site_index': 'site_param_spatial_index_path',
+        'proportion_legume_path': 'proportion_legume_path',
+    }
+    for key, aligned_path in aligned_inputs.items():
+        monthly_match = _MONTHLY_INPUT_KEY_REGEX.match(key)
+        temperature_match = re.match(r'^(min|max)_temp_(\d+)$', key)
+        if monthly_match:
+            month_index = int(monthly_match.group(2))
+            month_i = (starting_month + month_index - 1) % 12 + 1
+            year = starting_year + (starting_month + month_index - 1) // 12
+            point_input_name = '%s_%d_%.2d.tif' % (
+                monthly_match.group(1), year, month_i)
+        elif temperature_match:
+            point_input_name = '%s_temp_%.2d.tif' % (
+                temperature_match.group(1), int(temperature_match.group(2)))
+        elif key.startswith('pft_') or key in static_arg_map:
+            point_input_name = '%s.tif' % key
+        else:
+            # rasterized from vectors, or replaced by point latitude
+            continue
+        point_input_path = os.path.join(point_input_dir, point_input_name)
+        aligned_info = pygeoprocessing.get_raster_info(aligned_path)
+        _write_point_raster(
+            _sample_raster_at_points(aligned_path, x_array, y_array),
+            aligned_info['datatype'], aligned_info['nodata'][0],
+            projection_wkt, point_geotransform, point_input_path)
+        if key in static_arg_map:
+            point_args[static_arg_map[key]] = point_input_path
+    point_args['monthly_precip_path_pattern'] = os.path.join(
+        point_input_dir, 'precip_<year>_<month>.tif')
+    point_args['monthly_vi_path_pattern'] = os.path.join(
+        point_input_dir, 'EO_index_<year>_<month>.tif')
+    point_args['min_temp_path_pattern'] = os.path.join(
+        point_input_dir, 'min_temp_<month>.tif')
+    point_args['max_temp_path_pattern'] = os.path.join(
+        point_input_dir, 'max_temp_<month>.tif')
+    point_args['veg_spatial_composition_path_pattern'] = os.path.join(
+        point_input_dir, 'pft_<PFT>.tif')
+    point_args['latitude_path'] = os.path.join(
+        point_input_dir, 'latitude.tif')
+    # outputs are collected from the floating point raster of each month
+    point_args['stack_monthly_outputs'] = False
+    point_args['quantize_outputs'] = False
+    _write_point_raster(
+        y_array, gdal.GDT_Float32, _TARGET_NODATA, projection_wkt,
+        point_geotransform, point_args['latitude_path'])
+
+    initial_conditions_dir = None
+    try:
+        initial_conditions_dir = args['initial_conditions_dir']
+    except KeyError:
+        pass
+    if initial_conditions_dir:
+        point_args['initial_conditions_dir'] = os.path.join(
+            point_input_dir, 'initial_conditions')
+        utils.make_directories([point_args['initial_conditions_dir']])
+        for initial_name in os.listdir(initial_conditions_dir):
+            if not initial_name.endswith('.tif'):
+                continue
+            initial_path = os.path.join(initial_conditions_dir, initial_name)
+            initial_info = pygeoprocessing.get_raster_info(initial_path)
+            _write_point_raster(
+                _sample_raster_at_points(initial_path, x_array, y_array),
+                initial_info['datatype'], initial_info['nodata'][0],
+                projection_wkt, point_geotransform, os.path.join(
+                    point_args['initial_conditions_dir'], initial_name))
+
+    # one polygon covering all points, and one grazing area for each point
+    # inside a grazing area of the landscape
+    def point_bounding_box(point_index_list):
+        """Bounding box of the pixels of a list of points."""
+        y_bounds = sorted([
+            point_geotransform[3], point_geotransform[3] + pixel_y])
+        return [
+            point_geotransform[0] + pixel_x * min(point_index_list),
+            y_bounds[0],
+            point_geotransform[0] + pixel_x * (max(point_index_list) + 1),
+            y_bounds[1]]
+
+    point_args['aoi_path'] = os.path.join(point_input_dir, 'aoi.shp')
+    _write_polygon_vector(
+        [point_bounding_box(range(n_points))], projection_wkt, {}, [{}],
+        point_args['aoi_path'])
+
+    grazing_area_id_array = _sample_raster_at_points(
+        aligned_inputs['grazing_area_id'], x_array, y_array)
+    _, grazing_area_count = zonal_sum_and_count(
+        [aligned_inputs['grazing_area_id']],
+        aligned_inputs['grazing_area_id'])
+    grazing_vector = gdal.OpenEx(
+        args['animal_grazing_areas_path'], gdal.OF_VECTOR)
+    grazing_layer = grazing_vector.GetLayer()
+    grazing_box_list = []
+    grazing_field_list = []
+    for point_index in range(n_points):
+        grazing_area_id = int(grazing_area_id_array[point_index])
+        if grazing_area_id == _TARGET_NODATA or grazing_area_id < 0:
+            continue
+        grazing_feature = grazing_layer.GetFeature(grazing_area_id)
+        grazing_box_list.append(point_bounding_box([point_index]))
+        grazing_field_list.append({
+            'animal_id': int(grazing_feature.GetField('animal_id')),
+            'num_animal': (
+                float(grazing_feature.GetField('num_animal')) /
+                grazing_area_count[0, grazing_area_id]),
+        })
+    grazing_feature = None
+    grazing_layer = None
+    grazing_vector = None
+    point_args['animal_grazing_areas_path'] = os.path.join(
+        point_input_dir, 'animal_grazing_areas.shp')
+    _write_polygon_vector(
+        grazing_box_list, projection_wkt,
+        {'animal_id': ogr.OFTInteger, 'num_animal': ogr.OFTReal},
+        grazing_field_list, point_args['animal_grazing_areas_path'])
+
+    point_args['workspace_dir'] = point_dir
+    point_args['alignment_cache_dir'] = os.path.join(
+        point_dir, 'aligned_inputs')
+    return point_args, list(point_df['point_id'])
+
+
+def _collect_point_outputs(output_dir, point_id_list, target_path):
+    """Collect the value of each output of a point run at each point.
+
+    Parameters:
+        output_dir (string): path to output directory of the point run
+        point_id_list (list): identifier of each pixel of the point run
+        target_path (string): path to table that should contain the fields
+            'point_id', 'output' and 'value'. Nodata values are left empty.
 
     Side effects:
-        modifies or creates the raster indicated by `target_path`
+        creates the table indicated by `target_path`
 
     Returns:
         None
 
     """
-    def raster_difference_op(raster1, raster2):
-        """Subtract raster2 from raster1 without removing nodata values."""
-        valid_mask = (
-            (~numpy.isclose(raster1, raster1_nodata)) &
-            (~numpy.isclose(raster2, raster2_nodata)))
-        result = numpy.empty(raster1.shape, dtype=numpy.float32)
-        result[:] = target_nodata
-        result[valid_mask] = raster1[valid_mask] - raster2[valid_mask]
-        return result
+    point_output_list = []
+    for output_name in sorted(os.listdir(output_dir)):
+        if not output_name.endswith('.tif'):
+            continue
+        output_path = os.path.join(output_dir, output_name)
+        output_nodata = pygeoprocessing.get_raster_info(
+            output_path)['nodata'][0]
+        output_raster = gdal.OpenEx(output_path, gdal.OF_RASTER)
+        output_array = output_raster.GetRasterBand(1).ReadAsArray()[0]
+        output_raster = None
+        for point_id, value in zip(point_id_list, output_array):
+            if output_nodata is not None and numpy.isclose(
+                    value, output_nodata):
+                value = numpy.nan
+            point_output_list.append({
+                'point_id': point_id,
+                'output': os.path.splitext(output_name)[0],
+                'value': value,
+            })
+    pandas.DataFrame(
+        point_output_list, columns=['point_id', 'output', 'value']).to_csv(
+            target_path, index=False)
+
+
+def _draw_parameter_values(
+        param_bounds, center_map, width_fraction, random_state):
+    """Draw a random value of each parameter for calibration.
 
-    def raster_difference_op_nodata_remove(raster1, raster2):
-        """Subtract raster2 from raster1, treating nodata as zero."""
-        numpy.place(raster1, numpy.isclose(raster1, raster1_nodata), [0])
-        numpy.place(raster2, numpy.isclose(raster2, raster2_nodata), [0])
-        result = raster1 - raster2
-        return result
+    Parameters:
+        param_bounds (dict): map of parameter name to a tuple (minimum,
+            maximum) of allowed values
+        center_map (dict): map of parameter name to the value at the center
+            of the range to draw from, or None to draw from the full range
+        width_fraction (float): width of the range to draw from, as a
+            fraction of the width between minimum and maximum. The range is
+            clipped to the allowed values.
+        random_state (numpy.random.RandomState): random number generator
 
-    if nodata_remove:
-        pygeoprocessing.raster_calculator(
-            [(path, 1) for path in [raster1, raster2]],
-            raster_difference_op_nodata_remove, target_path, gdal.GDT_Float32,
-            target_nodata)
-    else:
-        pygeoprocessing.raster_calculator(
-            [(path, 1) for path in [raster1, raster2]],
-            raster_difference_op, target_path, gdal.GDT_Float32,
-            target_nodata)
+    Returns:
+        dictionary mapping parameter name to value
 
+    """
+    value_map = {}
+    for param_name in sorted(param_bounds.keys()):
+        minimum, maximum = param_bounds[param_name]
+        if center_map is None:
+            low, high = minimum, maximum
+        else:
+            half_width = (maximum - minimum) * width_fraction / 2.
+            low = max(minimum, center_map[param_name] - half_width)
+            high = min(maximum, center_map[param_name] + half_width)
+        value_map[param_name] = random_state.uniform(low, high)
+    return value_map
 
-def reclassify_nodata(target_path, new_nodata_value):
-    """Reclassify the nodata value of a raster to a new value.
 
-    Convert all areas of nodata in the target raster to the new nodata
-    value, which must be an integer.
+def _write_parameter_table(base_table_path, param_value_map, target_path):
+    """Copy a parameter table, setting columns to calibrated values.
 
     Parameters:
-        target_path (string): path to target raster
-        new_nodata_value (integer): new value to set as nodata
+        base_table_path (string): path to plant functional type or site
+            parameter table
+        param_value_map (dict): map of column name to the value that should
+            be used in every row of the column. Column names are matched
+            regardless of case.
+        target_path (string): path to table that should be created
+
+    Raises:
+        ValueError if a parameter is not a column of the base table
 
     Side effects:
-        modifies the raster indicated by `target_path`
+        creates the table indicated by `target_path`
 
     Returns:
         None
 
     """
-    def reclassify_op(target_raster):
-        reclassified_raster = numpy.copy(target_raster)
-        reclassify_mask = (target_raster == previous_nodata_value)
-        reclassified_raster[reclassify_mask] = new_nodata_value
-        return reclassified_raster
+    table_df = pandas.read_csv(base_table_path, sep=None, engine='python')
+    column_map = dict([(str(col).lower(), col) for col in table_df.columns])
+    for param_name, value in param_value_map.items():
+        if param_name.lower() not in column_map:
+            raise ValueError(
+                "Parameter %s not found in %s" % (
+                    param_name, base_table_path))
+        table_df[column_map[param_name.lower()]] = value
+    table_df.to_csv(target_path, index=False)
 
-    fd, temp_path = tempfile.mkstemp(dir=PROCESSING_DIR)
-    shutil.copyfile(target_path, temp_path)
-    previous_nodata_value = pygeoprocessing.get_raster_info(
-        target_path)['nodata'][0]
 
-    pygeoprocessing.raster_calculator(
-        [(temp_path, 1)], reclassify_op, target_path, gdal.GDT_Float32,
-        new_nodata_value)
+def _observed_biomass_error(output_dir, modeled_output):
+    """Calculate root mean squared error of modeled vs observed biomass.
 
-    # clean up
-    os.close(fd)
-    os.remove(temp_path)
+    Compare each raster of observed biomass written to `output_dir` with the
+    raster of modeled biomass for the same month, over pixels where both
+    are valid.
 
+    Parameters:
+        output_dir (string): path to output directory of a model run
+        modeled_output (string): prefix of the modeled biomass outputs, e.g.
+            'potential_biomass'
 
-def weighted_state_variable_sum(
-        sv, sv_reg, aligned_inputs, pft_id_set, weighted_sum_path):
-    """Calculate weighted sum of state variable across plant functional types.
+    Returns:
+        root mean squared difference between modeled and observed biomass in
+            kg/ha, or numpy.nan if no valid pixels were compared
+
+    """
+    observed_regex = re.compile(r'^observed_biomass_(\d+)_(\d+)\.tif$')
+    squared_error_sum = 0.
+    n_valid = 0
+    for output_name in sorted(os.listdir(output_dir)):
+        observed_match = observed_regex.match(output_name)
+        if not observed_match:
+            continue
+        modeled_path = os.path.join(
+            output_dir, '%s_%s_%s.tif' % (
+                modeled_output, observed_match.group(1),
+                observed_match.group(2)))
+        if not os.path.exists(modeled_path):
+            continue
+        observed_path = os.path.join(output_dir, output_name)
+        block_pair_list = zip(
+            pygeoprocessing.iterblocks((observed_path, 1)),
+            pygeoprocessing.iterblocks((modeled_path, 1)))
+        observed_nodata = pygeoprocessing.get_raster_info(
+            observed_path)['nodata'][0]
+        modeled_nodata = pygeoprocessing.get_raster_info(
+            modeled_path)['nodata'][0]
+        for (_, observed_block), (_, modeled_block) in block_pair_list:
+            valid_mask = (
+                numpy.isfinite(observed_block) &
+                numpy.isfinite(modeled_block))
+            if observed_nodata is not None:
+                valid_mask &= ~numpy.isclose(observed_block, observed_nodata)
+            if modeled_nodata is not None:
+                valid_mask &= ~numpy.isclose(modeled_block, modeled_nodata)
+            squared_error_sum += numpy.sum(
+                (modeled_block[valid_mask].astype(numpy.float64) -
+                 observed_block[valid_mask]) ** 2)
+            n_valid += numpy.count_nonzero(valid_mask)
+    if n_valid == 0:
+        return numpy.nan
+    return numpy.sqrt(squared_error_sum / n_valid)
+
+
+def _raster_list_mean(raster_list, target_path):
+    """Calculate the mean per pixel across rasters in a list.
+
+    Nodata values are excluded from the mean, and the mean is nodata in
+    pixels where all rasters are nodata.
+
+    Parameters:
+        raster_list (list): list of paths to rasters to average
+        target_path (string): path to location to store the result
+
+    Side effects:
+        modifies or creates the raster indicated by `target_path`
+
+    Returns:
+        None
+
+    """
+    nodata_list = [
+        pygeoprocessing.get_raster_info(path)['nodata'][0] for path in
+        raster_list]
+
+    def raster_mean_op(*value_list):
+        """Average the rasters in raster_list, excluding nodata values."""
+        value_sum = numpy.zeros(value_list[0].shape, dtype=numpy.float64)
+        value_count = numpy.zeros(value_list[0].shape, dtype=numpy.int32)
+        for value, nodata in zip(value_list, nodata_list):
+            valid_mask = numpy.ones(value.shape, dtype=bool)
+            if nodata is not None:
+                valid_mask = ~numpy.isclose(value, nodata)
+            value_sum[valid_mask] += value[valid_mask]
+            value_count[valid_mask] += 1
+        result = numpy.empty(value_list[0].shape, dtype=numpy.float32)
+        result[:] = _TARGET_NODATA
+        valid_mask = value_count > 0
+        result[valid_mask] = value_sum[valid_mask] / value_count[valid_mask]
+        return result
+
+    _raster_calculator(
+        [(path, 1) for path in raster_list], raster_mean_op, target_path,
+        gdal.GDT_Float32, _TARGET_NODATA)
+
+
+def _precip_climatology(aligned_inputs, n_months, target_dir):
+    """Build the inputs of a climatology year for the spin-up.
+
+    Precipitation of each month of the climatology year is the mean of that
+    month over the `n_months` months of `aligned_inputs`, so that
+    `precip_0` is the mean of `precip_0`, `precip_12`, `precip_24`, etc.
+
+    Parameters:
+        aligned_inputs (dict): map of key, path pairs indicating paths
+            to aligned model inputs, including monthly precipitation
+        n_months (int): number of months of precipitation in
+            `aligned_inputs`, at least 12
+        target_dir (string): path to directory where climatology
+            precipitation rasters should be written
+
+    Side effects:
+        creates the rasters `precip_climatology_<month>.tif` for months 0
+            through 11 in `target_dir`
+
+    Returns:
+        a copy of `aligned_inputs` in which `precip_0` through `precip_11`
+            are replaced by the climatology rasters
+
+    """
+    climate_inputs = aligned_inputs.copy()
+    for month_index in range(12):
+        climate_inputs['precip_%d' % month_index] = os.path.join(
+            target_dir, 'precip_climatology_%d.tif' % month_index)
+        _raster_list_mean(
+            [aligned_inputs['precip_%d' % m_index] for m_index in range(
+                month_index, n_months, 12)],
+            climate_inputs['precip_%d' % month_index])
+    return climate_inputs
+
+
+def _update_spin_up_state(
+        year_start_sv_reg, year_end_sv_reg, stable_year_path, year,
+        tolerance):
+    """Detect stable pixels at the end of one year of spin-up.
+
+    A pixel becomes stable when carbon in each soil organic matter pool at
+    the end of the year differs from carbon at the start of the year by no
+    more than `tolerance` times its value at the start of the year. The
+    state variables at the start of the next year are taken from the end of
+    this year for pixels that are not stable, and are held at their values
+    from the start of this year for stable pixels.
+
+    Parameters:
+        year_start_sv_reg (dict): map of key, path pairs giving paths to
+            state variables at the start of the year. These rasters are
+            replaced with the state at the start of the next year.
+        year_end_sv_reg (dict): map of key, path pairs giving paths to state
+            variables at the end of the year
+        stable_year_path (string): path to integer raster giving the year in
+            which each pixel became stable, or -1 if it is not yet stable
+        year (int): index of the year of spin-up
+        tolerance (float): relative change in carbon below which a pixel is
+            stable
+
+    Side effects:
+        modifies the rasters in `year_start_sv_reg`
+        modifies the raster indicated by `stable_year_path`
+
+    Returns:
+        number of valid pixels that are not yet stable
+
+    """
+    def update_stable_year(stable_year, *som_list):
+        """Record the year in which pixels become stable."""
+        n_pools = len(som_list) // 2
+        valid_mask = numpy.ones(stable_year.shape, dtype=bool)
+        stable_mask = numpy.ones(stable_year.shape, dtype=bool)
+        for start, end in zip(som_list[:n_pools], som_list[n_pools:]):
+            valid_mask &= (
+                ~numpy.isclose(start, _SV_NODATA) &
+                ~numpy.isclose(end, _SV_NODATA))
+            stable_mask &= (
+                numpy.abs(end - start) <= tolerance * numpy.abs(start))
+        result = stable_year.copy()
+        result[valid_mask & stable_mask & (stable_year == -1)] = year
+        return result
+
+    def hold_stable(stable_year, start, end):
+        """Hold state variables of stable pixels at start of year values."""
+        return numpy.where(stable_year >= 0, start, end)
+
+    temp_dir = tempfile.mkdtemp(dir=PROCESSING_DIR)
+    updated_stable_year_path = os.path.join(temp_dir, 'stable_year.tif')
+    _raster_calculator(
+        [(stable_year_path, 1)] + [
+            (year_start_sv_reg['%s_path' % pool], 1) for pool in
+            _SOM_CARBON_POOLS] + [
+            (year_end_sv_reg['%s_path' % pool], 1) for pool in
+            _SOM_CARBON_POOLS],
+        update_stable_year, updated_stable_year_path, gdal.GDT_Int32,
+        _STABLE_YEAR_NODATA)
+    shutil.copyfile(updated_stable_year_path, stable_year_path)
+
+    for sv_key in year_start_sv_reg:
+        updated_sv_path = os.path.join(temp_dir, 'updated_sv.tif')
+        _raster_calculator(
+            [(stable_year_path, 1), (year_start_sv_reg[sv_key], 1),
+                (year_end_sv_reg[sv_key], 1)],
+            hold_stable, updated_sv_path, gdal.GDT_Float32, _SV_NODATA)
+        shutil.copyfile(updated_sv_path, year_start_sv_reg[sv_key])
+
+    # count valid pixels that are not yet stable
+    sv_nodata_mask_path = year_start_sv_reg['%s_path' % _SOM_CARBON_POOLS[0]]
+    n_unstable = 0
+    for (_, stable_block), (_, som_block) in zip(
+            pygeoprocessing.iterblocks((stable_year_path, 1)),
+            pygeoprocessing.iterblocks((sv_nodata_mask_path, 1))):
+        n_unstable += numpy.count_nonzero(
+            (stable_block == -1) & ~numpy.isclose(som_block, _SV_NODATA))
+
+    # clean up temporary files
+    shutil.rmtree(temp_dir)
+    return n_unstable
+
+
+def _align_shared_inputs(args):
+    """Align model inputs once for runs that share them.
+
+    Run the model with `args['align_only']` so that inputs are aligned into
+    the alignment cache of `args` and read the paths of the aligned inputs.
+
+    Parameters:
+        args (dict): arguments to `execute`
+
+    Returns:
+        a tuple (alignment_cache_dir, aligned_inputs) where
+            alignment_cache_dir is the path to the alignment cache and
+            aligned_inputs maps key, string descriptor of input raster, to
+            path to aligned input raster
+
+    """
+    alignment_cache_dir = None
+    try:
+        alignment_cache_dir = args['alignment_cache_dir']
+    except KeyError:
+        pass
+    if not alignment_cache_dir:
+        alignment_cache_dir = os.path.join(
+            args['workspace_dir'], 'aligned_inputs')
+    align_args = args.copy()
+    align_args['alignment_cache_dir'] = alignment_cache_dir
+    align_args['align_only'] = True
+    execute(align_args)
+    with open(os.path.join(
+            args['workspace_dir'], 'aligned_inputs',
+            'aligned_inputs.json')) as manifest_file:
+        aligned_inputs = json.load(manifest_file)
+    return alignment_cache_dir, aligned_inputs
+
+
+def _execute_in_processes(args_list, n_workers):
+    """Run the model once for each set of arguments, in parallel processes.
+
+    Parameters:
+        args_list (list): list of dictionaries of arguments to `execute`
+        n_workers (int): number of processes to run at once. If None, the
+            number of CPUs is used.
+
+    Side effects:
+        runs `execute` with each dictionary in `args_list`
+
+    Returns:
+        None
+
+    """
+    worker_pool = multiprocessing.Pool(n_workers)
+    try:
+        worker_pool.map(execute, args_list)
+    finally:
+        worker_pool.terminate()
+        worker_pool.join()
+
+
+def _sample_raster_at_points(raster_path, x_array, y_array):
+    """Read the value of a raster at each of a list of points.
+
+    Parameters:
+        raster_path (string): path to single-band raster
+        x_array (numpy.ndarray): x coordinate of each point, in the
+            coordinate system of the raster
+        y_array (numpy.ndarray): y coordinate of each point, in the
+            coordinate system of the raster
+
+    Raises:
+        ValueError if a point lies outside the raster
+
+    Returns:
+        numpy array containing the value of the pixel covering each point
+
+    """
+    x_array = numpy.asarray(x_array)
+    y_array = numpy.asarray(y_array)
+    raster_info = pygeoprocessing.get_raster_info(raster_path)
+    geotransform = raster_info['geotransform']
+    n_cols, n_rows = raster_info['raster_size']
+    col_array = numpy.floor(
+        (x_array - geotransform[0]) / geotransform[1]).astype(numpy.int64)
+    row_array = numpy.floor(
+        (y_array - geotransform[3]) / geotransform[5]).astype(numpy.int64)
+    outside_mask = (
+        (col_array < 0) | (col_array >= n_cols) |
+        (row_array < 0) | (row_array >= n_rows))
+    if numpy.any(outside_mask):
+        raise ValueError(
+            "The following points lie outside %s: %s" % (
+                raster_path, ", ".join([
+                    '(%s, %s)' % (x, y) for x, y in zip(
+                        x_array[outside_mask], y_array[outside_mask])])))
+
+    # read each block of the raster that contains points once
+    block_x_size, block_y_size = raster_info['block_size']
+    block_id_array = (
+        (row_array // block_y_size) * ((n_cols - 1) // block_x_size + 1) +
+        col_array // block_x_size)
+    value_array = None
+    raster = gdal.OpenEx(raster_path, gdal.OF_RASTER)
+    band = raster.GetRasterBand(1)
+    for block_id in numpy.unique(block_id_array):
+        point_mask = block_id_array == block_id
+        xoff = (col_array[point_mask][0] // block_x_size) * block_x_size
+        yoff = (row_array[point_mask][0] // block_y_size) * block_y_size
+        block_array = band.ReadAsArray(
+            int(xoff), int(yoff), int(min(block_x_size, n_cols - xoff)),
+            int(min(block_y_size, n_rows - yoff)))
+        if value_array is None:
+            value_array = numpy.empty(x_array.shape, dtype=block_array.dtype)
+        value_array[point_mask] = block_array[
+            row_array[point_mask] - yoff, col_array[point_mask] - xoff]
+    band = None
+    raster = None
+    if value_array is None:
+        # no points
+        value_array = numpy.array([])
+    return value_array
+
+
+def _write_point_raster(
+        value_array, datatype, nodata, projection_wkt, geotransform,
+        target_path):
+    """Write values at a list of points to a raster with a single row.
+
+    Parameters:
+        value_array (numpy.ndarray): value at each point
+        datatype (int): GDAL datatype of the target raster
+        nodata (float): nodata value of the target raster, or None
+        projection_wkt (string): projection of the target raster
+        geotransform (list): geotransform of the target raster
+        target_path (string): path to raster that should contain one pixel
+            for each point
+
+    Side effects:
+        creates the raster indicated by `target_path`
+
+    Returns:
+        None
+
+    """
+    driver = gdal.GetDriverByName('GTiff')
+    target_raster = driver.Create(
+        target_path, len(value_array), 1, 1, datatype)
+    target_raster.SetProjection(projection_wkt)
+    target_raster.SetGeoTransform(geotransform)
+    target_band = target_raster.GetRasterBand(1)
+    if nodata is not None:
+        target_band.SetNoDataValue(nodata)
+    target_band.WriteArray(numpy.asarray(value_array).reshape(1, -1))
+    target_band = None
+    target_raster = None
+
+
+def _write_polygon_vector(
+        bounding_box_list, projection_wkt, field_type_map, field_value_list,
+        target_path):
+    """Write a shapefile of rectangular polygons.
+
+    Parameters:
+        bounding_box_list (list): list of bounding boxes
+            [minx, miny, maxx, maxy], one for each polygon
+        projection_wkt (string): projection of the target vector
+        field_type_map (dict): map of field name to OGR field type
+        field_value_list (list): list of dictionaries, one for each polygon,
+            mapping field name to the value of that field
+        target_path (string): path to shapefile that should be created
+
+    Side effects:
+        creates the vector indicated by `target_path`
+
+    Returns:
+        None
+
+    """
+    target_sr = osr.SpatialReference()
+    target_sr.ImportFromWkt(projection_wkt)
+    driver = ogr.GetDriverByName('ESRI Shapefile')
+    target_vector = driver.CreateDataSource(target_path)
+    target_layer = target_vector.CreateLayer(
+        os.path.splitext(os.path.basename(target_path))[0], target_sr,
+        ogr.wkbPolygon)
+    for field_name, field_type in sorted(field_type_map.items()):
+        target_layer.CreateField(ogr.FieldDefn(field_name, field_type))
+    for bounding_box, field_value_map in zip(
+            bounding_box_list, field_value_list):
+        ring = ogr.Geometry(ogr.wkbLinearRing)
+        for x, y in [
+                (bounding_box[0], bounding_box[1]),
+                (bounding_box[0], bounding_box[3]),
+                (bounding_box[2], bounding_box[3]),
+                (bounding_box[2], bounding_box[1]),
+                (bounding_box[0], bounding_box[1])]:
+            ring.AddPoint(x, y)
+        polygon = ogr.Geometry(ogr.wkbPolygon)
+        polygon.AddGeometry(ring)
+        feature = ogr.Feature(target_layer.GetLayerDefn())
+        feature.SetGeometry(polygon)
+        for field_name, value in field_value_map.items():
+            feature.SetField(field_name, value)
+        target_layer.CreateFeature(feature)
+        feature = None
+    target_layer = None
+    target_vector = None
+
+
+def _set_raster_presets(args):
+    """Select the GeoTIFF creation presets of a model run.
+
+    Parameters:
+        args (dict): arguments to `execute`, optionally including
+            'scratch_raster_preset' and 'output_raster_preset'
+
+    Raises:
+        ValueError if a preset is not one of `_GTIFF_CREATION_PRESETS`, or
+            uses a compression that GDAL does not support
+
+    Side effects:
+        modifies the globals `SCRATCH_RASTER_PRESET` and
+            `OUTPUT_RASTER_PRESET`
+
+    Returns:
+        None
+
+    """
+    global SCRATCH_RASTER_PRESET
+    global OUTPUT_RASTER_PRESET
+    preset_list = []
+    for preset_key in ['scratch_raster_preset', 'output_raster_preset']:
+        preset = None
+        try:
+            if args[preset_key] not in ['', None]:
+                preset = args[preset_key]
+        except KeyError:
+            pass
+        if preset is not None:
+            if preset not in _GTIFF_CREATION_PRESETS:
+                raise ValueError(
+                    "Raster preset %s is not recognized. Available presets "
+                    "are: %s" % (
+                        preset, ", ".join(sorted(_GTIFF_CREATION_PRESETS))))
+            compression = [
+                option.split('=')[1] for option in
+                _GTIFF_CREATION_PRESETS[preset] if
+                option.startswith('COMPRESS=')][0]
+            if compression not in gdal.GetDriverByName(
+                    'GTiff').GetMetadataItem('DMD_CREATIONOPTIONLIST'):
+                raise ValueError(
+                    "Raster preset %s uses %s compression, which is not "
+                    "supported by this build of GDAL" % (preset, compression))
+        preset_list.append(preset)
+    SCRATCH_RASTER_PRESET, OUTPUT_RASTER_PRESET = preset_list
+
+
+def _gtiff_creation_options(preset, datatype):
+    """GeoTIFF creation options of a preset for a raster of a datatype.
+
+    Parameters:
+        preset (string): key of `_GTIFF_CREATION_PRESETS`
+        datatype (int): GDAL datatype of the raster
+
+    Returns:
+        list of GeoTIFF creation options
+
+    """
+    option_list = list(_GTIFF_CREATION_PRESETS[preset])
+    if 'COMPRESS=NONE' not in option_list:
+        # the floating point predictor applies only to floating point data
+        if datatype in [gdal.GDT_Float32, gdal.GDT_Float64]:
+            option_list.append('PREDICTOR=3')
+        else:
+            option_list.append('PREDICTOR=2')
+    return option_list
+
+
+def _target_creation_options(target_path, datatype):
+    """GeoTIFF creation options of the current run for a target raster.
+
+    Parameters:
+        target_path (string): path to the raster that will be created
+        datatype (int): GDAL datatype of the raster
+
+    Returns:
+        list of GeoTIFF creation options, or None if no preset was selected
+            for the raster
+
+    """
+    preset = OUTPUT_RASTER_PRESET
+    if PROCESSING_DIR and os.path.abspath(target_path).startswith(
+            os.path.join(os.path.abspath(PROCESSING_DIR), '')):
+        preset = SCRATCH_RASTER_PRESET
+    if preset is None:
+        return None
+    return _gtiff_creation_options(preset, datatype)
+
+
+def _raster_calculator(
+        base_raster_path_band_const_list, local_op, target_raster_path,
+        datatype_target, nodata_target):
+    """Call `pygeoprocessing.raster_calculator` with the run's presets."""
+    creation_options = _target_creation_options(
+        target_raster_path, datatype_target)
+    if creation_options is None:
+        pygeoprocessing.raster_calculator(
+            base_raster_path_band_const_list, local_op, target_raster_path,
+            datatype_target, nodata_target)
+    else:
+        pygeoprocessing.raster_calculator(
+            base_raster_path_band_const_list, local_op, target_raster_path,
+            datatype_target, nodata_target,
+            gtiff_creation_options=creation_options)
+
+
+def _new_raster_from_base(
+        base_path, target_path, datatype, band_nodata_list,
+        fill_value_list=None):
+    """Call `pygeoprocessing.new_raster_from_base` with the run's presets."""
+    creation_options = _target_creation_options(target_path, datatype)
+    if creation_options is None:
+        pygeoprocessing.new_raster_from_base(
+            base_path, target_path, datatype, band_nodata_list,
+            fill_value_list=fill_value_list)
+    else:
+        pygeoprocessing.new_raster_from_base(
+            base_path, target_path, datatype, band_nodata_list,
+            fill_value_list=fill_value_list,
+            gtiff_creation_options=creation_options)
+
+
+def raster_multiplication(
+        raster1, raster1_nodata, raster2, raster2_nodata, target_path,
+        target_path_nodata):
+    """Multiply raster1 by raster2.
+
+    Multiply raster1 by raster2 element-wise. In any pixel where raster1 or
+    raster2 is nodata, the result is nodata. The result is always of float
+    datatype.
+
+    Side effects:
+        modifies or creates the raster indicated by `target_path`
+
+    Returns:
+        None
+
+    """
+    def raster_multiply_op(raster1, raster2):
+        """Multiply two rasters."""
+        valid_mask = (
+            (~numpy.isclose(raster1, raster1_nodata)) &
+            (~numpy.isclose(raster2, raster2_nodata)))
+        result = numpy.empty(raster1.shape, dtype=numpy.float32)
+        result[:] = target_path_nodata
+        result[valid_mask] = raster1[valid_mask] * raster2[valid_mask]
+        return result
+    _raster_calculator(
+        [(path, 1) for path in [raster1, raster2]],
+        raster_multiply_op, target_path, gdal.GDT_Float32,
+        target_path_nodata)
+
+
+def raster_division(
+        raster1, raster1_nodata, raster2, raster2_nodata, target_path,
+        target_path_nodata):
+    """Divide raster1 by raster2.
+
+    Divide raster1 by raster2 element-wise. In any pixel where raster1 or
+    raster2 is nodata, the result is nodata. The result is always of float
+    datatype.
+
+    Side effects:
+        modifies or creates the raster indicated by `target_path`
+
+    Returns:
+        None
+
+    """
+    def raster_divide_op(raster1, raster2):
+        """Divide raster1 by raster2."""
+        valid_mask = (
+            (~numpy.isclose(raster1, raster1_nodata)) &
+            (~numpy.isclose(raster2, raster2_nodata)))
+        raster1 = raster1.astype(numpy.float32)
+        raster2 = raster2.astype(numpy.float32)
+
+        result = numpy.empty(raster1.shape, dtype=numpy.float32)
+        result[:] = target_path_nodata
+        error_mask = ((raster1 != 0) & (raster2 == 0.) & valid_mask)
+        zero_mask = ((raster1 == 0.) & (raster2 == 0.) & valid_mask)
+        nonzero_mask = ((raster2 != 0.) & valid_mask)
+        result[error_mask] = target_path_nodata
+        result[zero_mask] = 0.
+        result[nonzero_mask] = raster1[nonzero_mask] / raster2[nonzero_mask]
+        return result
+    _raster_calculator(
+        [(path, 1) for path in [raster1, raster2]],
+        raster_divide_op, target_path, gdal.GDT_Float32,
+        target_path_nodata)
+
+
+def raster_list_sum(
+        raster_list, input_nodata, target_path, target_nodata,
+        nodata_remove=False):
+    """Calculate the sum per pixel across rasters in a list.
+
+    Sum the rasters in `raster_list` element-wise, allowing nodata values
+    in the rasters to propagate to the result or treating nodata as zero. If
+    nodata is treated as zero, areas where all inputs are nodata will be nodata
+    in the output.
+
+    Parameters:
+        raster_list (list): list of paths to rasters to sum
+        input_nodata (float or int): nodata value in the input rasters
+        target_path (string): path to location to store the result
+        target_nodata (float or int): nodata value for the result raster
+        nodata_remove (bool): if true, treat nodata values in input
+            rasters as zero. If false, the sum in a pixel where any input
+            raster is nodata is nodata.
+
+    Side effects:
+        modifies or creates the raster indicated by `target_path`
+
+    Returns:
+        None
+
+    """
+    def raster_sum_op(*raster_list):
+        """Add the rasters in raster_list without removing nodata values."""
+        invalid_mask = numpy.any(
+            numpy.isclose(numpy.array(raster_list), input_nodata), axis=0)
+        for r in raster_list:
+            numpy.place(r, numpy.isclose(r, input_nodata), [0])
+        sum_of_rasters = numpy.sum(raster_list, axis=0)
+        sum_of_rasters[invalid_mask] = target_nodata
+        return sum_of_rasters
+
+    def raster_sum_op_nodata_remove(*raster_list):
+        """Add the rasters in raster_list, treating nodata as zero."""
+        invalid_mask = numpy.all(
+            numpy.isclose(numpy.array(raster_list), input_nodata), axis=0)
+        for r in raster_list:
+            numpy.place(r, numpy.isclose(r, input_nodata), [0])
+        sum_of_rasters = numpy.sum(raster_list, axis=0)
+        sum_of_rasters[invalid_mask] = target_nodata
+        return sum_of_rasters
+
+    if nodata_remove:
+        _raster_calculator(
+            [(path, 1) for path in raster_list], raster_sum_op_nodata_remove,
+            target_path, gdal.GDT_Float32, target_nodata)
+
+    else:
+        _raster_calculator(
+            [(path, 1) for path in raster_list], raster_sum_op,
+            target_path, gdal.GDT_Float32, target_nodata)
+
+
+def raster_sum(
+        raster1, raster1_nodata, raster2, raster2_nodata, target_path,
+        target_nodata, nodata_remove=False):
+    """Add raster 1 and raster2.
+
+    Add raster1 and raster2, allowing nodata values in the rasters to
+    propagate to the result or treating nodata as zero.
+
+    Parameters:
+        raster1 (string): path to one raster operand
+        raster1_nodata (float or int): nodata value in raster1
+        raster2 (string): path to second raster operand
+        raster2_nodata (float or int): nodata value in raster2
+        target_path (string): path to location to store the sum
+        target_nodata (float or int): nodata value for the result raster
+        nodata_remove (bool): if true, treat nodata values in input
+            rasters as zero. If false, the sum in a pixel where any
+            input raster is nodata is nodata.
+
+    Side effects:
+        modifies or creates the raster indicated by `target_path`
+
+    Returns:
+        None
+
+    """
+    def raster_sum_op(raster1, raster2):
+        """Add raster1 and raster2 without removing nodata values."""
+        valid_mask = (
+            (~numpy.isclose(raster1, raster1_nodata)) &
+            (~numpy.isclose(raster2, raster2_nodata)))
+        result = numpy.empty(raster1.shape, dtype=numpy.float32)
+        result[:] = target_nodata
+        result[valid_mask] = raster1[valid_mask] + raster2[valid_mask]
+        return result
+
+    def raster_sum_op_nodata_remove(raster1, raster2):
+        """Subtract raster2 from raster1, treating nodata as zero."""
+        numpy.place(raster1, numpy.isclose(raster1, raster1_nodata), [0])
+        numpy.place(raster2, numpy.isclose(raster2, raster2_nodata), [0])
+        result = raster1 + raster2
+        return result
+
+    if nodata_remove:
+        _raster_calculator(
+            [(path, 1) for path in [raster1, raster2]],
+            raster_sum_op_nodata_remove, target_path, gdal.GDT_Float32,
+            target_nodata)
+    else:
+        _raster_calculator(
+            [(path, 1) for path in [raster1, raster2]],
+            raster_sum_op, target_path, gdal.GDT_Float32,
+            target_nodata)
+
+
+def raster_difference(
+        raster1, raster1_nodata, raster2, raster2_nodata, target_path,
+        target_nodata, nodata_remove=False):
+    """Subtract raster2 from raster1.
+
+    Subtract raster2 from raster1 element-wise, allowing nodata values in the
+    rasters to propagate to the result or treating nodata as zero.
+
+    Parameters:
+        raster1 (string): path to raster from which to subtract raster2
+        raster1_nodata (float or int): nodata value in raster1
+        raster2 (string): path to raster which should be subtracted from
+            raster1
+        raster2_nodata (float or int): nodata value in raster2
+        target_path (string): path to location to store the difference
+        target_nodata (float or int): nodata value for the result raster
+        nodata_remove (bool): if true, treat nodata values in input
+            rasters as zero. If false, the difference in a pixel where any
+            input raster is nodata is nodata.
+
+    Side effects:
+        modifies or creates the raster indicated by `target_path`
+
+    Returns:
+        None
+
+    """
+    def raster_difference_op(raster1, raster2):
+        """Subtract raster2 from raster1 without removing nodata values."""
+        valid_mask = (
+            (~numpy.isclose(raster1, raster1_nodata)) &
+            (~numpy.isclose(raster2, raster2_nodata)))
+        result = numpy.empty(raster1.shape, dtype=numpy.float32)
+        result[:] = target_nodata
+        result[valid_mask] = raster1[valid_mask] - raster2[valid_mask]
+        return result
+
+    def raster_difference_op_nodata_remove(raster1, raster2):
+        """Subtract raster2 from raster1, treating nodata as zero."""
+        numpy.place(raster1, numpy.isclose(raster1, raster1_nodata), [0])
+        numpy.place(raster2, numpy.isclose(raster2, raster2_nodata), [0])
+        result = raster1 - raster2
+        return result
+
+    if nodata_remove:
+        _raster_calculator(
+            [(path, 1) for path in [raster1, raster2]],
+            raster_difference_op_nodata_remove, target_path, gdal.GDT_Float32,
+            target_nodata)
+    else:
+        _raster_calculator(
+            [(path, 1) for path in [raster1, raster2]],
+            raster_difference_op, target_path, gdal.GDT_Float32,
+            target_nodata)
+
+
+def reclassify_nodata(target_path, new_nodata_value):
+    """Reclassify the nodata value of a raster to a new value.
+
+    Convert all areas of nodata in the target raster to the new nodata
+    value, which must be an integer.
+
+    Parameters:
+        target_path (string): path to target raster
+        new_nodata_value (integer): new value to set as nodata
+
+    Side effects:
+        modifies the raster indicated by `target_path`
+
+    Returns:
+        None
+
+    """
+    def reclassify_op(target_raster):
+        reclassified_raster = numpy.copy(target_raster)
+        reclassify_mask = (target_raster == previous_nodata_value)
+        reclassified_raster[reclassify_mask] = new_nodata_value
+        return reclassified_raster
+
+    fd, temp_path = tempfile.mkstemp(dir=PROCESSING_DIR)
+    shutil.copyfile(target_path, temp_path)
+    previous_nodata_value = pygeoprocessing.get_raster_info(
+        target_path)['nodata'][0]
+
+    _raster_calculator(
+        [(temp_path, 1)], reclassify_op, target_path, gdal.GDT_Float32,
+        new_nodata_value)
+
+    # clean up
+    os.close(fd)
+    os.remove(temp_path)
+
+
+def weighted_state_variable_sum(
+        sv, sv_reg, aligned_inputs, pft_id_set, weighted_sum_path):
+    """Calculate weighted sum of state variable across plant functional types.
+
+    To sum a state variable across PFTs within a grid cell, the state variable
+    must be weighted by the fractional cover of each PFT inside the grid cell.
+    First multiply the state variable by its fractional cover, and then add up
+    the weighted products.
+
+    Parameters:
+        sv (string): state variable to be summed across plant functional types
+        sv_reg (dict): map of key, path pairs giving paths to state variables,
+            including sv, the state variable to be summed
+        aligned_inputs (dict): map of key, path pairs indicating paths
+            to aligned model inputs, including fractional cover of each plant
+            functional type
+        pft_id_set (set): set of integers identifying plant functional types
+        weighted_sum_path (string): path to raster that should contain the
+            weighted sum across PFTs
+
+    Side effects:
+        modifies or creates the raster indicated by `weighted_sum_path`
+
+    Returns:
+        None
+
+    """
+    temp_dir = tempfile.mkdtemp(dir=PROCESSING_DIR)
+    temp_val_dict = {}
+    for pft_i in pft_id_set:
+        val = '{}_weighted'.format(sv)
+        temp_val_dict['{}_{}'.format(val, pft_i)] = os.path.join(
+            temp_dir, '{}_{}.tif'.format(val, pft_i))
+
+    weighted_path_list = []
+    for pft_i in pft_id_set:
+        target_path = temp_val_dict['{}_weighted_{}'.format(sv, pft_i)]
+        pft_nodata = pygeoprocessing.get_raster_info(
+            aligned_inputs['pft_{}'.format(pft_i)])['nodata'][0]
+        raster_multiplication(
+            sv_reg['{}_{}_path'.format(sv, pft_i)], _SV_NODATA,
+            aligned_inputs['pft_{}'.format(pft_i)], pft_nodata,
+            target_path, _TARGET_NODATA)
+        weighted_path_list.append(target_path)
+    raster_list_sum(
+        weighted_path_list, _TARGET_NODATA, weighted_sum_path, _TARGET_NODATA,
+        nodata_remove=True)
+
+    # clean up temporary files
+    shutil.rmtree(temp_dir)
+
+
+def _check_pft_fractional_cover_sum(aligned_inputs, pft_id_set):
+    """Check the sum of fractional cover across plant functional types.
+
+    Parameters:
+        aligned_inputs (dict): map of key, path pairs indicating paths
+            to aligned model inputs, including fractional cover of each plant
+            functional type
+        pft_id_set (set): set of integers identifying plant functional types
+
+    Raises:
+        ValueError if the pixel-wise sum of fractional cover values across
+            plant functional types exceeds 1
+
+    Returns:
+        None
+
+    """
+    with tempfile.NamedTemporaryFile(
+            prefix='cover_sum', dir=PROCESSING_DIR) as cover_sum_temp_file:
+        cover_sum_path = cover_sum_temp_file.name
+    with tempfile.NamedTemporaryFile(
+            prefix='operand_temp', dir=PROCESSING_DIR) as operand_temp_file:
+        operand_temp_path = operand_temp_file.name
+
+    # initialize sum to zero
+    _new_raster_from_base(
+        aligned_inputs['site_index'], cover_sum_path, gdal.GDT_Float32,
+        [_TARGET_NODATA], fill_value_list=[0])
+    for pft_i in pft_id_set:
+        shutil.copyfile(cover_sum_path, operand_temp_path)
+        pft_nodata = pygeoprocessing.get_raster_info(
+            aligned_inputs['pft_{}'.format(pft_i)])['nodata'][0]
+        raster_sum(
+            aligned_inputs['pft_{}'.format(pft_i)], pft_nodata,
+            operand_temp_path, _TARGET_NODATA,
+            cover_sum_path, _TARGET_NODATA)
+    # get maximum sum of fractional cover
+    max_cover = 0.
+    for offset_map, raster_block in pygeoprocessing.iterblocks(
+            (cover_sum_path, 1)):
+        valid_mask = (raster_block != _TARGET_NODATA)
+        max_cover = max(max_cover, numpy.amax(raster_block[valid_mask]))
+    if max_cover > 1:
+        raise ValueError(
+            "Fractional cover across plant functional types exceeds 1")
+
+    # clean up
+    os.remove(cover_sum_path)
+
+
+def zonal_sum_and_count(base_raster_path_list, zone_raster_path):
+    """Sum and count valid pixels of several rasters inside each zone.
+
+    Read all rasters in `base_raster_path_list` in a single block-wise pass
+    over the integer zone raster indicated by `zone_raster_path`, accumulating
+    the sum and count of valid pixels of each raster inside each zone with
+    `numpy.bincount`. Pixels that are nodata in the zone raster or carry a
+    negative zone value are excluded. Pixels that are nodata in one base
+    raster are excluded from the sum and count of that raster only. All
+    rasters must share the dimensions of the zone raster.
+
+    Parameters:
+        base_raster_path_list (list): list of paths to rasters that should be
+            summarized
+        zone_raster_path (string): path to integer raster identifying the zone
+            of each pixel
+
+    Returns:
+        a tuple (zone_sum, zone_count) of numpy arrays with one row for each
+            raster in `base_raster_path_list` and one column for each zone
+            value from 0 to the largest zone value in `zone_raster_path`
+
+    """
+    zone_nodata = pygeoprocessing.get_raster_info(
+        zone_raster_path)['nodata'][0]
+    base_nodata_list = [
+        pygeoprocessing.get_raster_info(path)['nodata'][0] for path in
+        base_raster_path_list]
+    base_raster_list = [
+        gdal.OpenEx(path, gdal.OF_RASTER) for path in base_raster_path_list]
+    base_band_list = [raster.GetRasterBand(1) for raster in base_raster_list]
+
+    n_zones = 0
+    zone_sum = numpy.zeros(
+        (len(base_raster_path_list), n_zones), dtype=numpy.float64)
+    zone_count = numpy.zeros(
+        (len(base_raster_path_list), n_zones), dtype=numpy.int64)
+    for offset_map, zone_block in pygeoprocessing.iterblocks(
+            (zone_raster_path, 1)):
+        zone_mask = (zone_block >= 0)
+        if zone_nodata is not None:
+            zone_mask &= (zone_block != zone_nodata)
+        if not numpy.any(zone_mask):
+            continue
+        zone_block = zone_block.astype(numpy.int64)
+        block_n_zones = int(numpy.amax(zone_block[zone_mask])) + 1
+        if block_n_zones > n_zones:
+            zone_sum = numpy.pad(
+                zone_sum, ((0, 0), (0, block_n_zones - n_zones)), 'constant')
+            zone_count = numpy.pad(
+                zone_count, ((0, 0), (0, block_n_zones - n_zones)),
+                'constant')
+            n_zones = block_n_zones
+        for raster_i in range(len(base_band_list)):
+            base_block = base_band_list[raster_i].ReadAsArray(**offset_map)
+            valid_mask = zone_mask
+            if base_nodata_list[raster_i] is not None:
+                valid_mask = (
+                    zone_mask &
+                    ~numpy.isclose(base_block, base_nodata_list[raster_i]))
+            zone_sum[raster_i] += numpy.bincount(
+                zone_block[valid_mask], weights=base_block[valid_mask],
+                minlength=n_zones)
+            zone_count[raster_i] += numpy.bincount(
+                zone_block[valid_mask], minlength=n_zones)
+
+    # clean up
+    base_band_list = None
+    base_raster_list = None
+    return zone_sum, zone_count
+
+
+def _file_signature(path):
+    """Describe the version of a file on disk without reading its contents.
+
+    Parameters:
+        path (string): path to a file
+
+    Returns:
+        list containing the absolute path, size in bytes and last
+            modification time of the file
+
+    """
+    file_stat = os.stat(path)
+    return [
+        os.path.abspath(path), file_stat.st_size,
+        int(file_stat.st_mtime * 1e6)]
+
+
+def _vector_signature(vector_path):
+    """Describe the version of a vector and its sidecar files on disk.
+
+    A shapefile stores attributes, the index of its geometries, its
+    projection and its encoding in files next to the .shp file, and a
+    change to any of them can change the result of masking or rasterizing
+    the vector.
+
+    Parameters:
+        vector_path (string): path to a vector file
+
+    Returns:
+        list containing the result of `_file_signature` for the vector and
+            each of its sidecar files that exists
+
+    """
+    signature_list = [_file_signature(vector_path)]
+    vector_base, vector_ext = os.path.splitext(vector_path)
+    if vector_ext.lower() == '.shp':
+        for sidecar_ext in ['.dbf', '.shx', '.prj', '.cpg']:
+            for sidecar_path in [
+                    vector_base + sidecar_ext,
+                    vector_base + sidecar_ext.upper()]:
+                if os.path.exists(sidecar_path):
+                    signature_list.append(_file_signature(sidecar_path))
+                    break
+    return signature_list
+
+
+def _cube_file_path(cube_path):
+    """Find the file containing a time-stacked raster.
+
+    Parameters:
+        cube_path (string): path to a multi-band raster, or a GDAL NetCDF
+            subdataset name of the form 'NETCDF:"<path>":<variable>'
+
+    Returns:
+        path to the file on disk that contains the raster
+
+    """
+    netcdf_match = re.match(
+        r'^NETCDF:"?(.+?)"?:[^:"]+$', cube_path, re.IGNORECASE)
+    if netcdf_match:
+        return netcdf_match.group(1)
+    return cube_path
+
+
+def _write_cube_slices(cube_path, band_index_map, cube_slice_dir):
+    """Write single-band virtual rasters referring to bands of a cube.
+
+    Each virtual raster refers to one band of a time-stacked raster, so that
+    monthly slices of the cube can be aligned and read like the single-band
+    rasters supplied for each month. Virtual rasters are named by the
+    signature of the cube and are only written if they do not exist
+    already, so they can be identified in the alignment cache.
+
+    Parameters:
+        cube_path (string): path to a multi-band GeoTIFF or NetCDF raster,
+            or a GDAL NetCDF subdataset name
+        band_index_map (dict): map of input key to the index of the band
+            that contains the input, starting at 1
+        cube_slice_dir (string): path to directory where the virtual rasters
+            should be written
+
+    Raises:
+        ValueError if the cube does not contain all bands in
+            `band_index_map`
+
+    Side effects:
+        creates a virtual raster in `cube_slice_dir` for each band in
+            `band_index_map` if it does not exist already
+
+    Returns:
+        dict mapping the keys of `band_index_map` to paths to virtual
+            rasters
+
+    """
+    n_bands = pygeoprocessing.get_raster_info(cube_path)['n_bands']
+    missing_band_list = sorted(set([
+        band_index for band_index in band_index_map.values() if
+        band_index < 1 or band_index > n_bands]))
+    if missing_band_list:
+        raise ValueError(
+            "Couldn't find the following bands in the raster %s, which "
+            "contains %d bands:\n\t%s" % (
+                cube_path, n_bands,
+                "\n\t".join([str(band) for band in missing_band_list])))
+
+    utils.make_directories([cube_slice_dir])
+    cube_file_path = _cube_file_path(cube_path)
+    if cube_file_path == cube_path:
+        cube_path = os.path.abspath(cube_path)
+    cube_key = hashlib.sha1(json.dumps(
+        [cube_path] + _file_signature(cube_file_path)).encode(
+            'utf-8')).hexdigest()
+    cube_basename = os.path.splitext(os.path.basename(cube_file_path))[0]
+    slice_path_map = {}
+    for key, band_index in band_index_map.items():
+        slice_path = os.path.join(
+            cube_slice_dir, '{}_{}_b{}.vrt'.format(
+                cube_basename, cube_key[:16], band_index))
+        if not os.path.exists(slice_path):
+            temp_dir = tempfile.mkdtemp(dir=cube_slice_dir)
+            temp_slice_path = os.path.join(
+                temp_dir, os.path.basename(slice_path))
+            gdal.Translate(
+                temp_slice_path, cube_path, format='VRT',
+                bandList=[band_index])
+            try:
+                os.rename(temp_slice_path, slice_path)
+            except OSError:
+                if not os.path.exists(slice_path):
+                    raise
+            shutil.rmtree(temp_dir)
+        slice_path_map[key] = slice_path
+    return slice_path_map
+
+
+def _alignment_cache_key(
+        base_raster_path, target_pixel_size, target_bb, mask_vector_path,
+        resample_method):
+    """Calculate the key identifying one aligned input in the cache.
+
+    The aligned raster depends only on the source raster, the target grid,
+    the vector used to mask it and the resampling method, so a raster
+    aligned with identical values of all of these can be reused. The mask
+    vector is identified by `_vector_signature`, including its sidecar
+    files.
+
+    Parameters:
+        base_raster_path (string): path to source raster
+        target_pixel_size (list): x and y size of target pixels
+        target_bb (list): bounding box of the target raster, in the form
+            [minx, miny, maxx, maxy]
+        mask_vector_path (string): path to vector used to mask the aligned
+            raster
+        resample_method (string): resampling method used by gdal
+
+    Returns:
+        hexadecimal string uniquely identifying the aligned raster
+
+    """
+    key_list = [
+        _file_signature(base_raster_path),
+        [float(val) for val in target_pixel_size],
+        [float(val) for val in target_bb],
+        _vector_signature(mask_vector_path),
+        resample_method]
+    return hashlib.sha1(
+        json.dumps(key_list, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def _target_bounding_box(base_raster_path_list, aoi_path):
+    """Calculate the bounding box shared by all aligned inputs.
+
+    The target bounding box is the intersection of the bounding boxes of all
+    input rasters and the area of interest, matching the 'intersection'
+    mode of `pygeoprocessing.align_and_resize_raster_stack`.
+
+    Parameters:
+        base_raster_path_list (list): list of paths to source rasters
+        aoi_path (string): path to area of interest vector
+
+    Raises:
+        ValueError if the inputs do not intersect
+
+    Returns:
+        list giving the target bounding box in the form
+            [minx, miny, maxx, maxy]
+
+    """
+    bounding_box_list = [
+        pygeoprocessing.get_raster_info(path)['bounding_box'] for path in
+        base_raster_path_list]
+    bounding_box_list.append(
+        pygeoprocessing.get_vector_info(aoi_path)['bounding_box'])
+    target_bb = pygeoprocessing.merge_bounding_box_list(
+        bounding_box_list, 'intersection')
+    if target_bb[0] >= target_bb[2] or target_bb[1] >= target_bb[3]:
+        raise ValueError(
+            "Input rasters and area of interest do not intersect: "
+            "bounding box %s" % target_bb)
+    return target_bb
+
+
+def _snap_bounding_box(target_bb, target_pixel_size):
+    """Extend a bounding box to a whole number of target pixels.
+
+    The width and height of the target raster are calculated as in
+    `pygeoprocessing.warp_raster`, so that rasters aligned to the returned
+    bounding box have the same dimensions regardless of how they are
+    created.
+
+    Parameters:
+        target_bb (list): bounding box in the form [minx, miny, maxx, maxy]
+        target_pixel_size (list): x and y size of target pixels
+
+    Returns:
+        list giving the bounding box extended to the right and bottom so
+            that it contains a whole number of pixels
+
+    """
+    snapped_bb = list(target_bb)
+    x_size = abs(target_pixel_size[0])
+    y_size = abs(target_pixel_size[1])
+    n_cols = int(abs(float(target_bb[2] - target_bb[0]) / x_size))
+    n_rows = int(abs(float(target_bb[3] - target_bb[1]) / y_size))
+    if not numpy.isclose(n_cols * x_size, target_bb[2] - target_bb[0]):
+        n_cols += 1
+    if not numpy.isclose(n_rows * y_size, target_bb[3] - target_bb[1]):
+        n_rows += 1
+    n_cols = max(n_cols, 1)
+    n_rows = max(n_rows, 1)
+    snapped_bb[2] = target_bb[0] + x_size * n_cols
+    snapped_bb[1] = target_bb[3] - y_size * n_rows
+    return snapped_bb
+
+
+def _shares_target_grid(base_raster_path, target_pixel_size, target_bb):
+    """Test whether a raster's pixels coincide with the target grid.
+
+    Parameters:
+        base_raster_path (string): path to source raster
+        target_pixel_size (list): x and y size of target pixels
+        target_bb (list): bounding box of the target raster, in the form
+            [minx, miny, maxx, maxy]
+
+    Returns:
+        True if the source raster has the target pixel size and its pixel
+            edges line up with the edges of the target bounding box, so that
+            it can be clipped to the target grid without resampling
+
+    """
+    base_info = pygeoprocessing.get_raster_info(base_raster_path)
+    if not numpy.allclose(
+            numpy.abs(base_info['pixel_size']),
+            numpy.abs(target_pixel_size)):
+        return False
+    geotransform = base_info['geotransform']
+    if geotransform[2] != 0 or geotransform[4] != 0:
+        return False
+    col_offset = (target_bb[0] - geotransform[0]) / abs(target_pixel_size[0])
+    row_offset = (geotransform[3] - target_bb[3]) / abs(target_pixel_size[1])
+    return bool(
+        numpy.isclose(col_offset, round(col_offset)) and
+        numpy.isclose(row_offset, round(row_offset)))
+
+
+def _write_aligned_vrt(
+        base_raster_path, target_pixel_size, target_bb, aoi_path,
+        target_vrt_path):
+    """Write a virtual raster that clips a source raster to the target grid.
+
+    The virtual raster refers to the source raster rather than copying it,
+    and masks pixels outside the area of interest to the nodata value of the
+    source raster when it is read.
+
+    Parameters:
+        base_raster_path (string): path to source raster, which must share
+            the target grid and have a nodata value
+        target_pixel_size (list): x and y size of target pixels
+        target_bb (list): bounding box of the target raster, in the form
+            [minx, miny, maxx, maxy]
+        aoi_path (string): path to area of interest vector used to mask the
+            aligned raster
+        target_vrt_path (string): path to the virtual raster to create
+
+    Side effects:
+        creates the virtual raster indicated by `target_vrt_path`
+
+    Returns:
+        None
+
+    """
+    base_nodata = pygeoprocessing.get_raster_info(
+        base_raster_path)['nodata'][0]
+    gdal.Warp(
+        target_vrt_path, os.path.abspath(base_raster_path), format='VRT',
+        outputBounds=_snap_bounding_box(target_bb, target_pixel_size),
+        xRes=abs(target_pixel_size[0]), yRes=abs(target_pixel_size[1]),
+        resampleAlg='near', cutlineDSName=os.path.abspath(aoi_path),
+        srcNodata=base_nodata, dstNodata=base_nodata)
+
+
+def _align_input_raster(
+        base_raster_path, target_pixel_size, target_bb, aoi_path,
+        alignment_cache_dir, use_vrt=False):
+    """Align one input raster, reusing a cached copy if one exists.
+
+    Aligned rasters are stored in `alignment_cache_dir` under a name that
+    includes the key calculated by `_alignment_cache_key`, so a raster that
+    was already aligned to the same grid from the same source is not aligned
+    again. The aligned raster is written to a temporary file and renamed
+    when complete so that an interrupted run does not leave a partial
+    raster in the cache.
+
+    Parameters:
+        base_raster_path (string): path to source raster
+        target_pixel_size (list): x and y size of target pixels
+        target_bb (list): bounding box of the target raster, in the form
+            [minx, miny, maxx, maxy]
+        aoi_path (string): path to area of interest vector used to mask the
+            aligned raster
+        alignment_cache_dir (string): path to directory containing aligned
+            rasters
+        use_vrt (bool): if True, and the source raster already shares the
+            target grid and has a nodata value, the aligned raster is a
+            virtual raster referring to the source raster instead of a
+            resampled copy
+
+    Side effects:
+        creates the aligned raster in `alignment_cache_dir` if it does not
+            exist already
+
+    Returns:
+        path to the aligned raster
+
+    """
+    resample_method = 'near'
+    cache_key = _alignment_cache_key(
+        base_raster_path, target_pixel_size, target_bb, aoi_path,
+        resample_method)
+    aligned_basename = 'aligned_{}_{}'.format(
+        os.path.splitext(os.path.basename(base_raster_path))[0],
+        cache_key[:16])
+    write_vrt = False
+    if use_vrt:
+        vrt_path = os.path.join(
+            alignment_cache_dir, '{}.vrt'.format(aligned_basename))
+        if os.path.exists(vrt_path):
+            LOGGER.debug("reusing aligned raster %s", vrt_path)
+            return vrt_path
+        write_vrt = (
+            pygeoprocessing.get_raster_info(
+                base_raster_path)['nodata'][0] is not None and
+            _shares_target_grid(
+                base_raster_path, target_pixel_size, target_bb))
+    if write_vrt:
+        aligned_path = vrt_path
+    else:
+        aligned_path = os.path.join(
+            alignment_cache_dir, '{}.tif'.format(aligned_basename))
+        if os.path.exists(aligned_path):
+            LOGGER.debug("reusing aligned raster %s", aligned_path)
+            return aligned_path
+
+    temp_dir = tempfile.mkdtemp(dir=alignment_cache_dir)
+    try:
+        temp_aligned_path = os.path.join(
+            temp_dir, os.path.basename(aligned_path))
+        if write_vrt:
+            _write_aligned_vrt(
+                base_raster_path, target_pixel_size, target_bb, aoi_path,
+                temp_aligned_path)
+        else:
+            pygeoprocessing.warp_raster(
+                base_raster_path, target_pixel_size, temp_aligned_path,
+                resample_method, target_bb=target_bb,
+                vector_mask_options={'mask_vector_path': aoi_path})
+        try:
+            os.rename(temp_aligned_path, aligned_path)
+        except OSError:
+            # another run sharing the cache aligned the same raster
+            if not os.path.exists(aligned_path):
+                raise
+    finally:
+        # the cache is shared, so partial rasters must not be left in it
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    return aligned_path
+
+
+def _align_inputs(
+        base_align_raster_path_id_map, target_pixel_size, target_bb,
+        aoi_path, alignment_cache_dir, use_vrt=False):
+    """Align model inputs to a shared grid, reusing cached aligned rasters.
+
+    All inputs are resampled to `target_pixel_size` and clipped to
+    `target_bb`, which is calculated by `_target_bounding_box` as in
+    `pygeoprocessing.align_and_resize_raster_stack`. Inputs that were
+    aligned to the same grid by a previous run are taken from the cache.
+
+    Parameters:
+        base_align_raster_path_id_map (dict): map of input key to path to
+            source raster
+        target_pixel_size (list): x and y size of target pixels
+        target_bb (list): bounding box of the target rasters, in the form
+            [minx, miny, maxx, maxy]
+        aoi_path (string): path to area of interest vector
+        alignment_cache_dir (string): path to directory containing aligned
+            rasters
+        use_vrt (bool): if True, inputs that already share the target grid
+            are aligned as virtual rasters referring to the source rasters,
+            and only inputs on a different grid are resampled
+
+    Side effects:
+        creates aligned rasters in `alignment_cache_dir` for inputs that were
+            not found in the cache
+
+    Returns:
+        dict mapping the keys of `base_align_raster_path_id_map` to paths to
+            aligned rasters
+
+    """
+    utils.make_directories([alignment_cache_dir])
+    aligned_inputs = {}
+    for key in sorted(base_align_raster_path_id_map.keys()):
+        aligned_inputs[key] = _align_input_raster(
+            base_align_raster_path_id_map[key], target_pixel_size, target_bb,
+            aoi_path, alignment_cache_dir, use_vrt=use_vrt)
+    return aligned_inputs
+
+
+class _MonthlyInputAligner(object):
+    """Align monthly precipitation and vegetation index inputs as needed.
+
+    Monthly inputs are aligned just before the month that uses them, while
+    the inputs for the next few months are aligned in a background thread.
+    Aligned monthly inputs are deleted as soon as no later month of the
+    simulation needs them, including precipitation of the 12 months that
+    leave the moving annual precipitation window in later months.
+
+    """
+
+    def __init__(
+            self, base_monthly_path_id_map, target_pixel_size, target_bb,
+            aoi_path, aligned_monthly_dir, use_vrt=False,
+            n_prefetch_months=3, read_ahead=False):
+        """Set up the aligner.
+
+        Parameters:
+            base_monthly_path_id_map (dict): map of monthly input key, e.g.
+                'precip_5' or 'EO_index_5', to path to source raster
+            target_pixel_size (list): x and y size of target pixels
+            target_bb (list): bounding box of the target raster, in the form
+                [minx, miny, maxx, maxy]
+            aoi_path (string): path to area of interest vector
+            aligned_monthly_dir (string): path to directory where aligned
+                monthly inputs are written and deleted
+            use_vrt (bool): if True, align monthly inputs that share the
+                target grid as virtual rasters
+            n_prefetch_months (int): number of months following the current
+                month whose inputs are aligned in the background
+            read_ahead (bool): if True, inputs aligned in the background are
+                also read once, so that reading them in the month that uses
+                them is served from the operating system's file cache
+
+        Returns:
+            None
+
+        """
+        self.base_monthly_path_id_map = base_monthly_path_id_map
+        self.target_pixel_size = target_pixel_size
+        self.target_bb = target_bb
+        self.aoi_path = aoi_path
+        self.aligned_monthly_dir = aligned_monthly_dir
+        self.use_vrt = use_vrt
+        self.n_prefetch_months = n_prefetch_months
+        self.read_ahead = read_ahead
+        self.aligned_path_map = {}
+        self.pending_result_map = {}
+        self.worker_pool = multiprocessing.pool.ThreadPool(1)
+
+    def _month_key_list(self, month_index):
+        """List monthly input keys required by one month of the simulation.
+
+        Parameters:
+            month_index (int): month of the simulation
+
+        Returns:
+            list of keys of monthly inputs used in month `month_index`,
+                including the annual precipitation window of `_yearly_tasks`
+                if `month_index` is the first month of a year
+
+        """
+        key_list = [
+            'precip_{}'.format(month_index),
+            'EO_index_{}'.format(month_index)]
+        if (month_index % 12) == 0:
+            annual_key_list = [
+                'precip_{}'.format(month_index + offset) for offset in
+                range(-11, 12)]
+            key_list.extend([
+                key for key in annual_key_list if key in
+                self.base_monthly_path_id_map][:12])
+        return sorted(set([
+            key for key in key_list if key in self.base_monthly_path_id_map]))
+
+    def _align(self, key):
+        """Align one monthly input in the calling thread."""
+        return _align_input_raster(
+            self.base_monthly_path_id_map[key], self.target_pixel_size,
+            self.target_bb, self.aoi_path, self.aligned_monthly_dir,
+            use_vrt=self.use_vrt)
+
+    def _align_and_read(self, key):
+        """Align one monthly input and read it if reading ahead."""
+        aligned_path = self._align(key)
+        if self.read_ahead:
+            _read_raster_blocks(aligned_path)
+        return aligned_path
+
+    def prepare(self, month_index, aligned_inputs):
+        """Make sure inputs for one month are aligned.
+
+        Parameters:
+            month_index (int): month of the simulation
+            aligned_inputs (dict): map of key to aligned input raster
+
+        Side effects:
+            adds aligned monthly inputs used in month `month_index` to
+                `aligned_inputs`
+            starts aligning inputs for the following months in the background
+
+        Returns:
+            None
+
+        """
+        for key in self._month_key_list(month_index):
+            if key not in self.aligned_path_map:
+                if key in self.pending_result_map:
+                    self.aligned_path_map[key] = (
+                        self.pending_result_map.pop(key).get())
+                else:
+                    self.aligned_path_map[key] = self._align(key)
+            aligned_inputs[key] = self.aligned_path_map[key]
+
+        for prefetch_month in range(
+                month_index + 1, month_index + self.n_prefetch_months + 1):
+            for key in self._month_key_list(prefetch_month):
+                if (key not in self.aligned_path_map and
+                        key not in self.pending_result_map):
+                    self.pending_result_map[key] = (
+                        self.worker_pool.apply_async(
+                            self._align_and_read, (key,)))
+
+    def release(self, month_index, aligned_inputs):
+        """Delete aligned inputs that are not needed after a month.
+
+        Precipitation of the last 12 months is kept, because it leaves the
+        moving annual precipitation window in a later month.
+
+        Parameters:
+            month_index (int): month of the simulation that was just
+                completed
+            aligned_inputs (dict): map of key to aligned input raster
 
-    To sum a state variable across PFTs within a grid cell, the state variable
-    must be weighted by the fractional cover of each PFT inside the grid cell.
-    First multiply the state variable by its fractional cover, and then add up
-    the weighted products.
+        Side effects:
+            removes monthly inputs that are not used after month
+                `month_index` from `aligned_inputs` and deletes them
+
+        Returns:
+            None
+
+        """
+        next_month = month_index + 1
+        for key in list(self.aligned_path_map.keys()):
+            key_match = _MONTHLY_INPUT_KEY_REGEX.match(key)
+            input_month = int(key_match.group(2))
+            if input_month >= next_month:
+                continue
+            if (key_match.group(1) == 'precip' and
+                    input_month >= next_month - 12):
+                continue
+            aligned_path = self.aligned_path_map.pop(key)
+            aligned_inputs.pop(key, None)
+            if aligned_path not in self.aligned_path_map.values():
+                os.remove(aligned_path)
+
+    def close(self):
+        """Stop the background thread."""
+        self.worker_pool.terminate()
+        self.worker_pool.join()
+
+
+def _read_raster_blocks(raster_path):
+    """Read every block of a raster and discard the values.
+
+    Reading a raster ahead of the step that uses it moves the cost of
+    fetching it from disk or network storage off the critical path: the
+    later read is served from the operating system's file cache.
+
+    Parameters:
+        raster_path (string): path to raster
+
+    Returns:
+        raster_path
+
+    """
+    for offset_map, raster_block in pygeoprocessing.iterblocks(
+            (raster_path, 1)):
+        pass
+    return raster_path
+
+
+def _next_month_input_paths(aligned_inputs, month_index, starting_month):
+    """List the aligned inputs of the month after `month_index`.
 
     Parameters:
-        sv (string): state variable to be summed across plant functional types
-        sv_reg (dict): map of key, path pairs giving paths to state variables,
-            including sv, the state variable to be summed
         aligned_inputs (dict): map of key, path pairs indicating paths
-            to aligned model inputs, including fractional cover of each plant
-            functional type
+            to aligned model inputs
+        month_index (int): current monthly step, relative to 0 so that
+            month_index=0 at first monthly time step
+        starting_month (int): month of the year of the first month of the
+            run, such that starting_month=1 indicates January
+
+    Returns:
+        list of paths to the precipitation and vegetation index inputs of
+            the next monthly step and the temperature inputs of the next
+            month of the year, omitting those that are not in
+            `aligned_inputs`
+
+    """
+    next_month = (starting_month + month_index) % 12 + 1
+    return [
+        aligned_inputs[key] for key in [
+            'precip_{}'.format(month_index + 1),
+            'EO_index_{}'.format(month_index + 1),
+            'min_temp_{}'.format(next_month),
+            'max_temp_{}'.format(next_month)]
+        if key in aligned_inputs]
+
+
+class _MonthlyInputPrefetcher(object):
+    """Read the next month's inputs on a thread pool.
+
+    While the current month is computed, the aligned climate and vegetation
+    index inputs of the following month are read in background threads so
+    that the latency of reading them overlaps with computation.
+
+    """
+
+    def __init__(self, n_workers=2):
+        """Start the thread pool.
+
+        Parameters:
+            n_workers (int): number of threads reading inputs
+
+        Returns:
+            None
+
+        """
+        self.worker_pool = multiprocessing.pool.ThreadPool(n_workers)
+        self.pending_result_list = []
+        # paths of all rasters submitted, and of those whose reads finished
+        self.submitted_path_list = []
+        self.read_path_list = []
+
+    def prefetch(self, raster_path_list):
+        """Start reading a list of rasters in the background.
+
+        Reads started by the previous call are finished first, so that any
+        error raised while reading is reported and reads do not accumulate.
+
+        Parameters:
+            raster_path_list (list): list of paths to rasters to read
+
+        Returns:
+            None
+
+        """
+        self.wait()
+        for raster_path in raster_path_list:
+            self.submitted_path_list.append(raster_path)
+            self.pending_result_list.append(
+                self.worker_pool.apply_async(
+                    _read_raster_blocks, (raster_path,)))
+
+    def wait(self):
+        """Wait for pending reads to finish."""
+        for pending_result in self.pending_result_list:
+            self.read_path_list.append(pending_result.get())
+        self.pending_result_list = []
+
+    def close(self):
+        """Finish pending reads and stop the thread pool."""
+        self.wait()
+        self.worker_pool.close()
+        self.worker_pool.join()
+
+
+def _raster_content_hash(raster_path):
+    """Calculate a hash of the georeferencing and pixel values of a raster.
+
+    Unlike `_file_signature`, the hash does not depend on when the raster
+    was written, so rasters written by different runs with the same
+    contents have the same hash.
+
+    Parameters:
+        raster_path (string): path to single-band raster
+
+    Returns:
+        hexadecimal string hash of the raster
+
+    """
+    raster_info = pygeoprocessing.get_raster_info(raster_path)
+    raster_hash = hashlib.sha1()
+    raster_hash.update(json.dumps([
+        list(raster_info['geotransform']), list(raster_info['raster_size']),
+        raster_info['nodata'][0]]).encode('utf-8'))
+    for _, raster_block in pygeoprocessing.iterblocks((raster_path, 1)):
+        raster_hash.update(numpy.ascontiguousarray(raster_block).tobytes())
+    return raster_hash.hexdigest()
+
+
+def _persistent_param_cache_key(aligned_inputs, site_param_table, sv_reg):
+    """Calculate the key identifying a set of persistent parameters.
+
+    Persistent parameters are calculated from the site spatial index, soil
+    texture and bulk density inputs, the site parameters and initial soil
+    organic matter and surface structural material. The key is calculated
+    from the path, size and modification time of the aligned inputs, the
+    contents of the initial state variable rasters and the values of the
+    site parameter table.
+
+    Parameters:
+        aligned_inputs (dict): map of key, string descriptor of input
+            raster, to path to aligned input raster
+        site_param_table (dict): map of site spatial index to dictionaries
+            that contain site-level parameters
+        sv_reg (dict): map of key, path pairs giving paths to initial state
+            variables
+
+    Returns:
+        hexadecimal string key
+
+    """
+    key_list = [
+        [_file_signature(aligned_inputs[key]) for key in [
+            'site_index', 'sand', 'silt', 'clay', 'bulk_d_path']],
+        [_raster_content_hash(sv_reg[key]) for key in
+            _PERSISTENT_PARAM_SV_KEYS],
+        sorted([
+            (str(site_code), sorted([
+                (str(param), str(value)) for param, value in
+                site_params.items()]))
+            for site_code, site_params in site_param_table.items()]),
+        _SV_NODATA,
+    ]
+    return hashlib.sha1(json.dumps(key_list).encode('utf-8')).hexdigest()
+
+
+def _cached_persistent_params(
+        aligned_inputs, site_param_table, sv_reg, pp_cache_dir):
+    """Calculate persistent parameters, or reuse them from a previous run.
+
+    Persistent parameters are written to a directory inside `pp_cache_dir`
+    named by `_persistent_param_cache_key`. If that directory exists, the
+    parameters were calculated by a previous run from the same inputs and
+    are not calculated again. Parameters are calculated in a temporary
+    directory that is renamed once it is complete, so that runs sharing the
+    cache never read an incomplete set of parameters.
+
+    Parameters:
+        aligned_inputs (dict): map of key, string descriptor of input
+            raster, to path to aligned input raster
+        site_param_table (dict): map of site spatial index to dictionaries
+            that contain site-level parameters
+        sv_reg (dict): map of key, path pairs giving paths to initial state
+            variables
+        pp_cache_dir (string): path to directory where persistent parameters
+            are cached
+
+    Side effects:
+        creates a directory of persistent parameter rasters inside
+            `pp_cache_dir`, if it does not exist
+
+    Returns:
+        pp_reg, map of key, path pairs giving paths to persistent parameter
+            rasters
+
+    """
+    utils.make_directories([pp_cache_dir])
+    pp_dir = os.path.join(
+        pp_cache_dir, _persistent_param_cache_key(
+            aligned_inputs, site_param_table, sv_reg))
+    if os.path.isdir(pp_dir):
+        LOGGER.info("Reusing persistent parameters from %s", pp_dir)
+    else:
+        temp_dir = tempfile.mkdtemp(dir=pp_cache_dir)
+        try:
+            temp_pp_reg = dict([
+                (key, os.path.join(temp_dir, path)) for key, path in
+                _PERSISTENT_PARAMS_FILES.items()])
+
+            # calculate field capacity and wilting point
+            LOGGER.info("Calculating field capacity and wilting point")
+            _afiel_awilt(
+                aligned_inputs['site_index'], site_param_table,
+                sv_reg['som1c_2_path'], sv_reg['som2c_2_path'],
+                sv_reg['som3c_path'], aligned_inputs['sand'],
+                aligned_inputs['silt'], aligned_inputs['clay'],
+                aligned_inputs['bulk_d_path'], temp_pp_reg)
+
+            # calculate other persistent parameters
+            LOGGER.info("Calculating persistent parameters")
+            _persistent_params(
+                aligned_inputs['site_index'], site_param_table,
+                aligned_inputs['sand'], aligned_inputs['clay'], temp_pp_reg)
+
+            # calculate required ratios for decomposition of structural
+            # material
+            LOGGER.info(
+                "Calculating required ratios for structural decomposition")
+            _structural_ratios(
+                aligned_inputs['site_index'], site_param_table, sv_reg,
+                temp_pp_reg)
+            try:
+                os.rename(temp_dir, pp_dir)
+            except OSError:
+                # another run wrote the same parameters first
+                if not os.path.exists(pp_dir):
+                    raise
+        finally:
+            # the cache is shared, so partial results must not be left in it
+            shutil.rmtree(temp_dir, ignore_errors=True)
+    return dict([
+        (key, os.path.join(pp_dir, path)) for key, path in
+        _PERSISTENT_PARAMS_FILES.items()])
+
+
+def _initial_state_variables(
+        args, aligned_inputs, pft_id_set, site_index_set, target_pixel_size):
+    """Create state variables describing the start of the simulation.
+
+    Initial state variables are aligned from the rasters in
+    `args['initial_conditions_dir']` if it is supplied, or are created from
+    the initial conditions tables `args['site_initial_table']` and
+    `args['pft_initial_table']` otherwise. They are written to the directory
+    `state_variables_m-1` inside the workspace.
+
+    Parameters:
+        args (dict): arguments to `execute`
+        aligned_inputs (dict): map of key, string descriptor of input
+            raster, to path to aligned input raster
         pft_id_set (set): set of integers identifying plant functional types
-        weighted_sum_path (string): path to raster that should contain the
-            weighted sum across PFTs
+        site_index_set (set): set of site indices found in the site
+            spatial index raster
+        target_pixel_size (list): x and y size of aligned input pixels
+
+    Raises:
+        ValueError if initial conditions are missing for any site, plant
+            functional type or state variable
 
     Side effects:
-        modifies or creates the raster indicated by `weighted_sum_path`
+        creates the directory `state_variables_m-1` inside the workspace
+            containing initial state variable rasters
+        modifies the global `_SV_NODATA` to match initial condition rasters,
+            if they are supplied
+
+    Returns:
+        sv_reg, map of key, string descriptor of state variable, to path to
+            initial state variable raster
+
+    """
+    sv_dir = os.path.join(args['workspace_dir'], 'state_variables_m-1')
+    utils.make_directories([sv_dir])
+    initial_conditions_dir = None
+    try:
+        initial_conditions_dir = args['initial_conditions_dir']
+    except KeyError:
+        pass
+    if initial_conditions_dir:
+        # check that a raster for each required state variable is supplied
+        missing_initial_values = []
+        # set _SV_NODATA from initial rasters
+        state_var_nodata = set([])
+        # align initial state variables to resampled inputs
+        resample_initial_path_map = {}
+        for sv in _SITE_STATE_VARIABLE_FILES.keys():
+            sv_path = os.path.join(
+                initial_conditions_dir, _SITE_STATE_VARIABLE_FILES[sv])
+            state_var_nodata.update(
+                set([pygeoprocessing.get_raster_info(sv_path)['nodata'][0]]))
+            resample_initial_path_map[sv] = sv_path
+            if not os.path.exists(sv_path):
+                missing_initial_values.append(sv_path)
+        for pft_i in pft_id_set:
+            for sv in _PFT_STATE_VARIABLES:
+                sv_key = '{}_{}_path'.format(sv, pft_i)
+                sv_path = os.path.join(
+                    initial_conditions_dir, '{}_{}.tif'.format(sv, pft_i))
+                state_var_nodata.update(
+                    set([pygeoprocessing.get_raster_info(sv_path)['nodata']
+                         [0]]))
+                resample_initial_path_map[sv_key] = sv_path
+                if not os.path.exists(sv_path):
+                    missing_initial_values.append(sv_path)
+        if missing_initial_values:
+            raise ValueError(
+                "Couldn't find the following required initial values: " +
+                "\n\t".join(missing_initial_values))
+        if len(state_var_nodata) > 1:
+            raise ValueError(
+                "Initial state variable rasters contain >1 nodata value")
+        global _SV_NODATA
+        _SV_NODATA = list(state_var_nodata)[0]
+
+        # align initial values with inputs
+        initial_path_list = (
+            [aligned_inputs['precip_0']] +
+            [resample_initial_path_map[key] for key in sorted(
+                resample_initial_path_map.keys())])
+        aligned_initial_path_list = (
+            [os.path.join(PROCESSING_DIR, 'aligned_input_template.tif')] +
+            [os.path.join(
+                sv_dir, os.path.basename(resample_initial_path_map[key])) for
+                key in sorted(resample_initial_path_map.keys())])
+        pygeoprocessing.align_and_resize_raster_stack(
+            initial_path_list, aligned_initial_path_list,
+            ['near'] * len(initial_path_list),
+            target_pixel_size, 'intersection',
+            base_vector_path_list=[args['aoi_path']], raster_align_index=0,
+            vector_mask_options={'mask_vector_path': args['aoi_path']})
+        sv_reg = dict(
+            [(key, os.path.join(sv_dir, os.path.basename(path)))
+             for key, path in resample_initial_path_map.items()])
+    else:
+        # create initialization rasters from tables
+        try:
+            site_initial_conditions_table = utils.build_lookup_from_csv(
+                args['site_initial_table'], 'site')
+        except KeyError:
+            raise ValueError(
+                "If initial conditions rasters are not supplied, initial " +
+                "conditions tables must be supplied")
+        missing_site_index_list = list(
+            site_index_set.difference(site_initial_conditions_table.keys()))
+        if missing_site_index_list:
+            raise ValueError(
+                "Couldn't find initial conditions values for the following " +
+                "site indices: %s\n\t" + ", ".join(missing_site_index_list))
+        try:
+            pft_initial_conditions_table = utils.build_lookup_from_csv(
+                args['pft_initial_table'], 'PFT')
+        except KeyError:
+            raise ValueError(
+                "If initial conditions rasters are not supplied, initial " +
+                "conditions tables must be supplied")
+        missing_pft_index_list = pft_id_set.difference(
+            pft_initial_conditions_table.keys())
+        if missing_pft_index_list:
+            raise ValueError(
+                "Couldn't find initial condition values for the following "
+                "plant functional types: %s\n\t" + ", ".join(
+                    missing_pft_index_list))
+        sv_reg = initial_conditions_from_tables(
+            aligned_inputs, sv_dir, pft_id_set, site_initial_conditions_table,
+            pft_initial_conditions_table)
+    return sv_reg
+
+
+def _write_checkpoint(
+        checkpoint_dir, month_index, starting_year, starting_month,
+        target_pixel_size, target_bb, sv_reg, pp_reg, year_reg,
+        animal_trait_table):
+    """Save the state of the model at the end of one month.
+
+    The checkpoint contains copies of the state variables, persistent
+    parameters and yearly parameters, the animal trait table including the
+    reproductive status of breeding females, and a manifest describing
+    them and the grid of the aligned inputs. The manifest is written last,
+    so a checkpoint that was interrupted while it was being written is not
+    found by `_find_latest_checkpoint`.
+
+    Parameters:
+        checkpoint_dir (string): path to directory that should contain the
+            checkpoint. This directory is replaced if it exists
+        month_index (int): month of the simulation that was just completed
+        starting_year (int): first year of the simulation
+        starting_month (int): first month of the simulation
+        target_pixel_size (list): x and y size of aligned input pixels
+        target_bb (list): bounding box of aligned inputs, in the form
+            [minx, miny, maxx, maxy]
+        sv_reg (dict): map of key, string descriptor of state variable, to
+            path to state variable raster at the end of `month_index`
+        pp_reg (dict): map of key, string descriptor of persistent parameter,
+            to path to persistent parameter raster
+        year_reg (dict): map of key, string descriptor of yearly parameter,
+            to path to yearly parameter raster
+        animal_trait_table (data frame): data frame of animal parameters and
+            traits indexed by animal id
+
+    Side effects:
+        creates the directory `checkpoint_dir` containing the checkpoint
+
+    Returns:
+        None
+
+    """
+    if os.path.exists(checkpoint_dir):
+        shutil.rmtree(checkpoint_dir)
+    manifest = {
+        'month_index': month_index,
+        'starting_year': starting_year,
+        'starting_month': starting_month,
+        'target_pixel_size': [float(val) for val in target_pixel_size],
+        'target_bb': [float(val) for val in target_bb],
+        'sv_nodata': _SV_NODATA,
+        'animal_trait_table': 'animal_trait_table.pickle',
+    }
+    for reg_name, reg in [
+            ('state_variables', sv_reg), ('persistent_params', pp_reg),
+            ('yearly', year_reg)]:
+        reg_dir = os.path.join(checkpoint_dir, reg_name)
+        utils.make_directories([reg_dir])
+        manifest[reg_name] = {}
+        for key, path in reg.items():
+            if not os.path.exists(path):
+                continue
+            checkpoint_path = os.path.join(reg_dir, os.path.basename(path))
+            shutil.copyfile(path, checkpoint_path)
+            manifest[reg_name][key] = os.path.relpath(
+                checkpoint_path, checkpoint_dir)
+    animal_trait_table.to_pickle(
+        os.path.join(checkpoint_dir, manifest['animal_trait_table']))
+    with open(os.path.join(checkpoint_dir, 'checkpoint.json'), 'w') as (
+            manifest_file):
+        json.dump(manifest, manifest_file, indent=2, sort_keys=True)
+
+
+def _find_latest_checkpoint(resume_from):
+    """Find the checkpoint describing the latest month of a model run.
+
+    Parameters:
+        resume_from (string): path to a checkpoint directory, or to a model
+            workspace containing the directory `checkpoints`
+
+    Raises:
+        ValueError if no complete checkpoint is found
+
+    Returns:
+        path to the directory containing the complete checkpoint with the
+            highest month index
+
+    """
+    if os.path.exists(os.path.join(resume_from, 'checkpoint.json')):
+        return resume_from
+    checkpoint_root = os.path.join(resume_from, 'checkpoints')
+    latest_month_index = None
+    latest_checkpoint_dir = None
+    if os.path.isdir(checkpoint_root):
+        for dirname in os.listdir(checkpoint_root):
+            manifest_path = os.path.join(
+                checkpoint_root, dirname, 'checkpoint.json')
+            if not os.path.exists(manifest_path):
+                continue
+            try:
+                with open(manifest_path, 'r') as manifest_file:
+                    month_index = json.load(manifest_file)['month_index']
+            except (ValueError, KeyError):
+                continue
+            if latest_month_index is None or month_index > latest_month_index:
+                latest_month_index = month_index
+                latest_checkpoint_dir = os.path.join(checkpoint_root, dirname)
+    if latest_checkpoint_dir is None:
+        raise ValueError(
+            "Couldn't find a complete checkpoint in %s" % resume_from)
+    return latest_checkpoint_dir
+
+
+def _read_checkpoint(checkpoint_dir):
+    """Read the manifest of a checkpoint written by `_write_checkpoint`.
+
+    Parameters:
+        checkpoint_dir (string): path to directory containing the checkpoint
+
+    Returns:
+        dict describing the checkpoint, where paths to rasters and to the
+            animal trait table are absolute
+
+    """
+    with open(os.path.join(checkpoint_dir, 'checkpoint.json'), 'r') as (
+            manifest_file):
+        checkpoint = json.load(manifest_file)
+    for reg_name in ['state_variables', 'persistent_params', 'yearly']:
+        checkpoint[reg_name] = dict([
+            (key, os.path.join(checkpoint_dir, path)) for key, path in
+            checkpoint[reg_name].items()])
+    checkpoint['animal_trait_table'] = os.path.join(
+        checkpoint_dir, checkpoint['animal_trait_table'])
+    return checkpoint
+
+
+def _restore_registry(checkpoint_reg, target_reg):
+    """Copy rasters saved in a checkpoint to the paths used by this run.
+
+    Parameters:
+        checkpoint_reg (dict): map of key to path to raster saved in the
+            checkpoint
+        target_reg (dict): map of key to path where the raster should be
+            copied
+
+    Raises:
+        ValueError if the checkpoint does not contain a raster for a key of
+            `target_reg` that it is required to contain
+
+    Side effects:
+        copies each raster in `checkpoint_reg` to the corresponding path in
+            `target_reg`
+
+    Returns:
+        None
+
+    """
+    missing_key_list = sorted(
+        set(target_reg.keys()).difference(checkpoint_reg.keys()))
+    if missing_key_list:
+        raise ValueError(
+            "Checkpoint does not contain the following rasters:\n\t" +
+            "\n\t".join(missing_key_list))
+    for key, target_path in target_reg.items():
+        shutil.copyfile(checkpoint_reg[key], target_path)
+
+
+def _restore_animal_state(animal_trait_table, checkpoint_trait_table):
+    """Carry the changing state of animals over from a checkpoint.
+
+    Traits derived from the animal trait table of this run are kept, so a
+    run resumed from a checkpoint may change animal traits such as
+    `grz_months`. Reproductive status and the weight of the conceptus and of
+    milk production are taken from the checkpoint for animals present in
+    both tables.
+
+    Parameters:
+        animal_trait_table (data frame): data frame of animal parameters and
+            traits indexed by animal id, derived from inputs to this run
+        checkpoint_trait_table (data frame): data frame of animal parameters
+            and traits indexed by animal id, saved in a checkpoint
 
     Returns:
-        None
+        copy of `animal_trait_table` where the columns in
+            `_ANIMAL_STATE_COLUMNS` are taken from `checkpoint_trait_table`
 
     """
-    temp_dir = tempfile.mkdtemp(dir=PROCESSING_DIR)
-    temp_val_dict = {}
-    for pft_i in pft_id_set:
-        val = '{}_weighted'.format(sv)
-        temp_val_dict['{}_{}'.format(val, pft_i)] = os.path.join(
-            temp_dir, '{}_{}.tif'.format(val, pft_i))
+    restored_trait_table = animal_trait_table.copy()
+    shared_id_list = [
+        animal_id for animal_id in restored_trait_table.index if
+        animal_id in checkpoint_trait_table.index]
+    for column in _ANIMAL_STATE_COLUMNS:
+        if column in checkpoint_trait_table.columns:
+            restored_trait_table.loc[shared_id_list, column] = (
+                checkpoint_trait_table.loc[shared_id_list, column].values)
+    return restored_trait_table
+
+
+class _StateVariableRetention(object):
+    """Remove or compress state variable directories of past months.
+
+    The directory `state_variables_m<month>` of a month is needed until the
+    following month has been simulated. After that, the retention policy
+    decides whether it is kept, in which case its rasters are compressed,
+    or removed. Both happen in a background thread so that the simulation
+    does not wait for them.
 
-    weighted_path_list = []
-    for pft_i in pft_id_set:
-        target_path = temp_val_dict['{}_weighted_{}'.format(sv, pft_i)]
-        pft_nodata = pygeoprocessing.get_raster_info(
-            aligned_inputs['pft_{}'.format(pft_i)])['nodata'][0]
-        raster_multiplication(
-            sv_reg['{}_{}_path'.format(sv, pft_i)], _SV_NODATA,
-            aligned_inputs['pft_{}'.format(pft_i)], pft_nodata,
-            target_path, _TARGET_NODATA)
-        weighted_path_list.append(target_path)
-    raster_list_sum(
-        weighted_path_list, _TARGET_NODATA, weighted_sum_path, _TARGET_NODATA,
-        nodata_remove=True)
+    """
 
-    # clean up temporary files
-    shutil.rmtree(temp_dir)
+    def __init__(self, workspace_dir, policy):
+        """Parse the retention policy and start the background thread.
+
+        Parameters:
+            workspace_dir (string): path to the workspace containing the
+                state variable directories
+            policy (string): one of 'all', 'none', 'last:N' or 'every:K'
 
+        Raises:
+            ValueError if `policy` is not recognized
 
-def _check_pft_fractional_cover_sum(aligned_inputs, pft_id_set):
-    """Check the sum of fractional cover across plant functional types.
+        Returns:
+            None
+
+        """
+        policy_match = re.match(
+            r'^\s*(all|none|last:(\d+)|every:([1-9]\d*))\s*$', policy)
+        if not policy_match:
+            raise ValueError(
+                "State variable retention policy %s is not recognized. Use "
+                "'all', 'none', 'last:N' or 'every:K'" % policy)
+        self.workspace_dir = workspace_dir
+        self.policy = policy_match.group(1).split(':')[0]
+        self.n_months = None
+        if self.policy in ['last', 'every']:
+            self.n_months = int(
+                policy_match.group(2) or policy_match.group(3))
+        self.candidate_month_list = []
+        self.compressed_month_set = set()
+        self.last_month_index = None
+        self.pending_result_list = []
+        self.worker_pool = multiprocessing.pool.ThreadPool(1)
+
+    def sv_dir(self, month_index):
+        """Path to the state variable directory of one month."""
+        return os.path.join(
+            self.workspace_dir, 'state_variables_m%d' % month_index)
+
+    def is_kept(self, month_index, last_month_index):
+        """Whether the directory of a month is kept.
+
+        Parameters:
+            month_index (int): month of the directory
+            last_month_index (int): latest month that has been simulated
+
+        Returns:
+            True if the policy keeps the directory of `month_index`
+
+        """
+        if self.policy == 'all':
+            return True
+        if self.policy == 'last':
+            return month_index > last_month_index - self.n_months
+        if self.policy == 'every':
+            return (
+                (month_index + 1) % self.n_months == 0 or
+                month_index == last_month_index)
+        return False
+
+    def _apply(self, last_month_index):
+        """Remove or compress the directories of candidate months."""
+        remaining_month_list = []
+        for month_index in self.candidate_month_list:
+            sv_dir = self.sv_dir(month_index)
+            if not os.path.isdir(sv_dir):
+                continue
+            if not self.is_kept(month_index, last_month_index):
+                self.pending_result_list.append(
+                    self.worker_pool.apply_async(shutil.rmtree, (sv_dir,)))
+                continue
+            if month_index not in self.compressed_month_set:
+                self.pending_result_list.append(
+                    self.worker_pool.apply_async(
+                        _compress_rasters_in_dir, (sv_dir,)))
+                self.compressed_month_set.add(month_index)
+            if self.policy == 'last':
+                # the month is removed when it leaves the window
+                remaining_month_list.append(month_index)
+        self.candidate_month_list = remaining_month_list
+
+    def month_completed(self, month_index):
+        """Apply the policy after a month has been simulated.
+
+        The directory of the previous month is no longer needed by the
+        simulation and becomes subject to the policy.
+
+        Parameters:
+            month_index (int): month that has just been simulated
+
+        Returns:
+            None
+
+        """
+        self.pending_result_list = [
+            result for result in self.pending_result_list if
+            not result.ready()]
+        self.candidate_month_list.append(month_index - 1)
+        self._apply(month_index)
+        self.last_month_index = month_index
+
+    def close(self):
+        """Apply the policy to the last month and wait for the thread."""
+        if self.last_month_index is not None:
+            self.candidate_month_list.append(self.last_month_index)
+            self._apply(self.last_month_index)
+        for result in self.pending_result_list:
+            result.get()
+        self.pending_result_list = []
+        self.worker_pool.close()
+        self.worker_pool.join()
+
+
+def _compress_rasters_in_dir(raster_dir):
+    """Compress each GeoTIFF inside a directory in place.
+
+    Rasters are rewritten with the 'compact_archive' creation preset.
+    Rasters that are compressed already are skipped.
 
     Parameters:
-        aligned_inputs (dict): map of key, path pairs indicating paths
-            to aligned model inputs, including fractional cover of each plant
-            functional type
-        pft_id_set (set): set of integers identifying plant functional types
+        raster_dir (string): path to directory containing rasters
 
-    Raises:
-        ValueError if the pixel-wise sum of fractional cover values across
-            plant functional types exceeds 1
+    Side effects:
+        replaces each uncompressed GeoTIFF in `raster_dir` with a compressed
+            copy
 
     Returns:
         None
 
     """
-    with tempfile.NamedTemporaryFile(
-            prefix='cover_sum', dir=PROCESSING_DIR) as cover_sum_temp_file:
-        cover_sum_path = cover_sum_temp_file.name
-    with tempfile.NamedTemporaryFile(
-            prefix='operand_temp', dir=PROCESSING_DIR) as operand_temp_file:
-        operand_temp_path = operand_temp_file.name
-
-    # initialize sum to zero
-    pygeoprocessing.new_raster_from_base(
-        aligned_inputs['site_index'], cover_sum_path, gdal.GDT_Float32,
-        [_TARGET_NODATA], fill_value_list=[0])
-    for pft_i in pft_id_set:
-        shutil.copyfile(cover_sum_path, operand_temp_path)
-        pft_nodata = pygeoprocessing.get_raster_info(
-            aligned_inputs['pft_{}'.format(pft_i)])['nodata'][0]
-        raster_sum(
-            aligned_inputs['pft_{}'.format(pft_i)], pft_nodata,
-            operand_temp_path, _TARGET_NODATA,
-            cover_sum_path, _TARGET_NODATA)
-    # get maximum sum of fractional cover
-    max_cover = 0.
-    for offset_map, raster_block in pygeoprocessing.iterblocks(
-            (cover_sum_path, 1)):
-        valid_mask = (raster_block != _TARGET_NODATA)
-        max_cover = max(max_cover, numpy.amax(raster_block[valid_mask]))
-    if max_cover > 1:
-        raise ValueError(
-            "Fractional cover across plant functional types exceeds 1")
-
-    # clean up
-    os.remove(cover_sum_path)
+    for raster_name in os.listdir(raster_dir):
+        if not raster_name.endswith('.tif'):
+            continue
+        raster_path = os.path.join(raster_dir, raster_name)
+        raster = gdal.OpenEx(raster_path, gdal.OF_RASTER)
+        compression = raster.GetMetadataItem('COMPRESSION', 'IMAGE_STRUCTURE')
+        datatype = raster.GetRasterBand(1).DataType
+        raster = None
+        if compression:
+            continue
+        temp_path = os.path.join(raster_dir, '_compressed_' + raster_name)
+        gdal.Translate(
+            temp_path, raster_path, format='GTiff',
+            creationOptions=_gtiff_creation_options(
+                'compact_archive', datatype))
+        os.remove(raster_path)
+        os.rename(temp_path, raster_path)
 
 
 def initial_conditions_from_tables(
@@ -1644,7 +4862,7 @@ def initial_conditions_from_tables(
                 sv_dir, '{}_{}.tif'.format(state_var, pft_i))
             sv_key = '{}_{}_path'.format(state_var, pft_i)
             initial_sv_reg[sv_key] = target_path
-            pygeoprocessing.raster_calculator(
+            _raster_calculator(
                 [(pft_cover_path, 1), (fill_val, 'raw')],
                 full_masked, target_path, gdal.GDT_Float32, _SV_NODATA)
     return initial_sv_reg
@@ -1709,7 +4927,7 @@ def _calc_ompc(
         return ompc
 
     bulkd_nodata = pygeoprocessing.get_raster_info(bulkd_path)['nodata'][0]
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             som1c_2_path, som2c_2_path, som3c_path,
             bulkd_path, edepth_path]],
@@ -1775,7 +4993,7 @@ def _calc_afiel(
     clay_nodata = pygeoprocessing.get_raster_info(clay_path)['nodata'][0]
     bulkd_nodata = pygeoprocessing.get_raster_info(bulkd_path)['nodata'][0]
 
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             sand_path, silt_path, clay_path, ompc_path, bulkd_path]],
         afiel_op, afiel_path, gdal.GDT_Float32, _TARGET_NODATA)
@@ -1846,7 +5064,7 @@ def _calc_awilt(
     clay_nodata = pygeoprocessing.get_raster_info(clay_path)['nodata'][0]
     bulkd_nodata = pygeoprocessing.get_raster_info(bulkd_path)['nodata'][0]
 
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             sand_path, silt_path, clay_path, ompc_path, bulkd_path]],
         awilt_op, awilt_path, gdal.GDT_Float32, _TARGET_NODATA)
@@ -1915,7 +5133,7 @@ def _afiel_awilt(
             ompc_dec[valid_mask] = ompc_orig[valid_mask] * 0.85
             return ompc_dec
 
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(ompc_orig_path, 1)], decrement_op, ompc_dec_path,
             gdal.GDT_Float32, _TARGET_NODATA)
 
@@ -2009,7 +5227,7 @@ def _persistent_params(
         """Calculate water content of soil layer 1."""
         return afiel_1 - awilt_1
 
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             pp_reg['afiel_1_path'], pp_reg['awilt_1_path']]],
         calc_wc, pp_reg['wc_path'], gdal.GDT_Float32, _TARGET_NODATA)
@@ -2039,7 +5257,7 @@ def _persistent_params(
             peftxa[valid_mask] + (peftxb[valid_mask] * sand[valid_mask]))
         return eftext
 
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             param_val_dict['peftxa'], param_val_dict['peftxb'], sand_path]],
         calc_eftext, pp_reg['eftext_path'], gdal.GDT_Float32, _IC_NODATA)
@@ -2073,7 +5291,7 @@ def _persistent_params(
             p1co2a_2[valid_mask] + (p1co2b_2[valid_mask] * sand[valid_mask]))
         return p1co2_2
 
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             param_val_dict['p1co2a_2'],
             param_val_dict['p1co2b_2'], sand_path]],
@@ -2106,7 +5324,7 @@ def _persistent_params(
             ps1s3_1[valid_mask] + (ps1s3_2[valid_mask] * clay[valid_mask]))
         return fps1s3
 
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             param_val_dict['ps1s3_1'], param_val_dict['ps1s3_2'], clay_path]],
         calc_fps1s3, pp_reg['fps1s3_path'], gdal.GDT_Float32, _IC_NODATA)
@@ -2138,7 +5356,7 @@ def _persistent_params(
             ps2s3_1[valid_mask] + (ps2s3_2[valid_mask] * clay[valid_mask]))
         return fps2s3
 
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             param_val_dict['ps2s3_1'], param_val_dict['ps2s3_2'], clay_path]],
         calc_fps2s3, pp_reg['fps2s3_path'], gdal.GDT_Float32, _IC_NODATA)
@@ -2170,7 +5388,7 @@ def _persistent_params(
             omlech_1[valid_mask] + (omlech_2[valid_mask] * sand[valid_mask]))
         return orglch
 
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             param_val_dict['omlech_1'], param_val_dict['omlech_2'],
             sand_path]],
@@ -2205,7 +5423,7 @@ def _persistent_params(
         vlossg[valid_mask] = vlossg[valid_mask] * vlossg_param[valid_mask]
         return vlossg
 
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [param_val_dict['vlossg'], clay_path]],
         calc_vlossg, pp_reg['vlossg_path'], gdal.GDT_Float32, _IC_NODATA)
 
@@ -2415,7 +5633,7 @@ def _structural_ratios(site_index_path, site_param_table, sv_reg, pp_reg):
 
     for iel in [1, 2]:
         # calculate rnewas_iel_1 - aboveground material to SOM1
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 sv_reg['struce_1_{}_path'.format(iel)],
                 sv_reg['strucc_1_path'],
@@ -2425,7 +5643,7 @@ def _structural_ratios(site_index_path, site_param_table, sv_reg, pp_reg):
             _aboveground_ratio, pp_reg['rnewas_{}_1_path'.format(iel)],
             gdal.GDT_Float32, _TARGET_NODATA)
         # calculate rnewas_iel_2 - aboveground material to SOM2
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 param_val_dict['pcemic2_2_{}'.format(iel)],
                 param_val_dict['pcemic2_1_{}'.format(iel)],
@@ -2461,9 +5679,249 @@ def _structural_ratios(site_index_path, site_param_table, sv_reg, pp_reg):
     shutil.rmtree(temp_dir)
 
 
+class _AnnualPrecipWindow(object):
+    """Sum of monthly precipitation over a moving 12-month window.
+
+    The window is moved forward by adding precipitation of the months that
+    enter it and subtracting precipitation of the months that leave it, in
+    one pass over those rasters. Moving the window by k months reads 2k + 1
+    rasters, so it is moved only while that is fewer than the 12 rasters
+    read when the window is summed from scratch. The number of months
+    inside the window that are nodata is kept alongside the sum, so that
+    annual precipitation is nodata exactly where one of the 12 months is
+    nodata, as when the months are summed from scratch.
+
+    """
+
+    def __init__(self, window_dir):
+        """Set up an empty window.
+
+        Parameters:
+            window_dir (string): path to directory where the sum and nodata
+                count of the window are stored
+
+        Returns:
+            None
+
+        """
+        self.sum_path = os.path.join(window_dir, 'precip_window_sum.tif')
+        self.nodata_count_path = os.path.join(
+            window_dir, 'precip_window_nodata_count.tif')
+        self.window_end = None
+
+    def update(self, month_index, aligned_inputs):
+        """Move the window forward to end at one month, if possible.
+
+        The window moves only if it ends at the previous month and
+        precipitation of the entering and leaving months is available.
+        Otherwise it is left unchanged, and is summed from scratch the next
+        time annual precipitation is needed. Callers that only need annual
+        precipitation once a year need not call this every month:
+        `write_annual_precip` moves the window itself.
+
+        Parameters:
+            month_index (int): month of the simulation that should be the
+                last month of the window
+            aligned_inputs (dict): map of key to aligned input raster,
+                including monthly precipitation
+
+        Side effects:
+            modifies the rasters indicated by `self.sum_path` and
+                `self.nodata_count_path`
+
+        Returns:
+            None
+
+        """
+        if self.window_end == month_index - 1:
+            self._move(month_index, aligned_inputs)
+
+    def _move(self, month_index, aligned_inputs):
+        """Move the window forward from its end to `month_index`.
+
+        Returns:
+            True if the window was moved, False if precipitation of a month
+                entering or leaving the window is not available
+
+        """
+        enter_key_list = [
+            'precip_{}'.format(enter_month) for enter_month in range(
+                self.window_end + 1, month_index + 1)]
+        leave_key_list = [
+            'precip_{}'.format(enter_month - 12) for enter_month in range(
+                self.window_end + 1, month_index + 1)]
+        if any(key not in aligned_inputs for key in (
+                enter_key_list + leave_key_list)):
+            return False
+        n_enter = len(enter_key_list)
+        nodata_list = [
+            pygeoprocessing.get_raster_info(
+                aligned_inputs[key])['nodata'][0] for key in
+            enter_key_list + leave_key_list]
+
+        def move_sum(window_sum, *precip_list):
+            """Add entering and subtract leaving precipitation."""
+            result = window_sum.copy()
+            for precip_i, (precip, nodata) in enumerate(
+                    zip(precip_list, nodata_list)):
+                valid_mask = ~_nodata_mask(precip, nodata)
+                if precip_i < n_enter:
+                    result[valid_mask] += precip[valid_mask]
+                else:
+                    result[valid_mask] -= precip[valid_mask]
+            return result
+
+        def move_nodata_count(nodata_count, *precip_list):
+            """Count nodata months entering and leaving the window."""
+            result = nodata_count.copy()
+            for precip_i, (precip, nodata) in enumerate(
+                    zip(precip_list, nodata_list)):
+                if precip_i < n_enter:
+                    result += _nodata_mask(precip, nodata).astype(numpy.int32)
+                else:
+                    result -= _nodata_mask(precip, nodata).astype(numpy.int32)
+            return result
+
+        base_path_list = [
+            (aligned_inputs[key], 1) for key in
+            enter_key_list + leave_key_list]
+        for window_path, op, datatype in [
+                (self.sum_path, move_sum, gdal.GDT_Float64),
+                (self.nodata_count_path, move_nodata_count,
+                    gdal.GDT_Int32)]:
+            updated_path = window_path.replace('.tif', '_updated.tif')
+            _raster_calculator(
+                [(window_path, 1)] + base_path_list, op, updated_path,
+                datatype, _TARGET_NODATA)
+            os.remove(window_path)
+            os.rename(updated_path, window_path)
+        self.window_end = month_index
+        return True
+
+    def write_annual_precip(self, month_index, aligned_inputs, target_path):
+        """Write annual precipitation for the year starting at one month.
+
+        If the window ends a few months before `month_index`, it is moved
+        forward to end at `month_index`. Otherwise, if it does not end at
+        `month_index`, it is summed from scratch over the first 12 months of
+        precipitation found from 11 months before `month_index` to 11
+        months after it.
+
+        Parameters:
+            month_index (int): month of the simulation
+            aligned_inputs (dict): map of key to aligned input raster,
+                including monthly precipitation
+            target_path (string): path to raster that should contain annual
+                precipitation
+
+        Raises:
+            ValueError if fewer than 12 monthly precipitation rasters can be
+                found
+            ValueError if precipitation rasters include more than one nodata
+                value
+
+        Side effects:
+            modifies or creates the raster indicated by `target_path`
+
+        Returns:
+            None
+
+        """
+        # moving the window by k months reads 2k + 1 rasters, against 12
+        # when summing from scratch
+        n_move = None
+        if self.window_end is not None:
+            n_move = month_index - self.window_end
+        if n_move != 0:
+            if (n_move is None or n_move < 0 or 2 * n_move + 1 >= 12 or
+                    not self._move(month_index, aligned_inputs)):
+                self._sum_from_scratch(month_index, aligned_inputs)
+
+        def annual_precip_op(window_sum, nodata_count):
+            """Mask the sum where a month of the window is nodata."""
+            result = numpy.empty(window_sum.shape, dtype=numpy.float32)
+            result[:] = _TARGET_NODATA
+            valid_mask = (nodata_count == 0)
+            result[valid_mask] = window_sum[valid_mask]
+            return result
+
+        _raster_calculator(
+            [(self.sum_path, 1), (self.nodata_count_path, 1)],
+            annual_precip_op, target_path, gdal.GDT_Float32, _TARGET_NODATA)
+
+    def _sum_from_scratch(self, month_index, aligned_inputs):
+        """Sum the 12 months of precipitation used for one month."""
+        offset = -12
+        window_month_list = []
+        while len(window_month_list) < 12:
+            offset += 1
+            if offset == 12:
+                raise ValueError(
+                    "Insufficient precipitation rasters were found")
+            if 'precip_{}'.format(month_index + offset) in aligned_inputs:
+                window_month_list.append(month_index + offset)
+        precip_path_list = [
+            aligned_inputs['precip_{}'.format(precip_month)] for
+            precip_month in window_month_list]
+
+        precip_nodata = set([])
+        for precip_raster in precip_path_list:
+            precip_nodata.update(set([
+                pygeoprocessing.get_raster_info(precip_raster)['nodata'][0]]))
+        if len(precip_nodata) > 1:
+            raise ValueError("Precipitation rasters include >1 nodata value")
+        precip_nodata = list(precip_nodata)[0]
+
+        def sum_op(*precip_list):
+            """Sum precipitation, treating nodata as zero."""
+            result = numpy.zeros(precip_list[0].shape, dtype=numpy.float64)
+            for precip in precip_list:
+                valid_mask = ~_nodata_mask(precip, precip_nodata)
+                result[valid_mask] += precip[valid_mask]
+            return result
+
+        def nodata_count_op(*precip_list):
+            """Count months of precipitation that are nodata."""
+            result = numpy.zeros(precip_list[0].shape, dtype=numpy.int32)
+            for precip in precip_list:
+                result += _nodata_mask(precip, precip_nodata)
+            return result
+
+        base_path_list = [(path, 1) for path in precip_path_list]
+        _raster_calculator(
+            base_path_list, sum_op, self.sum_path, gdal.GDT_Float64,
+            _TARGET_NODATA)
+        _raster_calculator(
+            base_path_list, nodata_count_op, self.nodata_count_path,
+            gdal.GDT_Int32, _TARGET_NODATA)
+
+        # the window can be moved forward only if it is 12 consecutive months
+        if window_month_list == list(range(
+                window_month_list[0], window_month_list[0] + 12)):
+            self.window_end = window_month_list[-1]
+        else:
+            self.window_end = None
+
+
+def _nodata_mask(value_array, nodata):
+    """Identify nodata values in an array.
+
+    Parameters:
+        value_array (numpy.ndarray): array of raster values
+        nodata (float): nodata value of the raster, or None
+
+    Returns:
+        boolean array that is True where `value_array` is nodata
+
+    """
+    if nodata is None:
+        return numpy.zeros(value_array.shape, dtype=bool)
+    return numpy.isclose(value_array, nodata)
+
+
 def _yearly_tasks(
         aligned_inputs, site_param_table, veg_trait_table, month_index,
-        pft_id_set, year_reg):
+        pft_id_set, year_reg, precip_window=None):
     """Calculate quantities that remain static for 12 months.
 
     These quantities are annual precipitation, annual atmospheric N
@@ -2488,6 +5946,9 @@ def _yearly_tasks(
         pft_id_set (set): set of integers identifying plant functional types
         year_reg (dict): map of key, path pairs giving paths to the annual
             precipitation and N deposition rasters
+        precip_window (_AnnualPrecipWindow): optional, moving sum of monthly
+            precipitation that is updated each month. If it is not supplied,
+            annual precipitation is summed from scratch.
 
     Side effects:
         modifies or creates the rasters indicated by:
@@ -2562,33 +6023,13 @@ def _yearly_tasks(
         pltlig[valid_mask] = numpy.clip(pltlig[valid_mask], 0.02, 0.5)
         return pltlig
 
-    offset = -12
-    annual_precip_rasters = []
-    while len(annual_precip_rasters) < 12:
-        offset += 1
-        if offset == 12:
-            raise ValueError("Insufficient precipitation rasters were found")
-        precip_month = month_index + offset
-        try:
-            annual_precip_rasters.append(
-                    aligned_inputs['precip_%d' % precip_month])
-        except KeyError:
-            continue
-
-    precip_nodata = set([])
-    for precip_raster in annual_precip_rasters:
-        precip_nodata.update(
-            set([pygeoprocessing.get_raster_info(precip_raster)['nodata'][0]]))
-    if len(precip_nodata) > 1:
-        raise ValueError("Precipitation rasters include >1 nodata value")
-    precip_nodata = list(precip_nodata)[0]
-
-    raster_list_sum(
-        annual_precip_rasters, precip_nodata, year_reg['annual_precip_path'],
-        _TARGET_NODATA)
-
     # intermediate parameter rasters for this operation
     temp_dir = tempfile.mkdtemp(dir=PROCESSING_DIR)
+    if precip_window is None:
+        precip_window = _AnnualPrecipWindow(temp_dir)
+    precip_window.write_annual_precip(
+        month_index, aligned_inputs, year_reg['annual_precip_path'])
+
     param_val_dict = {}
     for val in['epnfa_1', 'epnfa_2']:
         target_path = os.path.join(temp_dir, '{}.tif'.format(val))
@@ -2605,12 +6046,12 @@ def _yearly_tasks(
                 temp_dir, '{}_{}.tif'.format(val, pft_i))
             param_val_dict['{}_{}'.format(val, pft_i)] = target_path
             fill_val = veg_trait_table[pft_i][val]
-            pygeoprocessing.new_raster_from_base(
+            _new_raster_from_base(
                 aligned_inputs['site_index'], target_path, gdal.GDT_Float32,
                 [_IC_NODATA], fill_value_list=[fill_val])
 
     # calculate base N deposition
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             param_val_dict['epnfa_1'], param_val_dict['epnfa_2'],
             year_reg['annual_precip_path']]],
@@ -2619,7 +6060,7 @@ def _yearly_tasks(
 
     for pft_i in pft_id_set:
         # fraction of surface residue that is lignin
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 param_val_dict['fligni_1_1_{}'.format(pft_i)],
                 param_val_dict['fligni_2_1_{}'.format(pft_i)],
@@ -2628,7 +6069,7 @@ def _yearly_tasks(
             gdal.GDT_Float32, _TARGET_NODATA)
 
         # fraction of soil residue that is lignin
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 param_val_dict['fligni_1_2_{}'.format(pft_i)],
                 param_val_dict['fligni_2_2_{}'.format(pft_i)],
@@ -2640,9 +6081,28 @@ def _yearly_tasks(
     shutil.rmtree(temp_dir)
 
 
-def calc_latitude(template_raster, latitude_raster_path):
-    """Calculate latitude at the center of each pixel in a template raster."""
-    pygeoprocessing.new_raster_from_base(
+def calc_latitude(
+        template_raster, latitude_raster_path, latitude_input_path=None):
+    """Calculate latitude at the center of each pixel in a template raster.
+
+    Parameters:
+        template_raster (string): path to a raster in geographic coordinates
+            that is aligned with model inputs
+        latitude_raster_path (string): path to raster that should contain
+            the latitude of each pixel
+        latitude_input_path (string): optional, path to a raster aligned with
+            `template_raster` giving the latitude of each pixel. If supplied,
+            its values are used instead of latitude calculated from the
+            pixel coordinates.
+
+    Side effects:
+        modifies or creates the raster indicated by `latitude_raster_path`
+
+    Returns:
+        None
+
+    """
+    _new_raster_from_base(
         template_raster, latitude_raster_path, gdal.GDT_Float32,
         [_IC_NODATA])
     latitude_raster = gdal.OpenEx(
@@ -2650,8 +6110,19 @@ def calc_latitude(template_raster, latitude_raster_path):
     target_band = latitude_raster.GetRasterBand(1)
     base_raster_info = pygeoprocessing.get_raster_info(template_raster)
     geotransform = base_raster_info['geotransform']
+    latitude_input_band = None
+    if latitude_input_path:
+        # latitude of each pixel is supplied as a model input
+        latitude_input_raster = gdal.OpenEx(
+            latitude_input_path, gdal.OF_RASTER)
+        latitude_input_band = latitude_input_raster.GetRasterBand(1)
     for offset_map, raster_block in pygeoprocessing.iterblocks(
             (template_raster, 1)):
+        if latitude_input_band is not None:
+            target_band.WriteArray(
+                latitude_input_band.ReadAsArray(**offset_map),
+                xoff=offset_map['xoff'], yoff=offset_map['yoff'])
+            continue
         n_y_block = raster_block.shape[0]
         n_x_block = raster_block.shape[1]
 
@@ -2683,11 +6154,14 @@ def calc_latitude(template_raster, latitude_raster_path):
     target_band.FlushCache()
     target_band.FlushCache()
     target_band = None
+    latitude_input_band = None
+    latitude_input_raster = None
     gdal.Dataset.__swig_destroy__(latitude_raster)
     latitude_raster = None
 
 
-def _calc_daylength(template_raster, month, daylength_path):
+def _calc_daylength(
+        template_raster, month, daylength_path, latitude_input_path=None):
     """Calculate estimated hours of daylength. Daylen.c.
 
     Parameters:
@@ -2696,6 +6170,9 @@ def _calc_daylength(template_raster, month, daylength_path):
         month (int): current month of the year, such that month=0 indicates
             January
         daylength_path (string): path to shortwave radiation raster
+        latitude_input_path (string): optional, path to a raster giving the
+            latitude of each pixel, used instead of latitude calculated from
+            the pixel coordinates of `template_raster`
 
     Side effects:
         modifies or creates the raster indicated by `daylength_path`
@@ -2730,9 +6207,11 @@ def _calc_daylength(template_raster, month, daylength_path):
     # calculate an intermediate input, latitude at each pixel center
     temp_dir = tempfile.mkdtemp(dir=PROCESSING_DIR)
     latitude_raster_path = os.path.join(temp_dir, 'latitude.tif')
-    calc_latitude(template_raster, latitude_raster_path)
+    calc_latitude(
+        template_raster, latitude_raster_path,
+        latitude_input_path=latitude_input_path)
 
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(latitude_raster_path, 1)], daylength(month), daylength_path,
         gdal.GDT_Float32, _TARGET_NODATA)
 
@@ -2740,7 +6219,8 @@ def _calc_daylength(template_raster, month, daylength_path):
     shutil.rmtree(temp_dir)
 
 
-def _shortwave_radiation(template_raster, month, shwave_path):
+def _shortwave_radiation(
+        template_raster, month, shwave_path, latitude_input_path=None):
     """Calculate shortwave radiation outside the atmosphere.
 
     Shortwave radiation outside the atmosphere is calculated according to
@@ -2755,6 +6235,9 @@ def _shortwave_radiation(template_raster, month, shwave_path):
         month (int): current month of the year, such that month=0 indicates
             January
         shwave_path (string): path to shortwave radiation raster
+        latitude_input_path (string): optional, path to a raster giving the
+            latitude of each pixel, used instead of latitude calculated from
+            the pixel coordinates of `template_raster`
 
     Side effects:
         Modifies the raster indicated by `shwave_path`
@@ -2811,9 +6294,11 @@ def _shortwave_radiation(template_raster, month, shwave_path):
     # calculate an intermediate input, latitude at each pixel center
     temp_dir = tempfile.mkdtemp(dir=PROCESSING_DIR)
     latitude_raster_path = os.path.join(temp_dir, 'latitude.tif')
-    calc_latitude(template_raster, latitude_raster_path)
+    calc_latitude(
+        template_raster, latitude_raster_path,
+        latitude_input_path=latitude_input_path)
 
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(latitude_raster_path, 1)],
         shwave(month), shwave_path,
         gdal.GDT_Float32, _TARGET_NODATA)
@@ -2907,7 +6392,7 @@ def _reference_evapotranspiration(
         max_temp_path)['nodata'][0]
     mintmp_nodata = pygeoprocessing.get_raster_info(
         min_temp_path)['nodata'][0]
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             max_temp_path, min_temp_path, shwave_path, fwloss_4_path]],
         _calc_pevap, pevap_path, gdal.GDT_Float32, _TARGET_NODATA)
@@ -3276,7 +6761,7 @@ def _potential_production(
                 temp_dir, '{}_{}.tif'.format(val, pft_i))
             param_val_dict['{}_{}'.format(val, pft_i)] = target_path
             fill_val = veg_trait_table[pft_i][val]
-            pygeoprocessing.new_raster_from_base(
+            _new_raster_from_base(
                 aligned_inputs['site_index'], target_path, gdal.GDT_Float32,
                 [_IC_NODATA], fill_value_list=[fill_val])
 
@@ -3296,7 +6781,7 @@ def _potential_production(
             sv, prev_sv_reg, aligned_inputs, pft_id_set, weighted_sum_path)
 
     # ctemp, soil temperature relative to impacts on growth
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             temp_val_dict['sum_aglivc'],
             param_val_dict['pmxbio'],
@@ -3308,7 +6793,8 @@ def _potential_production(
 
     # shwave, shortwave radiation outside the atmosphere
     _shortwave_radiation(
-        aligned_inputs['site_index'], current_month, temp_val_dict['shwave'])
+        aligned_inputs['site_index'], current_month, temp_val_dict['shwave'],
+        latitude_input_path=aligned_inputs.get('latitude'))
 
     # pet, reference evapotranspiration modified by fwloss parameter
     _reference_evapotranspiration(
@@ -3321,7 +6807,7 @@ def _potential_production(
     # calculate quantities that differ between PFTs
     for pft_i in do_PFT:
         # potprd, the limiting effect of temperature
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 aligned_inputs['min_temp_{}'.format(current_month)],
                 aligned_inputs['max_temp_{}'.format(current_month)],
@@ -3334,7 +6820,7 @@ def _potential_production(
             gdal.GDT_Float32, _TARGET_NODATA)
 
         # h2ogef_1, the limiting effect of soil water availability
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 temp_val_dict['pevap'],
                 prev_sv_reg['avh2o_1_{}_path'.format(pft_i)],
@@ -3347,7 +6833,7 @@ def _potential_production(
             gdal.GDT_Float32, _TARGET_NODATA)
 
         # biof, the limiting effect of obstruction
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 temp_val_dict['sum_stdedc'],
                 temp_val_dict['sum_aglivc'],
@@ -3358,7 +6844,7 @@ def _potential_production(
             gdal.GDT_Float32, _TARGET_NODATA)
 
         # total potential production
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 param_val_dict['prdx_1_{}'.format(pft_i)],
                 temp_val_dict['shwave'],
@@ -3439,7 +6925,7 @@ def _calc_favail_P(sv_reg, param_val_dict):
                 interim[valid_mask], favail_5[valid_mask]))
         return favail_P
 
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             sv_reg['minerl_1_1_path'],
             param_val_dict['favail_4'],
@@ -3614,11 +7100,11 @@ def _calc_available_nutrient(
         target_path = os.path.join(temp_dir, '{}.tif'.format(val))
         param_val_dict[val] = target_path
         fill_val = pft_param_dict[val]
-        pygeoprocessing.new_raster_from_base(
+        _new_raster_from_base(
             site_index_path, target_path, gdal.GDT_Float32,
             [_IC_NODATA], fill_value_list=[fill_val])
 
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             param_val_dict['rictrl'],
             sv_reg['bglivc_{}_path'.format(pft_i)],
@@ -3631,7 +7117,7 @@ def _calc_available_nutrient(
     if iel == 1:
         eavail_prior_path = os.path.join(temp_dir, 'eavail_prior.tif')
         shutil.copyfile(eavail_path, eavail_prior_path)
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 eavail_prior_path,
                 param_val_dict['snfxmx_1'],
@@ -3717,7 +7203,7 @@ def _calc_nutrient_demand(
             demand_above[valid_mask] + demand_below[valid_mask])
         return demand_e
 
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             biomass_production_path, fraction_allocated_to_roots_path,
             cercrp_min_above_path, cercrp_min_below_path]],
@@ -3910,28 +7396,28 @@ def calc_ce_ratios(
             (prb_2[valid_mask] * annual_precip[valid_mask]))
         return cercrp_below
 
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             pramn_1_path, pramn_2_path, aglivc_path, biomax_path]],
         calc_above_ratio,
         month_reg['cercrp_min_above_{}_{}'.format(iel, pft_i)],
         gdal.GDT_Float32, _TARGET_NODATA)
 
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             pramx_1_path, pramx_2_path, aglivc_path, biomax_path]],
         calc_above_ratio,
         month_reg['cercrp_max_above_{}_{}'.format(iel, pft_i)],
         gdal.GDT_Float32, _TARGET_NODATA)
 
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             prbmn_1_path, prbmn_2_path, annual_precip_path]],
         calc_below_ratio,
         month_reg['cercrp_min_below_{}_{}'.format(iel, pft_i)],
         gdal.GDT_Float32, _TARGET_NODATA)
 
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             prbmx_1_path, prbmx_2_path, annual_precip_path]],
         calc_below_ratio,
@@ -4126,17 +7612,17 @@ def calc_revised_fracrc(
         temp_val_dict[val] = os.path.join(
             temp_dir, '{}.tif'.format(val))
 
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [totale_1_path, demand_1_path]],
         calc_a2drat, temp_val_dict['a2drat_1'], gdal.GDT_Float32,
         _TARGET_NODATA)
 
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [totale_2_path, demand_2_path]],
         calc_a2drat, temp_val_dict['a2drat_2'], gdal.GDT_Float32,
         _TARGET_NODATA)
 
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             h2ogef_1_path, cfrtcw_1_path, cfrtcw_2_path,
             temp_val_dict['a2drat_1'], temp_val_dict['a2drat_2'],
@@ -4144,7 +7630,7 @@ def calc_revised_fracrc(
         calc_perennial_fracrc, temp_val_dict['fracrc_perennial'],
         gdal.GDT_Float32, _TARGET_NODATA)
 
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             frtcindx_path, fracrc_p_path,
             temp_val_dict['fracrc_perennial']]],
@@ -4353,20 +7839,20 @@ def calc_final_tgprod_rtsh(
     agprod_path = os.path.join(temp_dir, 'agprod.tif')
 
     # grazing effect on aboveground production
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             tgprod_pot_prod_path, fracrc_path, flgrem_path,
             grzeff_path]],
         grazing_effect_on_aboveground_production,
         agprod_path, gdal.GDT_Float32, _TARGET_NODATA)
     # grazing effect on final root:shoot ratio
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             fracrc_path, flgrem_path, grzeff_path, gremb_path]],
         grazing_effect_on_root_shoot, rtsh_path,
         gdal.GDT_Float32, _TARGET_NODATA)
     # final total potential production
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [rtsh_path, agprod_path]],
         calc_tgprod_final, tgprod_path,
         gdal.GDT_Float32, _TARGET_NODATA)
@@ -4462,7 +7948,7 @@ def _root_shoot_ratio(
                 temp_dir, '{}_{}.tif'.format(val, pft_i))
             param_val_dict['{}_{}'.format(val, pft_i)] = target_path
             fill_val = veg_trait_table[pft_i][val]
-            pygeoprocessing.new_raster_from_base(
+            _new_raster_from_base(
                 aligned_inputs['site_index'], target_path, gdal.GDT_Float32,
                 [_IC_NODATA], fill_value_list=[fill_val])
         for val in [
@@ -4475,7 +7961,7 @@ def _root_shoot_ratio(
             param_val_dict[
                 '{}_{}'.format(val, pft_i)] = target_path
             fill_val = veg_trait_table[pft_i][val]
-            pygeoprocessing.new_raster_from_base(
+            _new_raster_from_base(
                 aligned_inputs['site_index'], target_path,
                 gdal.GDT_Float32, [_IC_NODATA], fill_value_list=[fill_val])
 
@@ -4485,7 +7971,7 @@ def _root_shoot_ratio(
     _calc_favail_P(prev_sv_reg, param_val_dict)
     for pft_i in do_PFT:
         # fracrc_p, provisional fraction of C allocated to roots
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 year_reg['annual_precip_path'],
                 param_val_dict['frtcindx_{}'.format(pft_i)],
@@ -4566,7 +8052,7 @@ def _snow(
         site_index_path, site_param_table, precip_path, tave_path,
         max_temp_path, min_temp_path, prev_snow_path, prev_snlq_path,
         current_month, snowmelt_path, snow_path, snlq_path,
-        inputs_after_snow_path, pet_rem_path):
+        inputs_after_snow_path, pet_rem_path, latitude_input_path=None):
     """Account for precipitation as snow and snowmelt from snowpack.
 
     Determine whether precipitation falls as snow. Track the fate of
@@ -4597,6 +8083,9 @@ def _snow(
             to the system after accounting for snow
         pet_rem_path (string): path to raster containing potential
             evapotranspiration remaining after any evaporation of snow
+        latitude_input_path (string): optional, path to a raster giving the
+            latitude of each pixel, used instead of latitude calculated from
+            the pixel coordinates of `precip_path`
 
     Side effects:
         creates the raster indicated by `snowmelt_path`
@@ -4756,7 +8245,9 @@ def _snow(
         precip_path)['nodata'][0]
 
     # solar radiation outside the atmosphere
-    _shortwave_radiation(precip_path, current_month, temp_val_dict['shwave'])
+    _shortwave_radiation(
+        precip_path, current_month, temp_val_dict['shwave'],
+        latitude_input_path=latitude_input_path)
 
     # pet, reference evapotranspiration modified by fwloss parameter
     _reference_evapotranspiration(
@@ -4764,7 +8255,7 @@ def _snow(
         param_val_dict['fwloss_4'], temp_val_dict['pet'])
 
     # calculate snowmelt
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             tave_path, precip_path, prev_snow_path,
             prev_snlq_path, temp_val_dict['pet'],
@@ -4774,7 +8265,7 @@ def _snow(
         gdal.GDT_Float32, _TARGET_NODATA)
 
     # calculate change in snow
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             tave_path, precip_path, prev_snow_path,
             prev_snlq_path, temp_val_dict['pet'],
@@ -4784,7 +8275,7 @@ def _snow(
         gdal.GDT_Float32, _TARGET_NODATA)
 
     # calculate change in liquid in snow
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             tave_path, precip_path, prev_snow_path,
             prev_snlq_path, temp_val_dict['pet'],
@@ -4794,7 +8285,7 @@ def _snow(
         gdal.GDT_Float32, _TARGET_NODATA)
 
     # calculate change in potential evapotranspiration energy
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             tave_path, precip_path, prev_snow_path,
             prev_snlq_path, temp_val_dict['pet'],
@@ -4804,7 +8295,7 @@ def _snow(
         gdal.GDT_Float32, _TARGET_NODATA)
 
     # calculate soil moisture inputs draining from snow after snowmelt
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             tave_path, precip_path, prev_snow_path,
             prev_snlq_path, temp_val_dict['pet'],
@@ -5497,7 +8988,7 @@ def _soil_water(
 
     # calculate canopy and litter cover that influence moisture inputs
     # calculate biomass in surface litter
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             prev_sv_reg['strucc_1_path'], prev_sv_reg['metabc_1_path']]],
         calc_surface_litter_biomass, temp_val_dict['alit'],
@@ -5530,26 +9021,26 @@ def _soil_water(
             weighted_path_list, _TARGET_NODATA,
             temp_val_dict['sum_tgprod'], _TARGET_NODATA, nodata_remove=True)
     else:  # no potential production occurs this month, so tgprod = 0
-        pygeoprocessing.new_raster_from_base(
+        _new_raster_from_base(
             temp_val_dict['sum_aglivc'], temp_val_dict['sum_tgprod'],
             gdal.GDT_Float32, [_TARGET_NODATA], fill_value_list=[0.])
 
     # calculate average temperature
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             aligned_inputs['max_temp_{}'.format(current_month)],
             aligned_inputs['min_temp_{}'.format(current_month)]]],
         calc_avg_temp, temp_val_dict['tave'], gdal.GDT_Float32, _IC_NODATA)
 
     # calculate aboveground live biomass
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             temp_val_dict['sum_aglivc'], temp_val_dict['sum_tgprod']]],
         _calc_aboveground_live_biomass, temp_val_dict['aliv'],
         gdal.GDT_Float32, _TARGET_NODATA)
 
     # calculate total standing biomass
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             temp_val_dict['aliv'], temp_val_dict['sum_stdedc']]],
         _calc_standing_biomass, temp_val_dict['sd'],
@@ -5565,13 +9056,14 @@ def _soil_water(
         prev_sv_reg['snow_path'], prev_sv_reg['snlq_path'],
         current_month, month_reg['snowmelt'], sv_reg['snow_path'],
         sv_reg['snlq_path'], temp_val_dict['modified_moisture_inputs'],
-        temp_val_dict['pet_rem'])
+        temp_val_dict['pet_rem'],
+        latitude_input_path=aligned_inputs.get('latitude'))
 
     # remove runoff and surface evaporation from moisture inputs
     shutil.copyfile(
         temp_val_dict['modified_moisture_inputs'],
         temp_val_dict['current_moisture_inputs'])
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             temp_val_dict['current_moisture_inputs'],
             param_val_dict['fracro'], param_val_dict['precro'],
@@ -5583,7 +9075,7 @@ def _soil_water(
         gdal.GDT_Float32, _TARGET_NODATA)
 
     # calculate bare soil evaporation
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             temp_val_dict['current_moisture_inputs'],
             param_val_dict['fracro'], param_val_dict['precro'],
@@ -5595,7 +9087,7 @@ def _soil_water(
         gdal.GDT_Float32, _TARGET_NODATA)
 
     # calculate total losses to surface evaporation
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             temp_val_dict['current_moisture_inputs'],
             param_val_dict['fracro'], param_val_dict['precro'],
@@ -5610,7 +9102,7 @@ def _soil_water(
     shutil.copyfile(
         temp_val_dict['modified_moisture_inputs'],
         temp_val_dict['current_moisture_inputs'])
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             temp_val_dict['pet_rem'], temp_val_dict['evap_losses'],
             temp_val_dict['tave'], temp_val_dict['aliv'],
@@ -5620,7 +9112,7 @@ def _soil_water(
         gdal.GDT_Float32, _TARGET_NODATA)
 
     # calculate potential transpiration
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             temp_val_dict['pet_rem'], temp_val_dict['evap_losses'],
             temp_val_dict['tave'], temp_val_dict['aliv'],
@@ -5629,7 +9121,7 @@ def _soil_water(
         gdal.GDT_Float32, _TARGET_NODATA)
 
     # calculate potential evaporation from top soil layer
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             temp_val_dict['pet_rem'], temp_val_dict['evap_losses'],
             temp_val_dict['tave'], temp_val_dict['aliv'],
@@ -5643,7 +9135,7 @@ def _soil_water(
             temp_val_dict['modified_moisture_inputs'],
             temp_val_dict['current_moisture_inputs'])
         # revise moisture content of this soil layer
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 param_val_dict['adep_{}'.format(lyr)],
                 pp_reg['afiel_{}_path'.format(lyr)],
@@ -5653,7 +9145,7 @@ def _soil_water(
             temp_val_dict['asmos_interim_{}'.format(lyr)],
             gdal.GDT_Float32, _TARGET_NODATA)
         # calculate soil moisture moving to next layer
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 param_val_dict['adep_{}'.format(lyr)],
                 pp_reg['afiel_{}_path'.format(lyr)],
@@ -5670,7 +9162,7 @@ def _soil_water(
     # calculate available water for transpiration
     avw_list = []
     for lyr in range(1, nlaypg_max + 1):
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 temp_val_dict['asmos_interim_{}'.format(lyr)],
                 pp_reg['awilt_{}_path'.format(lyr)],
@@ -5697,14 +9189,14 @@ def _soil_water(
         awwt_list, _TARGET_NODATA, temp_val_dict['tot2'], _TARGET_NODATA)
 
     # revise total potential transpiration
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [temp_val_dict['trap'], temp_val_dict['tot']]],
         revise_potential_transpiration, temp_val_dict['trap_revised'],
         gdal.GDT_Float32, _TARGET_NODATA)
 
     # remove water via transpiration
     for lyr in range(1, nlaypg_max + 1):
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 temp_val_dict['asmos_interim_{}'.format(lyr)],
                 pp_reg['awilt_{}_path'.format(lyr)],
@@ -5714,7 +9206,7 @@ def _soil_water(
             remove_transpiration('avinj'),
             temp_val_dict['avinj_{}'.format(lyr)], gdal.GDT_Float32,
             _TARGET_NODATA)
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 temp_val_dict['asmos_interim_{}'.format(lyr)],
                 pp_reg['awilt_{}_path'.format(lyr)],
@@ -5730,7 +9222,7 @@ def _soil_water(
             sv_reg['asmos_{}_path'.format(lyr)])
 
     # relative water content of soil layer 1
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             sv_reg['asmos_1_path'], param_val_dict['adep_1'],
             pp_reg['awilt_1_path'], pp_reg['afiel_1_path']]],
@@ -5738,7 +9230,7 @@ def _soil_water(
         gdal.GDT_Float32, _TARGET_NODATA)
 
     # evaporation from soil layer 1
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             temp_val_dict['rwcf_1'], temp_val_dict['pevp'],
             temp_val_dict['absevap'], sv_reg['asmos_1_path'],
@@ -6662,7 +10154,7 @@ def respiration(
             prefix='d_statv_temp', dir=PROCESSING_DIR) as d_statv_temp_file:
         d_statv_temp_path = d_statv_temp_file.name
 
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             tcflow_path, frac_co2_path, estatv_path,
             cstatv_path]],
@@ -6680,7 +10172,7 @@ def respiration(
         delta_minerl_1_iel_path, _IC_NODATA)
     if gromin_1_path:
         shutil.copyfile(gromin_1_path, d_statv_temp_path)
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 d_statv_temp_path,
                 operand_temp_path]],
@@ -6739,7 +10231,7 @@ def nutrient_flow(
             prefix='d_statv_temp', dir=PROCESSING_DIR) as d_statv_temp_file:
         d_statv_temp_path = d_statv_temp_file.name
 
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             cflow_path, cstatv_donating_path, rcetob_path,
             estatv_donating_path, minerl_1_path]],
@@ -6750,7 +10242,7 @@ def nutrient_flow(
         d_statv_temp_path, _IC_NODATA, operand_temp_path, _IC_NODATA,
         d_estatv_donating_path, _IC_NODATA)
 
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             cflow_path, cstatv_donating_path, rcetob_path,
             estatv_donating_path, minerl_1_path]],
@@ -6761,7 +10253,7 @@ def nutrient_flow(
         d_statv_temp_path, _IC_NODATA, operand_temp_path, _IC_NODATA,
         d_estatv_receiving_path, _IC_NODATA)
 
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             cflow_path, cstatv_donating_path, rcetob_path,
             estatv_donating_path, minerl_1_path]],
@@ -6773,7 +10265,7 @@ def nutrient_flow(
         d_minerl_path, _IC_NODATA)
     if gromin_path:
         shutil.copyfile(gromin_path, d_statv_temp_path)
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 d_statv_temp_path, operand_temp_path]],
             update_gross_mineralization, gromin_path,
@@ -6887,13 +10379,13 @@ def remove_leached_iel(
         d_statv_temp_path = d_statv_temp_file.name
 
     if iel == 1:
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 som1c_2_path, som1e_2_iel_path, cleach_path]],
             calc_leached_N, operand_temp_path,
             gdal.GDT_Float32, _TARGET_NODATA)
     else:
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 som1c_2_path, som1e_2_iel_path, cleach_path]],
             calc_leached_P, operand_temp_path,
@@ -7042,12 +10534,12 @@ def update_aminrl(
         aminrl_prev_path = aminrl_prev_file.name
 
     shutil.copyfile(aminrl_1_path, aminrl_prev_path)
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [aminrl_prev_path, minerl_1_1_path]],
         update_aminrl_1, aminrl_1_path, gdal.GDT_Float32, _SV_NODATA)
 
     shutil.copyfile(aminrl_2_path, aminrl_prev_path)
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             aminrl_prev_path, minerl_1_2_path, fsol_path]],
         update_aminrl_2, aminrl_2_path, gdal.GDT_Float32, _SV_NODATA)
@@ -7461,7 +10953,8 @@ def _decomposition(
 
     # shwave, shortwave radiation outside the atmosphere
     _shortwave_radiation(
-        aligned_inputs['site_index'], current_month, temp_val_dict['shwave'])
+        aligned_inputs['site_index'], current_month, temp_val_dict['shwave'],
+        latitude_input_path=aligned_inputs.get('latitude'))
 
     # pet, reference evapotranspiration modified by fwloss parameter
     _reference_evapotranspiration(
@@ -7471,7 +10964,7 @@ def _decomposition(
         temp_val_dict['pevap'])
 
     # rprpet, ratio of precipitation to reference evapotranspiration
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             temp_val_dict['pevap'], month_reg['snowmelt'],
             sv_reg['avh2o_3_path'],
@@ -7480,7 +10973,7 @@ def _decomposition(
         _TARGET_NODATA)
 
     # bgwfunc, effect of soil moisture on decomposition
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(temp_val_dict['rprpet'], 1)],
         calc_bgwfunc, month_reg['bgwfunc'], gdal.GDT_Float32,
         _TARGET_NODATA)
@@ -7488,14 +10981,15 @@ def _decomposition(
     # estimated daylength
     _calc_daylength(
         aligned_inputs['site_index'], current_month,
-        temp_val_dict['daylength'])
+        temp_val_dict['daylength'],
+        latitude_input_path=aligned_inputs.get('latitude'))
 
     # total biomass for purposes of soil shading
     for sv in ['aglivc', 'stdedc']:
         weighted_sum_path = temp_val_dict['sum_{}'.format(sv)]
         weighted_state_variable_sum(
             sv, prev_sv_reg, aligned_inputs, pft_id_set, weighted_sum_path)
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             temp_val_dict['sum_aglivc'], temp_val_dict['sum_stdedc'],
             prev_sv_reg['strucc_1_path'], prev_sv_reg['metabc_1_path'],
@@ -7504,7 +10998,7 @@ def _decomposition(
         _TARGET_NODATA)
 
     # stemp, soil surface temperature for the purposes of decomposition
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             temp_val_dict['biomass'], sv_reg['snow_path'],
             aligned_inputs['max_temp_{}'.format(current_month)],
@@ -7515,7 +11009,7 @@ def _decomposition(
         _TARGET_NODATA)
 
     # defac, decomposition factor calculated from soil temp and moisture
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             month_reg['bgwfunc'], temp_val_dict['stemp'],
             param_val_dict['teff_1'], param_val_dict['teff_2'],
@@ -7524,7 +11018,7 @@ def _decomposition(
         _TARGET_NODATA)
 
     # anerb, impact of soil anaerobic conditions on decomposition
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             temp_val_dict['rprpet'], temp_val_dict['pevap'],
             param_val_dict['drain'], param_val_dict['aneref_1'],
@@ -7533,25 +11027,25 @@ def _decomposition(
         _TARGET_NODATA)
 
     # initialize gromin_1, gross mineralization of N
-    pygeoprocessing.new_raster_from_base(
+    _new_raster_from_base(
         aligned_inputs['site_index'], temp_val_dict['gromin_1'],
         gdal.GDT_Float32, [_TARGET_NODATA], fill_value_list=[0])
 
     # pH effect on decomposition for structural material
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(aligned_inputs['ph_path'], 1)],
         calc_pheff_struc, temp_val_dict['pheff_struc'], gdal.GDT_Float32,
         _TARGET_NODATA)
 
     # pH effect on decomposition for metabolic material
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(aligned_inputs['ph_path'], 1)],
         calc_pheff_metab, temp_val_dict['pheff_metab'], gdal.GDT_Float32,
         _TARGET_NODATA)
 
     # initialize aminrl_1 and aminrl_2
     shutil.copyfile(prev_sv_reg['minerl_1_1_path'], temp_val_dict['aminrl_1'])
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             prev_sv_reg['minerl_1_2_path'], param_val_dict['sorpmx'],
             param_val_dict['pslsrb']]],
@@ -7626,12 +11120,12 @@ def _decomposition(
     for dtm in range(4):
         # initialize change (delta, d) in state variables for this decomp step
         for state_var in delta_sv_dict.keys():
-            pygeoprocessing.new_raster_from_base(
+            _new_raster_from_base(
                 aligned_inputs['site_index'], delta_sv_dict[state_var],
                 gdal.GDT_Float32, [_IC_NODATA], fill_value_list=[0])
         if dtm == 0:
             # schedule flow of N from atmospheric fixation to surface mineral
-            pygeoprocessing.raster_calculator(
+            _raster_calculator(
                 [(path, 1) for path in [
                     aligned_inputs['precip_{}'.format(month_index)],
                     year_reg['annual_precip_path'], year_reg['baseNdep_path'],
@@ -7642,7 +11136,7 @@ def _decomposition(
         # decomposition of structural material in surface and soil
         for lyr in [1, 2]:
             if lyr == 1:
-                pygeoprocessing.raster_calculator(
+                _raster_calculator(
                     [(path, 1) for path in [
                         temp_val_dict['aminrl_1'], temp_val_dict['aminrl_2'],
                         sv_reg['strucc_1_path'], sv_reg['struce_1_1_path'],
@@ -7654,7 +11148,7 @@ def _decomposition(
                     calc_tcflow_strucc_1, temp_val_dict['tcflow'],
                     gdal.GDT_Float32, _IC_NODATA)
             else:
-                pygeoprocessing.raster_calculator(
+                _raster_calculator(
                     [(path, 1) for path in [
                         temp_val_dict['aminrl_1'], temp_val_dict['aminrl_2'],
                         sv_reg['strucc_2_path'], sv_reg['struce_2_1_path'],
@@ -7694,7 +11188,7 @@ def _decomposition(
                 delta_sv_dict['struce_{}_2'.format(lyr)],
                 delta_sv_dict['minerl_1_2'])
 
-            pygeoprocessing.raster_calculator(
+            _raster_calculator(
                 [(path, 1) for path in [
                     temp_val_dict['tosom2'], param_val_dict['rsplig']]],
                 calc_net_cflow, temp_val_dict['net_tosom2'], gdal.GDT_Float32,
@@ -7753,7 +11247,7 @@ def _decomposition(
                 delta_sv_dict['struce_{}_2'.format(lyr)],
                 delta_sv_dict['minerl_1_2'])
 
-            pygeoprocessing.raster_calculator(
+            _raster_calculator(
                 [(path, 1) for path in [
                     temp_val_dict['tosom1'],
                     param_val_dict['ps1co2_{}'.format(lyr)]]],
@@ -7797,7 +11291,7 @@ def _decomposition(
             if lyr == 1:
                 for iel in [1, 2]:
                     # required ratio for surface metabolic decomposing to SOM1
-                    pygeoprocessing.raster_calculator(
+                    _raster_calculator(
                         [(path, 1) for path in [
                             sv_reg['metabe_1_{}_path'.format(iel)],
                             sv_reg['metabc_1_path'],
@@ -7807,7 +11301,7 @@ def _decomposition(
                         _aboveground_ratio,
                         temp_val_dict['rceto1_{}'.format(iel)],
                         gdal.GDT_Float32, _TARGET_NODATA)
-                pygeoprocessing.raster_calculator(
+                _raster_calculator(
                     [(path, 1) for path in [
                         temp_val_dict['aminrl_1'], temp_val_dict['aminrl_2'],
                         sv_reg['metabc_1_path'], sv_reg['metabe_1_1_path'],
@@ -7820,7 +11314,7 @@ def _decomposition(
             else:
                 for iel in [1, 2]:
                     # required ratio for soil metabolic decomposing to SOM1
-                    pygeoprocessing.raster_calculator(
+                    _raster_calculator(
                         [(path, 1) for path in [
                             temp_val_dict['aminrl_{}'.format(iel)],
                             param_val_dict['varat1_1_{}'.format(iel)],
@@ -7829,7 +11323,7 @@ def _decomposition(
                         _belowground_ratio,
                         temp_val_dict['rceto1_{}'.format(iel)],
                         gdal.GDT_Float32, _TARGET_NODATA)
-                pygeoprocessing.raster_calculator(
+                _raster_calculator(
                     [(path, 1) for path in [
                         temp_val_dict['aminrl_1'], temp_val_dict['aminrl_2'],
                         sv_reg['metabc_2_path'], sv_reg['metabe_2_1_path'],
@@ -7863,7 +11357,7 @@ def _decomposition(
                 delta_sv_dict['metabe_{}_2'.format(lyr)],
                 delta_sv_dict['minerl_1_2'])
 
-            pygeoprocessing.raster_calculator(
+            _raster_calculator(
                 [(path, 1) for path in [
                     temp_val_dict['tcflow'],
                     param_val_dict['pmco2_{}'.format(lyr)]]],
@@ -7897,7 +11391,7 @@ def _decomposition(
 
         # decomposition of surface SOM1 to surface SOM2: line 63 Somdec.f
         for iel in [1, 2]:
-            pygeoprocessing.raster_calculator(
+            _raster_calculator(
                 [(path, 1) for path in [
                     sv_reg['som1c_1_path'],
                     sv_reg['som1e_1_{}_path'.format(iel)],
@@ -7908,7 +11402,7 @@ def _decomposition(
                 calc_surface_som2_ratio,
                 temp_val_dict['rceto2_{}'.format(iel)],
                 gdal.GDT_Float32, _TARGET_NODATA)
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 temp_val_dict['aminrl_1'], temp_val_dict['aminrl_2'],
                 sv_reg['som1c_1_path'], sv_reg['som1e_1_1_path'],
@@ -7935,7 +11429,7 @@ def _decomposition(
             sv_reg['som1c_1_path'], sv_reg['som1e_1_2_path'],
             delta_sv_dict['som1e_1_2'], delta_sv_dict['minerl_1_2'])
 
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 temp_val_dict['tcflow'], param_val_dict['p1co2a_1']]],
             calc_net_cflow, temp_val_dict['net_tosom2'], gdal.GDT_Float32,
@@ -7963,7 +11457,7 @@ def _decomposition(
         # soil SOM1 decomposes to soil SOM3 and SOM2, line 137 Somdec.f
         for iel in [1, 2]:
             # required ratio for soil SOM1 decomposing to SOM2
-            pygeoprocessing.raster_calculator(
+            _raster_calculator(
                 [(path, 1) for path in [
                     temp_val_dict['aminrl_{}'.format(iel)],
                     param_val_dict['varat22_1_{}'.format(iel)],
@@ -7972,7 +11466,7 @@ def _decomposition(
                 _belowground_ratio,
                 temp_val_dict['rceto2_{}'.format(iel)],
                 gdal.GDT_Float32, _TARGET_NODATA)
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 temp_val_dict['aminrl_1'], temp_val_dict['aminrl_2'],
                 sv_reg['som1c_2_path'], sv_reg['som1e_2_1_path'],
@@ -7999,7 +11493,7 @@ def _decomposition(
             sv_reg['som1c_2_path'], sv_reg['som1e_2_2_path'],
             delta_sv_dict['som1e_2_2'], delta_sv_dict['minerl_1_2'])
 
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 temp_val_dict['tcflow'], pp_reg['fps1s3_path'],
                 param_val_dict['animpt'], temp_val_dict['anerb']]],
@@ -8012,7 +11506,7 @@ def _decomposition(
             delta_sv_dict['som3c'], _IC_NODATA)
         for iel in [1, 2]:
             # required ratio for soil SOM1 decomposing to SOM3, line 198
-            pygeoprocessing.raster_calculator(
+            _raster_calculator(
                 [(path, 1) for path in [
                     temp_val_dict['aminrl_{}'.format(iel)],
                     param_val_dict['varat3_1_{}'.format(iel)],
@@ -8034,7 +11528,7 @@ def _decomposition(
             delta_sv_dict['som3e_2'], delta_sv_dict['minerl_1_2'])
 
         # organic leaching: line 204 Somdec.f
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 month_reg['amov_2'], temp_val_dict['tcflow'],
                 param_val_dict['omlech_3'], pp_reg['orglch_path']]],
@@ -8047,7 +11541,7 @@ def _decomposition(
                 delta_sv_dict['som1e_2_{}'.format(iel)], iel)
 
         # rest of flow from soil SOM1 goes to SOM2
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 temp_val_dict['tcflow'], pp_reg['p1co2_2_path'],
                 temp_val_dict['tosom3'], temp_val_dict['cleach']]],
@@ -8075,7 +11569,7 @@ def _decomposition(
             delta_sv_dict['minerl_1_2'])
 
         # soil SOM2 decomposing to soil SOM1 and SOM3, line 269
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 temp_val_dict['aminrl_1'], temp_val_dict['aminrl_2'],
                 sv_reg['som2c_2_path'], sv_reg['som2e_2_1_path'],
@@ -8102,7 +11596,7 @@ def _decomposition(
             delta_sv_dict['som2e_2_2'], delta_sv_dict['minerl_1_2'])
 
         # soil SOM2 flows first to SOM3
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 temp_val_dict['tcflow'], pp_reg['fps2s3_path'],
                 param_val_dict['animpt'], temp_val_dict['anerb']]],
@@ -8126,7 +11620,7 @@ def _decomposition(
             delta_sv_dict['som3e_2'], delta_sv_dict['minerl_1_2'])
 
         # rest of flow from soil SOM2 goes to soil SOM1
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 temp_val_dict['tcflow'], param_val_dict['p2co2_2'],
                 temp_val_dict['tosom3']]],
@@ -8151,7 +11645,7 @@ def _decomposition(
             delta_sv_dict['som1e_2_2'], delta_sv_dict['minerl_1_2'])
 
         # surface SOM2 decomposes to surface SOM1
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 temp_val_dict['aminrl_1'], temp_val_dict['aminrl_2'],
                 sv_reg['som2c_1_path'], sv_reg['som2e_1_1_path'],
@@ -8176,7 +11670,7 @@ def _decomposition(
             sv_reg['som2c_1_path'], sv_reg['som2e_1_2_path'],
             delta_sv_dict['som2e_1_2'], delta_sv_dict['minerl_1_2'])
 
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 temp_val_dict['tcflow'], param_val_dict['p2co2_1']]],
             calc_net_cflow, temp_val_dict['tosom1'], gdal.GDT_Float32,
@@ -8201,11 +11695,11 @@ def _decomposition(
 
         # SOM3 decomposing to soil SOM1
         # pH effect on decomposition of SOM3
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(aligned_inputs['ph_path'], 1)],
             calc_pheff_som3, temp_val_dict['pheff_som3'], gdal.GDT_Float32,
             _TARGET_NODATA)
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 temp_val_dict['aminrl_1'], temp_val_dict['aminrl_2'],
                 sv_reg['som3c_path'], sv_reg['som3e_1_path'],
@@ -8230,7 +11724,7 @@ def _decomposition(
             temp_val_dict['tcflow'], param_val_dict['p3co2'],
             sv_reg['som3c_path'], sv_reg['som3e_2_path'],
             delta_sv_dict['som3e_2'], delta_sv_dict['minerl_1_2'])
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 temp_val_dict['tcflow'], param_val_dict['p3co2']]],
             calc_net_cflow, temp_val_dict['tosom1'], gdal.GDT_Float32,
@@ -8255,7 +11749,7 @@ def _decomposition(
             delta_sv_dict['som1e_2_2'], delta_sv_dict['minerl_1_2'])
 
         # Surface SOM2 flows to soil SOM2 via mixing
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 sv_reg['som2c_1_path'], param_val_dict['cmix'],
                 temp_val_dict['defac']]],
@@ -8295,7 +11789,7 @@ def _decomposition(
             delta_sv_dict['som2e_2_2'], delta_sv_dict['minerl_1_2'])
 
         # P flow from parent to mineral: Pschem.f
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 sv_reg['parent_2_path'], param_val_dict['pparmn_2'],
                 temp_val_dict['defac']]],
@@ -8315,7 +11809,7 @@ def _decomposition(
             delta_sv_dict['minerl_1_2'], _IC_NODATA)
 
         # P flow from secondary to mineral
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 sv_reg['secndy_2_path'], param_val_dict['psecmn_2'],
                 temp_val_dict['defac']]],
@@ -8336,7 +11830,7 @@ def _decomposition(
 
         # P flow from mineral to secondary
         for lyr in range(1, nlayer_max + 1):
-            pygeoprocessing.raster_calculator(
+            _raster_calculator(
                 [(path, 1) for path in [
                     sv_reg['minerl_{}_2_path'.format(lyr)],
                     param_val_dict['pmnsec_2'], temp_val_dict['fsol'],
@@ -8358,7 +11852,7 @@ def _decomposition(
                 delta_sv_dict['secndy_2'], _IC_NODATA)
 
         # P flow from secondary to occluded
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 sv_reg['secndy_2_path'], param_val_dict['psecoc1'],
                 temp_val_dict['defac']]],
@@ -8378,7 +11872,7 @@ def _decomposition(
             delta_sv_dict['occlud'], _IC_NODATA)
 
         # P flow from occluded to secondary
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 sv_reg['occlud_path'], param_val_dict['psecoc2'],
                 temp_val_dict['defac']]],
@@ -8454,7 +11948,7 @@ def _decomposition(
                 sv_reg['{}_path'.format(state_var)], _SV_NODATA)
 
         # update aminrl: Simsom.f line 301
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 sv_reg['minerl_1_2_path'], param_val_dict['sorpmx'],
                 param_val_dict['pslsrb']]],
@@ -8482,7 +11976,8 @@ def _decomposition(
 
 def partit(
         cpart_path, epart_1_path, epart_2_path, frlign_path,
-        site_index_path, site_param_table, lyr, sv_reg):
+        site_index_path, site_param_table, lyr, sv_reg,
+        animal_index_path=None, animal_param_lookup=None):
     """Partition incoming material into structural and metabolic pools.
 
     When organic material is added to the soil, for example as dead
@@ -8500,7 +11995,8 @@ def partit(
         epart_2_path (string): path to raster containing P in incoming
             material
         frlign_path (string): path to raster containing fraction of incoming
-            material that is lignin
+            material that is lignin, or None if the fraction of lignin is
+            given by the animal parameter 'feclig'
         site_index_path (string): path to site spatial index raster
         site_param_table (dict): map of site spatial index to dictionaries
             that contain site-level parameters
@@ -8508,6 +12004,11 @@ def partit(
             1=surface layer, 2=soil layer)
         sv_reg (dict): map of key, path pairs giving paths to current state
             variables
+        animal_index_path (string): path to animal spatial index raster.
+            Required if `frlign_path` is None
+        animal_param_lookup (dict): in-memory table of animal parameters,
+            including 'feclig', as returned by `build_animal_param_lookup`.
+            Required if `frlign_path` is None
 
     Side effects:
         modifies the rasters indicated by the following paths:
@@ -8770,13 +12271,31 @@ def partit(
             (site_index_path, 1), site_to_val, target_path,
             gdal.GDT_Float32, _IC_NODATA)
 
+    def frlign_raster_calculator(local_op, path_list, target_path, nodata):
+        """Call `_raster_calculator` where None in `path_list` is frlign."""
+        if frlign_path is not None:
+            _raster_calculator(
+                [(frlign_path if path is None else path, 1) for path in
+                    path_list],
+                local_op, target_path, gdal.GDT_Float32, nodata)
+        else:
+            _raster_calculator(
+                [(path, 1) for path in [animal_index_path] + [
+                    path for path in path_list if path is not None]],
+                animal_param_op(
+                    local_op, [
+                        'feclig' if path is None else None for path in
+                        path_list],
+                    animal_param_lookup),
+                target_path, gdal.GDT_Float32, nodata)
+
     # direct absorption of N and P from surface mineral layer
     for iel in [1, 2]:
         if iel == 1:
             epart_path = epart_1_path
         else:
             epart_path = epart_2_path
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 cpart_path, epart_path,
                 sv_reg['minerl_1_{}_path'.format(iel)],
@@ -8796,14 +12315,12 @@ def partit(
             sv_reg['minerl_1_{}_path'.format(iel)], _SV_NODATA)
 
     # partition C into structural and metabolic
-    pygeoprocessing.raster_calculator(
-        [(path, 1) for path in [
-            cpart_path, epart_1_path, temp_val_dict['dirabs_1'],
-            frlign_path, param_val_dict['spl_1'],
-            param_val_dict['spl_2']]],
-        calc_d_metabc_lyr, temp_val_dict['d_metabc_lyr'], gdal.GDT_Float32,
-        _TARGET_NODATA)
-    pygeoprocessing.raster_calculator(
+    frlign_raster_calculator(
+        calc_d_metabc_lyr, [
+            cpart_path, epart_1_path, temp_val_dict['dirabs_1'], None,
+            param_val_dict['spl_1'], param_val_dict['spl_2']],
+        temp_val_dict['d_metabc_lyr'], _TARGET_NODATA)
+    _raster_calculator(
         [(path, 1) for path in [
             cpart_path, temp_val_dict['d_metabc_lyr']]],
         calc_d_strucc_lyr, temp_val_dict['d_strucc_lyr'], gdal.GDT_Float32,
@@ -8828,7 +12345,7 @@ def partit(
             epart_path = epart_1_path
         else:
             epart_path = epart_2_path
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 temp_val_dict['d_strucc_lyr'],
                 param_val_dict['rcestr_{}'.format(iel)]]],
@@ -8842,7 +12359,7 @@ def partit(
             temp_val_dict['d_struce_lyr_iel'], _TARGET_NODATA,
             sv_reg['struce_{}_{}_path'.format(lyr, iel)], _SV_NODATA)
 
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 cpart_path, epart_path,
                 temp_val_dict['dirabs_{}'.format(iel)],
@@ -8858,13 +12375,12 @@ def partit(
             sv_reg['metabe_{}_{}_path'.format(lyr, iel)], _SV_NODATA)
 
     # adjust fraction of lignin in receiving structural pool
-    pygeoprocessing.raster_calculator(
-        [(path, 1) for path in [
-            frlign_path, temp_val_dict['d_strucc_lyr'], cpart_path,
+    frlign_raster_calculator(
+        calc_d_strlig_lyr, [
+            None, temp_val_dict['d_strucc_lyr'], cpart_path,
             sv_reg['strlig_{}_path'.format(lyr)],
-            sv_reg['strucc_{}_path'.format(lyr)]]],
-        calc_d_strlig_lyr, temp_val_dict['operand_temp'], gdal.GDT_Float32,
-        _IC_NODATA)
+            sv_reg['strucc_{}_path'.format(lyr)]],
+        temp_val_dict['operand_temp'], _IC_NODATA)
     shutil.copyfile(
         sv_reg['strlig_{}_path'.format(lyr)],
         temp_val_dict['d_statv_temp'])
@@ -9077,16 +12593,16 @@ def _death_and_partition(
         param_val_dict[val] = target_path
 
     # sum of material across pfts to be partitioned to organic matter
-    pygeoprocessing.new_raster_from_base(
+    _new_raster_from_base(
         aligned_inputs['site_index'], temp_val_dict['sum_weighted_delta_C'],
         gdal.GDT_Float32, [_TARGET_NODATA], fill_value_list=[0])
-    pygeoprocessing.new_raster_from_base(
+    _new_raster_from_base(
         aligned_inputs['site_index'], temp_val_dict['sum_weighted_delta_N'],
         gdal.GDT_Float32, [_TARGET_NODATA], fill_value_list=[0])
-    pygeoprocessing.new_raster_from_base(
+    _new_raster_from_base(
         aligned_inputs['site_index'], temp_val_dict['sum_weighted_delta_P'],
         gdal.GDT_Float32, [_TARGET_NODATA], fill_value_list=[0])
-    pygeoprocessing.new_raster_from_base(
+    _new_raster_from_base(
         aligned_inputs['site_index'], temp_val_dict['sum_lignin'],
         gdal.GDT_Float32, [_TARGET_NODATA], fill_value_list=[0])
 
@@ -9095,7 +12611,7 @@ def _death_and_partition(
     min_temp_nodata = pygeoprocessing.get_raster_info(
         aligned_inputs['min_temp_{}'.format(current_month)])['nodata'][0]
 
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             aligned_inputs['max_temp_{}'.format(current_month)],
             aligned_inputs['min_temp_{}'.format(current_month)]]],
@@ -9108,10 +12624,10 @@ def _death_and_partition(
         # calculate change in C leaving the given state variable
         if state_variable == 'stded':
             fill_val = veg_trait_table[pft_i]['fallrt']
-            pygeoprocessing.new_raster_from_base(
+            _new_raster_from_base(
                 aligned_inputs['site_index'], param_val_dict['fallrt'],
                 gdal.GDT_Float32, [_IC_NODATA], fill_value_list=[fill_val])
-            pygeoprocessing.raster_calculator(
+            _raster_calculator(
                 [(path, 1) for path in [
                     prev_sv_reg['stdedc_{}_path'.format(pft_i)],
                     param_val_dict['fallrt']]],
@@ -9120,10 +12636,10 @@ def _death_and_partition(
         else:
             for val in ['rtdtmp', 'rdr']:
                 fill_val = veg_trait_table[pft_i][val]
-                pygeoprocessing.new_raster_from_base(
+                _new_raster_from_base(
                     aligned_inputs['site_index'], param_val_dict[val],
                     gdal.GDT_Float32, [_IC_NODATA], fill_value_list=[fill_val])
-            pygeoprocessing.raster_calculator(
+            _raster_calculator(
                 [(path, 1) for path in [
                     temp_val_dict['tave'],
                     param_val_dict['rtdtmp'],
@@ -9169,7 +12685,7 @@ def _death_and_partition(
 
         for iel in [1, 2]:
             # calculate N or P flowing out of the pft-level state variable
-            pygeoprocessing.raster_calculator(
+            _raster_calculator(
                 [(path, 1) for path in [
                     prev_sv_reg['{}c_{}_path'.format(state_variable, pft_i)],
                     prev_sv_reg['{}e_{}_{}_path'.format(
@@ -9322,7 +12838,7 @@ def _shoot_senescence(
                 temp_dir, '{}_{}.tif'.format(val, pft_i))
             param_val_dict['{}_{}'.format(val, pft_i)] = target_path
             fill_val = veg_trait_table[pft_i][val]
-            pygeoprocessing.new_raster_from_base(
+            _new_raster_from_base(
                 prev_sv_reg['aglivc_{}_path'.format(pft_i)], target_path,
                 gdal.GDT_Float32, [_IC_NODATA], fill_value_list=[fill_val])
 
@@ -9331,7 +12847,7 @@ def _shoot_senescence(
             temp_val_dict['fdeth'] = param_val_dict[
                 'fsdeth_2_{}'.format(pft_i)]
         else:
-            pygeoprocessing.raster_calculator(
+            _raster_calculator(
                 [(path, 1) for path in [
                     prev_sv_reg['aglivc_{}_path'.format(pft_i)],
                     month_reg['bgwfunc'],
@@ -9433,7 +12949,7 @@ def convert_biomass_to_C(biomass_path, c_path):
         carbon[:] = _TARGET_NODATA
         carbon[valid_mask] = biomass[valid_mask] / 2.5
         return carbon
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(biomass_path, 1)], convert_op, c_path, gdal.GDT_Float32,
         _TARGET_NODATA)
 
@@ -9778,7 +13294,7 @@ def nutrient_uptake(
     # calculate uptake from crop storage
     pft_nodata = pygeoprocessing.get_raster_info(
         fract_cover_path)['nodata'][0]
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             eavail_path, eup_above_iel_path, eup_below_iel_path,
             plantNfix_path, sv_reg['crpstg_{}_{}_path'.format(iel, pft_i)]]] +
@@ -9786,7 +13302,7 @@ def nutrient_uptake(
         calc_uptake_source('uptake_storage'), temp_val_dict['uptake_storage'],
         gdal.GDT_Float32, _TARGET_NODATA)
     # calculate uptake from soil
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             eavail_path, eup_above_iel_path, eup_below_iel_path,
             plantNfix_path, sv_reg['crpstg_{}_{}_path'.format(iel, pft_i)]]] +
@@ -9795,7 +13311,7 @@ def nutrient_uptake(
         gdal.GDT_Float32, _TARGET_NODATA)
     if iel == 1:
         # calculate uptake from symbiotically fixed N
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 eavail_path, eup_above_iel_path, eup_below_iel_path,
                 plantNfix_path,
@@ -9812,14 +13328,14 @@ def nutrient_uptake(
         temp_val_dict['statv_temp'], _SV_NODATA,
         temp_val_dict['uptake_storage'], _TARGET_NODATA,
         sv_reg['crpstg_{}_{}_path'.format(iel, pft_i)], _SV_NODATA)
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             temp_val_dict['uptake_storage'], eup_above_iel_path,
             eup_below_iel_path]],
         calc_aboveground_uptake, delta_aglive_iel_path,
         gdal.GDT_Float32, _TARGET_NODATA)
 
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             temp_val_dict['uptake_storage'], eup_above_iel_path,
             eup_below_iel_path]],
@@ -9836,18 +13352,18 @@ def nutrient_uptake(
     # uptake from each soil layer in proportion to its contribution to availm
     for lyr in range(1, nlay + 1):
         if iel == 2:
-            pygeoprocessing.raster_calculator(
+            _raster_calculator(
                 [(path, 1) for path in [
                     sv_reg['minerl_1_2_path'], sorpmx_path,
                     pslsrb_path]],
                 fsfunc, temp_val_dict['fsol'], gdal.GDT_Float32,
                 _TARGET_NODATA)
         else:
-            pygeoprocessing.new_raster_from_base(
+            _new_raster_from_base(
                 sv_reg['aglive_{}_{}_path'.format(iel, pft_i)],
                 temp_val_dict['fsol'],
                 gdal.GDT_Float32, [_IC_NODATA], fill_value_list=[1.])
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 temp_val_dict['uptake_soil'],
                 sv_reg['minerl_{}_{}_path'.format(lyr, iel)],
@@ -9869,7 +13385,7 @@ def nutrient_uptake(
             sv_reg['minerl_{}_{}_path'.format(lyr, iel)], _SV_NODATA)
 
         # uptake from minerl iel in lyr into above and belowground live
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 temp_val_dict['minerl_uptake_lyr'], eup_above_iel_path,
                 eup_below_iel_path]],
@@ -9881,7 +13397,7 @@ def nutrient_uptake(
             temp_val_dict['uptake_above'], _TARGET_NODATA,
             delta_aglive_iel_path, _SV_NODATA)
 
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 temp_val_dict['minerl_uptake_lyr'], eup_above_iel_path,
                 eup_below_iel_path]],
@@ -9897,7 +13413,7 @@ def nutrient_uptake(
 
     # uptake from N fixation into above and belowground live
     if iel == 1:
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 temp_val_dict['uptake_Nfix'], eup_above_iel_path,
                 eup_below_iel_path]],
@@ -9909,7 +13425,7 @@ def nutrient_uptake(
             temp_val_dict['uptake_above'], _TARGET_NODATA,
             delta_aglive_iel_path, _SV_NODATA)
 
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 temp_val_dict['uptake_Nfix'], eup_above_iel_path,
                 eup_below_iel_path]],
@@ -10252,7 +13768,7 @@ def _new_growth(
                 temp_dir, '{}_{}.tif'.format(val, pft_i))
             param_val_dict['{}_{}'.format(val, pft_i)] = target_path
             fill_val = veg_trait_table[pft_i][val]
-            pygeoprocessing.new_raster_from_base(
+            _new_raster_from_base(
                 sv_reg['aglivc_{}_path'.format(pft_i)], target_path,
                 gdal.GDT_Float32, [_IC_NODATA], fill_value_list=[fill_val])
 
@@ -10287,7 +13803,7 @@ def _new_growth(
                 temp_val_dict['potenc_{}'.format(pft_i)])
 
             # restrict potential growth by availability of N and P
-            pygeoprocessing.raster_calculator(
+            _raster_calculator(
                 [(path, 1) for path in [
                     temp_val_dict['potenc_{}'.format(pft_i)],
                     temp_val_dict['availm_1_{}'.format(pft_i)],
@@ -10296,7 +13812,7 @@ def _new_growth(
                 restrict_potential_growth,
                 temp_val_dict['potenc_lim_minerl_{}'.format(pft_i)],
                 gdal.GDT_Float32, _TARGET_NODATA)
-            pygeoprocessing.raster_calculator(
+            _raster_calculator(
                 [(path, 1) for path in [
                     temp_val_dict['potenc_lim_minerl_{}'.format(pft_i)],
                     month_reg['rtsh_{}'.format(pft_i)],
@@ -10314,7 +13830,7 @@ def _new_growth(
                 calc_nutrient_limitation('cprodl'),
                 temp_val_dict['cprodl_{}'.format(pft_i)],
                 gdal.GDT_Float32, _TARGET_NODATA)
-            pygeoprocessing.raster_calculator(
+            _raster_calculator(
                 [(path, 1) for path in [
                     temp_val_dict['potenc_lim_minerl_{}'.format(pft_i)],
                     month_reg['rtsh_{}'.format(pft_i)],
@@ -10332,7 +13848,7 @@ def _new_growth(
                 calc_nutrient_limitation('eup_above_1'),
                 temp_val_dict['eup_above_1_{}'.format(pft_i)],
                 gdal.GDT_Float32, _TARGET_NODATA)
-            pygeoprocessing.raster_calculator(
+            _raster_calculator(
                 [(path, 1) for path in [
                     temp_val_dict['potenc_lim_minerl_{}'.format(pft_i)],
                     month_reg['rtsh_{}'.format(pft_i)],
@@ -10350,7 +13866,7 @@ def _new_growth(
                 calc_nutrient_limitation('eup_below_1'),
                 temp_val_dict['eup_below_1_{}'.format(pft_i)],
                 gdal.GDT_Float32, _TARGET_NODATA)
-            pygeoprocessing.raster_calculator(
+            _raster_calculator(
                 [(path, 1) for path in [
                     temp_val_dict['potenc_lim_minerl_{}'.format(pft_i)],
                     month_reg['rtsh_{}'.format(pft_i)],
@@ -10368,7 +13884,7 @@ def _new_growth(
                 calc_nutrient_limitation('eup_above_2'),
                 temp_val_dict['eup_above_2_{}'.format(pft_i)],
                 gdal.GDT_Float32, _TARGET_NODATA)
-            pygeoprocessing.raster_calculator(
+            _raster_calculator(
                 [(path, 1) for path in [
                     temp_val_dict['potenc_lim_minerl_{}'.format(pft_i)],
                     month_reg['rtsh_{}'.format(pft_i)],
@@ -10386,7 +13902,7 @@ def _new_growth(
                 calc_nutrient_limitation('eup_below_2'),
                 temp_val_dict['eup_below_2_{}'.format(pft_i)],
                 gdal.GDT_Float32, _TARGET_NODATA)
-            pygeoprocessing.raster_calculator(
+            _raster_calculator(
                 [(path, 1) for path in [
                     temp_val_dict['potenc_lim_minerl_{}'.format(pft_i)],
                     month_reg['rtsh_{}'.format(pft_i)],
@@ -10406,7 +13922,7 @@ def _new_growth(
                 gdal.GDT_Float32, _TARGET_NODATA)
 
             # calculate uptake of C into new aboveground production
-            pygeoprocessing.raster_calculator(
+            _raster_calculator(
                 [(path, 1) for path in [
                     temp_val_dict['cprodl_{}'.format(pft_i)],
                     month_reg['rtsh_{}'.format(pft_i)]]],
@@ -10418,7 +13934,7 @@ def _new_growth(
             shutil.copyfile(
                 sv_reg['bglivc_{}_path'.format(pft_i)],
                 temp_val_dict['statv_temp'])
-            pygeoprocessing.raster_calculator(
+            _raster_calculator(
                 [(path, 1) for path in [
                     temp_val_dict['statv_temp'],
                     temp_val_dict['cprodl_{}'.format(pft_i)],
@@ -10443,7 +13959,7 @@ def _new_growth(
         else:
             # no growth scheduled this month
             for val in ['delta_aglivc', 'delta_aglive_1', 'delta_aglive_2']:
-                pygeoprocessing.new_raster_from_base(
+                _new_raster_from_base(
                     sv_reg['aglivc_{}_path'.format(pft_i)],
                     delta_agliv_dict['{}_{}'.format(val, pft_i)],
                     gdal.GDT_Float32, [_SV_NODATA], fill_value_list=[0])
@@ -10657,18 +14173,18 @@ def _leach(aligned_inputs, site_param_table, month_reg, sv_reg):
 
     sand_nodata = pygeoprocessing.get_raster_info(
         aligned_inputs['sand'])['nodata'][0]
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             param_val_dict['fleach_1'], param_val_dict['fleach_2'],
             aligned_inputs['sand'], param_val_dict['fleach_3']]],
         calc_frlech_N, temp_val_dict['frlech_1'], gdal.GDT_Float32,
         _TARGET_NODATA)
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             sv_reg['minerl_1_2_path'], param_val_dict['sorpmx'],
             param_val_dict['pslsrb']]],
         fsfunc, temp_val_dict['fsol'], gdal.GDT_Float32, _TARGET_NODATA)
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             param_val_dict['fleach_1'], param_val_dict['fleach_2'],
             aligned_inputs['sand'], param_val_dict['fleach_4'],
@@ -10678,7 +14194,7 @@ def _leach(aligned_inputs, site_param_table, month_reg, sv_reg):
 
     for iel in [1, 2]:
         for lyr in range(1, nlayer_max + 1):
-            pygeoprocessing.raster_calculator(
+            _raster_calculator(
                 [(path, 1) for path in [
                     param_val_dict['minlch'], month_reg['amov_{}'.format(lyr)],
                     temp_val_dict['frlech_{}'.format(iel)],
@@ -10781,7 +14297,8 @@ def _grazing(
             flgrem_<pft>, the fraction of live biomass of one pft removed by
             grazing, and fdgrem_<pft>, the fraction of standing dead biomass
             of one pft removed by grazing
-        animal_trait_table (dict): dictionary containing animal parameters
+        animal_trait_table (data frame): data frame of animal parameters and
+            traits indexed by animal id
         pft_id_set (set): set of integers identifying plant functional types
         sv_reg (dict): map of key, path pairs giving paths to state
             variables for the current month
@@ -10962,21 +14479,15 @@ def _grazing(
             temp_val_dict['{}_{}'.format(val, pft_i)] = os.path.join(
                 temp_dir, '{}_{}.tif'.format(val, pft_i))
 
+    # animal parameters are looked up from the animal index in memory
+    animal_param_lookup = build_animal_param_lookup(
+        animal_trait_table, ['gfcret', 'gret_2', 'fecf_1', 'fecf_2', 'feclig'])
     param_val_dict = {}
     param_val_dict['gret_1'] = os.path.join(temp_dir, 'gret_1.tif')
-    for val in ['gfcret', 'gret_2', 'fecf_1', 'fecf_2', 'feclig']:
-        target_path = os.path.join(temp_dir, '{}.tif'.format(val))
-        param_val_dict[val] = target_path
-        animal_to_val = dict(
-            [(animal_code, float(table[val])) for
-                (animal_code, table) in animal_trait_table.items()])
-        pygeoprocessing.reclassify_raster(
-            (aligned_inputs['animal_index'], 1), animal_to_val, target_path,
-            gdal.GDT_Float32, _IC_NODATA)
 
     clay_nodata = pygeoprocessing.get_raster_info(
         aligned_inputs['clay'])['nodata'][0]
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(aligned_inputs['clay'], 1)],
         calc_gret_1, param_val_dict['gret_1'], gdal.GDT_Float32, _IC_NODATA)
 
@@ -10987,13 +14498,13 @@ def _grazing(
         # calculate C consumed
         pft_nodata = pygeoprocessing.get_raster_info(
             aligned_inputs['pft_{}'.format(pft_i)])['nodata'][0]
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 sv_reg['aglivc_{}_path'.format(pft_i)],
                 month_reg['flgrem_{}'.format(pft_i)]]],
             calc_c_removed, temp_val_dict['shremc'], gdal.GDT_Float32,
             _TARGET_NODATA)
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 sv_reg['stdedc_{}_path'.format(pft_i)],
                 month_reg['fdgrem_{}'.format(pft_i)]]],
@@ -11001,12 +14512,14 @@ def _grazing(
             _TARGET_NODATA)
 
         # calculate C returned in feces
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
-                temp_val_dict['shremc'], temp_val_dict['sdremc'],
-                param_val_dict['gfcret'],
+                aligned_inputs['animal_index'], temp_val_dict['shremc'],
+                temp_val_dict['sdremc'],
                 aligned_inputs['pft_{}'.format(pft_i)]]],
-            calc_weighted_c_returned,
+            animal_param_op(
+                calc_weighted_c_returned, [None, None, 'gfcret', None],
+                animal_param_lookup),
             temp_val_dict['weighted_C_feces_{}'.format(pft_i)],
             gdal.GDT_Float32, _TARGET_NODATA)
         weighted_C_returned_list.append(
@@ -11014,14 +14527,24 @@ def _grazing(
 
         # calculate N and P consumed
         for iel in [1, 2]:
-            pygeoprocessing.raster_calculator(
+            # gret_1 is calculated from clay; all other parameters are
+            # animal parameters
+            if iel == 1:
+                gret_path_list = [param_val_dict['gret_1']]
+                gret_arg = None
+            else:
+                gret_path_list = []
+                gret_arg = 'gret_2'
+            returned_arg_list = [
+                None, None, gret_arg, 'fecf_{}'.format(iel), None]
+            _raster_calculator(
                 [(path, 1) for path in [
                     temp_val_dict['shremc'],
                     sv_reg['aglive_{}_{}_path'.format(iel, pft_i)],
                     sv_reg['aglivc_{}_path'.format(pft_i)]]],
                 calc_iel_removed, temp_val_dict['shreme'], gdal.GDT_Float32,
                 _TARGET_NODATA)
-            pygeoprocessing.raster_calculator(
+            _raster_calculator(
                 [(path, 1) for path in [
                     temp_val_dict['sdremc'],
                     sv_reg['stdede_{}_{}_path'.format(iel, pft_i)],
@@ -11044,13 +14567,14 @@ def _grazing(
                 sv_reg['stdede_{}_{}_path'.format(iel, pft_i)], _SV_NODATA)
 
             # calculate N or P returned in feces
-            pygeoprocessing.raster_calculator(
+            _raster_calculator(
                 [(path, 1) for path in [
-                    temp_val_dict['shreme'], temp_val_dict['sdreme'],
-                    param_val_dict['gret_{}'.format(iel)],
-                    param_val_dict['fecf_{}'.format(iel)],
+                    aligned_inputs['animal_index'], temp_val_dict['shreme'],
+                    temp_val_dict['sdreme']] + gret_path_list + [
                     aligned_inputs['pft_{}'.format(pft_i)]]],
-                calc_weighted_iel_returned_feces,
+                animal_param_op(
+                    calc_weighted_iel_returned_feces, returned_arg_list,
+                    animal_param_lookup),
                 temp_val_dict['weighted_iel_feces_{}_{}'.format(iel, pft_i)],
                 gdal.GDT_Float32, _TARGET_NODATA)
             if iel == 1:
@@ -11063,13 +14587,14 @@ def _grazing(
                         iel, pft_i)])
 
             # calculate N or P returned in urine
-            pygeoprocessing.raster_calculator(
+            _raster_calculator(
                 [(path, 1) for path in [
-                    temp_val_dict['shreme'], temp_val_dict['sdreme'],
-                    param_val_dict['gret_{}'.format(iel)],
-                    param_val_dict['fecf_{}'.format(iel)],
+                    aligned_inputs['animal_index'], temp_val_dict['shreme'],
+                    temp_val_dict['sdreme']] + gret_path_list + [
                     aligned_inputs['pft_{}'.format(pft_i)]]],
-                calc_weighted_iel_returned_urine,
+                animal_param_op(
+                    calc_weighted_iel_returned_urine, returned_arg_list,
+                    animal_param_lookup),
                 temp_val_dict['weighted_iel_urine'],
                 gdal.GDT_Float32, _TARGET_NODATA)
             shutil.copyfile(
@@ -11111,9 +14636,10 @@ def _grazing(
     partit(
         temp_val_dict['sum_weighted_C_returned'],
         temp_val_dict['sum_weighted_N_returned'],
-        temp_val_dict['sum_weighted_P_returned'],
-        param_val_dict['feclig'], aligned_inputs['site_index'],
-        site_param_table, 1, sv_reg)
+        temp_val_dict['sum_weighted_P_returned'], None,
+        aligned_inputs['site_index'], site_param_table, 1, sv_reg,
+        animal_index_path=aligned_inputs['animal_index'],
+        animal_param_lookup=animal_param_lookup)
 
     # clean up temporary files
     shutil.rmtree(temp_dir)
@@ -11124,8 +14650,8 @@ def calc_derived_animal_traits(input_animal_trait_table, freer_parameter_df):
 
     Populate the animal trait table with parameters from Freer et al (2012),
     and use these parameters along with input traits to calculate derived
-    animal traits.  Add these traits to the existing dictionary of animal
-    traits supplied by the user as input.
+    animal traits.  Add these traits to the existing table of animal traits
+    supplied by the user as input.
 
     Parameters:
         input_animal_trait_table (dict): dictionary of key, dictionary pairs
@@ -11138,9 +14664,9 @@ def calc_derived_animal_traits(input_animal_trait_table, freer_parameter_df):
             animal trait table
 
     Returns:
-        animal_trait_table, a dictionary of key, dictionary pairs where keys
-        indicate unique ids for animal types and nested dictionaries contain
-        animal traits, including inputs, Freer parameters, and the following
+        animal_trait_table, a data frame with one row per animal type, indexed
+        by the unique id of each animal type, whose columns contain animal
+        traits, including inputs, Freer parameters, and the following
         derived animal traits:
             - SRW_modified, standard reference weight modified by animal sex
             - W_total, total body weight (equal to input weight for all animal
@@ -11166,6 +14692,8 @@ def calc_derived_animal_traits(input_animal_trait_table, freer_parameter_df):
         input_animal_trait_table, orient='index')
     animal_df = pandas.merge(
         input_df, freer_parameter_df, how='left', on='type')
+    # a left merge preserves the order of rows in the input table
+    animal_df.index = input_df.index
     animal_df.replace('', numpy.nan, inplace=True)
     animal_df.fillna(_IC_NODATA, inplace=True)
     animal_df['W_total'] = animal_df['weight']
@@ -11197,29 +14725,29 @@ def calc_derived_animal_traits(input_animal_trait_table, freer_parameter_df):
     animal_df.loc[animal_df.type == 'camelid', 'type_int'] = 5
     animal_df.loc[animal_df.type == 'hindgut_fermenter', 'type_int'] = 6
     animal_df['reproductive_status_int'] = 0
-    animal_df['A_foet'] = 0
-    animal_df['A_y'] = 0
-    animal_trait_table = animal_df.to_dict(orient='index')
-    return animal_trait_table
+    animal_df['A_foet'] = 0.
+    animal_df['A_y'] = 0.
+    return animal_df
 
 
-def update_breeding_female_status(inner_animal_trait_dict, month_index):
-    """Update derived traits of a single animal type that is breeding females.
+def update_breeding_female_status(animal_trait_table, month_index):
+    """Update derived traits of animal types that are breeding females.
 
     Because breeding females undergo cycles of conception, pregnancy, and
     lactation, some derived traits must be updated at each model time step.
-    These traits do not vary spatially.
+    These traits do not vary spatially. All breeding female animal types are
+    updated at once; rows describing other animal types are not modified.
 
     Parameters:
-        inner_animal_trait_dict (dict): dictionary of key, value pairs
-            representing input and derived traits for this animal type.
+        animal_trait_table (data frame): data frame with one row per animal
+            type containing input and derived traits, as returned by
+            `calc_derived_animal_traits`
         month_index (int): month of the simulation, such that month_index=13
             indicates month 13 of the simulation
 
     Returns:
-        updated_trait_table, a dictionary of key, value pairs where values
-        indicate input and derived traits for this animal type, including the
-        following updated animal traits:
+        updated_trait_table, a copy of `animal_trait_table` including the
+        following updated traits for breeding females:
             - reproductive_status_int, integer indicating animal reproductive
                 status:
                 0: not pregnant or lactating (default)
@@ -11230,48 +14758,50 @@ def update_breeding_female_status(inner_animal_trait_dict, month_index):
             - A_y, age of the suckling young if lactating
 
     """
-    updated_trait_table = inner_animal_trait_dict.copy()
+    updated_trait_table = animal_trait_table.copy()
+    female_mask = (updated_trait_table['sex'] == 'breeding_female')
+    if not female_mask.any():
+        return updated_trait_table
+    female_df = updated_trait_table.loc[female_mask, [
+        'conception_step', 'calving_interval', 'lactation_duration', 'weight',
+        'Z', 'SRW_modified', 'CP1', 'CP4', 'CP5', 'CP6', 'CP7', 'CP15',
+        'A_foet', 'A_y']].astype(numpy.float64)
     months_of_pregnancy = 9
     cycle_month_index = (
-        (month_index - updated_trait_table['conception_step']) %
-        updated_trait_table['calving_interval'])
-    if cycle_month_index < months_of_pregnancy:
-        # animal is pregnant
-        updated_trait_table['reproductive_status_int'] = 1
-        updated_trait_table['A_foet'] = cycle_month_index * 30 + 1
-        RA = updated_trait_table['A_foet'] / updated_trait_table['CP1']
-        BW = (
-            (1 - updated_trait_table['CP4'] +
-                updated_trait_table['CP4'] *
-                updated_trait_table['Z']) *
-            updated_trait_table['CP15'] *
-            updated_trait_table['SRW_modified'])
-        W_c_1 = updated_trait_table['CP5'] * BW
-        W_c_2 = math.exp(
-            updated_trait_table['CP6'] *
-            (1 - math.exp(updated_trait_table['CP7'] * (1 - RA))))
-        W_c = W_c_1 * W_c_2  # equation 62, weight of conceptus
-        updated_trait_table['W_total'] = (
-            updated_trait_table['weight'] + W_c)
-    elif (cycle_month_index <
-            (months_of_pregnancy +
-                updated_trait_table['lactation_duration'])):
-        # animal is lactating
-        updated_trait_table['reproductive_status_int'] = 2
-        updated_trait_table['W_total'] = updated_trait_table['weight']
-        updated_trait_table['A_y'] = (
-            (cycle_month_index - months_of_pregnancy) * 30 + 1)
-    else:
-        # animal is not pregnant or lactating
-        updated_trait_table['reproductive_status_int'] = 0
-        updated_trait_table['W_total'] = updated_trait_table['weight']
-        updated_trait_table['A_foet'] = 0
-        updated_trait_table['A_y'] = 0
+        (month_index - female_df['conception_step']) %
+        female_df['calving_interval'])
+    pregnant_mask = (cycle_month_index < months_of_pregnancy)
+    lactating_mask = (
+        (~pregnant_mask) &
+        (cycle_month_index <
+            (months_of_pregnancy + female_df['lactation_duration'])))
+    open_mask = ~(pregnant_mask | lactating_mask)
+
+    # weight of conceptus if pregnant, equation 62
+    A_foet = cycle_month_index * 30 + 1
+    RA = A_foet / female_df['CP1']
+    BW = (
+        (1 - female_df['CP4'] + female_df['CP4'] * female_df['Z']) *
+        female_df['CP15'] * female_df['SRW_modified'])
+    W_c = (
+        female_df['CP5'] * BW *
+        numpy.exp(female_df['CP6'] * (1 - numpy.exp(
+            female_df['CP7'] * (1 - RA)))))
+    A_y = (cycle_month_index - months_of_pregnancy) * 30 + 1
+
+    updated_trait_table.loc[female_mask, 'reproductive_status_int'] = (
+        numpy.select([pregnant_mask, lactating_mask], [1, 2], default=0))
+    updated_trait_table.loc[female_mask, 'W_total'] = numpy.where(
+        pregnant_mask, female_df['weight'] + W_c, female_df['weight'])
+    updated_trait_table.loc[female_mask, 'A_foet'] = numpy.select(
+        [pregnant_mask, open_mask], [A_foet, 0], default=female_df['A_foet'])
+    updated_trait_table.loc[female_mask, 'A_y'] = numpy.select(
+        [lactating_mask, open_mask], [A_y, 0], default=female_df['A_y'])
     return updated_trait_table
 
 
-def calc_max_intake(inner_animal_trait_dict):
-    """Calculate maximum daily forage intake for a single animal type.
+def calc_max_intake(animal_trait_table):
+    """Calculate maximum daily forage intake for each animal type.
 
     An animal's maximum intake is the maximum potential daily intake of dry
     matter (kg) and depends on the size, condition, and reproductive stage of
@@ -11280,37 +14810,35 @@ def calc_max_intake(inner_animal_trait_dict):
     traits.
 
     Parameters:
-        inner_animal_trait_dict (dict): dictionary of key, value pairs
-            representing input and derived traits for this animal type.
+        animal_trait_table (data frame): data frame with one row per animal
+            type containing input and derived traits, as returned by
+            `calc_derived_animal_traits`
 
     Returns:
-        updated_trait_table, a dictionary of key, value pairs where values
-        indicate input and derived traits for this animal type, including the
+        updated_trait_table, a copy of `animal_trait_table` including the
         following updated animal trait:
             - max_intake, maximum daily forage intake in kg dry matter
 
     """
-    updated_trait_table = inner_animal_trait_dict.copy()
-    if updated_trait_table['BC'] > 1.:
-        CF = (
-            updated_trait_table['BC'] *
-            (updated_trait_table['CI20'] - updated_trait_table['BC']) /
-            (updated_trait_table['CI20'] - 1.))
-    else:
-        CF = 1.
+    updated_trait_table = animal_trait_table.copy()
+    BC = updated_trait_table['BC']
+    CF = numpy.where(
+        BC > 1.,
+        BC * (updated_trait_table['CI20'] - BC) /
+        (updated_trait_table['CI20'] - 1.), 1.)
     YF = 1.  # eq 4 gives a different value for unweaned animals
     TF = 1.  # ignore effect of temperature on intake
-    LF = 1.  # assume any lactating animals are suckling young (eq 8)
-    if updated_trait_table['reproductive_status_int'] == 2:
-        BCpart = updated_trait_table['BC']  # body condition at parturition
-        Mi = updated_trait_table['A_y'] / updated_trait_table['CI8']
-        LA = (
-            1. - updated_trait_table['CI15'] +
-            updated_trait_table['CI15'] * BCpart)
-        LF = (
-            1. + updated_trait_table['CI19'] * Mi **
-            updated_trait_table['CI9'] * math.exp(
-                updated_trait_table['CI9'] * (1 - Mi)) * LA)
+    # assume any lactating animals are suckling young (eq 8)
+    BCpart = BC  # body condition at parturition
+    Mi = updated_trait_table['A_y'] / updated_trait_table['CI8']
+    LA = (
+        1. - updated_trait_table['CI15'] +
+        updated_trait_table['CI15'] * BCpart)
+    LF = numpy.where(
+        updated_trait_table['reproductive_status_int'] == 2,
+        1. + updated_trait_table['CI19'] * Mi **
+        updated_trait_table['CI9'] * numpy.exp(
+            updated_trait_table['CI9'] * (1 - Mi)) * LA, 1.)
     updated_trait_table['max_intake'] = (
         updated_trait_table['CI1'] * updated_trait_table['SRW_modified'] *
         updated_trait_table['Z'] * (
@@ -11319,6 +14847,107 @@ def calc_max_intake(inner_animal_trait_dict):
     return updated_trait_table
 
 
+def build_animal_param_lookup(animal_trait_table, param_list):
+    """Build an in-memory table of animal parameters indexed by animal id.
+
+    Animal parameters and traits do not vary within the area occupied by one
+    animal type. Rather than writing one raster per parameter at each model
+    step, parameter values are held in memory and retrieved from the animal
+    spatial index one block at a time by `lookup_animal_params`.
+
+    Parameters:
+        animal_trait_table (data frame): data frame of animal parameters and
+            traits indexed by animal id
+        param_list (list): list of strings identifying the animal parameters
+            that should be included in the table
+
+    Returns:
+        animal_param_lookup, a dictionary containing the key 'animal_id',
+            giving a sorted array of animal ids, and one key for each
+            parameter in `param_list` giving an array of parameter values in
+            the same order as 'animal_id'
+
+    """
+    sorted_trait_table = animal_trait_table.sort_index()
+    animal_param_lookup = {
+        'animal_id': sorted_trait_table.index.values.astype(numpy.float64)}
+    for val in param_list:
+        animal_param_lookup[val] = sorted_trait_table[val].values.astype(
+            numpy.float32)
+    return animal_param_lookup
+
+
+def lookup_animal_params(animal_index, animal_param_lookup, param_list):
+    """Retrieve animal parameters for each pixel of the animal spatial index.
+
+    Parameters:
+        animal_index (numpy.ndarray): input, integer index of the animal type
+            grazing on each pixel
+        animal_param_lookup (dict): in-memory table of animal parameters as
+            returned by `build_animal_param_lookup`
+        param_list (list): list of strings identifying the parameters to
+            retrieve
+
+    Returns:
+        param_dict, a dictionary of parameter, numpy.ndarray pairs where each
+            array has the shape of `animal_index` and contains the value of
+            the parameter for the animal type on each pixel, or _IC_NODATA
+            where the pixel is not occupied by a known animal type
+
+    """
+    animal_id_array = animal_param_lookup['animal_id']
+    if animal_id_array.size > 0:
+        lookup_index = numpy.clip(
+            numpy.searchsorted(animal_id_array, animal_index), 0,
+            animal_id_array.size - 1)
+        valid_mask = (animal_id_array[lookup_index] == animal_index)
+    else:
+        lookup_index = numpy.zeros(animal_index.shape, dtype=numpy.int64)
+        valid_mask = numpy.zeros(animal_index.shape, dtype=bool)
+    param_dict = {}
+    for val in param_list:
+        param = numpy.empty(animal_index.shape, dtype=numpy.float32)
+        param[:] = _IC_NODATA
+        param[valid_mask] = animal_param_lookup[val][lookup_index[valid_mask]]
+        param_dict[val] = param
+    return param_dict
+
+
+def animal_param_op(local_op, arg_list, animal_param_lookup):
+    """Wrap a local operation so that animal parameters are read from memory.
+
+    The returned operation is intended for use with
+    `pygeoprocessing.raster_calculator`. Its first argument is a block of the
+    animal spatial index, followed by blocks of the rasters that supply the
+    remaining arguments of `local_op`.
+
+    Parameters:
+        local_op (function): local operation taking numpy arrays as arguments
+        arg_list (list): one item for each argument of `local_op`, in order.
+            Items that are strings name an animal parameter to be retrieved
+            from `animal_param_lookup`; items that are None are filled, in
+            order, by the raster blocks that follow the animal index
+        animal_param_lookup (dict): in-memory table of animal parameters as
+            returned by `build_animal_param_lookup`
+
+    Returns:
+        _animal_param_op, a local operation that calls `local_op` with
+            animal parameters supplied from `animal_param_lookup`
+
+    """
+    param_list = [val for val in arg_list if val is not None]
+
+    def _animal_param_op(animal_index, *block_list):
+        param_dict = lookup_animal_params(
+            animal_index, animal_param_lookup, param_list)
+        block_iter = iter(block_list)
+        local_args = [
+            next(block_iter) if val is None else param_dict[val] for val in
+            arg_list]
+        return local_op(*local_args)
+    return _animal_param_op
+
+
 def calc_pasture_height(sv_reg, aligned_inputs, pft_id_set, processing_dir):
     """Calculate estimated height in cm for each forage feed type.
 
@@ -11415,7 +15044,7 @@ def calc_pasture_height(sv_reg, aligned_inputs, pft_id_set, processing_dir):
             aligned_inputs['pft_{}'.format(pft_i)])['nodata'][0]
 
         # calculate weighted aboveground live biomass in kg/ha
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 sv_reg['aglivc_{}_path'.format(pft_i)],
                 aligned_inputs['pft_{}'.format(pft_i)]]],
@@ -11423,7 +15052,7 @@ def calc_pasture_height(sv_reg, aligned_inputs, pft_id_set, processing_dir):
             temp_val_dict['agliv_kgha_{}'.format(pft_i)],
             gdal.GDT_Float32, _TARGET_NODATA)
         # calculate weighted standing dead biomass in kg/ha
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 sv_reg['stdedc_{}_path'.format(pft_i)],
                 aligned_inputs['pft_{}'.format(pft_i)]]],
@@ -11436,7 +15065,7 @@ def calc_pasture_height(sv_reg, aligned_inputs, pft_id_set, processing_dir):
         biomass_raster_list.append(
             temp_val_dict['stded_kgha_{}'.format(pft_i)])
 
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in biomass_raster_list], calc_scale_term,
         temp_val_dict['scale_term'], gdal.GDT_Float32,
         _TARGET_NODATA)
@@ -11528,7 +15157,7 @@ def calc_fraction_biomass(
         target_path = os.path.join(
             processing_dir, 'agliv_frac_bio_{}'.format(pft_i))
         frac_biomass_dict['agliv_{}'.format(pft_i)] = target_path
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 sv_reg['aglivc_{}_path'.format(pft_i)],
                 aligned_inputs['pft_{}'.format(pft_i)],
@@ -11538,7 +15167,7 @@ def calc_fraction_biomass(
         target_path = os.path.join(
             processing_dir, 'stded_frac_bio_{}'.format(pft_i))
         frac_biomass_dict['stded_{}'.format(pft_i)] = target_path
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 sv_reg['stdedc_{}_path'.format(pft_i)],
                 aligned_inputs['pft_{}'.format(pft_i)],
@@ -11547,7 +15176,7 @@ def calc_fraction_biomass(
     return frac_biomass_dict
 
 
-def order_by_digestibility(sv_reg, pft_id_set, aoi_path):
+def order_by_digestibility(sv_reg, pft_id_set, aoi_mask_path):
     """Calculate the order of feed types according to their digestibility.
 
     During diet selection, animals select among feed types in descending order
@@ -11555,15 +15184,16 @@ def order_by_digestibility(sv_reg, pft_id_set, aoi_path):
     crude protein content, the order of feed types may be estimated from their
     nitrogen to carbon ratios. Order feed types by digestibility according to
     the mean nitrogen to carbon ratio of each feed type across the study area
-    aoi.
+    aoi. Carbon and nitrogen of all feed types are summarized inside the aoi
+    in a single pass with `zonal_sum_and_count`.
 
     Parameters:
         sv_reg (dict): map of key, path pairs giving paths to state
             variables for the previous month, including C and N in aboveground
             live and standing dead
         pft_id_set (set): set of integers identifying plant functional types
-        aoi_path (string): path to vector layer giving the spatial extent of
-            the model
+        aoi_mask_path (string): path to integer raster that is non-negative
+            inside the study area aoi and nodata outside it
 
     Returns:
         ordered_feed_types, a list of strings where each string designates a
@@ -11571,56 +15201,32 @@ def order_by_digestibility(sv_reg, pft_id_set, aoi_path):
             or standing dead), in descending order of digestibility
 
     """
-    def calc_nc_ratio(cstatv_path, nstatv_path, aoi_path):
-        """Calculate the mean nitrogen to carbon ratio of a biomass fraction.
-
-        Calculate the mean nitrogen to carbon ratio of a biomass fraction
-        falling inside the study area aoi.  The ratio is calculated from the
-        state variables representing carbon and nitrogen content of that
-        biomass fraction. If the area of interest vector dataset contains more
-        than one polygon feature, the average ratio is calculated across
-        features.
-
-        Parameters:
-            cstatv_path (string): path to raster containing carbon in the
-                biomass fraction
-            nstatv_path (string): path to raster containing nitrogen in the
-                biomass fraction
-            aoi_path (string): path to vector layer defining the study area of
-                interest
-
-        Returns:
-            nc_ratio, the ratio of mean nitrogen to mean carbon for this state
-                variable inside the model area of interest
+    feed_type_list = []
+    statv_path_list = []
+    for pft_i in pft_id_set:
+        for statv in ['agliv', 'stded']:
+            feed_type_list.append('{}_{}'.format(statv, pft_i))
+            statv_path_list.extend([
+                sv_reg['{}c_{}_path'.format(statv, pft_i)],
+                sv_reg['{}e_1_{}_path'.format(statv, pft_i)]])
+    zone_sum, zone_count = zonal_sum_and_count(statv_path_list, aoi_mask_path)
+    aoi_sum = zone_sum.sum(axis=1)
+    aoi_count = zone_count.sum(axis=1)
 
-        """
-        carbon_zonal_stat_df = pandas.DataFrame.from_dict(
-            pygeoprocessing.zonal_statistics((cstatv_path, 1), aoi_path),
-            orient='index')
-        if carbon_zonal_stat_df['count'].sum() == 0:
-            return 0
-        else:
-            mean_carbon = (
-                carbon_zonal_stat_df['sum'].sum() /
-                carbon_zonal_stat_df['count'].sum())
-        nitrogen_zonal_stat_df = pandas.DataFrame.from_dict(
-            pygeoprocessing.zonal_statistics((nstatv_path, 1), aoi_path),
-            orient='index')
-        if nitrogen_zonal_stat_df['count'].sum() == 0:
+    nc_ratio_dict = {}
+    for feed_index, feed_type in enumerate(feed_type_list):
+        carbon_index = 2 * feed_index
+        nitrogen_index = carbon_index + 1
+        if aoi_count[carbon_index] == 0:
+            nc_ratio_dict[feed_type] = 0
+            continue
+        mean_carbon = aoi_sum[carbon_index] / aoi_count[carbon_index]
+        if aoi_count[nitrogen_index] == 0:
             mean_nitrogen = 0
         else:
             mean_nitrogen = (
-                nitrogen_zonal_stat_df['sum'].sum() /
-                nitrogen_zonal_stat_df['count'].sum())
-        return (mean_nitrogen / mean_carbon)
-
-    nc_ratio_dict = {}
-    for pft_i in pft_id_set:
-        for statv in ['agliv', 'stded']:
-            cstatv_path = sv_reg['{}c_{}_path'.format(statv, pft_i)]
-            nstatv_path = sv_reg['{}e_1_{}_path'.format(statv, pft_i)]
-            nc_ratio = calc_nc_ratio(cstatv_path, nstatv_path, aoi_path)
-            nc_ratio_dict['{}_{}'.format(statv, pft_i)] = nc_ratio
+                aoi_sum[nitrogen_index] / aoi_count[nitrogen_index])
+        nc_ratio_dict[feed_type] = mean_nitrogen / mean_carbon
 
     # order the dictionary by descending N/C ratio keys, get list from values
     sorted_list = sorted(
@@ -11824,7 +15430,7 @@ def calc_crude_protein_intake(
         pft_i = feed_type.split('_')[1]
         target_path = os.path.join(
             temp_dir, 'weighted_cp_{}.tif'.format(feed_type))
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 sv_reg['{}c_{}_path'.format(statv, pft_i)],
                 sv_reg['{}e_1_{}_path'.format(statv, pft_i)],
@@ -11987,8 +15593,9 @@ def calc_degr_protein_intake(crude_protein_intake, total_digestibility):
 
 
 def calc_protein_req(
-        energy_intake_path, energy_maintenance_path, CRD4_path, CRD5_path,
-        CRD6_path, CRD7_path, current_month, protein_req_path):
+        energy_intake_path, energy_maintenance_path, animal_index_path,
+        animal_param_lookup, current_month, protein_req_path,
+        latitude_input_path=None):
     """Calculate rumen degradable protein required.
 
     The requirement for rumen degradable protein depends on the ratio of energy
@@ -12000,14 +15607,18 @@ def calc_protein_req(
             intake from the diet
         energy_maintenance_path (string): path to raster containing energy
             requirements of maintenance
-        CRD4_path (string): path to raster containing the parameter CRD4
-        CRD5_path (string): path to raster containing the parameter CRD5
-        CRD6_path (string): path to raster containing the parameter CRD6
-        CRD7_path (string): path to raster containing the parameter CRD7
+        animal_index_path (string): path to raster that indexes the location of
+            grazing animal types to their parameters and traits
+        animal_param_lookup (dict): in-memory table of animal parameters,
+            including CRD4, CRD5, CRD6 and CRD7, as returned by
+            `build_animal_param_lookup`
         current_month (int): month of the year, such that current_month=1
             indicates January
         protein_req_path (string): path to raster that should contain the
             result, rumen degradable protein required
+        latitude_input_path (string): optional, path to a raster giving the
+            latitude of each pixel, used instead of latitude calculated from
+            the pixel coordinates of `energy_intake_path`
 
     Side effects:
         modifies or creates the raster indicated by `protein_req_path`
@@ -12071,14 +15682,19 @@ def calc_protein_req(
     # calculate an intermediate input, latitude at each pixel center
     temp_dir = tempfile.mkdtemp(dir=PROCESSING_DIR)
     latitude_raster_path = os.path.join(temp_dir, 'latitude.tif')
-    calc_latitude(energy_intake_path, latitude_raster_path)
+    calc_latitude(
+        energy_intake_path, latitude_raster_path,
+        latitude_input_path=latitude_input_path)
 
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
-            latitude_raster_path, energy_intake_path, energy_maintenance_path,
-            CRD4_path, CRD5_path, CRD6_path, CRD7_path]],
-        protein_req_op(current_month), protein_req_path,
-        gdal.GDT_Float32, _TARGET_NODATA)
+            animal_index_path, latitude_raster_path, energy_intake_path,
+            energy_maintenance_path]],
+        animal_param_op(
+            protein_req_op(current_month),
+            [None, None, None, 'CRD4', 'CRD5', 'CRD6', 'CRD7'],
+            animal_param_lookup),
+        protein_req_path, gdal.GDT_Float32, _TARGET_NODATA)
 
     # clean up temporary files
     shutil.rmtree(temp_dir)
@@ -12217,9 +15833,9 @@ def calc_max_fraction_removed(total_weighted_C, management_threshold):
 
 
 def _calc_grazing_offtake(
-        aligned_inputs, aoi_path, management_threshold, sv_reg, pft_id_set,
-        animal_index_path, animal_trait_table, veg_trait_table, current_month,
-        month_reg):
+        aligned_inputs, aoi_mask_path, management_threshold, sv_reg,
+        pft_id_set, animal_index_path, animal_trait_table, veg_trait_table,
+        current_month, month_reg):
     """Calculate fraction of live and dead biomass removed by herbivores.
 
     Perform diet selection by animals grazing available forage as
@@ -12232,8 +15848,8 @@ def _calc_grazing_offtake(
         aligned_inputs (dict): map of key, path pairs indicating paths
             to aligned model inputs, including fractional cover of each plant
             functional type and proportion of the pasture that is legume
-        aoi_path (string): path to vector layer defining the study area of
-            interest
+        aoi_mask_path (string): path to integer raster that is non-negative
+            inside the study area of interest and nodata outside it
         management_threshold (float): biomass required to be left
             standing at each model step after offtake by grazing animals
         sv_reg (dict): map of key, path pairs giving paths to state
@@ -12241,8 +15857,8 @@ def _calc_grazing_offtake(
         pft_id_set (set): set of integers identifying plant functional types
         animal_index_path (string): path to raster that indexes the location of
             grazing animal types to their parameters and traits
-        animal_trait_table (dict): map of animal id to dictionaries containing
-            animal parameters and traits
+        animal_trait_table (data frame): data frame of animal parameters and
+            traits indexed by animal id
         veg_trait_table (dict): map of pft id to dictionaries containing
             plant functional type parameters
         current_month (int): month of the year, such that current_month=1
@@ -12502,21 +16118,14 @@ def _calc_grazing_offtake(
                 target_path = os.path.join(
                     temp_dir, '{}.tif'.format(value_string))
                 temp_val_dict[value_string] = target_path
-    param_val_dict = {}
-    # animal parameters
-    for val in [
+    # animal parameters are looked up from the animal index in memory
+    animal_param_lookup = build_animal_param_lookup(
+        animal_trait_table, [
             'age', 'sex_int', 'type_int', 'W_total', 'max_intake', 'ZF', 'CR1',
             'CR2', 'CR3', 'CR4', 'CR5', 'CR6', 'CR12', 'CR13', 'CK1', 'CK2',
             'CM1', 'CM2', 'CM3', 'CM4', 'CM6', 'CM7', 'CM16', 'CRD1', 'CRD2',
-            'CRD4', 'CRD5', 'CRD6', 'CRD7']:
-        target_path = os.path.join(temp_dir, '{}.tif'.format(val))
-        param_val_dict[val] = target_path
-        animal_to_val = dict(
-            [(animal_code, float(table[val])) for
-                (animal_code, table) in animal_trait_table.items()])
-        pygeoprocessing.reclassify_raster(
-            (animal_index_path, 1), animal_to_val, target_path,
-            gdal.GDT_Float32, _IC_NODATA)
+            'CRD4', 'CRD5', 'CRD6', 'CRD7'])
+    param_val_dict = {}
     # pft parameters
     for val in [
             'species_factor', 'digestibility_slope',
@@ -12526,7 +16135,7 @@ def _calc_grazing_offtake(
                 temp_dir, '{}_{}.tif'.format(val, pft_i))
             param_val_dict['{}_{}'.format(val, pft_i)] = target_path
             fill_val = veg_trait_table[pft_i][val]
-            pygeoprocessing.new_raster_from_base(
+            _new_raster_from_base(
                 sv_reg['aglivc_{}_path'.format(pft_i)], target_path,
                 gdal.GDT_Float32, [_IC_NODATA], fill_value_list=[fill_val])
 
@@ -12543,12 +16152,12 @@ def _calc_grazing_offtake(
         temp_val_dict['total_weighted_C'], _TARGET_NODATA)
 
     # calculate maximum fraction of biomass that can be removed
-    pygeoprocessing.new_raster_from_base(
+    _new_raster_from_base(
         temp_val_dict['total_weighted_C'],
         temp_val_dict['management_threshold'],
         gdal.GDT_Float32, [_TARGET_NODATA],
         fill_value_list=[management_threshold])
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             temp_val_dict['total_weighted_C'],
             temp_val_dict['management_threshold']]],
@@ -12565,10 +16174,11 @@ def _calc_grazing_offtake(
         sv_reg, aligned_inputs, pft_id_set, temp_dir)
 
     # find the order of feed types on which diet selection should proceed
-    ordered_feed_types = order_by_digestibility(sv_reg, pft_id_set, aoi_path)
+    ordered_feed_types = order_by_digestibility(
+        sv_reg, pft_id_set, aoi_mask_path)
 
     # initialize relative_availability_sum to 0
-    pygeoprocessing.new_raster_from_base(
+    _new_raster_from_base(
         aligned_inputs['site_index'],
         temp_val_dict['relative_availability_sum'],
         gdal.GDT_Float32, [_IC_NODATA], fill_value_list=[0.])
@@ -12585,20 +16195,21 @@ def _calc_grazing_offtake(
             aligned_inputs['pft_{}'.format(pft_i)])['nodata'][0]
 
         # calculate available biomass of this feed type
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
+                animal_index_path,
                 sv_reg['{}c_{}_path'.format(statv, pft_i)],
                 aligned_inputs['pft_{}'.format(pft_i)],
                 frac_biomass_dict['{}_{}'.format(statv, pft_i)],
-                pasture_height_dict['{}_{}'.format(statv, pft_i)],
-                param_val_dict['ZF'], param_val_dict['CR4'],
-                param_val_dict['CR5'], param_val_dict['CR6'],
-                param_val_dict['CR12'], param_val_dict['CR13']]],
-            calc_avail_biomass, temp_val_dict['avail_biomass'],
-            gdal.GDT_Float32, _TARGET_NODATA)
+                pasture_height_dict['{}_{}'.format(statv, pft_i)]]],
+            animal_param_op(
+                calc_avail_biomass,
+                [None, None, None, None, 'ZF', 'CR4', 'CR5', 'CR6', 'CR12',
+                    'CR13'], animal_param_lookup),
+            temp_val_dict['avail_biomass'], gdal.GDT_Float32, _TARGET_NODATA)
 
         # calculate digestibility of this feed type
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 sv_reg['{}c_{}_path'.format(statv, pft_i)],
                 sv_reg['{}e_1_{}_path'.format(statv, pft_i)],
@@ -12609,18 +16220,20 @@ def _calc_grazing_offtake(
             gdal.GDT_Float32, _TARGET_NODATA)
 
         # calculate relative ingestibility
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
+                animal_index_path,
                 temp_val_dict['digestibility_{}_{}'.format(statv, pft_i)],
                 aligned_inputs['proportion_legume_path'],
-                param_val_dict['CR1'], param_val_dict['CR3'],
                 param_val_dict['species_factor_{}'.format(pft_i)]]],
-            calc_relative_ingestibility,
+            animal_param_op(
+                calc_relative_ingestibility,
+                [None, None, 'CR1', 'CR3', None], animal_param_lookup),
             temp_val_dict['relative_ingestibility_{}_{}'.format(statv, pft_i)],
             gdal.GDT_Float32, _TARGET_NODATA)
 
         # calculate relative availability including unsatisfied capacity
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 temp_val_dict['avail_biomass'],
                 temp_val_dict['relative_availability_sum']]],
@@ -12637,15 +16250,17 @@ def _calc_grazing_offtake(
 
     # calculate daily intake of each feed type
     for feed_type in ordered_feed_types:
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
+                animal_index_path,
                 aligned_inputs['proportion_legume_path'],
-                param_val_dict['max_intake'],
                 temp_val_dict['relative_availability_{}'.format(feed_type)],
                 temp_val_dict['relative_ingestibility_{}'.format(feed_type)],
-                temp_val_dict['relative_availability_sum'],
-                param_val_dict['CR2']]],
-            calc_daily_intake,
+                temp_val_dict['relative_availability_sum']]],
+            animal_param_op(
+                calc_daily_intake,
+                [None, 'max_intake', None, None, None, 'CR2'],
+                animal_param_lookup),
             temp_val_dict['daily_intake_{}'.format(feed_type)],
             gdal.GDT_Float32, _TARGET_NODATA)
 
@@ -12662,26 +16277,24 @@ def _calc_grazing_offtake(
     calc_crude_protein_intake(
         sv_reg, temp_val_dict, ordered_feed_types,
         temp_val_dict['total_crude_protein_intake'])
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             temp_val_dict['total_intake'],
             temp_val_dict['total_digestibility']]],
         calc_energy_intake, temp_val_dict['energy_intake'],
         gdal.GDT_Float32, _TARGET_NODATA)
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
-            param_val_dict['age'], param_val_dict['sex_int'],
-            param_val_dict['W_total'], temp_val_dict['energy_intake'],
+            animal_index_path, temp_val_dict['energy_intake'],
             temp_val_dict['total_intake'],
-            temp_val_dict['total_digestibility'],
-            param_val_dict['CK1'], param_val_dict['CK2'],
-            param_val_dict['CM1'], param_val_dict['CM2'],
-            param_val_dict['CM3'], param_val_dict['CM4'],
-            param_val_dict['CM6'], param_val_dict['CM7'],
-            param_val_dict['CM16']]],
-        calc_energy_maintenance, temp_val_dict['energy_maintenance'],
-        gdal.GDT_Float32, _TARGET_NODATA)
-    pygeoprocessing.raster_calculator(
+            temp_val_dict['total_digestibility']]],
+        animal_param_op(
+            calc_energy_maintenance,
+            ['age', 'sex_int', 'W_total', None, None, None, 'CK1', 'CK2',
+                'CM1', 'CM2', 'CM3', 'CM4', 'CM6', 'CM7', 'CM16'],
+            animal_param_lookup),
+        temp_val_dict['energy_maintenance'], gdal.GDT_Float32, _TARGET_NODATA)
+    _raster_calculator(
         [(path, 1) for path in [
             temp_val_dict['total_crude_protein_intake'],
             temp_val_dict['total_digestibility']]],
@@ -12689,29 +16302,34 @@ def _calc_grazing_offtake(
         gdal.GDT_Float32, _TARGET_NODATA)
     calc_protein_req(
         temp_val_dict['energy_intake'], temp_val_dict['energy_maintenance'],
-        param_val_dict['CRD4'], param_val_dict['CRD5'], param_val_dict['CRD6'],
-        param_val_dict['CRD7'], current_month, temp_val_dict['protein_req'])
-    pygeoprocessing.raster_calculator(
+        animal_index_path, animal_param_lookup, current_month,
+        temp_val_dict['protein_req'],
+        latitude_input_path=aligned_inputs.get('latitude'))
+    _raster_calculator(
         [(path, 1) for path in [
-            param_val_dict['max_intake'], temp_val_dict['total_digestibility'],
+            animal_index_path, temp_val_dict['total_digestibility'],
             temp_val_dict['energy_intake'],
             temp_val_dict['energy_maintenance'],
-            temp_val_dict['degr_protein_intake'], temp_val_dict['protein_req'],
-            param_val_dict['type_int'], param_val_dict['CRD1'],
-            param_val_dict['CRD2']]],
-        revise_max_intake, temp_val_dict['max_intake_revised'],
-        gdal.GDT_Float32, _IC_NODATA)
+            temp_val_dict['degr_protein_intake'],
+            temp_val_dict['protein_req']]],
+        animal_param_op(
+            revise_max_intake,
+            ['max_intake', None, None, None, None, None, 'type_int', 'CRD1',
+                'CRD2'], animal_param_lookup),
+        temp_val_dict['max_intake_revised'], gdal.GDT_Float32, _IC_NODATA)
     # recalculate intake of each feed type according to reduced maximum intake
     for feed_type in ordered_feed_types:
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
+                animal_index_path,
                 aligned_inputs['proportion_legume_path'],
                 temp_val_dict['max_intake_revised'],
                 temp_val_dict['relative_availability_{}'.format(feed_type)],
                 temp_val_dict['relative_ingestibility_{}'.format(feed_type)],
-                temp_val_dict['relative_availability_sum'],
-                param_val_dict['CR2']]],
-            calc_daily_intake,
+                temp_val_dict['relative_availability_sum']]],
+            animal_param_op(
+                calc_daily_intake, [None, None, None, None, None, 'CR2'],
+                animal_param_lookup),
             temp_val_dict['daily_intake_{}'.format(feed_type)],
             gdal.GDT_Float32, _TARGET_NODATA)
 
@@ -12719,7 +16337,7 @@ def _calc_grazing_offtake(
     for pft_i in pft_id_set:
         pft_nodata = pygeoprocessing.get_raster_info(
             aligned_inputs['pft_{}'.format(pft_i)])['nodata'][0]
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 sv_reg['aglivc_{}_path'.format(pft_i)],
                 aligned_inputs['pft_{}'.format(pft_i)],
@@ -12727,7 +16345,7 @@ def _calc_grazing_offtake(
                 month_reg['animal_density'], temp_val_dict['max_fgrem']]],
             calc_fraction_removed, month_reg['flgrem_{}'.format(pft_i)],
             gdal.GDT_Float32, _TARGET_NODATA)
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 sv_reg['stdedc_{}_path'.format(pft_i)],
                 aligned_inputs['pft_{}'.format(pft_i)],
@@ -12952,8 +16570,8 @@ def _animal_diet_sufficiency(
         aligned_inputs (dict): map of key, path pairs indicating paths
             to aligned model inputs, including fractional cover of each plant
             functional type and animal spatial index
-        animal_trait_table (dict): map of animal id to dictionaries containing
-            animal parameters and traits
+        animal_trait_table (data frame): data frame of animal parameters and
+            traits indexed by animal id
         veg_trait_table (dict): map of pft id to dictionaries containing
             plant functional type parameters
         current_month (int): month of the year, such that current_month=1
@@ -13035,25 +16653,19 @@ def _animal_diet_sufficiency(
                 target_path = os.path.join(
                     temp_dir, '{}.tif'.format(value_string))
                 temp_val_dict[value_string] = target_path
-    param_val_dict = {}
-    # animal parameters
+    # animal parameters are looked up from the animal index in memory
     animal_index_path = aligned_inputs['animal_index']
-    for val in [
-            'type_int', 'reproductive_status_int', 'SRW_modified', 'sfw',
-            'age', 'sex_int', 'W_total', 'Z', 'BC', 'A_foet', 'A_y', 'CK1',
-            'CK2', 'CK5', 'CK6', 'CK8', 'CM1', 'CM2', 'CM3', 'CM4', 'CM6',
-            'CM7', 'CM16', 'CP1', 'CP4', 'CP5', 'CRD4', 'CRD5', 'CRD6', 'CRD7',
-            'CP8', 'CP9', 'CP10', 'CP15', 'CL0', 'CL1', 'CL2', 'CL3', 'CL5',
-            'CL6', 'CL15', 'CA1', 'CA2', 'CA3', 'CA4', 'CA6', 'CA7', 'CW1',
-            'CW2', 'CW3', 'CW5', 'CW6', 'CW7', 'CW8', 'CW9', 'CW12']:
-        target_path = os.path.join(temp_dir, '{}.tif'.format(val))
-        param_val_dict[val] = target_path
-        animal_to_val = dict(
-            [(animal_code, float(table[val])) for
-                (animal_code, table) in animal_trait_table.items()])
-        pygeoprocessing.reclassify_raster(
-            (animal_index_path, 1), animal_to_val, target_path,
-            gdal.GDT_Float32, _IC_NODATA)
+    diet_sufficiency_param_list = [
+        'type_int', 'reproductive_status_int', 'SRW_modified', 'sfw', 'age',
+        'Z', 'BC', 'A_foet', 'A_y', 'CK5', 'CK6', 'CK8', 'CP1', 'CP4', 'CP5',
+        'CP8', 'CP9', 'CP10', 'CP15', 'CL0', 'CL1', 'CL2', 'CL3', 'CL5', 'CL6',
+        'CL15', 'CA1', 'CA2', 'CA3', 'CA4', 'CA6', 'CA7', 'CW1', 'CW2', 'CW3',
+        'CW5', 'CW6', 'CW7', 'CW8', 'CW9', 'CW12']
+    animal_param_lookup = build_animal_param_lookup(
+        animal_trait_table, diet_sufficiency_param_list + [
+            'sex_int', 'W_total', 'CK1', 'CK2', 'CM1', 'CM2', 'CM3', 'CM4',
+            'CM6', 'CM7', 'CM16', 'CRD4', 'CRD5', 'CRD6', 'CRD7'])
+    param_val_dict = {}
     # pft parameters
     for val in ['digestibility_slope', 'digestibility_intercept']:
         for pft_i in pft_id_set:
@@ -13061,7 +16673,7 @@ def _animal_diet_sufficiency(
                 temp_dir, '{}_{}.tif'.format(val, pft_i))
             param_val_dict['{}_{}'.format(val, pft_i)] = target_path
             fill_val = veg_trait_table[pft_i][val]
-            pygeoprocessing.new_raster_from_base(
+            _new_raster_from_base(
                 sv_reg['aglivc_{}_path'.format(pft_i)], target_path,
                 gdal.GDT_Float32, [_IC_NODATA], fill_value_list=[fill_val])
 
@@ -13069,7 +16681,7 @@ def _animal_diet_sufficiency(
     for pft_i in pft_id_set:
         pft_nodata = pygeoprocessing.get_raster_info(
             aligned_inputs['pft_{}'.format(pft_i)])['nodata'][0]
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 sv_reg['aglivc_{}_path'.format(pft_i)],
                 aligned_inputs['pft_{}'.format(pft_i)],
@@ -13078,7 +16690,7 @@ def _animal_diet_sufficiency(
             daily_intake_from_fraction_removed,
             temp_val_dict['daily_intake_agliv_{}'.format(pft_i)],
             gdal.GDT_Float32, _TARGET_NODATA)
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 sv_reg['stdedc_{}_path'.format(pft_i)],
                 aligned_inputs['pft_{}'.format(pft_i)],
@@ -13089,7 +16701,7 @@ def _animal_diet_sufficiency(
             gdal.GDT_Float32, _TARGET_NODATA)
         for statv in ['agliv', 'stded']:
             # calculate digestibility of this feed type
-            pygeoprocessing.raster_calculator(
+            _raster_calculator(
                 [(path, 1) for path in [
                     sv_reg['{}c_{}_path'.format(statv, pft_i)],
                     sv_reg['{}e_1_{}_path'.format(statv, pft_i)],
@@ -13115,26 +16727,24 @@ def _animal_diet_sufficiency(
     calc_crude_protein_intake(
         sv_reg, temp_val_dict, feed_type_list,
         temp_val_dict['total_crude_protein_intake'])
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             temp_val_dict['total_intake'],
             temp_val_dict['total_digestibility']]],
         calc_energy_intake, temp_val_dict['energy_intake'],
         gdal.GDT_Float32, _TARGET_NODATA)
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
-            param_val_dict['age'], param_val_dict['sex_int'],
-            param_val_dict['W_total'], temp_val_dict['energy_intake'],
+            animal_index_path, temp_val_dict['energy_intake'],
             temp_val_dict['total_intake'],
-            temp_val_dict['total_digestibility'],
-            param_val_dict['CK1'], param_val_dict['CK2'],
-            param_val_dict['CM1'], param_val_dict['CM2'],
-            param_val_dict['CM3'], param_val_dict['CM4'],
-            param_val_dict['CM6'], param_val_dict['CM7'],
-            param_val_dict['CM16']]],
-        calc_energy_maintenance, temp_val_dict['energy_maintenance'],
-        gdal.GDT_Float32, _TARGET_NODATA)
-    pygeoprocessing.raster_calculator(
+            temp_val_dict['total_digestibility']]],
+        animal_param_op(
+            calc_energy_maintenance,
+            ['age', 'sex_int', 'W_total', None, None, None, 'CK1', 'CK2',
+                'CM1', 'CM2', 'CM3', 'CM4', 'CM6', 'CM7', 'CM16'],
+            animal_param_lookup),
+        temp_val_dict['energy_maintenance'], gdal.GDT_Float32, _TARGET_NODATA)
+    _raster_calculator(
         [(path, 1) for path in [
             temp_val_dict['total_crude_protein_intake'],
             temp_val_dict['total_digestibility']]],
@@ -13142,40 +16752,23 @@ def _animal_diet_sufficiency(
         gdal.GDT_Float32, _TARGET_NODATA)
     calc_protein_req(
         temp_val_dict['energy_intake'], temp_val_dict['energy_maintenance'],
-        param_val_dict['CRD4'], param_val_dict['CRD5'], param_val_dict['CRD6'],
-        param_val_dict['CRD7'], current_month, temp_val_dict['protein_req'])
+        animal_index_path, animal_param_lookup, current_month,
+        temp_val_dict['protein_req'],
+        latitude_input_path=aligned_inputs.get('latitude'))
 
     # calculate diet sufficiency: ratio of energy intake to energy requirements
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
-            temp_val_dict['total_intake'], temp_val_dict['energy_intake'],
+            animal_index_path, temp_val_dict['total_intake'],
+            temp_val_dict['energy_intake'],
             temp_val_dict['energy_maintenance'],
             temp_val_dict['total_crude_protein_intake'],
-            temp_val_dict['degr_protein_intake'], temp_val_dict['protein_req'],
-            param_val_dict['type_int'],
-            param_val_dict['reproductive_status_int'],
-            param_val_dict['SRW_modified'], param_val_dict['sfw'],
-            param_val_dict['age'], param_val_dict['Z'],
-            param_val_dict['BC'], param_val_dict['A_foet'],
-            param_val_dict['A_y'], param_val_dict['CK5'],
-            param_val_dict['CK6'], param_val_dict['CK8'],
-            param_val_dict['CP1'], param_val_dict['CP4'],
-            param_val_dict['CP5'], param_val_dict['CP8'],
-            param_val_dict['CP9'], param_val_dict['CP10'],
-            param_val_dict['CP15'], param_val_dict['CL0'],
-            param_val_dict['CL1'], param_val_dict['CL2'],
-            param_val_dict['CL3'], param_val_dict['CL5'],
-            param_val_dict['CL6'], param_val_dict['CL15'],
-            param_val_dict['CA1'], param_val_dict['CA2'],
-            param_val_dict['CA3'], param_val_dict['CA4'],
-            param_val_dict['CA6'], param_val_dict['CA7'],
-            param_val_dict['CW1'], param_val_dict['CW2'],
-            param_val_dict['CW3'], param_val_dict['CW5'],
-            param_val_dict['CW6'], param_val_dict['CW7'],
-            param_val_dict['CW8'], param_val_dict['CW9'],
-            param_val_dict['CW12']]],
-        calc_diet_sufficiency, month_reg['diet_sufficiency'],
-        gdal.GDT_Float32, _TARGET_NODATA)
+            temp_val_dict['degr_protein_intake'],
+            temp_val_dict['protein_req']]],
+        animal_param_op(
+            calc_diet_sufficiency, [None] * 6 + diet_sufficiency_param_list,
+            animal_param_lookup),
+        month_reg['diet_sufficiency'], gdal.GDT_Float32, _TARGET_NODATA)
 
     # clean up temporary files
     shutil.rmtree(temp_dir)
@@ -13208,112 +16801,349 @@ def calc_animal_density(
         animal_density, density of grazing animals inside animal management
             polygons, in animals/ha
 
-    """
-    default_mask = (
-        (total_animals != _TARGET_NODATA))
-    valid_mask = (
-        (biomass_diff != _TARGET_NODATA) &
-        (sum_biomass_diff != _TARGET_NODATA) &
-        (sum_biomass_diff > 0) &
-        (default_mask))
-    animals_per_pixel = numpy.empty(biomass_diff.shape, dtype=numpy.float32)
-    animals_per_pixel[:] = _TARGET_NODATA
-    animals_per_pixel[valid_mask] = (
-        (biomass_diff[valid_mask] / sum_biomass_diff[valid_mask]) *
-        total_animals[valid_mask])
-    animal_density = numpy.empty(biomass_diff.shape, dtype=numpy.float32)
-    animal_density[:] = _TARGET_NODATA
-    animal_density[default_mask] = 0
-    animal_density[valid_mask] = animals_per_pixel[valid_mask] / pixel_area_ha
-    return animal_density
+    """
+    default_mask = (
+        (total_animals != _TARGET_NODATA))
+    valid_mask = (
+        (biomass_diff != _TARGET_NODATA) &
+        (sum_biomass_diff != _TARGET_NODATA) &
+        (sum_biomass_diff > 0) &
+        (default_mask))
+    animals_per_pixel = numpy.empty(biomass_diff.shape, dtype=numpy.float32)
+    animals_per_pixel[:] = _TARGET_NODATA
+    animals_per_pixel[valid_mask] = (
+        (biomass_diff[valid_mask] / sum_biomass_diff[valid_mask]) *
+        total_animals[valid_mask])
+    animal_density = numpy.empty(biomass_diff.shape, dtype=numpy.float32)
+    animal_density[:] = _TARGET_NODATA
+    animal_density[default_mask] = 0
+    animal_density[valid_mask] = animals_per_pixel[valid_mask] / pixel_area_ha
+    return animal_density
+
+
+def add_shp_id_field(base_vector_path, target_vector_path):
+    """Copy FID values into a new field called "shp_id".
+
+    Make a copy of the vector layer indicated by `base_vector_path`, and edit
+    the attribute table of the new vector layer by copying the values from the
+    FID field to a new field, "shp_id".
+
+    Side effects:
+        creates the vector layer indicated by `target_vector_path`
+
+    Returns:
+        None
+
+    """
+    base_vector = gdal.OpenEx(base_vector_path, gdal.OF_VECTOR)
+    base_layer = base_vector.GetLayer(0)
+    layer_dfn = base_layer.GetLayerDefn()
+    base_sr = osr.SpatialReference(base_layer.GetSpatialRef().ExportToWkt())
+
+    target_driver = ogr.GetDriverByName('ESRI Shapefile')
+    target_vector = target_driver.CreateDataSource(target_vector_path)
+    target_layer = target_vector.CreateLayer(
+        layer_dfn.GetName(), base_sr, layer_dfn.GetGeomType())
+
+    # copy all fields from original vector to modified vector
+    for fld_index in range(layer_dfn.GetFieldCount()):
+        original_field = layer_dfn.GetFieldDefn(fld_index)
+        field_name = original_field.GetName()
+        target_field = ogr.FieldDefn(
+            field_name, original_field.GetType())
+        target_field.SetWidth(24)
+        target_field.SetPrecision(11)
+        target_layer.CreateField(target_field)
+
+    # copy all features from original vector to modified vector
+    for feature in base_layer:
+        target_layer.CreateFeature(feature)
+
+    # copy FID to new field
+    new_field = ogr.FieldDefn('shp_id', ogr.OFTInteger)
+    target_layer.CreateField(new_field)
+    for feature in target_layer:
+        fid_val = int(feature.GetFID())
+        feature.SetField('shp_id', fid_val)
+        target_layer.SetFeature(feature)
+
+    # clean up
+    base_vector = None
+    base_layer = None
+    target_vector = None
+    target_layer = None
+
+
+def _rasterize_grazing_areas(
+        animal_grazing_areas_path, template_raster_path,
+        grazing_area_id_path, total_animals_path):
+    """Rasterize grazing area polygons once for the whole model run.
+
+    The location and number of grazing animals do not change over the course
+    of the model run, so the identity of the grazing area polygon covering
+    each pixel and the number of animals inside that polygon are rasterized
+    once and reused at each model step.
+
+    Parameters:
+        animal_grazing_areas_path (string): path to animal vector inputs giving
+            the location of grazing animals, including the field 'num_animal'
+        template_raster_path (string): path to raster that should be used as a
+            template for the target rasters
+        grazing_area_id_path (string): path to raster that should contain the
+            FID of the grazing area polygon covering each pixel
+        total_animals_path (string): path to raster that should contain the
+            total number of animals inside the grazing area polygon covering
+            each pixel
+
+    Side effects:
+        creates the raster indicated by `grazing_area_id_path`
+        creates the raster indicated by `total_animals_path`
+
+    Returns:
+        None
+
+    """
+    temp_dir = tempfile.mkdtemp(dir=PROCESSING_DIR)
+    animal_mgmt_copy_path = os.path.join(temp_dir, 'animal_mgmt_copy.shp')
+    add_shp_id_field(animal_grazing_areas_path, animal_mgmt_copy_path)
+    _new_raster_from_base(
+        template_raster_path, grazing_area_id_path, gdal.GDT_Int32,
+        [_TARGET_NODATA], fill_value_list=[_TARGET_NODATA])
+    pygeoprocessing.rasterize(
+        animal_mgmt_copy_path, grazing_area_id_path,
+        option_list=["ATTRIBUTE=shp_id"])
+
+    _new_raster_from_base(
+        template_raster_path, total_animals_path, gdal.GDT_Float32,
+        [_TARGET_NODATA], fill_value_list=[_TARGET_NODATA])
+    pygeoprocessing.rasterize(
+        animal_grazing_areas_path, total_animals_path,
+        option_list=["ATTRIBUTE=num_animal"])
+
+    # clean up temporary files
+    shutil.rmtree(temp_dir)
+
+
+def sum_c_to_biomass(sum_aglivc, sum_stdedc):
+    """Calculate total aboveground biomass from carbon.
+
+    Biomass in kg/ha is calculated from the state variables representing
+    grams of carbon per square meter, entailing two conversion steps:
+    multiply by 2.5 to get biomass, and multiply by 10 to get kg/ha from
+    g/m2.
+
+    Parameters:
+        sum_aglivc (numpy.ndarray): derived, sum of carbon in aboveground live
+            biomass across plant functional types weighted by cover of each
+            plant functional type
+        sum_stdedc (numpy.ndarray): derived, sum of carbon in aboveground
+            standing dead biomass across plant functional types weighted by
+            cover of each plant functional type
+
+    Returns:
+        total_biomass, kg of biomass per ha
+
+    """
+    valid_mask = (
+        (sum_aglivc != _TARGET_NODATA) &
+        (sum_stdedc != _TARGET_NODATA))
+    total_biomass = numpy.empty(sum_aglivc.shape, dtype=numpy.float32)
+    total_biomass[:] = _TARGET_NODATA
+    total_biomass[valid_mask] = (
+        (sum_aglivc[valid_mask] + sum_stdedc[valid_mask]) * 2.5 * 10)
+    return total_biomass
+
+
+def _eo_biomass_param_rasters(site_index_path, site_param_table, target_dir):
+    """Map the regression of biomass on vegetation index to each pixel.
+
+    Parameters:
+        site_index_path (string): path to site spatial index raster
+        site_param_table (dict): map of site spatial index to dictionaries
+            that contain site-level parameters, including slope and intercept
+            of relationship between NDVI and biomass
+        target_dir (string): path to directory where parameter rasters should
+            be written
+
+    Returns:
+        dictionary mapping 'eo_biomass_intercept' and 'eo_biomass_slope' to
+            paths to rasters containing the value of each parameter
+
+    """
+    param_val_dict = {}
+    for val in ['eo_biomass_intercept', 'eo_biomass_slope']:
+        target_path = os.path.join(target_dir, '{}.tif'.format(val))
+        param_val_dict[val] = target_path
+        site_to_val = dict(
+            [(site_code, float(table[val])) for
+                (site_code, table) in site_param_table.items()])
+        pygeoprocessing.reclassify_raster(
+            (site_index_path, 1), site_to_val, target_path,
+            gdal.GDT_Float32, _IC_NODATA)
+    return param_val_dict
+
+
+def _calc_observed_biomass(EO_index_path, param_val_dict, obs_biomass_path):
+    """Calculate observed biomass for one month from a vegetation index.
+
+    Observed biomass depends only on the vegetation index and site
+    parameters, and not on the state of the model, so it may be calculated
+    for any month ahead of time.
+
+    Parameters:
+        EO_index_path (string): path to aligned remotely sensed vegetation
+            index for the month
+        param_val_dict (dict): map of 'eo_biomass_intercept' and
+            'eo_biomass_slope' to paths to parameter rasters created by
+            `_eo_biomass_param_rasters`
+        obs_biomass_path (string): path to raster that should contain
+            observed biomass
+
+    Side effects:
+        creates or modifies the raster indicated by `obs_biomass_path`
+
+    Returns:
+        None
+
+    """
+    def calc_observed_biomass(
+            EO_index, EO_biomass_intercept, EO_biomass_slope):
+        """Calculate observed biomass from a remotely sensed vegetation index.
+
+        Observed biomass is calculated via linear regression from a vegetation
+        index derived from earth observations.  The linear regression is
+        assumed to apply to total standing biomass in kg per ha.
+
+        EO_index (numpy.ndarray): input, remotely sensed vegetation index for
+            the current month
+        EO_biomass_intercept (numpy.ndarray): parameter, intercept of linear
+            regression to predict total biomass from the vegetation index
+        EO_biomass_slope (numpy.ndarray): parameter, slope of linear regression
+            to predict total biomass from the vegetation index
+
+        Returns:
+            biomass_obs, observed total biomass
+
+        """
+        valid_mask = (
+            (~numpy.isclose(EO_index, EO_nodata)) &
+            (EO_biomass_intercept != _IC_NODATA) &
+            (EO_biomass_slope != _IC_NODATA))
+        biomass_obs = numpy.empty(EO_index.shape, dtype=numpy.float32)
+        biomass_obs[:] = _TARGET_NODATA
+        biomass_obs[valid_mask] = numpy.clip(
+            EO_index[valid_mask] * EO_biomass_slope[valid_mask] +
+            EO_biomass_intercept[valid_mask], 0., None)
+        return biomass_obs
+
+    EO_nodata = pygeoprocessing.get_raster_info(EO_index_path)['nodata'][0]
+    _raster_calculator(
+        [(path, 1) for path in [
+            EO_index_path, param_val_dict['eo_biomass_intercept'],
+            param_val_dict['eo_biomass_slope']]],
+        calc_observed_biomass, obs_biomass_path, gdal.GDT_Float32,
+        _TARGET_NODATA)
+
+
+class _ObservedBiomassPrePass(object):
+    """Calculate observed biomass of coming months in background threads.
+
+    Observed biomass does not depend on the state of the model, so it is
+    calculated ahead of the monthly loop, which waits for the result of a
+    month only when it estimates animal density for that month.
+
+    """
+
+    def __init__(self, site_index_path, site_param_table, n_workers=2):
+        """Map the regression parameters and start the worker threads.
+
+        Parameters:
+            site_index_path (string): path to site spatial index raster
+            site_param_table (dict): map of site spatial index to
+                dictionaries that contain site-level parameters
+            n_workers (int): number of months calculated at once
+
+        Returns:
+            None
 
+        """
+        self.param_dir = tempfile.mkdtemp(dir=PROCESSING_DIR)
+        self.param_val_dict = _eo_biomass_param_rasters(
+            site_index_path, site_param_table, self.param_dir)
+        self.pending_result_map = {}
+        self.worker_pool = multiprocessing.pool.ThreadPool(n_workers)
 
-def add_shp_id_field(base_vector_path, target_vector_path):
-    """Copy FID values into a new field called "shp_id".
+    def submit(self, EO_index_path, obs_biomass_path):
+        """Start calculating observed biomass for one month.
 
-    Make a copy of the vector layer indicated by `base_vector_path`, and edit
-    the attribute table of the new vector layer by copying the values from the
-    FID field to a new field, "shp_id".
+        Parameters:
+            EO_index_path (string): path to aligned vegetation index
+            obs_biomass_path (string): path to raster that should contain
+                observed biomass
 
-    Side effects:
-        creates the vector layer indicated by `target_vector_path`
+        Returns:
+            None
 
-    Returns:
-        None
+        """
+        if obs_biomass_path not in self.pending_result_map:
+            self.pending_result_map[obs_biomass_path] = (
+                self.worker_pool.apply_async(
+                    _calc_observed_biomass, (
+                        EO_index_path, self.param_val_dict,
+                        obs_biomass_path)))
 
-    """
-    base_vector = gdal.OpenEx(base_vector_path, gdal.OF_VECTOR)
-    base_layer = base_vector.GetLayer(0)
-    layer_dfn = base_layer.GetLayerDefn()
-    base_sr = osr.SpatialReference(base_layer.GetSpatialRef().ExportToWkt())
+    def wait(self, obs_biomass_path):
+        """Wait until observed biomass for one month has been written.
 
-    target_driver = ogr.GetDriverByName('ESRI Shapefile')
-    target_vector = target_driver.CreateDataSource(target_vector_path)
-    target_layer = target_vector.CreateLayer(
-        layer_dfn.GetName(), base_sr, layer_dfn.GetGeomType())
+        Parameters:
+            obs_biomass_path (string): path passed to `submit`
 
-    # copy all fields from original vector to modified vector
-    for fld_index in range(layer_dfn.GetFieldCount()):
-        original_field = layer_dfn.GetFieldDefn(fld_index)
-        field_name = original_field.GetName()
-        target_field = ogr.FieldDefn(
-            field_name, original_field.GetType())
-        target_field.SetWidth(24)
-        target_field.SetPrecision(11)
-        target_layer.CreateField(target_field)
+        Raises:
+            KeyError if observed biomass was not submitted for this path
 
-    # copy all features from original vector to modified vector
-    for feature in base_layer:
-        target_layer.CreateFeature(feature)
+        Returns:
+            None
 
-    # copy FID to new field
-    new_field = ogr.FieldDefn('shp_id', ogr.OFTInteger)
-    target_layer.CreateField(new_field)
-    for feature in target_layer:
-        fid_val = int(feature.GetFID())
-        feature.SetField('shp_id', fid_val)
-        target_layer.SetFeature(feature)
+        """
+        self.pending_result_map.pop(obs_biomass_path).get()
 
-    # clean up
-    base_vector = None
-    base_layer = None
-    target_vector = None
-    target_layer = None
+    def close(self):
+        """Stop the worker threads and remove parameter rasters."""
+        self.worker_pool.terminate()
+        self.worker_pool.join()
+        shutil.rmtree(self.param_dir)
 
 
-def sum_c_to_biomass(sum_aglivc, sum_stdedc):
-    """Calculate total aboveground biomass from carbon.
+def _pixel_area_ha(raster_path):
+    """Get pixel area in ha from dataset in geographic coordinates.
 
-    Biomass in kg/ha is calculated from the state variables representing
-    grams of carbon per square meter, entailing two conversion steps:
-    multiply by 2.5 to get biomass, and multiply by 10 to get kg/ha from
-    g/m2.
+    Calculate the approximate area in hectares of pixels in `raster_path`,
+    assuming that one degree of latitude equals 111139 meters. Use the
+    average latitude over the bounding box of `raster_path` to estimate the
+    horizontal pixel length.
 
     Parameters:
-        sum_aglivc (numpy.ndarray): derived, sum of carbon in aboveground live
-            biomass across plant functional types weighted by cover of each
-            plant functional type
-        sum_stdedc (numpy.ndarray): derived, sum of carbon in aboveground
-            standing dead biomass across plant functional types weighted by
-            cover of each plant functional type
+        raster_path (string): path to a raster dataset in geographic
+            coordinates
 
     Returns:
-        total_biomass, kg of biomass per ha
-
+        pixel_area_ha (float): approximate pixel area in hectares
     """
-    valid_mask = (
-        (sum_aglivc != _TARGET_NODATA) &
-        (sum_stdedc != _TARGET_NODATA))
-    total_biomass = numpy.empty(sum_aglivc.shape, dtype=numpy.float32)
-    total_biomass[:] = _TARGET_NODATA
-    total_biomass[valid_mask] = (
-        (sum_aglivc[valid_mask] + sum_stdedc[valid_mask]) * 2.5 * 10)
-    return total_biomass
+    raster_info = pygeoprocessing.get_raster_info(raster_path)
+    bounding_box = raster_info['bounding_box']
+    average_latitude = (bounding_box[1] + bounding_box[3]) / 2.
+    pixel_y_length_m = abs(raster_info['pixel_size'][1]) * 111139.
+    pixel_x_length_m = abs(
+        raster_info['pixel_size'][0]) * numpy.cos(
+        numpy.radians(average_latitude)) * 111139.
+    pixel_area_ha = (pixel_y_length_m * pixel_x_length_m) / 10000.0
+    return pixel_area_ha
 
 
 def _estimate_animal_density(
-        aligned_inputs, month_index, pft_id_set, site_param_table,
-        animal_grazing_areas_path, sv_reg, obs_biomass_path, month_reg):
+        aligned_inputs, month_index, pft_id_set, site_param_table, sv_reg,
+        obs_biomass_path, month_reg, calculate_observed_biomass=True,
+        potential_biomass_path=None):
     """Estimate the density of grazing animals on each pixel of the study area.
 
     Calculate observed biomass for the current month from a remotely sensed
@@ -13328,15 +17158,14 @@ def _estimate_animal_density(
         aligned_inputs (dict): map of key, path pairs indicating paths
             to aligned model inputs, including fractional cover of each plant
             functional type, remotely sensed vegetation index for the current
-            month and site spatial index
+            month, site spatial index, and the grazing area id and total
+            animals rasters created by `_rasterize_grazing_areas`
         month_index (int): month of the simulation, such that month_index=13
             indicates month 13 of the simulation
         pft_id_set (set): set of integers identifying plant functional types
         site_param_table (dict): map of site spatial index to dictionaries
             that contain site-level parameters, including slope and intercept
             of relationship between NDVI and biomass
-        animal_grazing_areas_path (string): path to animal vector inputs giving
-            the location of grazing animals
         sv_reg (dict): map of key, path pairs giving paths to state variables,
             including carbon in aboveground biomass for each plant functional
             type
@@ -13345,44 +17174,22 @@ def _estimate_animal_density(
         month_reg (dict): map of key, path pairs giving paths to intermediate
             calculated values that are shared between submodels, including
             estimated animal density
+        calculate_observed_biomass (bool): if False, observed biomass was
+            calculated ahead of time by `_ObservedBiomassPrePass` and is read
+            from `obs_biomass_path`
+        potential_biomass_path (string): optional, path to raster where
+            potential biomass in the absence of grazing should be kept, so
+            that it can be written to outputs without calculating it again
 
     Side effects:
         creates a geotiff raster of observed biomass calculated from remotely
             sensed vegetation index at the location indicated by
-            `obs_biomass_path`
+            `obs_biomass_path`, if `calculate_observed_biomass` is True
         creates or modifies the raster indicated by month_reg['animal_density']
+        creates or modifies the raster indicated by `potential_biomass_path`,
+            if supplied
 
     """
-    def calc_observed_biomass(
-            EO_index, EO_biomass_intercept, EO_biomass_slope):
-        """Calculate observed biomass from a remotely sensed vegetation index.
-
-        Observed biomass is calculated via linear regression from a vegetation
-        index derived from earth observations.  The linear regression is
-        assumed to apply to total standing biomass in kg per ha.
-
-        EO_index (numpy.ndarray): input, remotely sensed vegetation index for
-            the current month
-        EO_biomass_intercept (numpy.ndarray): parameter, intercept of linear
-            regression to predict total biomass from the vegetation index
-        EO_biomass_slope (numpy.ndarray): parameter, slope of linear regression
-            to predict total biomass from the vegetation index
-
-        Returns:
-            biomass_obs, observed total biomass
-
-        """
-        valid_mask = (
-            (~numpy.isclose(EO_index, EO_nodata)) &
-            (EO_biomass_intercept != _IC_NODATA) &
-            (EO_biomass_slope != _IC_NODATA))
-        biomass_obs = numpy.empty(EO_index.shape, dtype=numpy.float32)
-        biomass_obs[:] = _TARGET_NODATA
-        biomass_obs[valid_mask] = numpy.clip(
-            EO_index[valid_mask] * EO_biomass_slope[valid_mask] +
-            EO_biomass_intercept[valid_mask], 0., None)
-        return biomass_obs
-
     def calc_potential_biomass(
             aligned_inputs, sv_reg, pft_id_set, potential_biomass_path):
         """Sum total aboveground biomass across modeled plant functional types.
@@ -13423,7 +17230,7 @@ def _estimate_animal_density(
         weighted_state_variable_sum(
             'stdedc', sv_reg, aligned_inputs, pft_id_set,
             temp_val_dict['weighted_sum_stdedc'])
-        pygeoprocessing.raster_calculator(
+        _raster_calculator(
             [(path, 1) for path in [
                 temp_val_dict['weighted_sum_aglivc'],
                 temp_val_dict['weighted_sum_stdedc']]],
@@ -13462,107 +17269,73 @@ def _estimate_animal_density(
             biomass_potential[valid_mask] - biomass_obs[valid_mask])
         return biomass_diff
 
-    def get_pixel_area_ha(raster_path):
-        """Get pixel area in ha from dataset in geographic coordinates.
-
-        Calculate the approximate area in hectares of pixels in `raster_path`,
-        assuming that one degree of latitude equals 111139 meters. Use the
-        average latitude over the bounding box of `raster_path` to estimate the
-        horizontal pixel length.
+    def grazing_area_density_op(
+            biomass_diff, grazing_area_id, total_animals,
+            sum_biomass_diff_by_id, pixel_area_ha):
+        """Calculate animal density from per-polygon sums of biomass_diff.
 
         Parameters:
-            raster_path (string): path to a raster dataset in geographic
-                coordinates
+            biomass_diff (numpy.ndarray): derived, difference between observed
+                and predicted biomass
+            grazing_area_id (numpy.ndarray): input, FID of the grazing area
+                polygon covering each pixel
+            total_animals (numpy.ndarray): input, total number of grazing
+                animals inside animal management polygons
+            sum_biomass_diff_by_id (numpy.ndarray): derived, sum of
+                biomass_diff inside each grazing area polygon, indexed by FID
+            pixel_area_ha (float): derived, pixel area in ha
 
         Returns:
-            pixel_area_ha (float): approximate pixel area in hectares
+            animal_density, density of grazing animals inside animal
+                management polygons, in animals/ha
+
         """
-        raster_info = pygeoprocessing.get_raster_info(raster_path)
-        bounding_box = raster_info['bounding_box']
-        average_latitude = (bounding_box[1] + bounding_box[3]) / 2.
-        pixel_y_length_m = abs(raster_info['pixel_size'][1]) * 111139.
-        pixel_x_length_m = abs(
-            raster_info['pixel_size'][0]) * numpy.cos(
-            numpy.radians(average_latitude)) * 111139.
-        pixel_area_ha = (pixel_y_length_m * pixel_x_length_m) / 10000.0
-        return pixel_area_ha
+        valid_mask = (
+            (grazing_area_id >= 0) &
+            (grazing_area_id < sum_biomass_diff_by_id.size))
+        sum_biomass_diff = numpy.empty(biomass_diff.shape, dtype=numpy.float32)
+        sum_biomass_diff[:] = _TARGET_NODATA
+        sum_biomass_diff[valid_mask] = sum_biomass_diff_by_id[
+            grazing_area_id[valid_mask]]
+        return calc_animal_density(
+            biomass_diff, sum_biomass_diff, total_animals, pixel_area_ha)
 
     temp_dir = tempfile.mkdtemp(dir=PROCESSING_DIR)
     temp_val_dict = {}
-    for val in [
-            'biomass_potential', 'biomass_diff', 'animal_mgmt_features',
-            'total_animals', 'sum_biomass_diff', 'proportional_diff']:
+    for val in ['biomass_potential', 'biomass_diff']:
         temp_val_dict[val] = os.path.join(temp_dir, '{}.tif'.format(val))
-    temp_val_dict['animal_mgmt_copy'] = os.path.join(
-        temp_dir, 'animal_mgmt_copy.shp')
-    param_val_dict = {}
-    for val in ['eo_biomass_intercept', 'eo_biomass_slope']:
-        target_path = os.path.join(temp_dir, '{}.tif'.format(val))
-        param_val_dict[val] = target_path
-        site_to_val = dict(
-            [(site_code, float(table[val])) for
-                (site_code, table) in site_param_table.items()])
-        pygeoprocessing.reclassify_raster(
-            (aligned_inputs['site_index'], 1), site_to_val, target_path,
-            gdal.GDT_Float32, _IC_NODATA)
-
-    EO_nodata = pygeoprocessing.get_raster_info(
-        aligned_inputs['EO_index_{}'.format(month_index)])['nodata'][0]
-    pygeoprocessing.raster_calculator(
-        [(path, 1) for path in [
+    if potential_biomass_path:
+        temp_val_dict['biomass_potential'] = potential_biomass_path
+    if calculate_observed_biomass:
+        param_val_dict = _eo_biomass_param_rasters(
+            aligned_inputs['site_index'], site_param_table, temp_dir)
+        _calc_observed_biomass(
             aligned_inputs['EO_index_{}'.format(month_index)],
-            param_val_dict['eo_biomass_intercept'],
-            param_val_dict['eo_biomass_slope']]],
-        calc_observed_biomass, obs_biomass_path, gdal.GDT_Float32,
-        _TARGET_NODATA)
+            param_val_dict, obs_biomass_path)
     calc_potential_biomass(
         aligned_inputs, sv_reg, pft_id_set, temp_val_dict['biomass_potential'])
 
     # calculate biomass mismatch, setting negative pixels to 0
-    pygeoprocessing.raster_calculator(
+    _raster_calculator(
         [(path, 1) for path in [
             obs_biomass_path, temp_val_dict['biomass_potential']]],
         calc_biomass_diff, temp_val_dict['biomass_diff'],
         gdal.GDT_Float32, _TARGET_NODATA)
 
     # calculate the sum of biomass_diff within animal management polygons
-    biomass_diff_table = pygeoprocessing.zonal_statistics(
-        (temp_val_dict['biomass_diff'], 1), animal_grazing_areas_path,
-        polygons_might_overlap=False)
-
-    # generate raster with the sum of biomass diff within animal polygons
-    add_shp_id_field(
-        animal_grazing_areas_path, temp_val_dict['animal_mgmt_copy'])
-    pygeoprocessing.new_raster_from_base(
-        aligned_inputs['animal_index'], temp_val_dict['animal_mgmt_features'],
-        gdal.GDT_Float32, [_TARGET_NODATA], fill_value_list=[_TARGET_NODATA])
-    pygeoprocessing.rasterize(
-        temp_val_dict['animal_mgmt_copy'],
-        temp_val_dict['animal_mgmt_features'],
-        option_list=["ATTRIBUTE=shp_id"])
-    feature_to_val = dict(
-        [(fid, float(table['sum'])) for fid, table in
-            biomass_diff_table.items()])
-    pygeoprocessing.reclassify_raster(
-        (temp_val_dict['animal_mgmt_features'], 1), feature_to_val,
-        temp_val_dict['sum_biomass_diff'], gdal.GDT_Float32, _TARGET_NODATA)
-
-    # generate raster of total animals from animal management polygon
-    pygeoprocessing.new_raster_from_base(
-        aligned_inputs['animal_index'], temp_val_dict['total_animals'],
-        gdal.GDT_Float32, [_TARGET_NODATA], fill_value_list=[_TARGET_NODATA])
-    pygeoprocessing.rasterize(
-        animal_grazing_areas_path, temp_val_dict['total_animals'],
-        option_list=["ATTRIBUTE=num_animal"])
+    zone_sum, _ = zonal_sum_and_count(
+        [temp_val_dict['biomass_diff']], aligned_inputs['grazing_area_id'])
+    sum_biomass_diff_by_id = zone_sum[0].astype(numpy.float32)
 
     # calculate animals per ha from animals per pixel
-    pixel_area_ha = get_pixel_area_ha(aligned_inputs['animal_index'])
-    pygeoprocessing.raster_calculator(
+    pixel_area_ha = _pixel_area_ha(aligned_inputs['animal_index'])
+    _raster_calculator(
         [(path, 1) for path in [
-            temp_val_dict['biomass_diff'], temp_val_dict['sum_biomass_diff'],
-            temp_val_dict['total_animals']]] + [(pixel_area_ha, 'raw')],
-        calc_animal_density, month_reg['animal_density'], gdal.GDT_Float32,
-        _TARGET_NODATA)
+            temp_val_dict['biomass_diff'], aligned_inputs['grazing_area_id'],
+            aligned_inputs['total_animals']]] + [
+            (sum_biomass_diff_by_id, 'raw'), (pixel_area_ha, 'raw')],
+        grazing_area_density_op, month_reg['animal_density'],
+        gdal.GDT_Float32, _TARGET_NODATA)
 
     # clean up temporary files
     shutil.rmtree(temp_dir)
@@ -13570,7 +17343,9 @@ def _estimate_animal_density(
 
 def _write_monthly_outputs(
         aligned_inputs, provisional_sv_reg, sv_reg, month_reg, pft_id_set,
-        current_year, current_month, output_dir):
+        current_year, current_month, output_dir, output_stack=None,
+        output_list=None, potential_biomass_path=None,
+        summary_table_path=None, quantize_outputs=False):
     """Collect outputs from current state variable and monthly directories.
 
     Collect model outputs from the ending state of the model at the current
@@ -13592,9 +17367,27 @@ def _write_monthly_outputs(
         current_month (int): current month of the year, such that
             current_month=1 indicates January
         output_dir (string): path to directory where outputs should be written
+        output_stack (_MonthlyOutputStack): optional, time-stacked rasters
+            that outputs should be written to instead of one raster per
+            output in `output_dir`
+        output_list (list): optional, names of the outputs that should be
+            written. Outputs that are not listed are not calculated. By
+            default all outputs are written
+        potential_biomass_path (string): optional, path to potential biomass
+            calculated already from `provisional_sv_reg` by
+            `_estimate_animal_density`. If supplied, potential biomass is not
+            calculated again
+        summary_table_path (string): optional, path to table where
+            summaries of biomass, animal density and diet sufficiency inside
+            the study area and inside each grazing area should be appended
+        quantize_outputs (bool): if True, outputs in `output_dir` are
+            written as scaled 16-bit integers by `_write_quantized_raster`.
+            Quantization of stacked outputs is set by `output_stack`
 
     Side effects:
-        creates the following rasters in the output_dir directory:
+        creates the following rasters in the output_dir directory, if they
+        are included in `output_list`, or writes the band of the current
+        month to the raster of each output in `output_stack`:
             potential_biomass_<year>_<month>.tif, total modeled biomass in
                 kg/ha in the absence of grazing, including live and
                 standing dead fractions of all plant functional types
@@ -13606,11 +17399,17 @@ def _write_monthly_outputs(
             diet_sufficiency_<year>_<month>.tif, ratio of metabolizable
                 energy intake to maintenance energy requirements on pixels
                 where animals grazed
+        appends summaries of the current month to the table indicated by
+            `summary_table_path`, if supplied
 
     Returns:
         None
 
     """
+    if output_list is None:
+        output_list = [
+            'potential_biomass', 'standing_biomass', 'animal_density',
+            'diet_sufficiency']
     temp_dir = tempfile.mkdtemp(dir=PROCESSING_DIR)
     temp_val_dict = {}
     for val in ['weighted_sum_aglivc', 'weighted_sum_stdedc']:
@@ -13620,48 +17419,394 @@ def _write_monthly_outputs(
     for val in [
             'potential_biomass', 'standing_biomass', 'animal_density',
             'diet_sufficiency']:
-        output_val_dict[val] = os.path.join(
+        if output_stack or quantize_outputs or val not in output_list:
+            output_val_dict[val] = os.path.join(
+                temp_dir, '{}.tif'.format(val))
+        else:
+            output_val_dict[val] = os.path.join(
+                output_dir, '{}_{}_{}.tif'.format(
+                    val, current_year, current_month))
+
+    # outputs that are calculated elsewhere are copied from these rasters
+    source_path_dict = {
+        'animal_density': month_reg['animal_density'],
+        'diet_sufficiency': month_reg['diet_sufficiency'],
+    }
+    if 'potential_biomass' in output_list or summary_table_path:
+        if potential_biomass_path:
+            source_path_dict['potential_biomass'] = potential_biomass_path
+        else:
+            # total weighted C in aboveground biomass in the absence of
+            #   grazing
+            weighted_state_variable_sum(
+                'aglivc', provisional_sv_reg, aligned_inputs, pft_id_set,
+                temp_val_dict['weighted_sum_aglivc'])
+            weighted_state_variable_sum(
+                'stdedc', provisional_sv_reg, aligned_inputs, pft_id_set,
+                temp_val_dict['weighted_sum_stdedc'])
+            _raster_calculator(
+                [(path, 1) for path in [
+                    temp_val_dict['weighted_sum_aglivc'],
+                    temp_val_dict['weighted_sum_stdedc']]],
+                sum_c_to_biomass, output_val_dict['potential_biomass'],
+                gdal.GDT_Float32, _TARGET_NODATA)
+
+    if 'standing_biomass' in output_list or summary_table_path:
+        # total weighted C in aboveground biomass including impacts of
+        #   grazing
+        weighted_state_variable_sum(
+            'aglivc', sv_reg, aligned_inputs, pft_id_set,
+            temp_val_dict['weighted_sum_aglivc'])
+        weighted_state_variable_sum(
+            'stdedc', sv_reg, aligned_inputs, pft_id_set,
+            temp_val_dict['weighted_sum_stdedc'])
+        _raster_calculator(
+            [(path, 1) for path in [
+                temp_val_dict['weighted_sum_aglivc'],
+                temp_val_dict['weighted_sum_stdedc']]],
+            sum_c_to_biomass, output_val_dict['standing_biomass'],
+            gdal.GDT_Float32, _TARGET_NODATA)
+
+    for val in output_val_dict:
+        if val not in output_list:
+            continue
+        source_path = source_path_dict.get(val, output_val_dict[val])
+        target_path = os.path.join(
             output_dir, '{}_{}_{}.tif'.format(
                 val, current_year, current_month))
+        if output_stack:
+            output_stack.write(val, current_year, current_month, source_path)
+        elif quantize_outputs:
+            _write_quantized_raster(source_path, target_path, val)
+        elif source_path != target_path:
+            shutil.copyfile(source_path, target_path)
+
+    if summary_table_path:
+        for val in ['potential_biomass', 'standing_biomass']:
+            source_path_dict.setdefault(val, output_val_dict[val])
+        _append_monthly_summary(
+            aligned_inputs, source_path_dict, current_year, current_month,
+            summary_table_path)
 
-    # total weighted C in aboveground biomass in the absence of grazing
-    weighted_state_variable_sum(
-        'aglivc', provisional_sv_reg, aligned_inputs, pft_id_set,
-        temp_val_dict['weighted_sum_aglivc'])
-    weighted_state_variable_sum(
-        'stdedc', provisional_sv_reg, aligned_inputs, pft_id_set,
-        temp_val_dict['weighted_sum_stdedc'])
-    pygeoprocessing.raster_calculator(
-        [(path, 1) for path in [
-            temp_val_dict['weighted_sum_aglivc'],
-            temp_val_dict['weighted_sum_stdedc']]],
-        sum_c_to_biomass, output_val_dict['potential_biomass'],
-        gdal.GDT_Float32, _TARGET_NODATA)
+    # clean up
+    shutil.rmtree(temp_dir)
 
-    # total weighted C in aboveground biomass including impacts of grazing
-    weighted_state_variable_sum(
-        'aglivc', sv_reg, aligned_inputs, pft_id_set,
-        temp_val_dict['weighted_sum_aglivc'])
-    weighted_state_variable_sum(
-        'stdedc', sv_reg, aligned_inputs, pft_id_set,
-        temp_val_dict['weighted_sum_stdedc'])
-    pygeoprocessing.raster_calculator(
-        [(path, 1) for path in [
-            temp_val_dict['weighted_sum_aglivc'],
-            temp_val_dict['weighted_sum_stdedc']]],
-        sum_c_to_biomass, output_val_dict['standing_biomass'],
-        gdal.GDT_Float32, _TARGET_NODATA)
 
-    # density of animals inside grazing areas
-    shutil.copyfile(
-        month_reg['animal_density'], output_val_dict['animal_density'])
+def _append_monthly_summary(
+        aligned_inputs, source_path_dict, current_year, current_month,
+        summary_table_path):
+    """Summarize monthly outputs inside the study area and grazing areas.
 
-    # diet sufficiency
-    shutil.copyfile(
-        month_reg['diet_sufficiency'], output_val_dict['diet_sufficiency'])
+    The mean of each output is calculated over pixels inside the study area
+    and over pixels inside each grazing area polygon, in a single pass over
+    each of the rasterized study area and grazing areas. The total of
+    biomass in kg and of the number of animals is calculated from the mean
+    and the area covered by valid pixels.
 
-    # clean up
-    shutil.rmtree(temp_dir)
+    Parameters:
+        aligned_inputs (dict): map of key, path pairs indicating paths
+            to aligned model inputs, including the study area mask and the
+            grazing area id raster created by `_rasterize_grazing_areas`
+        source_path_dict (dict): map of output name to path to raster
+            containing the output for the current month
+        current_year (int): current year, for example 2016
+        current_month (int): current month of the year, such that
+            current_month=1 indicates January
+        summary_table_path (string): path to table that should contain the
+            fields 'year', 'month', 'grazing_area_id', 'output', 'mean' and
+            'total'. Rows of the study area have no grazing_area_id.
+
+    Side effects:
+        creates the table indicated by `summary_table_path` if it does not
+            exist, and appends the summaries of the current month to it
+
+    Returns:
+        None
+
+    """
+    output_name_list = sorted(source_path_dict)
+    source_path_list = [
+        source_path_dict[output_name] for output_name in output_name_list]
+    pixel_area_ha = _pixel_area_ha(aligned_inputs['aoi_mask'])
+    summary_list = []
+    for zone_key in ['aoi_mask', 'grazing_area_id']:
+        zone_sum, zone_count = zonal_sum_and_count(
+            source_path_list, aligned_inputs[zone_key])
+        for zone_id in range(zone_sum.shape[1]):
+            if zone_key == 'aoi_mask':
+                grazing_area_id = None
+            else:
+                grazing_area_id = zone_id
+            for output_i, output_name in enumerate(output_name_list):
+                if zone_count[output_i, zone_id] == 0:
+                    continue
+                mean = (
+                    zone_sum[output_i, zone_id] /
+                    zone_count[output_i, zone_id])
+                total = None
+                if output_name != 'diet_sufficiency':
+                    # kg/ha or animals/ha over the area of valid pixels
+                    total = zone_sum[output_i, zone_id] * pixel_area_ha
+                summary_list.append({
+                    'year': current_year,
+                    'month': current_month,
+                    'grazing_area_id': grazing_area_id,
+                    'output': output_name,
+                    'mean': mean,
+                    'total': total,
+                })
+    pandas.DataFrame(
+        summary_list, columns=[
+            'year', 'month', 'grazing_area_id', 'output', 'mean',
+            'total']).to_csv(
+            summary_table_path, mode='a', index=False,
+            header=not os.path.exists(summary_table_path))
+
+
+def _quantize_array(value_array, nodata, scale):
+    """Convert floating point values to scaled 16-bit unsigned integers.
+
+    Parameters:
+        value_array (numpy.ndarray): floating point values
+        nodata (float): nodata value of `value_array`, or None
+        scale (float): value represented by one unit of the stored integers
+
+    Returns:
+        stored, array of integers such that value = stored * scale +
+            _QUANTIZED_OUTPUT_OFFSET, rounded to the nearest integer and
+            clipped to the valid range, with _QUANTIZED_NODATA where
+            `value_array` is nodata
+
+    """
+    valid_mask = ~_nodata_mask(value_array, nodata)
+    stored = numpy.empty(value_array.shape, dtype=numpy.uint16)
+    stored[:] = _QUANTIZED_NODATA
+    stored[valid_mask] = numpy.clip(
+        numpy.round(
+            (value_array[valid_mask] - _QUANTIZED_OUTPUT_OFFSET) / scale),
+        0, _QUANTIZED_NODATA - 1)
+    return stored
+
+
+def _write_quantized_raster(base_raster_path, target_path, output_key):
+    """Write an output as scaled 16-bit unsigned integers.
+
+    Parameters:
+        base_raster_path (string): path to floating point raster containing
+            the output
+        target_path (string): path to raster that should contain the output
+            as scaled integers
+        output_key (string): name of the output, a key of
+            `_QUANTIZED_OUTPUT_SCALE`
+
+    Side effects:
+        creates the raster indicated by `target_path`, with the scale and
+            offset of the stored integers in its metadata
+
+    Returns:
+        None
+
+    """
+    base_nodata = pygeoprocessing.get_raster_info(
+        base_raster_path)['nodata'][0]
+    _raster_calculator(
+        [(base_raster_path, 1), (base_nodata, 'raw'),
+            (_QUANTIZED_OUTPUT_SCALE[output_key], 'raw')],
+        _quantize_array, target_path, gdal.GDT_UInt16, _QUANTIZED_NODATA)
+    target_raster = gdal.OpenEx(target_path, gdal.OF_RASTER | gdal.GA_Update)
+    target_band = target_raster.GetRasterBand(1)
+    target_band.SetScale(_QUANTIZED_OUTPUT_SCALE[output_key])
+    target_band.SetOffset(_QUANTIZED_OUTPUT_OFFSET)
+    target_band = None
+    target_raster = None
+
+
+class _MonthlyOutputStack(object):
+    """Collect monthly outputs into one time-stacked raster per output.
+
+    Each output is stored as a multi-band GeoTIFF with one band for each
+    month of the run, so that the values of all months at a pixel can be
+    read from one file. Rasters are tiled and compressed, and bands of
+    months that have not been written yet are not stored.
+
+    """
+
+    def __init__(
+            self, output_dir, starting_year, starting_month, n_months,
+            template_raster_path, quantize=False):
+        """Describe the stacked rasters without creating them.
+
+        Parameters:
+            output_dir (string): path to directory where stacked rasters
+                should be written
+            starting_year (int): year of the first month of the run
+            starting_month (int): month of the year of the first month of
+                the run, such that starting_month=1 indicates January
+            n_months (int): number of months of the run, the number of bands
+                in each stacked raster
+            template_raster_path (string): path to a raster on the model
+                grid, used to define the size, geotransform and projection of
+                the stacked rasters
+            quantize (bool): if True, outputs are stored as scaled 16-bit
+                integers as described by `_QUANTIZED_OUTPUT_SCALE`
+
+        Returns:
+            None
+
+        """
+        self.output_dir = output_dir
+        self.starting_year = starting_year
+        self.starting_month = starting_month
+        self.n_months = n_months
+        self.template_raster_path = template_raster_path
+        self.quantize = quantize
+
+    def stack_path(self, output_key):
+        """Path to the stacked raster of one output."""
+        return os.path.join(self.output_dir, '{}.tif'.format(output_key))
+
+    def _create(self, output_key, target_path):
+        """Create an empty stacked raster with one band for each month."""
+        template_info = pygeoprocessing.get_raster_info(
+            self.template_raster_path)
+        n_cols, n_rows = template_info['raster_size']
+        datatype = gdal.GDT_Float32
+        nodata = _TARGET_NODATA
+        if self.quantize:
+            datatype = gdal.GDT_UInt16
+            nodata = _QUANTIZED_NODATA
+        driver = gdal.GetDriverByName('GTiff')
+        target_raster = driver.Create(
+            target_path, n_cols, n_rows, self.n_months, datatype,
+            options=_gtiff_creation_options('compact_archive', datatype) + [
+                'INTERLEAVE=BAND', 'SPARSE_OK=TRUE'])
+        target_raster.SetProjection(template_info['projection'])
+        target_raster.SetGeoTransform(template_info['geotransform'])
+        for month_index in range(self.n_months):
+            month_i = (self.starting_month + month_index - 1) % 12 + 1
+            year = (
+                self.starting_year +
+                (self.starting_month + month_index - 1) // 12)
+            target_band = target_raster.GetRasterBand(month_index + 1)
+            target_band.SetNoDataValue(nodata)
+            target_band.SetDescription('{}_{}'.format(year, month_i))
+            if self.quantize:
+                target_band.SetScale(_QUANTIZED_OUTPUT_SCALE[output_key])
+                target_band.SetOffset(_QUANTIZED_OUTPUT_OFFSET)
+            target_band = None
+        target_raster = None
+
+    def _open(self, output_key):
+        """Open the stacked raster of one output for writing.
+
+        The stacked raster is created if it does not exist. If it was
+        written by a shorter run that is being extended, its bands are
+        copied to a new raster that includes the months of this run.
+
+        Raises:
+            ValueError if an existing stacked raster was written with a
+                different value of `quantize` or a different scale
+
+        """
+        stack_path = self.stack_path(output_key)
+        if os.path.exists(stack_path):
+            stack_raster = gdal.OpenEx(stack_path, gdal.OF_RASTER)
+            stack_band = stack_raster.GetRasterBand(1)
+            stack_datatype = stack_band.DataType
+            stack_scale = stack_band.GetScale()
+            stack_band = None
+            stack_raster = None
+            if self.quantize:
+                expected_datatype = gdal.GDT_UInt16
+                expected_scale = _QUANTIZED_OUTPUT_SCALE[output_key]
+            else:
+                expected_datatype = gdal.GDT_Float32
+                expected_scale = 1.
+            if stack_scale is None:
+                stack_scale = 1.
+            if (stack_datatype != expected_datatype or
+                    not numpy.isclose(stack_scale, expected_scale)):
+                raise ValueError(
+                    "The stacked output %s was written as %s with scale %s, "
+                    "but this run writes %s with scale %s. Remove it or "
+                    "match args['quantize_outputs'] to the earlier run" % (
+                        stack_path, gdal.GetDataTypeName(stack_datatype),
+                        stack_scale, gdal.GetDataTypeName(expected_datatype),
+                        expected_scale))
+            n_bands = pygeoprocessing.get_raster_info(stack_path)['n_bands']
+            if n_bands >= self.n_months:
+                return gdal.OpenEx(stack_path, gdal.OF_RASTER | gdal.GA_Update)
+            temp_dir = tempfile.mkdtemp(dir=self.output_dir)
+            temp_stack_path = os.path.join(temp_dir, 'stack.tif')
+            self._create(output_key, temp_stack_path)
+            target_raster = gdal.OpenEx(
+                temp_stack_path, gdal.OF_RASTER | gdal.GA_Update)
+            for band_index in range(1, n_bands + 1):
+                target_band = target_raster.GetRasterBand(band_index)
+                for offset_map, raster_block in pygeoprocessing.iterblocks(
+                        (stack_path, band_index)):
+                    target_band.WriteArray(
+                        raster_block, xoff=offset_map['xoff'],
+                        yoff=offset_map['yoff'])
+                target_band = None
+            target_raster = None
+            os.remove(stack_path)
+            os.rename(temp_stack_path, stack_path)
+            shutil.rmtree(temp_dir)
+        else:
+            self._create(output_key, stack_path)
+        return gdal.OpenEx(stack_path, gdal.OF_RASTER | gdal.GA_Update)
+
+    def write(self, output_key, current_year, current_month, base_raster_path):
+        """Write one month of an output to its stacked raster.
+
+        Parameters:
+            output_key (string): name of the output, for example
+                'standing_biomass'
+            current_year (int): year of the month to write
+            current_month (int): month of the year of the month to write
+            base_raster_path (string): path to single-band raster containing
+                the output for the month
+
+        Raises:
+            ValueError if the month lies outside the run
+
+        Side effects:
+            creates the stacked raster of the output if it does not exist
+            writes the band of the month in the stacked raster
+
+        Returns:
+            None
+
+        """
+        band_index = (
+            (current_year - self.starting_year) * 12 + current_month -
+            self.starting_month + 1)
+        if band_index < 1 or band_index > self.n_months:
+            raise ValueError(
+                "Month %d/%d lies outside the run of %d months starting in "
+                "%d/%d" % (
+                    current_month, current_year, self.n_months,
+                    self.starting_month, self.starting_year))
+        base_nodata = pygeoprocessing.get_raster_info(
+            base_raster_path)['nodata'][0]
+        target_raster = self._open(output_key)
+        target_band = target_raster.GetRasterBand(band_index)
+        for offset_map, raster_block in pygeoprocessing.iterblocks(
+                (base_raster_path, 1)):
+            if self.quantize:
+                raster_block = _quantize_array(
+                    raster_block, base_nodata,
+                    _QUANTIZED_OUTPUT_SCALE[output_key])
+            else:
+                raster_block = raster_block.astype(numpy.float32)
+                raster_block[_nodata_mask(raster_block, base_nodata)] = (
+                    _TARGET_NODATA)
+            target_band.WriteArray(
+                raster_block, xoff=offset_map['xoff'],
+                yoff=offset_map['yoff'])
+        target_band = None
+        target_raster = None
 
 
 def copy_intermediate_sv(pft_id_set, sv_reg, intermediate_sv_dir):
@@ -13746,10 +17891,6 @@ def validate(args, limit_to=None):
         'sand_proportion_path',
         'bulk_density_path',
         'ph_path',
-        'min_temp_path_pattern',
-        'max_temp_path_pattern',
-        'monthly_precip_path_pattern',
-        'monthly_vi_path_pattern',
         'site_param_spatial_index_path',
         'veg_spatial_composition_path_pattern',
         'animal_grazing_areas_path',
@@ -13781,6 +17922,19 @@ def validate(args, limit_to=None):
             elif args[key] in ['', None]:
                 no_value_list.append(key)
 
+    # climate inputs are required as a path pattern if not supplied as a cube
+    for pattern_key, cube_key in [
+            ('min_temp_path_pattern', 'min_temp_cube_path'),
+            ('max_temp_path_pattern', 'max_temp_cube_path'),
+            ('monthly_precip_path_pattern', 'monthly_precip_cube_path'),
+            ('monthly_vi_path_pattern', 'monthly_vi_cube_path')]:
+        if args.get(cube_key) in ['', None]:
+            if limit_to is None or limit_to == pattern_key:
+                if pattern_key not in args:
+                    missing_key_list.append(pattern_key)
+                elif args[pattern_key] in ['', None]:
+                    no_value_list.append(pattern_key)
+
     # if initial conditions dir is not supplied, initial tables are required
     if 'initial_conditions_dir' not in args:
         for key in ['site_initial_table', 'pft_initial_table']:
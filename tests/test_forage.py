@@ -6,6 +6,11 @@ import shutil
 import os
 import math
 
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
 import numpy
 import pandas
 from osgeo import osr
@@ -1205,6 +1210,46 @@ class foragetests(unittest.TestCase):
             test_result, 990.7401, delta=0.01,
             msg="Test result does not match expected value")
 
+    def test_calc_latitude(self):
+        """Test `calc_latitude`.
+
+        Test that latitude is calculated from the pixel coordinates of the
+        template raster, and that it is taken from a latitude raster instead
+        if one is supplied.
+
+        Raises:
+            AssertionError if `calc_latitude` does not match values
+                calculated by hand
+
+        Returns:
+            None
+
+        """
+        from rangeland_production import forage
+
+        template_raster = os.path.join(
+            self.workspace_dir, 'template_raster.tif')
+        create_constant_raster(template_raster, 0, n_rows=2)
+        latitude_input_path = os.path.join(
+            self.workspace_dir, 'latitude_input.tif')
+        create_constant_raster(latitude_input_path, -3.25, n_rows=2)
+
+        latitude_path = os.path.join(self.workspace_dir, 'latitude.tif')
+        forage.calc_latitude(template_raster, latitude_path)
+        latitude_raster = gdal.OpenEx(latitude_path, gdal.OF_RASTER)
+        numpy.testing.assert_allclose(
+            latitude_raster.GetRasterBand(1).ReadAsArray(), [[45.], [46.]])
+        latitude_raster = None
+
+        forage.calc_latitude(
+            template_raster, latitude_path,
+            latitude_input_path=latitude_input_path)
+        latitude_raster = gdal.OpenEx(latitude_path, gdal.OF_RASTER)
+        numpy.testing.assert_allclose(
+            latitude_raster.GetRasterBand(1).ReadAsArray(),
+            [[-3.25], [-3.25]])
+        latitude_raster = None
+
     def test_calc_ompc(self):
         """Test `_calc_ompc`.
 
@@ -7410,6 +7455,41 @@ class foragetests(unittest.TestCase):
             point_results_dict['mod_strlig_lyr'] - 0.003,
             point_results_dict['mod_strlig_lyr'] + 0.003, _SV_NODATA)
 
+        # fraction of lignin given by the animal parameter feclig
+        animal_index_path = os.path.join(self.workspace_dir, 'animal.tif')
+        create_constant_raster(animal_index_path, 2)
+        animal_param_lookup = forage.build_animal_param_lookup(
+            pandas.DataFrame.from_dict(
+                {2: {'feclig': frlign}}, orient='index'), ['feclig'])
+        create_constant_raster(sv_reg['minerl_1_1_path'], minerl_1_1)
+        create_constant_raster(sv_reg['minerl_1_2_path'], minerl_1_2)
+        create_constant_raster(sv_reg['metabc_1_path'], metabc_lyr)
+        create_constant_raster(sv_reg['strucc_1_path'], strucc_lyr)
+        create_constant_raster(sv_reg['struce_1_1_path'], struce_lyr_1)
+        create_constant_raster(sv_reg['metabe_1_1_path'], metabe_lyr_1)
+        create_constant_raster(sv_reg['struce_1_2_path'], struce_lyr_2)
+        create_constant_raster(sv_reg['metabe_1_2_path'], metabe_lyr_2)
+        create_constant_raster(sv_reg['strlig_1_path'], strlig_lyr)
+
+        forage.partit(
+            cpart_path, epart_1_path, epart_2_path, None, site_index_path,
+            site_param_table, lyr, sv_reg,
+            animal_index_path=animal_index_path,
+            animal_param_lookup=animal_param_lookup)
+
+        self.assert_all_values_in_raster_within_range(
+            sv_reg['metabc_1_path'],
+            point_results_dict['mod_metabc_lyr'] - tolerance,
+            point_results_dict['mod_metabc_lyr'] + tolerance, _SV_NODATA)
+        self.assert_all_values_in_raster_within_range(
+            sv_reg['strucc_1_path'],
+            point_results_dict['mod_strucc_lyr'] - tolerance,
+            point_results_dict['mod_strucc_lyr'] + tolerance, _SV_NODATA)
+        self.assert_all_values_in_raster_within_range(
+            sv_reg['strlig_1_path'],
+            point_results_dict['mod_strlig_lyr'] - 0.003,
+            point_results_dict['mod_strlig_lyr'] + 0.003, _SV_NODATA)
+
     def test_calc_delta_iel(self):
         """Test `calc_delta_iel`.
 
@@ -9193,7 +9273,7 @@ class foragetests(unittest.TestCase):
         create_constant_raster(month_reg['flgrem_1'], flgrem)
         create_constant_raster(month_reg['fdgrem_1'], fdgrem)
 
-        animal_trait_table = {
+        animal_trait_table = pandas.DataFrame.from_dict({
             1: {
                 'gfcret': gfcret,
                 'gret_2': gret_2,
@@ -9201,7 +9281,7 @@ class foragetests(unittest.TestCase):
                 'fecf_2': fecf_2,
                 'feclig': feclig,
             }
-        }
+        }, orient='index')
         pft_id_set = [1]
 
         # known state variables after grazing
@@ -10025,76 +10105,72 @@ class foragetests(unittest.TestCase):
             input_animal_trait_table, freer_parameter_df)
 
         self.assertAlmostEqual(
-            animal_trait_table[1]['Z'], entire_m_Z, places=6)
+            animal_trait_table.loc[1, 'Z'], entire_m_Z, places=6)
         self.assertAlmostEqual(
-            animal_trait_table[3]['Z'], castrate_Z, places=6)
+            animal_trait_table.loc[3, 'Z'], castrate_Z, places=6)
         self.assertAlmostEqual(
-            animal_trait_table[4]['Z'], heifer_Z, places=6)
+            animal_trait_table.loc[4, 'Z'], heifer_Z, places=6)
         self.assertAlmostEqual(
-            animal_trait_table[0]['Z'], sheep_Z, places=6)
+            animal_trait_table.loc[0, 'Z'], sheep_Z, places=6)
 
         self.assertAlmostEqual(
-            animal_trait_table[1]['ZF'], entire_m_ZF, places=6)
+            animal_trait_table.loc[1, 'ZF'], entire_m_ZF, places=6)
         self.assertAlmostEqual(
-            animal_trait_table[3]['ZF'], castrate_ZF, places=6)
+            animal_trait_table.loc[3, 'ZF'], castrate_ZF, places=6)
         self.assertAlmostEqual(
-            animal_trait_table[4]['ZF'], heifer_ZF, places=6)
+            animal_trait_table.loc[4, 'ZF'], heifer_ZF, places=6)
         self.assertAlmostEqual(
-            animal_trait_table[0]['ZF'], sheep_ZF, places=6)
+            animal_trait_table.loc[0, 'ZF'], sheep_ZF, places=6)
 
         self.assertAlmostEqual(
-            animal_trait_table[1]['BC'], entire_m_BC, places=6)
+            animal_trait_table.loc[1, 'BC'], entire_m_BC, places=6)
         self.assertAlmostEqual(
-            animal_trait_table[3]['BC'], castrate_BC, places=6)
+            animal_trait_table.loc[3, 'BC'], castrate_BC, places=6)
         self.assertAlmostEqual(
-            animal_trait_table[4]['BC'], heifer_BC, places=6)
+            animal_trait_table.loc[4, 'BC'], heifer_BC, places=6)
         self.assertAlmostEqual(
-            animal_trait_table[0]['BC'], sheep_BC, places=6)
+            animal_trait_table.loc[0, 'BC'], sheep_BC, places=6)
 
         # Test updating reproductive status of breeding females.
         # model step indicates pregnancy
         month_index = 2
-        for animal_id in animal_trait_table.keys():
-            if animal_trait_table[animal_id]['sex'] == 'breeding_female':
-                revised_animal_dict = forage.update_breeding_female_status(
-                    animal_trait_table[animal_id], month_index)
-                animal_trait_table[animal_id] = revised_animal_dict
+        animal_trait_table = forage.update_breeding_female_status(
+            animal_trait_table, month_index)
         # assert that reproductive status of breeding females is correct
         self.assertEqual(
-            animal_trait_table[2]['reproductive_status_int'], 1)
+            animal_trait_table.loc[2, 'reproductive_status_int'], 1)
         # assert that reproductive status of all other animal types is 0
         for animal_id in [0, 1, 3, 4]:
             self.assertEqual(
-                animal_trait_table[animal_id]['reproductive_status_int'], 0)
+                animal_trait_table.loc[animal_id, 'reproductive_status_int'],
+                0)
 
         # model step indicates lactating
         month_index = 6
-        for animal_id in animal_trait_table.keys():
-            if animal_trait_table[animal_id]['sex'] == 'breeding_female':
-                revised_animal_dict = forage.update_breeding_female_status(
-                    animal_trait_table[animal_id], month_index)
-                animal_trait_table[animal_id] = revised_animal_dict
+        animal_trait_table = forage.update_breeding_female_status(
+            animal_trait_table, month_index)
         # assert that reproductive status of breeding females is correct
         self.assertEqual(
-            animal_trait_table[2]['reproductive_status_int'], 2)
+            animal_trait_table.loc[2, 'reproductive_status_int'], 2)
         # assert that reproductive status of all other animal types is 0
         for animal_id in [0, 1, 3, 4]:
             self.assertEqual(
-                animal_trait_table[animal_id]['reproductive_status_int'], 0)
+                animal_trait_table.loc[animal_id, 'reproductive_status_int'],
+                0)
 
         # model step indicates open
         month_index = 8
-        for animal_id in animal_trait_table.keys():
-            if animal_trait_table[animal_id]['sex'] == 'breeding_female':
-                revised_animal_dict = forage.update_breeding_female_status(
-                    animal_trait_table[animal_id], month_index)
-                animal_trait_table[animal_id] = revised_animal_dict
+        animal_trait_table = forage.update_breeding_female_status(
+            animal_trait_table, month_index)
         self.assertEqual(
-            animal_trait_table[2]['reproductive_status_int'], 0)
+            animal_trait_table.loc[2, 'reproductive_status_int'], 0)
+        self.assertEqual(animal_trait_table.loc[2, 'A_foet'], 0)
+        self.assertEqual(animal_trait_table.loc[2, 'A_y'], 0)
         # assert that reproductive status of all other animal types is 0
         for animal_id in [0, 1, 3, 4]:
             self.assertEqual(
-                animal_trait_table[animal_id]['reproductive_status_int'], 0)
+                animal_trait_table.loc[animal_id, 'reproductive_status_int'],
+                0)
 
         # Test calculating maximum intake.
         # known values calculated by hand
@@ -10103,18 +10179,73 @@ class foragetests(unittest.TestCase):
         heifer_max_intake = 8.1275358
         sheep_max_intake = 0.8120074
 
-        for animal_id in animal_trait_table.keys():
-            revised_animal_trait_dict = forage.calc_max_intake(
-                animal_trait_table[animal_id])
-            animal_trait_table[animal_id] = revised_animal_trait_dict
+        animal_trait_table = forage.calc_max_intake(animal_trait_table)
         self.assertAlmostEqual(
-            animal_trait_table[1]['max_intake'], entire_m_max_intake)
+            animal_trait_table.loc[1, 'max_intake'], entire_m_max_intake)
         self.assertAlmostEqual(
-            animal_trait_table[3]['max_intake'], castrate_max_intake)
+            animal_trait_table.loc[3, 'max_intake'], castrate_max_intake)
         self.assertAlmostEqual(
-            animal_trait_table[4]['max_intake'], heifer_max_intake)
+            animal_trait_table.loc[4, 'max_intake'], heifer_max_intake)
         self.assertAlmostEqual(
-            animal_trait_table[0]['max_intake'], sheep_max_intake)
+            animal_trait_table.loc[0, 'max_intake'], sheep_max_intake)
+
+    def test_lookup_animal_params(self):
+        """Test `lookup_animal_params`.
+
+        Use the function `build_animal_param_lookup` to build an in-memory
+        table of animal parameters, and use `lookup_animal_params` to retrieve
+        parameter values for each pixel of an animal index. Test that pixels
+        occupied by known animal types receive the parameters of that animal
+        type, and that all other pixels receive _IC_NODATA.
+
+        Raises:
+            AssertionError if `lookup_animal_params` does not match values
+                supplied in the animal trait table
+
+        Returns:
+            None
+
+        """
+        from rangeland_production import forage
+
+        animal_trait_table = pandas.DataFrame.from_dict({
+            3: {'CR1': 0.8, 'W_total': 320.},
+            1: {'CR1': 0.7, 'W_total': 45.},
+        }, orient='index')
+        animal_param_lookup = forage.build_animal_param_lookup(
+            animal_trait_table, ['CR1', 'W_total'])
+        animal_index = numpy.array(
+            [[1, 3, _TARGET_NODATA], [2, 1, 4]], dtype=numpy.int32)
+        param_dict = forage.lookup_animal_params(
+            animal_index, animal_param_lookup, ['CR1', 'W_total'])
+
+        numpy.testing.assert_allclose(
+            param_dict['CR1'], numpy.array(
+                [[0.7, 0.8, _IC_NODATA], [_IC_NODATA, 0.7, _IC_NODATA]],
+                dtype=numpy.float32))
+        numpy.testing.assert_allclose(
+            param_dict['W_total'], numpy.array(
+                [[45., 320., _IC_NODATA], [_IC_NODATA, 45., _IC_NODATA]],
+                dtype=numpy.float32))
+
+        # wrapped local op receives parameters in place of raster blocks
+        def weight_ratio(weight, CR1, denominator):
+            return weight * CR1 / denominator
+
+        wrapped_op = forage.animal_param_op(
+            weight_ratio, ['W_total', 'CR1', None], animal_param_lookup)
+        result = wrapped_op(
+            animal_index[:1, :2], numpy.full((1, 2), 2., dtype=numpy.float32))
+        numpy.testing.assert_allclose(
+            result, numpy.array([[15.75, 128.]], dtype=numpy.float32),
+            rtol=1e-6)
+
+        # empty animal trait table
+        empty_lookup = forage.build_animal_param_lookup(
+            pandas.DataFrame(columns=['CR1']), ['CR1'])
+        param_dict = forage.lookup_animal_params(
+            animal_index, empty_lookup, ['CR1'])
+        self.assertTrue(numpy.all(param_dict['CR1'] == _IC_NODATA))
 
     def test_calc_pasture_height(self):
         """Test `calc_pasture_height`.
@@ -10328,9 +10459,15 @@ class foragetests(unittest.TestCase):
             args['site_param_spatial_index_path'], sv_reg['stdede_1_5_path'],
             gdal.GDT_Int32, [_TARGET_NODATA], fill_value_list=[stdede_1_5])
         pft_id_set = [4, 5]
+        aoi_mask_path = os.path.join(self.workspace_dir, 'aoi_mask.tif')
+        pygeoprocessing.new_raster_from_base(
+            args['site_param_spatial_index_path'], aoi_mask_path,
+            gdal.GDT_Int32, [_TARGET_NODATA], fill_value_list=[_TARGET_NODATA])
+        pygeoprocessing.rasterize(
+            args['aoi_path'], aoi_mask_path, burn_values=[0])
 
         ordered_feed_types = forage.order_by_digestibility(
-            sv_reg, pft_id_set, args['aoi_path'])
+            sv_reg, pft_id_set, aoi_mask_path)
 
         self.assert_sorted_lists_equal(ordered_feed_types, digestibility_order)
 
@@ -10406,7 +10543,8 @@ class foragetests(unittest.TestCase):
         create_constant_raster(aligned_inputs['site_index'], 1)
         create_constant_raster(
             aligned_inputs['proportion_legume_path'], proportion_legume)
-        aoi_path = TEST_AOI
+        aoi_mask_path = os.path.join(self.workspace_dir, 'aoi_mask.tif')
+        create_constant_raster(aoi_mask_path, 0)
         sv_reg = {
             'aglivc_1_path': os.path.join(self.workspace_dir, 'aglivc.tif'),
             'aglive_1_1_path': os.path.join(self.workspace_dir, 'aglive.tif'),
@@ -10421,7 +10559,7 @@ class foragetests(unittest.TestCase):
         pft_id_set = [1]
         animal_index_path = os.path.join(self.workspace_dir, 'animal.tif')
         create_constant_raster(animal_index_path, 1)
-        animal_trait_table = {
+        animal_trait_table = pandas.DataFrame.from_dict({
             1: {
                 'age': age,
                 'sex_int': sex_int,
@@ -10453,7 +10591,7 @@ class foragetests(unittest.TestCase):
                 'CRD6': CRD6,
                 'CRD7': CRD7,
             }
-        }
+        }, orient='index')
         veg_trait_table = {
             1: {
                 'species_factor': species_factor,
@@ -10472,9 +10610,9 @@ class foragetests(unittest.TestCase):
         # management threshold does not restrict offtake
         management_threshold = 0.1
         forage._calc_grazing_offtake(
-            aligned_inputs, aoi_path, management_threshold, sv_reg, pft_id_set,
-            animal_index_path, animal_trait_table, veg_trait_table,
-            current_month, month_reg)
+            aligned_inputs, aoi_mask_path, management_threshold, sv_reg,
+            pft_id_set, animal_index_path, animal_trait_table,
+            veg_trait_table, current_month, month_reg)
         flgrem = 0.000643
         fdgrem = 0.002561
 
@@ -10488,9 +10626,9 @@ class foragetests(unittest.TestCase):
         # management threshold restricts offtake
         management_threshold = 300
         forage._calc_grazing_offtake(
-            aligned_inputs, aoi_path, management_threshold, sv_reg, pft_id_set,
-            animal_index_path, animal_trait_table, veg_trait_table,
-            current_month, month_reg)
+            aligned_inputs, aoi_mask_path, management_threshold, sv_reg,
+            pft_id_set, animal_index_path, animal_trait_table,
+            veg_trait_table, current_month, month_reg)
         flgrem = 0
         fdgrem = 0
 
@@ -10607,7 +10745,7 @@ class foragetests(unittest.TestCase):
         }
         create_constant_raster(aligned_inputs['pft_1'], 1)
         create_constant_raster(aligned_inputs['animal_index'], 1)
-        animal_trait_table = {
+        animal_trait_table = pandas.DataFrame.from_dict({
             1: {
                 'type_int': animal_type,
                 'reproductive_status_int': reproductive_status,
@@ -10666,7 +10804,7 @@ class foragetests(unittest.TestCase):
                 'CW9': CW9,
                 'CW12': CW12,
             }
-        }
+        }, orient='index')
         veg_trait_table = {
             1: {
                 'digestibility_intercept': digestibility_intercept,
@@ -10728,6 +10866,10 @@ class foragetests(unittest.TestCase):
             'EO_index_1': os.path.join(self.workspace_dir, 'EO_index.tif'),
             'animal_index': os.path.join(
                 self.workspace_dir, 'animal_index.tif'),
+            'grazing_area_id': os.path.join(
+                self.workspace_dir, 'grazing_area_id.tif'),
+            'total_animals': os.path.join(
+                self.workspace_dir, 'total_animals.tif'),
         }
         create_constant_raster(aligned_inputs['site_index'], 1)
         create_constant_raster(aligned_inputs['pft_1'], 1)
@@ -10738,6 +10880,9 @@ class foragetests(unittest.TestCase):
         pygeoprocessing.rasterize(
             animal_mgmt_layer_path, aligned_inputs['animal_index'],
             option_list=["ATTRIBUTE=animal_id"])
+        forage._rasterize_grazing_areas(
+            animal_mgmt_layer_path, aligned_inputs['site_index'],
+            aligned_inputs['grazing_area_id'], aligned_inputs['total_animals'])
 
         site_param_table = {
             1: {
@@ -10760,7 +10905,7 @@ class foragetests(unittest.TestCase):
         animals_per_ha = 0.00011449
         forage._estimate_animal_density(
             aligned_inputs, month_index, pft_id_set, site_param_table,
-            animal_mgmt_layer_path, sv_reg, obs_biomass_path, month_reg)
+            sv_reg, obs_biomass_path, month_reg)
         self.assert_all_values_in_raster_within_range(
             month_reg['animal_density'], animals_per_ha - tolerance,
             animals_per_ha + tolerance, _TARGET_NODATA)
@@ -11095,3 +11240,1392 @@ class foragetests(unittest.TestCase):
         create_constant_raster(aligned_inputs['pft_4'], 0.3)
         with self.assertRaises(ValueError):
             forage._check_pft_fractional_cover_sum(aligned_inputs, pft_id_set)
+
+    def test_zonal_sum_and_count(self):
+        """Test `zonal_sum_and_count`.
+
+        Use the function `zonal_sum_and_count` to summarize two rasters inside
+        integer zones in a single pass. Test that sums and counts match values
+        calculated by hand, that nodata pixels in the zone raster are
+        excluded, and that nodata pixels in one base raster are excluded from
+        the summary of that raster only.
+
+        Raises:
+            AssertionError if `zonal_sum_and_count` does not match values
+                calculated by hand
+
+        Returns:
+            None
+
+        """
+        from rangeland_production import forage
+
+        zone_path = os.path.join(self.workspace_dir, 'zone.tif')
+        value_1_path = os.path.join(self.workspace_dir, 'value_1.tif')
+        value_2_path = os.path.join(self.workspace_dir, 'value_2.tif')
+        array_map = {
+            zone_path: numpy.array(
+                [[0, 0, 2], [2, _TARGET_NODATA, 0]], dtype=numpy.float32),
+            value_1_path: numpy.array(
+                [[1., 2., 3.], [4., 5., 6.]], dtype=numpy.float32),
+            value_2_path: numpy.array(
+                [[10., _TARGET_NODATA, 1.], [1., 7., 20.]],
+                dtype=numpy.float32),
+        }
+        for path, array in array_map.items():
+            create_constant_raster(path, 0, n_cols=3, n_rows=2)
+            raster = gdal.OpenEx(path, gdal.OF_RASTER | gdal.GA_Update)
+            raster.GetRasterBand(1).WriteArray(array)
+            raster = None
+
+        zone_sum, zone_count = forage.zonal_sum_and_count(
+            [value_1_path, value_2_path], zone_path)
+
+        numpy.testing.assert_allclose(
+            zone_sum, numpy.array([[9., 0., 7.], [30., 0., 2.]]))
+        numpy.testing.assert_array_equal(
+            zone_count, numpy.array([[3, 0, 2], [2, 0, 2]]))
+
+    def test_alignment_cache_key(self):
+        """Test `_alignment_cache_key`.
+
+        Use the function `_alignment_cache_key` to identify aligned inputs in
+        the alignment cache. Test that the key is identical for identical
+        inputs and differs when the source raster, the target pixel size,
+        the target extent or the resampling method changes, or when the
+        source raster or a sidecar file of a shapefile mask is modified.
+
+        Raises:
+            AssertionError if `_alignment_cache_key` does not identify
+                aligned inputs uniquely
+
+        Returns:
+            None
+
+        """
+        from rangeland_production import forage
+
+        base_path = os.path.join(self.workspace_dir, 'base.tif')
+        aoi_path = os.path.join(self.workspace_dir, 'aoi.tif')
+        create_constant_raster(base_path, 1, n_cols=3, n_rows=3)
+        create_constant_raster(aoi_path, 0)
+        pixel_size = [0.0001, -0.0001]
+        target_bb = [0, 44.4997, 0.0003, 44.5]
+
+        base_key = forage._alignment_cache_key(
+            base_path, pixel_size, target_bb, aoi_path, 'near')
+        self.assertEqual(
+            base_key, forage._alignment_cache_key(
+                base_path, pixel_size, target_bb, aoi_path, 'near'))
+        self.assertNotEqual(
+            base_key, forage._alignment_cache_key(
+                base_path, [0.0002, -0.0002], target_bb, aoi_path, 'near'))
+        self.assertNotEqual(
+            base_key, forage._alignment_cache_key(
+                base_path, pixel_size, [0, 44.4998, 0.0003, 44.5], aoi_path,
+                'near'))
+        self.assertNotEqual(
+            base_key, forage._alignment_cache_key(
+                base_path, pixel_size, target_bb, aoi_path, 'bilinear'))
+
+        # modifying the source raster invalidates the cached copy
+        base_mtime = os.stat(base_path).st_mtime
+        os.utime(base_path, (base_mtime + 10, base_mtime + 10))
+        self.assertNotEqual(
+            base_key, forage._alignment_cache_key(
+                base_path, pixel_size, target_bb, aoi_path, 'near'))
+
+        # modifying a sidecar file of a shapefile mask invalidates it too
+        projection = osr.SpatialReference()
+        projection.SetWellKnownGeogCS('WGS84')
+        aoi_shp_path = os.path.join(self.workspace_dir, 'aoi.shp')
+        forage._write_polygon_vector(
+            [target_bb], projection.ExportToWkt(), {}, [{}], aoi_shp_path)
+        shp_key = forage._alignment_cache_key(
+            base_path, pixel_size, target_bb, aoi_shp_path, 'near')
+        for sidecar_ext in ['.dbf', '.shx', '.prj']:
+            sidecar_path = os.path.join(
+                self.workspace_dir, 'aoi{}'.format(sidecar_ext))
+            sidecar_mtime = os.stat(sidecar_path).st_mtime
+            os.utime(sidecar_path, (sidecar_mtime + 10, sidecar_mtime + 10))
+            sidecar_key = forage._alignment_cache_key(
+                base_path, pixel_size, target_bb, aoi_shp_path, 'near')
+            self.assertNotEqual(shp_key, sidecar_key)
+            shp_key = sidecar_key
+
+    def test_align_input_raster_cache(self):
+        """Test `_align_input_raster` with a raster in the cache.
+
+        Align the same raster twice to the same grid. Test that the second
+        call returns the raster aligned by the first without writing it
+        again, and that a raster is aligned again after its source changes.
+
+        Raises:
+            AssertionError if the cached raster is rewritten
+
+        Returns:
+            None
+
+        """
+        from rangeland_production import forage
+
+        base_path = os.path.join(self.workspace_dir, 'base.tif')
+        create_constant_raster(base_path, 1, n_cols=3, n_rows=3)
+        base_info = pygeoprocessing.get_raster_info(base_path)
+        projection = osr.SpatialReference()
+        projection.SetWellKnownGeogCS('WGS84')
+        aoi_path = os.path.join(self.workspace_dir, 'aoi.shp')
+        forage._write_polygon_vector(
+            [base_info['bounding_box']], projection.ExportToWkt(), {}, [{}],
+            aoi_path)
+        alignment_cache_dir = os.path.join(self.workspace_dir, 'cache')
+        os.makedirs(alignment_cache_dir)
+
+        aligned_path = forage._align_input_raster(
+            base_path, base_info['pixel_size'], base_info['bounding_box'],
+            aoi_path, alignment_cache_dir)
+        aligned_mtime = os.stat(aligned_path).st_mtime
+        os.utime(aligned_path, (aligned_mtime - 10, aligned_mtime - 10))
+        aligned_mtime = os.stat(aligned_path).st_mtime
+
+        reused_path = forage._align_input_raster(
+            base_path, base_info['pixel_size'], base_info['bounding_box'],
+            aoi_path, alignment_cache_dir)
+        self.assertEqual(reused_path, aligned_path)
+        self.assertEqual(os.stat(reused_path).st_mtime, aligned_mtime)
+        self.assertEqual(os.listdir(alignment_cache_dir), [
+            os.path.basename(aligned_path)])
+
+        # a changed source is aligned again under a new name
+        create_constant_raster(base_path, 2, n_cols=3, n_rows=3)
+        base_mtime = os.stat(base_path).st_mtime
+        os.utime(base_path, (base_mtime + 10, base_mtime + 10))
+        realigned_path = forage._align_input_raster(
+            base_path, base_info['pixel_size'], base_info['bounding_box'],
+            aoi_path, alignment_cache_dir)
+        self.assertNotEqual(realigned_path, aligned_path)
+        self.assertEqual(os.stat(aligned_path).st_mtime, aligned_mtime)
+
+    def test_shares_target_grid(self):
+        """Test `_shares_target_grid` and `_snap_bounding_box`.
+
+        Use the function `_shares_target_grid` to decide whether a raster can
+        be aligned as a virtual raster without resampling. Test that a
+        raster whose pixels line up with the target bounding box shares the
+        target grid, and that a raster with a different pixel size or offset
+        does not. Test that `_snap_bounding_box` extends a bounding box to a
+        whole number of pixels.
+
+        Raises:
+            AssertionError if `_shares_target_grid` or `_snap_bounding_box`
+                do not match values calculated by hand
+
+        Returns:
+            None
+
+        """
+        from rangeland_production import forage
+
+        base_path = os.path.join(self.workspace_dir, 'base.tif')
+        create_constant_raster(base_path, 1, n_cols=3, n_rows=3)
+
+        self.assertTrue(forage._shares_target_grid(
+            base_path, [1, -1], [1., 44.5, 3., 46.5]))
+        self.assertFalse(forage._shares_target_grid(
+            base_path, [0.5, -0.5], [1., 44.5, 3., 46.5]))
+        self.assertFalse(forage._shares_target_grid(
+            base_path, [1, -1], [0.5, 44.5, 3., 46.5]))
+
+        self.assertEqual(
+            forage._snap_bounding_box([0., 0., 2.5, 3.], [1, -1]),
+            [0., 0., 3., 3.])
+        self.assertEqual(
+            forage._snap_bounding_box([0., 0.5, 2., 3.], [1, -1]),
+            [0., 0., 2., 3.])
+        self.assertEqual(
+            forage._snap_bounding_box([0., 0., 2., 3.], [1, -1]),
+            [0., 0., 2., 3.])
+
+    def test_monthly_input_aligner(self):
+        """Test `_MonthlyInputAligner`.
+
+        Use `_MonthlyInputAligner` to decide which monthly inputs are
+        required by each month of the simulation and which aligned inputs
+        can be deleted after each month. Test that the first month of each
+        year requires the 12-month precipitation window used by
+        `_yearly_tasks`, and that precipitation of the last 12 months, which
+        leaves the moving annual precipitation window later, is not
+        deleted.
+
+        Raises:
+            AssertionError if `_MonthlyInputAligner` does not match values
+                calculated by hand
+
+        Returns:
+            None
+
+        """
+        from rangeland_production import forage
+
+        n_months = 30
+        base_monthly_path_id_map = {}
+        for month_index in range(n_months):
+            for input_type in ['precip', 'EO_index']:
+                base_monthly_path_id_map['{}_{}'.format(
+                    input_type, month_index)] = os.path.join(
+                        self.workspace_dir, 'base_{}_{}.tif'.format(
+                            input_type, month_index))
+        aligner = forage._MonthlyInputAligner(
+            base_monthly_path_id_map, [1, -1], [0, 0, 1, 1],
+            TEST_AOI, self.workspace_dir)
+
+        self.assertEqual(
+            set(aligner._month_key_list(0)),
+            set(['precip_{}'.format(m) for m in range(12)] + ['EO_index_0']))
+        self.assertEqual(
+            set(aligner._month_key_list(12)),
+            set(['precip_{}'.format(m) for m in range(1, 13)] +
+                ['EO_index_12']))
+        self.assertEqual(
+            set(aligner._month_key_list(13)),
+            set(['precip_13', 'EO_index_13']))
+
+        aligned_inputs = {}
+        for month_index in range(24):
+            for input_type in ['precip', 'EO_index']:
+                key = '{}_{}'.format(input_type, month_index)
+                aligned_path = os.path.join(
+                    self.workspace_dir, 'aligned_{}.tif'.format(key))
+                create_constant_raster(aligned_path, 1)
+                aligner.aligned_path_map[key] = aligned_path
+                aligned_inputs[key] = aligned_path
+        aligner.release(20, aligned_inputs)
+        aligner.close()
+
+        self.assertEqual(
+            set(aligned_inputs.keys()),
+            set(['precip_{}'.format(m) for m in range(9, 24)] +
+                ['EO_index_{}'.format(m) for m in range(21, 24)]))
+        self.assertFalse(os.path.exists(os.path.join(
+            self.workspace_dir, 'aligned_precip_8.tif')))
+        self.assertTrue(os.path.exists(os.path.join(
+            self.workspace_dir, 'aligned_precip_9.tif')))
+
+    def test_write_cube_slices(self):
+        """Test `_write_cube_slices`.
+
+        Use the function `_write_cube_slices` to write single-band virtual
+        rasters referring to bands of a multi-band raster. Test that each
+        virtual raster contains the values of the requested band, and that
+        requesting a band that the raster does not contain raises an error.
+
+        Raises:
+            AssertionError if `_write_cube_slices` does not match values
+                calculated by hand
+
+        Returns:
+            None
+
+        """
+        from rangeland_production import forage
+
+        cube_path = os.path.join(self.workspace_dir, 'precip_cube.tif')
+        create_constant_raster(cube_path, 0, n_cols=2, n_rows=2)
+        template_raster = gdal.OpenEx(cube_path)
+        driver = gdal.GetDriverByName('GTiff')
+        cube_raster = driver.Create(
+            os.path.join(self.workspace_dir, 'temp_cube.tif'), 2, 2, 3,
+            gdal.GDT_Float32)
+        cube_raster.SetProjection(template_raster.GetProjection())
+        cube_raster.SetGeoTransform(template_raster.GetGeoTransform())
+        for band_index in range(1, 4):
+            cube_band = cube_raster.GetRasterBand(band_index)
+            cube_band.SetNoDataValue(_TARGET_NODATA)
+            cube_band.Fill(band_index * 10.)
+        template_raster = None
+        cube_band = None
+        cube_raster = None
+        shutil.move(
+            os.path.join(self.workspace_dir, 'temp_cube.tif'), cube_path)
+
+        slice_dir = os.path.join(self.workspace_dir, 'cube_slices')
+        slice_path_map = forage._write_cube_slices(
+            cube_path, {'precip_0': 2, 'precip_1': 3}, slice_dir)
+        for key, band_index in [('precip_0', 2), ('precip_1', 3)]:
+            slice_info = pygeoprocessing.get_raster_info(slice_path_map[key])
+            self.assertEqual(slice_info['n_bands'], 1)
+            self.assertEqual(slice_info['nodata'][0], _TARGET_NODATA)
+            for offset_map, raster_block in pygeoprocessing.iterblocks(
+                    (slice_path_map[key], 1)):
+                numpy.testing.assert_allclose(raster_block, band_index * 10.)
+
+        with self.assertRaises(ValueError):
+            forage._write_cube_slices(cube_path, {'precip_2': 4}, slice_dir)
+
+        self.assertEqual(
+            forage._cube_file_path('NETCDF:"/data/chirps.nc":precip'),
+            '/data/chirps.nc')
+        self.assertEqual(forage._cube_file_path(cube_path), cube_path)
+
+    def test_monthly_input_prefetcher(self):
+        """Test `_MonthlyInputPrefetcher` and `_next_month_input_paths`.
+
+        Use `_next_month_input_paths` to list the inputs of the month after
+        the last month of a year, and `_MonthlyInputPrefetcher` to read them
+        in background threads. Test that only inputs of the next month are
+        submitted, that reads started by one call to `prefetch` are finished
+        before the next call, and that closing the prefetcher leaves no
+        pending reads.
+
+        Raises:
+            AssertionError if `_MonthlyInputPrefetcher` does not read the
+                inputs of the next month
+
+        Returns:
+            None
+
+        """
+        from rangeland_production import forage
+
+        # the run starts in November, so month_index 1 is December and the
+        # next month is January of the following year
+        aligned_inputs = {}
+        for key in [
+                'precip_1', 'precip_2', 'EO_index_1', 'min_temp_12',
+                'max_temp_12', 'min_temp_1', 'max_temp_1', 'site_index']:
+            aligned_inputs[key] = os.path.join(
+                self.workspace_dir, '{}.tif'.format(key))
+            create_constant_raster(
+                aligned_inputs[key], 1, n_cols=3, n_rows=3)
+        next_month_path_list = forage._next_month_input_paths(
+            aligned_inputs, 1, 11)
+        self.assertEqual(next_month_path_list, [
+            aligned_inputs[key] for key in [
+                'precip_2', 'min_temp_1', 'max_temp_1']])
+
+        prefetcher = forage._MonthlyInputPrefetcher(n_workers=2)
+        prefetcher.prefetch(forage._next_month_input_paths(
+            aligned_inputs, 0, 11))
+        self.assertEqual(len(prefetcher.pending_result_list), 4)
+        prefetcher.prefetch(next_month_path_list)
+        self.assertEqual(sorted(prefetcher.read_path_list), sorted([
+            aligned_inputs[key] for key in [
+                'precip_1', 'EO_index_1', 'min_temp_12', 'max_temp_12']]))
+        self.assertEqual(len(prefetcher.pending_result_list), 3)
+        prefetcher.close()
+        self.assertEqual(prefetcher.pending_result_list, [])
+        self.assertEqual(
+            prefetcher.submitted_path_list[4:], next_month_path_list)
+        self.assertEqual(
+            sorted(prefetcher.read_path_list),
+            sorted(prefetcher.submitted_path_list))
+
+    def test_checkpoint(self):
+        """Test `_write_checkpoint`, `_find_latest_checkpoint`.
+
+        Use the function `_write_checkpoint` to save model state at the end
+        of two months, and `_find_latest_checkpoint`, `_read_checkpoint` and
+        `_restore_registry` to restore it. Test that the latest complete
+        checkpoint is found, that an incomplete checkpoint is ignored, and
+        that restored rasters and animal traits match the saved state.
+
+        Raises:
+            AssertionError if restored state does not match saved state
+            ValueError if a required raster is missing from the checkpoint
+
+        Returns:
+            None
+
+        """
+        from rangeland_production import forage
+
+        sv_reg = {
+            'aglivc_1_path': os.path.join(self.workspace_dir, 'aglivc_1.tif'),
+            'minerl_1_1_path': os.path.join(
+                self.workspace_dir, 'minerl_1_1.tif'),
+        }
+        pp_reg = {
+            'afiel_1_path': os.path.join(self.workspace_dir, 'afiel_1.tif'),
+        }
+        year_reg = {
+            'annual_precip_path': os.path.join(
+                self.workspace_dir, 'annual_precip.tif'),
+        }
+        for path in list(sv_reg.values()) + list(pp_reg.values()):
+            create_constant_raster(path, 2.)
+        animal_trait_table = pandas.DataFrame.from_dict({
+            1: {'sex': 'breeding_female', 'A_foet': 3., 'A_y': 0.},
+        }, orient='index')
+
+        pixel_size = (1., 1.)
+        target_bb = [0., 44.5, 1., 45.5]
+        checkpoint_root = os.path.join(self.workspace_dir, 'checkpoints')
+        forage._write_checkpoint(
+            os.path.join(checkpoint_root, 'm11'), 11, 2016, 1, pixel_size,
+            target_bb, sv_reg, pp_reg, year_reg, animal_trait_table)
+        create_constant_raster(sv_reg['aglivc_1_path'], 5.)
+        animal_trait_table.loc[1, 'A_foet'] = 4.
+        forage._write_checkpoint(
+            os.path.join(checkpoint_root, 'm23'), 23, 2016, 1, pixel_size,
+            target_bb, sv_reg, pp_reg, year_reg, animal_trait_table)
+        # a checkpoint without manifest was interrupted and is not valid
+        os.makedirs(os.path.join(checkpoint_root, 'm35'))
+
+        checkpoint_dir = forage._find_latest_checkpoint(self.workspace_dir)
+        self.assertEqual(checkpoint_dir, os.path.join(checkpoint_root, 'm23'))
+        checkpoint = forage._read_checkpoint(checkpoint_dir)
+        self.assertEqual(checkpoint['month_index'], 23)
+        self.assertEqual(checkpoint['starting_year'], 2016)
+        self.assertEqual(checkpoint['yearly'], {})
+        self.assertEqual(checkpoint['target_pixel_size'], [1., 1.])
+        self.assertEqual(checkpoint['target_bb'], target_bb)
+        restored_table = pandas.read_pickle(checkpoint['animal_trait_table'])
+        self.assertEqual(restored_table.loc[1, 'A_foet'], 4.)
+
+        restore_dir = os.path.join(self.workspace_dir, 'restored')
+        os.makedirs(restore_dir)
+        restored_sv_reg = dict([
+            (key, os.path.join(restore_dir, os.path.basename(path))) for
+            key, path in sv_reg.items()])
+        forage._restore_registry(
+            checkpoint['state_variables'], restored_sv_reg)
+        for offset_map, raster_block in pygeoprocessing.iterblocks(
+                (restored_sv_reg['aglivc_1_path'], 1)):
+            numpy.testing.assert_allclose(raster_block, 5.)
+
+        restored_sv_reg['bglivc_1_path'] = os.path.join(
+            restore_dir, 'bglivc_1.tif')
+        with self.assertRaises(ValueError):
+            forage._restore_registry(
+                checkpoint['state_variables'], restored_sv_reg)
+        with self.assertRaises(ValueError):
+            forage._find_latest_checkpoint(restore_dir)
+
+    def test_restore_animal_state(self):
+        """Test `_restore_animal_state`.
+
+        Use the function `_restore_animal_state` to carry reproductive status
+        of animals over from a checkpoint into an animal trait table derived
+        from different inputs. Test that state columns are taken from the
+        checkpoint for animals present in both tables, and that other traits
+        and animals missing from the checkpoint are unchanged.
+
+        Raises:
+            AssertionError if `_restore_animal_state` does not match values
+                calculated by hand
+
+        Returns:
+            None
+
+        """
+        from rangeland_production import forage
+
+        animal_trait_table = pandas.DataFrame.from_dict({
+            1: {'grz_months': '0,1,2,3', 'reproductive_status_int': 0,
+                'W_total': 300., 'A_foet': 0., 'A_y': 0.},
+            2: {'grz_months': '0,1', 'reproductive_status_int': 0,
+                'W_total': 250., 'A_foet': 0., 'A_y': 0.},
+        }, orient='index')
+        checkpoint_trait_table = pandas.DataFrame.from_dict({
+            1: {'grz_months': '0,1', 'reproductive_status_int': 1,
+                'W_total': 312., 'A_foet': 4.5, 'A_y': 0.},
+        }, orient='index')
+
+        restored_table = forage._restore_animal_state(
+            animal_trait_table, checkpoint_trait_table)
+        self.assertEqual(restored_table.loc[1, 'grz_months'], '0,1,2,3')
+        self.assertEqual(restored_table.loc[1, 'reproductive_status_int'], 1)
+        self.assertEqual(restored_table.loc[1, 'W_total'], 312.)
+        self.assertEqual(restored_table.loc[1, 'A_foet'], 4.5)
+        self.assertEqual(restored_table.loc[2, 'W_total'], 250.)
+        self.assertEqual(animal_trait_table.loc[1, 'W_total'], 300.)
+
+    def test_fork_scenarios_invalid(self):
+        """Test `fork_scenarios` with invalid arguments.
+
+        Test that `fork_scenarios` raises an error before running the model
+        if the fork month is outside the simulation or if a scenario changes
+        an argument that determines the shared history.
+
+        Raises:
+            ValueError if arguments are invalid
+
+        Returns:
+            None
+
+        """
+        from rangeland_production import forage
+
+        args = {
+            'workspace_dir': self.workspace_dir,
+            'n_months': 12,
+        }
+        with self.assertRaises(ValueError):
+            forage.fork_scenarios(
+                args, 11, {'low': {'management_threshold': 100}})
+        with self.assertRaises(ValueError):
+            forage.fork_scenarios(
+                args, 5, {'wet': {'site_param_table': 'site_params.csv'}})
+
+    def test_fork_scenarios_from_checkpoint(self):
+        """Test `fork_scenarios` with an existing checkpoint.
+
+        Save the model state at the end of the fork month as the shared run
+        would, and fork two scenarios from it. Test that the shared run is
+        not repeated, that each scenario resumes from the checkpoint with its
+        own arguments and the shared alignment cache, and that the state
+        restored by each scenario is the shared state.
+
+        Raises:
+            AssertionError if scenarios do not start from the shared state
+
+        Returns:
+            None
+
+        """
+        from rangeland_production import forage
+
+        state_dir = os.path.join(self.workspace_dir, 'shared_state')
+        os.makedirs(state_dir)
+        sv_reg = {
+            'aglivc_1_path': os.path.join(state_dir, 'aglivc_1.tif'),
+        }
+        pp_reg = {
+            'afiel_1_path': os.path.join(state_dir, 'afiel_1.tif'),
+        }
+        create_constant_raster(sv_reg['aglivc_1_path'], 7.)
+        create_constant_raster(pp_reg['afiel_1_path'], 0.3)
+        animal_trait_table = pandas.DataFrame.from_dict({
+            1: {'sex': 'breeding_female', 'A_foet': 3., 'A_y': 0.},
+        }, orient='index')
+        checkpoint_dir = os.path.join(
+            self.workspace_dir, 'checkpoints', 'm5')
+        forage._write_checkpoint(
+            checkpoint_dir, 5, 2016, 1, (1., 1.), [0., 44.5, 1., 45.5],
+            sv_reg, pp_reg, {}, animal_trait_table)
+
+        args = {
+            'workspace_dir': self.workspace_dir,
+            'n_months': 12,
+            'management_threshold': 300,
+        }
+        scenario_args_map = {
+            'low': {'management_threshold': 100},
+            'high': {'management_threshold': 500},
+        }
+        with mock.patch.object(forage, 'execute') as execute_mock:
+            with mock.patch.object(
+                    forage, '_execute_in_processes') as processes_mock:
+                scenario_workspace_map = forage.fork_scenarios(
+                    args, 5, scenario_args_map, n_workers=1)
+        self.assertFalse(execute_mock.called)
+        scenario_args_list = processes_mock.call_args[0][0]
+        self.assertEqual(
+            [scenario_args['management_threshold'] for scenario_args in
+             scenario_args_list], [500, 100])
+        self.assertEqual(args['management_threshold'], 300)
+
+        for scenario_args in scenario_args_list:
+            self.assertIn(
+                scenario_args['workspace_dir'],
+                scenario_workspace_map.values())
+            self.assertEqual(scenario_args['n_months'], 12)
+            self.assertEqual(
+                scenario_args['alignment_cache_dir'],
+                os.path.join(self.workspace_dir, 'aligned_inputs'))
+            checkpoint = forage._read_checkpoint(
+                forage._find_latest_checkpoint(scenario_args['resume_from']))
+            self.assertEqual(checkpoint['month_index'], 5)
+            restore_dir = os.path.join(
+                scenario_args['workspace_dir'], 'restored')
+            os.makedirs(restore_dir)
+            restored_sv_reg = {
+                'aglivc_1_path': os.path.join(restore_dir, 'aglivc_1.tif'),
+            }
+            forage._restore_registry(
+                checkpoint['state_variables'], restored_sv_reg)
+            for offset_map, raster_block in pygeoprocessing.iterblocks(
+                    (restored_sv_reg['aglivc_1_path'], 1)):
+                numpy.testing.assert_allclose(raster_block, 7.)
+            restored_table = pandas.read_pickle(
+                checkpoint['animal_trait_table'])
+            self.assertEqual(restored_table.loc[1, 'A_foet'], 3.)
+
+    def test_sample_raster_at_points(self):
+        """Test `_sample_raster_at_points` and `_write_point_raster`.
+
+        Sample a raster with known values at a list of points and write the
+        sampled values to a point raster. Test that each point takes the value
+        of the pixel covering it, and that points outside the raster are
+        rejected.
+
+        Raises:
+            AssertionError if sampled values do not match values of the
+                pixels covering each point
+            ValueError if a point lies outside the raster
+
+        Returns:
+            None
+
+        """
+        from rangeland_production import forage
+
+        base_path = os.path.join(self.workspace_dir, 'base.tif')
+        create_constant_raster(base_path, 0, n_cols=3, n_rows=2)
+        base_raster = gdal.OpenEx(base_path, gdal.OF_RASTER | gdal.GA_Update)
+        base_raster.GetRasterBand(1).WriteArray(
+            numpy.array([[1, 2, 3], [4, 5, 6]], dtype=numpy.float32))
+        base_raster = None
+
+        # geotransform of the test raster is [0, 1, 0, 44.5, 0, 1]
+        x_array = numpy.array([0.5, 2.9, 1.2])
+        y_array = numpy.array([44.6, 46.4, 45.5])
+        sampled_array = forage._sample_raster_at_points(
+            base_path, x_array, y_array)
+        numpy.testing.assert_array_equal(sampled_array, [1, 6, 5])
+
+        point_path = os.path.join(self.workspace_dir, 'point.tif')
+        base_info = pygeoprocessing.get_raster_info(base_path)
+        forage._write_point_raster(
+            sampled_array, gdal.GDT_Float32, _TARGET_NODATA,
+            base_info['projection'], [0, 1, 0, 45, 0, -1], point_path)
+        point_info = pygeoprocessing.get_raster_info(point_path)
+        self.assertEqual(point_info['raster_size'], (3, 1))
+        point_raster = gdal.OpenEx(point_path, gdal.OF_RASTER)
+        numpy.testing.assert_array_equal(
+            point_raster.GetRasterBand(1).ReadAsArray(), [[1, 6, 5]])
+        point_raster = None
+
+        with self.assertRaises(ValueError):
+            forage._sample_raster_at_points(
+                base_path, numpy.array([3.5]), numpy.array([44.6]))
+
+        # points spread over several blocks of a tiled raster
+        tiled_path = os.path.join(self.workspace_dir, 'tiled.tif')
+        value_array = numpy.arange(40 * 36, dtype=numpy.float32).reshape(
+            36, 40)
+        tiled_raster = gdal.GetDriverByName('GTiff').Create(
+            tiled_path, 40, 36, 1, gdal.GDT_Float32,
+            options=['TILED=YES', 'BLOCKXSIZE=16', 'BLOCKYSIZE=16'])
+        tiled_raster.SetGeoTransform([0, 1, 0, 36, 0, -1])
+        tiled_raster.GetRasterBand(1).WriteArray(value_array)
+        tiled_raster = None
+        col_array = numpy.array([0, 39, 17, 16, 5, 33, 39])
+        row_array = numpy.array([0, 35, 2, 20, 35, 17, 0])
+        sampled_array = forage._sample_raster_at_points(
+            tiled_path, col_array + 0.5, 36 - row_array - 0.5)
+        numpy.testing.assert_array_equal(
+            sampled_array, value_array[row_array, col_array])
+
+    def test_observed_biomass_error(self):
+        """Test `_observed_biomass_error`.
+
+        Write modeled and observed biomass rasters for two months and test
+        that the error is calculated over months and pixels where both are
+        valid.
+
+        Raises:
+            AssertionError if `_observed_biomass_error` does not match value
+                calculated by hand
+
+        Returns:
+            None
+
+        """
+        from rangeland_production import forage
+
+        output_dir = os.path.join(self.workspace_dir, 'output')
+        os.makedirs(output_dir)
+        create_constant_raster(
+            os.path.join(output_dir, 'observed_biomass_2016_1.tif'), 100)
+        create_constant_raster(
+            os.path.join(output_dir, 'potential_biomass_2016_1.tif'), 130)
+        create_constant_raster(
+            os.path.join(output_dir, 'observed_biomass_2016_2.tif'), 200)
+        create_constant_raster(
+            os.path.join(output_dir, 'potential_biomass_2016_2.tif'), 160)
+        create_constant_raster(
+            os.path.join(output_dir, 'observed_biomass_2016_3.tif'),
+            _TARGET_NODATA)
+        create_constant_raster(
+            os.path.join(output_dir, 'potential_biomass_2016_3.tif'), 500)
+
+        error = forage._observed_biomass_error(
+            output_dir, 'potential_biomass')
+        self.assertAlmostEqual(error, numpy.sqrt((30 ** 2 + 40 ** 2) / 2.))
+        self.assertTrue(numpy.isnan(forage._observed_biomass_error(
+            output_dir, 'standing_biomass')))
+
+    def test_precip_climatology(self):
+        """Test `_precip_climatology`.
+
+        Use 26 months of precipitation in which the value of each month is
+        its month index. Test that each month of the climatology year is the
+        mean of that month over all years, and that inputs other than
+        precipitation are unchanged. Test that `spin_up` raises ValueError
+        if fewer than 12 months are given.
+
+        Raises:
+            AssertionError if `_precip_climatology` does not match values
+                calculated by hand
+
+        Returns:
+            None
+
+        """
+        from rangeland_production import forage
+
+        n_months = 26
+        aligned_inputs = {
+            'site_index': os.path.join(self.workspace_dir, 'site.tif')}
+        create_constant_raster(aligned_inputs['site_index'], 1)
+        for month_index in range(n_months):
+            aligned_inputs['precip_%d' % month_index] = os.path.join(
+                self.workspace_dir, 'precip_%d.tif' % month_index)
+            create_constant_raster(
+                aligned_inputs['precip_%d' % month_index], month_index)
+        target_dir = os.path.join(self.workspace_dir, 'climatology')
+        os.makedirs(target_dir)
+
+        climate_inputs = forage._precip_climatology(
+            aligned_inputs, n_months, target_dir)
+        self.assertEqual(
+            climate_inputs['site_index'], aligned_inputs['site_index'])
+        for month_index in range(12):
+            self.assertEqual(
+                os.path.dirname(climate_inputs['precip_%d' % month_index]),
+                target_dir)
+            expected_mean = numpy.mean(range(month_index, n_months, 12))
+            precip_raster = gdal.OpenEx(
+                climate_inputs['precip_%d' % month_index], gdal.OF_RASTER)
+            numpy.testing.assert_allclose(
+                precip_raster.GetRasterBand(1).ReadAsArray(),
+                [[expected_mean]])
+            precip_raster = None
+        # months of the second and third year are not part of the result
+        self.assertEqual(
+            climate_inputs['precip_12'], aligned_inputs['precip_12'])
+
+        with self.assertRaises(ValueError):
+            forage.spin_up(
+                {'starting_month': 1, 'n_months': 11},
+                os.path.join(self.workspace_dir, 'initial_conditions'))
+
+    def test_update_spin_up_state(self):
+        """Test `_update_spin_up_state`.
+
+        Use one pixel whose soil organic carbon changes by less than the
+        tolerance and one whose carbon changes by more. Test that only the
+        first pixel is recorded as stable and that its state variables are
+        held at their values at the start of the year.
+
+        Raises:
+            AssertionError if `_update_spin_up_state` does not match values
+                calculated by hand
+
+        Returns:
+            None
+
+        """
+        from rangeland_production import forage
+
+        start_dir = os.path.join(self.workspace_dir, 'start')
+        end_dir = os.path.join(self.workspace_dir, 'end')
+        os.makedirs(start_dir)
+        os.makedirs(end_dir)
+        year_start_sv_reg = {}
+        year_end_sv_reg = {}
+        for sv in forage._SOM_CARBON_POOLS + ['minerl_1_1']:
+            year_start_sv_reg['%s_path' % sv] = os.path.join(
+                start_dir, '%s.tif' % sv)
+            year_end_sv_reg['%s_path' % sv] = os.path.join(
+                end_dir, '%s.tif' % sv)
+            create_constant_raster(
+                year_start_sv_reg['%s_path' % sv], 100., n_cols=2)
+            create_constant_raster(
+                year_end_sv_reg['%s_path' % sv], 100.05, n_cols=2)
+        # carbon in the second pixel is not yet stable
+        som3c_raster = gdal.OpenEx(
+            year_end_sv_reg['som3c_path'], gdal.OF_RASTER | gdal.GA_Update)
+        som3c_raster.GetRasterBand(1).WriteArray(
+            numpy.array([[100.05, 120.]], dtype=numpy.float32))
+        som3c_raster = None
+
+        stable_year_path = os.path.join(self.workspace_dir, 'stable.tif')
+        create_constant_raster(stable_year_path, -1, n_cols=2)
+        n_unstable = forage._update_spin_up_state(
+            year_start_sv_reg, year_end_sv_reg, stable_year_path, 3, 0.001)
+        self.assertEqual(n_unstable, 1)
+
+        stable_raster = gdal.OpenEx(stable_year_path, gdal.OF_RASTER)
+        numpy.testing.assert_array_equal(
+            stable_raster.GetRasterBand(1).ReadAsArray(), [[3, -1]])
+        stable_raster = None
+        som3c_raster = gdal.OpenEx(
+            year_start_sv_reg['som3c_path'], gdal.OF_RASTER)
+        numpy.testing.assert_allclose(
+            som3c_raster.GetRasterBand(1).ReadAsArray(), [[100., 120.]])
+        som3c_raster = None
+
+    def test_persistent_param_cache_key(self):
+        """Test `_persistent_param_cache_key`.
+
+        Test that the key is the same for initial state variables written
+        twice with the same values, and differs when the values of initial
+        state variables or site parameters change.
+
+        Raises:
+            AssertionError if `_persistent_param_cache_key` does not
+                identify inputs correctly
+
+        Returns:
+            None
+
+        """
+        from rangeland_production import forage
+
+        aligned_inputs = {}
+        for key in ['site_index', 'sand', 'silt', 'clay', 'bulk_d_path']:
+            aligned_inputs[key] = os.path.join(
+                self.workspace_dir, '%s.tif' % key)
+            create_constant_raster(aligned_inputs[key], 1)
+        site_param_table = {1: {'edepth': 0.2, 'favail_1': 0.9}}
+
+        sv_reg_list = []
+        for sv_dir_name in ['state_variables_a', 'state_variables_b']:
+            sv_dir = os.path.join(self.workspace_dir, sv_dir_name)
+            os.makedirs(sv_dir)
+            sv_reg = {}
+            for key in forage._PERSISTENT_PARAM_SV_KEYS:
+                sv_reg[key] = os.path.join(sv_dir, '%s.tif' % key[:-5])
+                create_constant_raster(sv_reg[key], 20.)
+            sv_reg_list.append(sv_reg)
+
+        key_a = forage._persistent_param_cache_key(
+            aligned_inputs, site_param_table, sv_reg_list[0])
+        self.assertEqual(
+            key_a, forage._persistent_param_cache_key(
+                aligned_inputs, site_param_table, sv_reg_list[1]))
+        self.assertNotEqual(
+            key_a, forage._persistent_param_cache_key(
+                aligned_inputs, {1: {'edepth': 0.3, 'favail_1': 0.9}},
+                sv_reg_list[0]))
+
+        create_constant_raster(sv_reg_list[1]['som3c_path'], 25.)
+        self.assertNotEqual(
+            key_a, forage._persistent_param_cache_key(
+                aligned_inputs, site_param_table, sv_reg_list[1]))
+
+    def test_annual_precip_window(self):
+        """Test `_AnnualPrecipWindow`.
+
+        Sum 12 months of precipitation from scratch, move the window forward
+        by one month and test that annual precipitation matches the sum of
+        the 12 months inside the window, including nodata where one of them
+        is nodata.
+
+        Raises:
+            AssertionError if `_AnnualPrecipWindow` does not match values
+                calculated by hand
+
+        Returns:
+            None
+
+        """
+        from rangeland_production import forage
+
+        aligned_inputs = {}
+        for month_index in range(14):
+            aligned_inputs['precip_{}'.format(month_index)] = os.path.join(
+                self.workspace_dir, 'precip_{}.tif'.format(month_index))
+            create_constant_raster(
+                aligned_inputs['precip_{}'.format(month_index)],
+                month_index + 1, n_cols=2)
+        # the first month is nodata in the second pixel
+        precip_raster = gdal.OpenEx(
+            aligned_inputs['precip_0'], gdal.OF_RASTER | gdal.GA_Update)
+        precip_raster.GetRasterBand(1).WriteArray(
+            numpy.array([[1, _TARGET_NODATA]], dtype=numpy.float32))
+        precip_raster = None
+
+        window_dir = os.path.join(self.workspace_dir, 'window')
+        os.makedirs(window_dir)
+        precip_window = forage._AnnualPrecipWindow(window_dir)
+        annual_precip_path = os.path.join(
+            self.workspace_dir, 'annual_precip.tif')
+
+        precip_window.update(0, aligned_inputs)
+        precip_window.write_annual_precip(
+            0, aligned_inputs, annual_precip_path)
+        self.assertEqual(precip_window.window_end, 11)
+        annual_raster = gdal.OpenEx(annual_precip_path, gdal.OF_RASTER)
+        numpy.testing.assert_allclose(
+            annual_raster.GetRasterBand(1).ReadAsArray(),
+            [[78, _TARGET_NODATA]])
+        annual_raster = None
+
+        for month_index in range(1, 13):
+            precip_window.update(month_index, aligned_inputs)
+        self.assertEqual(precip_window.window_end, 12)
+        precip_window.write_annual_precip(
+            12, aligned_inputs, annual_precip_path)
+        annual_raster = gdal.OpenEx(annual_precip_path, gdal.OF_RASTER)
+        numpy.testing.assert_allclose(
+            annual_raster.GetRasterBand(1).ReadAsArray(), [[90, 90]])
+        annual_raster = None
+
+    def test_annual_precip_window_drift(self):
+        """Test `_AnnualPrecipWindow` over more than 12 months.
+
+        Move the window forward month by month over 40 months of random
+        precipitation, and test that annual precipitation matches the sum
+        of the same 12 months from scratch, so that rounding in the repeated
+        additions and subtractions does not accumulate. Test that
+        `write_annual_precip` moves the window itself by a few months, and
+        sums from scratch when moving would read more rasters.
+
+        Raises:
+            AssertionError if the moving sum differs from the sum from
+                scratch
+
+        Returns:
+            None
+
+        """
+        from rangeland_production import forage
+
+        n_months = 40
+        aligned_inputs = {}
+        precip_array_list = []
+        for month_index in range(n_months):
+            precip_path = os.path.join(
+                self.workspace_dir, 'precip_{}.tif'.format(month_index))
+            aligned_inputs['precip_{}'.format(month_index)] = precip_path
+            create_constant_raster(precip_path, 0, n_cols=3, n_rows=3)
+            precip_array = numpy.random.uniform(
+                0, 300, (3, 3)).astype(numpy.float32)
+            precip_array_list.append(precip_array)
+            precip_raster = gdal.OpenEx(
+                precip_path, gdal.OF_RASTER | gdal.GA_Update)
+            precip_raster.GetRasterBand(1).WriteArray(precip_array)
+            precip_raster = None
+
+        def read_annual_precip(precip_window, month_index):
+            """Write annual precipitation for a month and read it back."""
+            annual_precip_path = os.path.join(
+                self.workspace_dir, 'annual_precip.tif')
+            precip_window.write_annual_precip(
+                month_index, aligned_inputs, annual_precip_path)
+            annual_raster = gdal.OpenEx(annual_precip_path, gdal.OF_RASTER)
+            annual_precip = annual_raster.GetRasterBand(1).ReadAsArray()
+            annual_raster = None
+            return annual_precip
+
+        window_dir = os.path.join(self.workspace_dir, 'window')
+        os.makedirs(window_dir)
+        precip_window = forage._AnnualPrecipWindow(window_dir)
+        read_annual_precip(precip_window, 0)
+        for month_index in range(12, n_months):
+            precip_window.update(month_index, aligned_inputs)
+        self.assertEqual(precip_window.window_end, n_months - 1)
+        moved_precip = read_annual_precip(precip_window, n_months - 1)
+
+        scratch_dir = os.path.join(self.workspace_dir, 'scratch')
+        os.makedirs(scratch_dir)
+        scratch_window = forage._AnnualPrecipWindow(scratch_dir)
+        scratch_precip = read_annual_precip(scratch_window, n_months - 1)
+        numpy.testing.assert_allclose(moved_precip, scratch_precip, rtol=1e-6)
+        numpy.testing.assert_allclose(
+            scratch_precip,
+            numpy.sum(precip_array_list[n_months - 12:], axis=0), rtol=1e-5)
+
+        # a window ending at month 11 is moved to month 14, but summed from
+        # scratch for month 24
+        scratch_window.window_end = None
+        read_annual_precip(scratch_window, 0)
+        self.assertEqual(scratch_window.window_end, 11)
+        numpy.testing.assert_allclose(
+            read_annual_precip(scratch_window, 14),
+            numpy.sum(precip_array_list[3:15], axis=0), rtol=1e-5)
+        self.assertEqual(scratch_window.window_end, 14)
+        numpy.testing.assert_allclose(
+            read_annual_precip(scratch_window, 24),
+            numpy.sum(precip_array_list[13:25], axis=0), rtol=1e-5)
+        self.assertEqual(scratch_window.window_end, 24)
+
+    def test_observed_biomass_pre_pass(self):
+        """Test `_ObservedBiomassPrePass`.
+
+        Submit observed biomass for two months to be calculated in background
+        threads and test that each matches biomass calculated by hand from
+        the vegetation index and the regression parameters of the site.
+
+        Raises:
+            AssertionError if `_ObservedBiomassPrePass` does not match values
+                calculated by hand
+
+        Returns:
+            None
+
+        """
+        from rangeland_production import forage
+
+        site_index_path = os.path.join(self.workspace_dir, 'site_index.tif')
+        create_constant_raster(site_index_path, 1, n_cols=2)
+        site_param_table = {
+            1: {'eo_biomass_intercept': -20., 'eo_biomass_slope': 1000.}}
+
+        EO_index_path_list = [
+            os.path.join(self.workspace_dir, 'EO_index_{}.tif'.format(i)) for
+            i in range(2)]
+        create_constant_raster(EO_index_path_list[0], 0.3, n_cols=2)
+        create_constant_raster(EO_index_path_list[1], 0.01, n_cols=2)
+        # the second pixel of the first month is nodata
+        EO_raster = gdal.OpenEx(
+            EO_index_path_list[0], gdal.OF_RASTER | gdal.GA_Update)
+        EO_raster.GetRasterBand(1).WriteArray(
+            numpy.array([[0.3, _TARGET_NODATA]], dtype=numpy.float32))
+        EO_raster = None
+
+        obs_biomass_path_list = [
+            os.path.join(
+                self.workspace_dir, 'observed_biomass_{}.tif'.format(i)) for
+            i in range(2)]
+        pre_pass = forage._ObservedBiomassPrePass(
+            site_index_path, site_param_table)
+        for EO_index_path, obs_biomass_path in zip(
+                EO_index_path_list, obs_biomass_path_list):
+            pre_pass.submit(EO_index_path, obs_biomass_path)
+        for obs_biomass_path in obs_biomass_path_list:
+            pre_pass.wait(obs_biomass_path)
+        pre_pass.close()
+        self.assertFalse(os.path.exists(pre_pass.param_dir))
+
+        obs_raster = gdal.OpenEx(obs_biomass_path_list[0], gdal.OF_RASTER)
+        numpy.testing.assert_allclose(
+            obs_raster.GetRasterBand(1).ReadAsArray(),
+            [[280, _TARGET_NODATA]], rtol=1e-5)
+        obs_raster = None
+        # biomass predicted by the regression is not negative
+        obs_raster = gdal.OpenEx(obs_biomass_path_list[1], gdal.OF_RASTER)
+        numpy.testing.assert_allclose(
+            obs_raster.GetRasterBand(1).ReadAsArray(), [[0, 0]])
+        obs_raster = None
+
+    def test_monthly_output_stack(self):
+        """Test `_MonthlyOutputStack` and `read_output_time_series`.
+
+        Write two of three months of an output to a stacked raster, and
+        test that the time series read at a pixel contains the values of
+        these months and NaN for the month that was not written. Extend the
+        run by one month and test that months written before are kept.
+
+        Raises:
+            AssertionError if the time series read from the stacked raster
+                does not match values written to it
+            AssertionError if `_MonthlyOutputStack` does not raise
+                ValueError for a month outside the run
+
+        Returns:
+            None
+
+        """
+        from rangeland_production import forage
+
+        template_path = os.path.join(self.workspace_dir, 'template.tif')
+        create_constant_raster(template_path, 1, n_cols=2)
+        output_dir = os.path.join(self.workspace_dir, 'output')
+        os.makedirs(output_dir)
+        month_path_list = [
+            os.path.join(self.workspace_dir, 'month_{}.tif'.format(i)) for
+            i in range(3)]
+        create_constant_raster(month_path_list[0], 10, n_cols=2)
+        create_constant_raster(month_path_list[1], 20, n_cols=2)
+        create_constant_raster(month_path_list[2], _TARGET_NODATA, n_cols=2)
+
+        output_stack = forage._MonthlyOutputStack(
+            output_dir, 2016, 11, 3, template_path)
+        output_stack.write('standing_biomass', 2017, 1, month_path_list[1])
+        output_stack.write('standing_biomass', 2016, 11, month_path_list[0])
+        with self.assertRaises(ValueError):
+            output_stack.write(
+                'standing_biomass', 2017, 2, month_path_list[0])
+
+        stack_path = os.path.join(output_dir, 'standing_biomass.tif')
+        time_series = forage.read_output_time_series(stack_path, 1.5, 44.6)
+        self.assertEqual(
+            list(time_series.index), ['2016_11', '2016_12', '2017_1'])
+        numpy.testing.assert_allclose(
+            time_series.values, [10, numpy.nan, 20])
+        with self.assertRaises(ValueError):
+            forage.read_output_time_series(stack_path, 2.5, 44.6)
+
+        output_stack = forage._MonthlyOutputStack(
+            output_dir, 2016, 11, 4, template_path)
+        output_stack.write('standing_biomass', 2017, 2, month_path_list[2])
+        time_series = forage.read_output_time_series(stack_path, 0.5, 44.6)
+        self.assertEqual(list(time_series.index)[-1], '2017_2')
+        numpy.testing.assert_allclose(
+            time_series.values, [10, numpy.nan, 20, numpy.nan])
+
+    def test_parse_output_list(self):
+        """Test `_parse_output_list`.
+
+        Test that outputs are identified from a list or a comma-separated
+        string, and that an unknown output raises ValueError.
+
+        Raises:
+            AssertionError if `_parse_output_list` does not match the
+                selected outputs
+            AssertionError if `_parse_output_list` does not raise ValueError
+                for an unknown output
+
+        Returns:
+            None
+
+        """
+        from rangeland_production import forage
+
+        self.assertEqual(
+            forage._parse_output_list(
+                ['standing_biomass', 'observed_biomass']),
+            ['standing_biomass', 'observed_biomass'])
+        self.assertEqual(
+            forage._parse_output_list('animal_density, diet_sufficiency,'),
+            ['animal_density', 'diet_sufficiency'])
+        self.assertEqual(forage._parse_output_list([]), [])
+        with self.assertRaises(ValueError):
+            forage._parse_output_list('standing_biomass,biomass')
+
+    def test_append_monthly_summary(self):
+        """Test `_append_monthly_summary`.
+
+        Summarize outputs of two months inside the study area and two
+        grazing areas, and test that the mean and total of each output match
+        values calculated by hand, excluding nodata pixels.
+
+        Raises:
+            AssertionError if `_append_monthly_summary` does not match values
+                calculated by hand
+
+        Returns:
+            None
+
+        """
+        from rangeland_production import forage
+
+        def write_array(raster_path, value_list):
+            """Write a row of values to a raster with three columns."""
+            create_constant_raster(raster_path, 0, n_cols=3)
+            raster = gdal.OpenEx(raster_path, gdal.OF_RASTER | gdal.GA_Update)
+            raster.GetRasterBand(1).WriteArray(
+                numpy.array([value_list], dtype=numpy.float32))
+            raster = None
+
+        aligned_inputs = {
+            'aoi_mask': os.path.join(self.workspace_dir, 'aoi_mask.tif'),
+            'grazing_area_id': os.path.join(
+                self.workspace_dir, 'grazing_area_id.tif'),
+        }
+        write_array(aligned_inputs['aoi_mask'], [0, 0, 0])
+        write_array(aligned_inputs['grazing_area_id'], [0, 0, 1])
+        source_path_dict = {
+            'standing_biomass': os.path.join(
+                self.workspace_dir, 'standing_biomass.tif'),
+            'diet_sufficiency': os.path.join(
+                self.workspace_dir, 'diet_sufficiency.tif'),
+        }
+        write_array(source_path_dict['standing_biomass'], [100, 200, 600])
+        write_array(
+            source_path_dict['diet_sufficiency'], [0.5, 1.5, _TARGET_NODATA])
+
+        summary_table_path = os.path.join(self.workspace_dir, 'summary.csv')
+        forage._append_monthly_summary(
+            aligned_inputs, source_path_dict, 2016, 12, summary_table_path)
+        forage._append_monthly_summary(
+            aligned_inputs, source_path_dict, 2017, 1, summary_table_path)
+
+        pixel_area_ha = forage._pixel_area_ha(aligned_inputs['aoi_mask'])
+        summary_df = pandas.read_csv(summary_table_path)
+        self.assertEqual(len(summary_df), 10)
+        month_df = summary_df[summary_df['month'] == 1]
+        aoi_df = month_df[month_df['grazing_area_id'].isnull()].set_index(
+            'output')
+        self.assertAlmostEqual(aoi_df.loc['standing_biomass', 'mean'], 300)
+        self.assertAlmostEqual(
+            aoi_df.loc['standing_biomass', 'total'] / pixel_area_ha, 900,
+            places=3)
+        self.assertAlmostEqual(aoi_df.loc['diet_sufficiency', 'mean'], 1)
+        self.assertTrue(numpy.isnan(aoi_df.loc['diet_sufficiency', 'total']))
+        area_df = month_df[month_df['grazing_area_id'] == 1].set_index(
+            'output')
+        self.assertEqual(list(area_df.index), ['standing_biomass'])
+        self.assertAlmostEqual(area_df.loc['standing_biomass', 'mean'], 600)
+
+    def test_state_variable_retention(self):
+        """Test `_StateVariableRetention`.
+
+        Simulate the completion of five months with the policies 'every:2'
+        and 'last:2', and test that only the directories kept by each policy
+        remain, and that rasters inside them are compressed.
+
+        Raises:
+            AssertionError if `_StateVariableRetention` does not keep the
+                directories of the expected months
+            AssertionError if `_StateVariableRetention` does not raise
+                ValueError for an unknown policy
+
+        Returns:
+            None
+
+        """
+        from rangeland_production import forage
+
+        with self.assertRaises(ValueError):
+            forage._StateVariableRetention(self.workspace_dir, 'some')
+
+        for policy, kept_month_list in [
+                ('every:2', [-1, 1, 3, 4]), ('last:2', [3, 4])]:
+            workspace_dir = os.path.join(
+                self.workspace_dir, policy.replace(':', '_'))
+            for month_index in range(-1, 5):
+                sv_dir = os.path.join(
+                    workspace_dir, 'state_variables_m%d' % month_index)
+                os.makedirs(sv_dir)
+                create_constant_raster(
+                    os.path.join(sv_dir, 'som1c_1.tif'), 10, n_cols=3,
+                    n_rows=3)
+            sv_retention = forage._StateVariableRetention(
+                workspace_dir, policy)
+            for month_index in range(5):
+                sv_retention.month_completed(month_index)
+            sv_retention.close()
+            self.assertEqual(
+                sorted(os.listdir(workspace_dir)), sorted([
+                    'state_variables_m%d' % month_index for month_index in
+                    kept_month_list]))
+            raster = gdal.OpenEx(
+                os.path.join(
+                    workspace_dir, 'state_variables_m4', 'som1c_1.tif'),
+                gdal.OF_RASTER)
+            self.assertEqual(
+                raster.GetMetadataItem('COMPRESSION', 'IMAGE_STRUCTURE'),
+                'DEFLATE')
+            numpy.testing.assert_allclose(
+                raster.GetRasterBand(1).ReadAsArray(), 10)
+            raster = None
+
+    def test_target_creation_options(self):
+        """Test `_set_raster_presets` and `_target_creation_options`.
+
+        Select a preset for temporary rasters and another for all other
+        rasters, and test that each raster receives the options of the
+        preset matching its location, with a predictor suited to its
+        datatype.
+
+        Raises:
+            AssertionError if `_target_creation_options` does not return the
+                options of the expected preset
+            AssertionError if `_set_raster_presets` does not raise ValueError
+                for an unknown preset
+
+        Returns:
+            None
+
+        """
+        from rangeland_production import forage
+
+        processing_dir = os.path.join(self.workspace_dir, 'temporary_files')
+        base_processing_dir = forage.PROCESSING_DIR
+        forage.PROCESSING_DIR = processing_dir
+        try:
+            forage._set_raster_presets({})
+            self.assertIsNone(forage._target_creation_options(
+                os.path.join(processing_dir, 'a.tif'), gdal.GDT_Float32))
+
+            forage._set_raster_presets({
+                'scratch_raster_preset': 'fast_scratch',
+                'output_raster_preset': 'compact_archive'})
+            scratch_options = forage._target_creation_options(
+                os.path.join(processing_dir, 'tmp', 'a.tif'),
+                gdal.GDT_Float32)
+            self.assertIn('COMPRESS=NONE', scratch_options)
+            self.assertFalse([
+                option for option in scratch_options if
+                option.startswith('PREDICTOR')])
+            output_options = forage._target_creation_options(
+                os.path.join(
+                    self.workspace_dir, 'temporary_files_old', 'a.tif'),
+                gdal.GDT_Float32)
+            self.assertIn('COMPRESS=DEFLATE', output_options)
+            self.assertIn('PREDICTOR=3', output_options)
+            self.assertIn('PREDICTOR=2', forage._target_creation_options(
+                os.path.join(self.workspace_dir, 'a.tif'), gdal.GDT_Int32))
+
+            with self.assertRaises(ValueError):
+                forage._set_raster_presets(
+                    {'output_raster_preset': 'smallest'})
+        finally:
+            forage.PROCESSING_DIR = base_processing_dir
+            forage._set_raster_presets({})
+
+    def test_quantized_outputs(self):
+        """Test `_write_quantized_raster` and `read_output_raster`.
+
+        Write an output as scaled integers to a single raster and to a
+        stacked raster, and test that the values read back match the
+        original values to the precision of the scale, with nodata kept and
+        values above the valid range clipped.
+
+        Raises:
+            AssertionError if values read from quantized outputs do not
+                match values calculated by hand
+
+        Returns:
+            None
+
+        """
+        from rangeland_production import forage
+
+        base_path = os.path.join(self.workspace_dir, 'standing_biomass.tif')
+        create_constant_raster(base_path, 0, n_cols=3)
+        base_raster = gdal.OpenEx(base_path, gdal.OF_RASTER | gdal.GA_Update)
+        base_raster.GetRasterBand(1).WriteArray(
+            numpy.array([[123.3, _TARGET_NODATA, 1e6]], dtype=numpy.float32))
+        base_raster = None
+        scale = forage._QUANTIZED_OUTPUT_SCALE['standing_biomass']
+        max_value = (forage._QUANTIZED_NODATA - 1) * scale
+
+        quantized_path = os.path.join(
+            self.workspace_dir, 'standing_biomass_quantized.tif')
+        forage._write_quantized_raster(
+            base_path, quantized_path, 'standing_biomass')
+        self.assertEqual(
+            pygeoprocessing.get_raster_info(quantized_path)['datatype'],
+            gdal.GDT_UInt16)
+        numpy.testing.assert_allclose(
+            forage.read_output_raster(quantized_path),
+            [[123.5, numpy.nan, max_value]])
+        # outputs that are not quantized are read unchanged
+        numpy.testing.assert_allclose(
+            forage.read_output_raster(base_path),
+            [[123.3, numpy.nan, 1e6]], rtol=1e-6)
+
+        output_dir = os.path.join(self.workspace_dir, 'output')
+        os.makedirs(output_dir)
+        output_stack = forage._MonthlyOutputStack(
+            output_dir, 2016, 1, 2, base_path, quantize=True)
+        output_stack.write('standing_biomass', 2016, 2, base_path)
+        stack_path = os.path.join(output_dir, 'standing_biomass.tif')
+        numpy.testing.assert_allclose(
+            forage.read_output_time_series(stack_path, 0.5, 44.6).values,
+            [numpy.nan, 123.5])
+        numpy.testing.assert_allclose(
+            forage.read_output_raster(stack_path, band_index=2),
+            [[123.5, numpy.nan, max_value]])
+
+        # a stack written with scaled integers is not extended with floats
+        float_stack = forage._MonthlyOutputStack(
+            output_dir, 2016, 1, 3, base_path, quantize=False)
+        with self.assertRaises(ValueError):
+            float_stack.write('standing_biomass', 2016, 3, base_path)